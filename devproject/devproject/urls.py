@@ -1,30 +1,11 @@
 from django.conf.urls import include, static, url
 from django.contrib import admin
-from django.contrib.sitemaps.views import sitemap
+from django.contrib.sitemaps import views as sitemaps_views
 
-from spectator.core.apps import spectator_apps
-from spectator.core.sitemaps import CreatorSitemap
+from spectator.core.sitemaps import get_sitemaps
 
-if spectator_apps.is_enabled('events'):
-    from spectator.events.sitemaps import EventSitemap, VenueSitemap, WorkSitemap
 
-if spectator_apps.is_enabled('reading'):
-    from spectator.reading.sitemaps import PublicationSitemap,\
-            PublicationSeriesSitemap
-
-
-sitemaps = {
-    'creators': CreatorSitemap,
-}
-
-if spectator_apps.is_enabled('events'):
-    sitemaps['events'] = EventSitemap
-    sitemaps['works'] = WorkSitemap
-    sitemaps['venues'] = VenueSitemap
-
-if spectator_apps.is_enabled('reading'):
-    sitemaps['publications'] = PublicationSitemap
-    sitemaps['publicationseries'] = PublicationSeriesSitemap
+sitemaps = get_sitemaps()
 
 
 urlpatterns = [
@@ -33,11 +14,18 @@ urlpatterns = [
     url(r'^', include('spectator.core.urls')),
 
     url(r'^sitemap\.xml$',
-        sitemap,
+        sitemaps_views.index,
+        {
+            'sitemaps': sitemaps,
+            'sitemap_url_name': 'sitemaps',
+        }),
+
+    url(r'^sitemap-(?P<section>.+)\.xml$',
+        sitemaps_views.sitemap,
         {
             'sitemaps': sitemaps,
         },
-        name='django.contrib.sitemaps.views.sitemap'),
+        name='sitemaps'),
 ]
 
 
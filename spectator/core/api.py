@@ -0,0 +1,229 @@
+import hashlib
+import json
+
+from django.core.paginator import InvalidPage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.utils.translation import ugettext as _
+from django.views.generic import View
+from django.views.generic.detail import SingleObjectMixin
+
+from . import app_settings
+from .models import Creator
+from .paginator import KeysetPaginator
+from .views import DecodeSlugMixin
+
+
+# Read-only JSON views of Spectator's objects.
+# Only available if the SPECTATOR_API setting is True.
+# See spectator.core.urls.api for the URLs.
+
+
+def object_data(obj, **data):
+    """
+    The fields every API object has, plus `data`, as a dict.
+    Objects without slugs, like Readings, are identified by their pk.
+    """
+    result = {}
+    if hasattr(obj, 'slug'):
+        result['slug'] = obj.slug
+    else:
+        result['id'] = obj.pk
+    if hasattr(obj, 'get_absolute_url'):
+        result['url'] = obj.get_absolute_url()
+    result.update(data)
+    result['time_created'] = obj.time_created
+    result['time_modified'] = obj.time_modified
+    return result
+
+
+def object_ref(obj, **data):
+    "A short reference to a related object, like an Event's Venue."
+    result = {'slug': obj.slug, 'name': str(obj),
+              'url': obj.get_absolute_url()}
+    result.update(data)
+    return result
+
+
+def roles_data(roles):
+    "A list of dicts about EventRoles, WorkRoles or PublicationRoles."
+    return [
+        {'creator': object_ref(role.creator), 'role_name': role.role_name,
+         'role_order': role.role_order}
+        for role in roles
+    ]
+
+
+def role_objects(roles):
+    "The roles and their Creators, for APIMixin.get_related_objects()."
+    objects = []
+    for role in roles:
+        objects.extend([role, role.creator])
+    return objects
+
+
+def roles_prefetch(model, lookup='roles'):
+    "A Prefetch for `model`'s roles, with their Creators."
+    return Prefetch(lookup, queryset=model.objects.select_related('creator'))
+
+
+class APIMixin(object):
+    """
+    Views should set `model` and implement `serialize(obj)`, returning a
+    dict. Override `get_queryset()` to fetch related objects that are
+    serialized, so that fetching them doesn't take a query per object.
+    """
+    model = None
+
+    def dispatch(self, request, *args, **kwargs):
+        if not app_settings.API:
+            raise Http404(_('The API is not enabled.'))
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return self.model._default_manager.all()
+
+    def serialize(self, obj):
+        raise NotImplementedError
+
+    def get_related_objects(self, obj):
+        """
+        The other objects included in `obj`'s data, whose changes should
+        change its ETag, e.g. an Event's Venue, roles and Creators.
+        """
+        return []
+
+
+class APIListView(APIMixin, View):
+    """
+    Streams a list of objects, ordered by pk, as JSON:
+
+        {
+          "results": [{...}, {...}, ...],
+          "next": "/api/events/?cursor=WzAsMSxbNDJdXQ&limit=100"
+        }
+
+    `next` is null if there are no more objects. The `limit` GET parameter
+    sets how many objects are returned, up to `max_limit`.
+
+    The objects are fetched `chunk_size` at a time, each chunk by seeking
+    from the last one (see KeysetPaginator.iterate()) with its related
+    objects prefetched, so each chunk costs a fixed number of queries,
+    and are written to the response as they're fetched.
+    """
+    ordering = ('pk',)
+    default_limit = 100
+    max_limit = 1000
+    chunk_size = 500
+
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = int(request.GET.get('limit', self.default_limit))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= self.max_limit:
+            return JsonResponse(
+                {'error': 'limit must be between 1 and {}'.format(
+                                                            self.max_limit)},
+                status=400)
+
+        # One more than the limit, to see if there's a next page:
+        paginator = KeysetPaginator(self.get_queryset(),
+                                    min(limit + 1, self.chunk_size),
+                                    ordering=self.ordering)
+        try:
+            objects = paginator.iterate(request.GET.get('cursor'),
+                                        limit=limit + 1)
+        except InvalidPage:
+            return JsonResponse({'error': 'That cursor is not valid'},
+                                status=400)
+
+        return StreamingHttpResponse(
+                            self.stream(paginator, objects, limit),
+                            content_type='application/json')
+
+    def stream(self, paginator, objects, limit):
+        "Yields the parts of the JSON response."
+        encoder = DjangoJSONEncoder()
+        last = None
+        count = 0
+        next_url = None
+
+        yield '{"results": ['
+        for obj in objects:
+            if count == limit:
+                query = self.request.GET.copy()
+                query['cursor'] = paginator.encode_cursor(last, 0)
+                query['limit'] = limit
+                next_url = '{}?{}'.format(self.request.path,
+                                          query.urlencode())
+                break
+            if count > 0:
+                yield ', '
+            yield encoder.encode(self.serialize(obj))
+            last = obj
+            count += 1
+        yield '], "next": {}}}'.format(json.dumps(next_url))
+
+
+class APIDetailView(APIMixin, DecodeSlugMixin, SingleObjectMixin, View):
+    """
+    Returns one object as JSON, with ETag and Last-Modified headers made
+    from its `time_modified`, and that of the related objects it includes.
+
+    Requests with a matching If-None-Match or If-Modified-Since header get
+    a 304 Not Modified response, without the object being serialized.
+    """
+
+    def get(self, request, *args, **kwargs):
+        obj = self.get_object()
+
+        objects = [obj] + list(self.get_related_objects(obj))
+        etag, last_modified = self.get_validators(objects)
+
+        response = get_conditional_response(request, etag=etag,
+                                            last_modified=last_modified)
+        if response is None:
+            response = JsonResponse(self.serialize(obj))
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def get_validators(self, objects):
+        """
+        Returns the (ETag, Last-Modified timestamp) for a list of objects.
+
+        The ETag changes when any of them is modified, or when the objects
+        themselves change, e.g. when a role is deleted.
+        """
+        stamps = [
+            (obj._meta.label_lower, obj.pk,
+             getattr(obj, 'time_modified', None))
+            for obj in objects
+        ]
+
+        key = json.dumps(stamps, cls=DjangoJSONEncoder)
+        etag = quote_etag(hashlib.sha1(key.encode()).hexdigest())
+
+        last_modified = max(s[2] for s in stamps if s[2] is not None)
+        return etag, int(last_modified.timestamp())
+
+
+class CreatorAPIMixin(object):
+    model = Creator
+
+    def serialize(self, obj):
+        return object_data(obj, name=obj.name, name_sort=obj.name_sort,
+                           kind=obj.kind)
+
+
+class CreatorListAPIView(CreatorAPIMixin, APIListView):
+    pass
+
+
+class CreatorDetailAPIView(CreatorAPIMixin, APIDetailView):
+    pass
@@ -17,3 +17,62 @@ SLUG_SALT = getattr(settings, 'SPECTATOR_SLUG_SALT', 'Django Spectator')
 
 # For Events and card titles.
 DATE_FORMAT = getattr(settings, 'SPECTATOR_DATE_FORMAT', '%-d %b %Y')
+
+# If True, the numbers of Creators, Events and Publications of each kind are
+# kept in a table, updated as objects are saved and deleted, rather than
+# counted each time they're needed.
+KIND_COUNTS_TABLE = getattr(settings, 'SPECTATOR_KIND_COUNTS_TABLE', False)
+
+# The alias of the cache, in the CACHES setting, that Spectator should use:
+CACHE_ALIAS = getattr(settings, 'SPECTATOR_CACHE_ALIAS', 'default')
+
+# If True, the total numbers of objects used by paginated lists are cached,
+# until a model involved is next saved or deleted.
+CACHE_PAGINATOR_COUNTS = getattr(
+    settings, 'SPECTATOR_CACHE_PAGINATOR_COUNTS', False)
+
+# If True, the HTML of the sidebar card template tags is cached until any of
+# the models they use are saved or deleted.
+CACHE_CARDS = getattr(settings, 'SPECTATOR_CACHE_CARDS', False)
+
+# If True, the charts of Creators with the most Events, Works, Readings and
+# Publications are kept in a table, updated as those things change, rather
+# than being calculated each time they're needed.
+LEADERBOARD_TABLES = getattr(settings, 'SPECTATOR_LEADERBOARD_TABLES', False)
+
+# If True, the numbers of Events and Readings of each kind per year are kept
+# in a table, updated as they're saved and deleted, rather than counted each
+# time they're needed.
+ANNUAL_COUNTS_TABLE = getattr(settings, 'SPECTATOR_ANNUAL_COUNTS_TABLE', False)
+
+# If True, a full-text search index of Creators, Events, Works, Venues,
+# Publications and Publication Series is kept up to date as they're saved and
+# deleted, and the search pages are enabled.
+SEARCH_INDEX = getattr(settings, 'SPECTATOR_SEARCH_INDEX', False)
+
+# Which search index to use: 'fts5' for SQLite's full-text search, 'tokens'
+# for a table of words that works with any database, or 'auto' to use 'fts5'
+# if it's available.
+SEARCH_BACKEND = getattr(settings, 'SPECTATOR_SEARCH_BACKEND', 'auto')
+
+# If True, the HTML list and detail pages send ETag and Last-Modified headers,
+# made from the time_modified of the objects they display, and answer
+# matching conditional requests with 304 Not Modified.
+CONDITIONAL_GET = getattr(settings, 'SPECTATOR_CONDITIONAL_GET', False)
+
+# If True, the read-only JSON API of Creators, Events, Works, Venues,
+# Publications and Readings is enabled, under /api/.
+API = getattr(settings, 'SPECTATOR_API', False)
+
+# The most SQL queries each view should make, keyed by URL name, like
+# {'spectator:events:event_list': 6}. Checked by QueryBudgetMiddleware and
+# QueryBudgetTestMixin in spectator.core.querybudget.
+QUERY_BUDGETS = getattr(settings, 'SPECTATOR_QUERY_BUDGETS', {})
+
+# The query budget of views that aren't in QUERY_BUDGETS, or None for no
+# limit.
+QUERY_BUDGET_DEFAULT = getattr(settings, 'SPECTATOR_QUERY_BUDGET_DEFAULT', None)
+
+# How many times the same SQL can be run, with different parameters, in one
+# request before it's reported as a likely N+1 problem.
+QUERY_REPEAT_LIMIT = getattr(settings, 'SPECTATOR_QUERY_REPEAT_LIMIT', 5)
@@ -0,0 +1,92 @@
+from django.db.models import Case, IntegerField, Value, When
+
+from . import app_settings
+from .fields import NaturalSortField
+from .search import get_backend, index_is_built, tokenize
+
+
+# The most results to return, the same as a page of Django's admin
+# autocomplete results:
+LIMIT = 20
+
+# Greater than any character likely to follow a prefix, to find every string
+# with it. In the Basic Multilingual Plane, because MySQL's 3-byte 'utf8'
+# columns reject anything beyond:
+MAX_CHAR = '\uffff'
+
+
+def get_sort_field(model):
+    "The name of `model`'s NaturalSortField, like 'name_sort', or None."
+    for field in model._meta.get_fields():
+        if isinstance(field, NaturalSortField):
+            return field.name
+    return None
+
+
+def autocomplete_ids(queryset, term, limit=LIMIT):
+    """
+    Returns a list of up to `limit` pks of objects in `queryset` matching
+    `term`, the text someone's typed so far, best first.
+
+    First come objects whose NaturalSortField (e.g. `name_sort`) starts with
+    `term`, in sort order. This is a range query on that field's index, so
+    stays fast however many objects there are.
+
+    If there aren't enough of those, and the SPECTATOR_SEARCH_INDEX setting
+    is True and the index has been built, they're followed by objects with
+    words starting with the words in `term`, from the search index. e.g.
+    'blond' finds 'The Long Blondes' and 'douglas a' finds 'Douglas Adams',
+    whose `name_sort` is 'adams, douglas'.
+    """
+    model = queryset.model
+    # A trailing space is kept, so 'long ' doesn't match 'longpigs':
+    prefix = term.lstrip().lower()
+    if not prefix.strip():
+        return []
+
+    ids = []
+
+    sort_field = get_sort_field(model)
+    if sort_field is not None:
+        ids = list(queryset.filter(**{
+                                sort_field + '__gte': prefix,
+                                sort_field + '__lt': prefix + MAX_CHAR,
+                            })
+                            .order_by(sort_field, 'pk')
+                            .values_list('pk', flat=True)[:limit])
+
+    tokens = tokenize(term)
+
+    using = queryset.db
+
+    if len(ids) < limit and tokens and app_settings.SEARCH_INDEX and \
+                                                    index_is_built(using):
+        # Fetch extra in case some are already in `ids`, or excluded from
+        # `queryset`:
+        rows = get_backend(using).rows(using, tokens, 0, limit * 2,
+                                       model_label=model._meta.label_lower)
+        found = set(queryset.filter(pk__in=[r[1] for r in rows])
+                            .values_list('pk', flat=True))
+
+        for label, object_id, score in rows:
+            if len(ids) == limit:
+                break
+            if object_id in found and object_id not in ids:
+                ids.append(object_id)
+
+    return ids
+
+
+def autocomplete(queryset, term, limit=LIMIT):
+    """
+    Returns a QuerySet of up to `limit` objects in `queryset` matching
+    `term`, best first. See autocomplete_ids().
+    """
+    ids = autocomplete_ids(queryset, term, limit=limit)
+    if not ids:
+        return queryset.none()
+
+    # Keep the objects in the order of `ids`:
+    order = Case(*[When(pk=pk, then=Value(i)) for i, pk in enumerate(ids)],
+                 output_field=IntegerField())
+    return queryset.filter(pk__in=ids).order_by(order)
@@ -0,0 +1,233 @@
+import bisect
+import datetime
+import itertools
+import random
+from collections import Counter
+
+from ..apps import spectator_apps
+from ..importers import get_importers
+
+
+# Generating a large, realistic-looking catalog of Creators, Events, Works,
+# Venues, Publications and Readings, inserted in bulk with the Importers
+# from spectator.core.importers.
+
+
+FIRST_NAMES = ['Alice', 'Bob', 'Carla', 'Dev', 'Edith', 'Femi', 'Greta',
+               'Hiro', 'Ines', 'Jonas', 'Kemi', 'Lars', 'Maya', 'Nils',
+               'Olga', 'Pedro', 'Quinn', 'Rosa', 'Sami', 'Tove']
+
+SURNAMES = ['Adams', 'Baker', 'Chen', 'Diaz', 'Evans', 'Fischer', 'Garcia',
+            'Hughes', 'Ito', 'Jensen', 'Khan', 'Lopez', 'Moreau', 'Novak',
+            'Okafor', 'Patel', 'Rossi', 'Silva', 'Tanaka', 'Weber']
+
+# The kinds of Events generated, and how often, out of 100:
+EVENT_KINDS = [('gig', 40), ('cinema', 25), ('theatre', 10), ('concert', 10),
+               ('comedy', 5), ('museum', 4), ('dance', 3), ('misc', 3)]
+
+# The kind of Work each kind of Event has, and the most per Event:
+EVENT_WORKS = {
+    'cinema': ('movie', 2),
+    'theatre': ('play', 1),
+    'concert': ('classicalwork', 5),
+    'museum': ('exhibition', 1),
+    'dance': ('dancepiece', 3),
+}
+
+WORK_ROLES = {
+    'movie': 'Director',
+    'play': 'Playwright',
+    'classicalwork': 'Composer',
+    'exhibition': 'Artist',
+    'dancepiece': 'Choreographer',
+}
+
+# Events and Readings are spread over these dates:
+START_DATE = datetime.date(1990, 1, 1)
+END_DATE = datetime.date(2019, 12, 31)
+
+
+class SkewedChooser(object):
+    """
+    Chooses ints from 0 to n-1 with a Zipf-like distribution, so that a few
+    are chosen very often and most rarely, like the popularity of Creators.
+    """
+
+    def __init__(self, n, rng, exponent=1.1):
+        self.rng = rng
+        self.cum_weights = list(itertools.accumulate(
+                                1 / (i ** exponent) for i in range(1, n + 1)))
+
+    def choose(self, rng=None):
+        x = (rng or self.rng).random() * self.cum_weights[-1]
+        return bisect.bisect(self.cum_weights, x)
+
+    def sample(self, k, rng=None):
+        "Up to `k` different ints, the most popular usually first."
+        return list(dict.fromkeys(self.choose(rng) for i in range(k)))
+
+
+def creator_name(n):
+    "A unique name; every third Creator is a group."
+    if n % 3 == 0:
+        return 'The Group {}'.format(n)
+    first = FIRST_NAMES[n % len(FIRST_NAMES)]
+    surname = SURNAMES[(n // len(FIRST_NAMES)) % len(SURNAMES)]
+    return '{} {} {}'.format(first, surname, n)
+
+
+def creator_item(n, role=''):
+    "A creator for Importer rows."
+    return {'name': creator_name(n), 'role': role,
+            'kind': 'group' if n % 3 == 0 else 'individual'}
+
+
+def random_date(rng):
+    return START_DATE + datetime.timedelta(
+                    days=rng.randrange((END_DATE - START_DATE).days + 1))
+
+
+class CatalogGenerator(object):
+    """
+    Generates rows for the Importers for a catalog with `num_events` Events,
+    and numbers of everything else in proportion, e.g.:
+
+        generator = CatalogGenerator(100000, seed=1)
+        created = generator.generate()
+
+    The same `seed` always generates the same catalog.
+
+    Creators, Venues, Works and Publications are chosen with a skewed
+    popularity, so some have thousands of Events or Readings and most have
+    few. Concerts, dance and cinema Events can have several Works, and
+    Readings span 30 years, with many Publications read more than once.
+    """
+
+    def __init__(self, num_events, seed=0):
+        self.num_events = num_events
+        self.seed = seed
+
+        self.num_creators = max(100, num_events // 5)
+        self.num_venues = max(10, num_events // 100)
+        self.num_works = max(50, num_events // 10)
+        self.num_readings = max(50, num_events // 4)
+        self.num_publications = max(20, self.num_readings // 2)
+
+    def generate(self, using=None, batch_size=1000):
+        """
+        Inserts the whole catalog. Returns a Counter of the number of
+        objects created of each model, keyed by verbose_name_plural.
+        """
+        importers = get_importers()
+        created = Counter()
+
+        if spectator_apps.is_enabled('events'):
+            for name, rows in (('works', self.work_rows()),
+                               ('events', self.event_rows())):
+                created.update(importers[name](
+                        using=using, batch_size=batch_size).run(rows))
+
+        if spectator_apps.is_enabled('reading'):
+            created.update(importers['readings'](
+                    using=using, batch_size=batch_size).run(
+                                                        self.reading_rows()))
+
+        return created
+
+    def _rng(self, name):
+        "A separate random generator for each kind of row."
+        return random.Random('{}-{}'.format(self.seed, name))
+
+    def work_title(self, kind, n):
+        return '{} {}'.format(kind.capitalize(), n)
+
+    def work_rows(self):
+        "Yields a row for each Work of each kind."
+        rng = self._rng('works')
+        creators = SkewedChooser(self.num_creators, rng)
+
+        for kind, role in sorted(WORK_ROLES.items()):
+            for n in range(self.num_works // len(WORK_ROLES)):
+                yield {
+                    'kind': kind,
+                    'title': self.work_title(kind, n),
+                    'year': 1900 + rng.randrange(120),
+                    'creators': [creator_item(c, role) for c in
+                                 creators.sample(rng.randint(1, 2))],
+                }
+
+    def event_rows(self):
+        "Yields a row for each Event."
+        rng = self._rng('events')
+        creators = SkewedChooser(self.num_creators, rng)
+        venues = SkewedChooser(self.num_venues, rng)
+        works = SkewedChooser(self.num_works // len(WORK_ROLES), rng)
+        kinds = [kind for kind, weight in EVENT_KINDS for i in range(weight)]
+
+        for n in range(self.num_events):
+            kind = rng.choice(kinds)
+            row = {
+                'kind': kind,
+                'date': random_date(rng).isoformat(),
+                'venue': 'Venue {}'.format(venues.choose()),
+                'creators': [],
+                'works': [],
+            }
+
+            if kind in EVENT_WORKS:
+                work_kind, max_works = EVENT_WORKS[kind]
+                row['works'] = [
+                    {'title': self.work_title(work_kind, w),
+                     'kind': work_kind}
+                    for w in works.sample(rng.randint(1, max_works))
+                ]
+                if kind == 'concert':
+                    row['creators'] = [creator_item(c, 'Performer') for c in
+                                       creators.sample(rng.randint(1, 2))]
+            else:
+                row['creators'] = [
+                    creator_item(c, 'Headliner' if i == 0 else 'Support')
+                    for i, c in enumerate(creators.sample(rng.randint(1, 4)))
+                ]
+                if kind == 'misc':
+                    row['title'] = 'Event {}'.format(n)
+
+            yield row
+
+    def reading_rows(self):
+        """
+        Yields a row for each Reading. The last few, the most recent, are
+        unfinished.
+        """
+        rng = self._rng('readings')
+        creators = SkewedChooser(self.num_creators, rng)
+        publications = SkewedChooser(self.num_publications, rng)
+
+        for n in range(self.num_readings):
+            p = publications.choose()
+            # Every Reading of a Publication has to have the same details,
+            # because only the first one creates it:
+            p_rng = random.Random('{}-publication-{}'.format(self.seed, p))
+            is_periodical = p_rng.random() < 0.2
+
+            if n < self.num_readings - 5:
+                start = random_date(rng)
+            else:
+                start = END_DATE - datetime.timedelta(days=rng.randint(1, 30))
+
+            row = {
+                'title': 'Publication {}'.format(p),
+                'kind': 'periodical' if is_periodical else 'book',
+                'series': 'Series {}'.format(p % 50) if is_periodical else '',
+                'creators': [creator_item(c, '' if i == 0 else 'Editor')
+                             for i, c in enumerate(
+                                creators.sample(p_rng.randint(1, 2), p_rng))],
+                'start_date': start.isoformat(),
+            }
+
+            if n < self.num_readings - 5:
+                end = start + datetime.timedelta(days=rng.randint(1, 60))
+                row['end_date'] = end.isoformat()
+                row['is_finished'] = rng.random() < 0.9
+
+            yield row
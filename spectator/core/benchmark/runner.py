@@ -0,0 +1,385 @@
+import datetime
+import platform
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.db import connection
+from django.db.models import Count
+from django.db.models.functions import ExtractYear
+from django.http import Http404, HttpResponseNotFound
+from django.template import RequestContext, Template
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import resolve, reverse
+
+import spectator
+from .. import app_settings
+from ..apps import spectator_apps
+from ..models import Creator
+
+
+# Timing Spectator's views and template tags against whatever's in the
+# database, e.g. a catalog made by spectator.core.benchmark.catalog.
+
+
+# Page numbers to request of each paginated list. Pages beyond the end of a
+# small catalog's lists will have a 404 status_code:
+PAGE_DEPTHS = (1, 10, 100, 'last')
+
+# app_settings that are left out of reports:
+SECRET_SETTINGS = ('GOOGLE_MAPS_API_KEY', 'SLUG_SALT')
+
+# The alias of the cache used while benchmarking; see isolated_cache():
+CACHE_ALIAS = 'spectator_benchmark'
+
+
+@contextmanager
+def isolated_cache():
+    """
+    Makes Spectator use a local-memory cache of its own within the block,
+    emptied afterwards.
+
+    Cached counts, cards, etc are keyed by things like their SQL and the
+    models' generations, which can be the same for a benchmark's catalog as
+    for the real database. So, if they were put in the usual cache, the real
+    site could show them.
+    """
+    caches_setting = dict(settings.CACHES)
+    caches_setting[CACHE_ALIAS] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'spectator-benchmark',
+    }
+    old_alias = app_settings.CACHE_ALIAS
+
+    with override_settings(CACHES=caches_setting):
+        app_settings.CACHE_ALIAS = CACHE_ALIAS
+        try:
+            yield caches[CACHE_ALIAS]
+        finally:
+            caches[CACHE_ALIAS].clear()
+            app_settings.CACHE_ALIAS = old_alias
+
+
+def make_request(path, data=None):
+    "A GET request for `path`, by an anonymous user."
+    request = RequestFactory().get(path, data or {})
+    request.user = AnonymousUser()
+    request.resolver_match = resolve(request.path_info)
+    return request
+
+
+def render_view(path, data=None):
+    """
+    Gets the response from the view for `path`, rendering it if it's a
+    TemplateResponse. Doesn't use any middleware.
+    """
+    request = make_request(path, data)
+
+    match = request.resolver_match
+    try:
+        response = match.func(request, *match.args, **match.kwargs)
+    except Http404:
+        return HttpResponseNotFound()
+
+    if hasattr(response, 'render'):
+        response.render()
+    elif response.streaming:
+        for chunk in response.streaming_content:
+            pass
+    return response
+
+
+def render_template(source, context=None):
+    """
+    Renders a template string, like one using a card template tag, as if
+    on the home page.
+    """
+    request = make_request(reverse('spectator:core:home'))
+    return Template(source).render(RequestContext(request, context or {}))
+
+
+class Benchmark(object):
+    """
+    Something to time: `func` is called with no arguments.
+    `name` should stay the same between runs, so reports can be compared.
+    """
+
+    def __init__(self, name, func):
+        self.name = name
+        self.func = func
+
+    def run(self, repeats=3):
+        """
+        Returns a dict of:
+
+            cold_ms -- The time of the first call, e.g. before any caching.
+            min_ms, median_ms, max_ms -- Of `repeats` more calls.
+            queries -- The number of queries made by one call.
+            peak_memory_kb -- The most memory allocated during one call.
+            status_code -- For views.
+        """
+        start = time.perf_counter()
+        result = self.func()
+        cold = time.perf_counter() - start
+
+        times = []
+        for i in range(repeats):
+            start = time.perf_counter()
+            self.func()
+            times.append(time.perf_counter() - start)
+
+        # Measured separately, because tracing slows everything down:
+        with CaptureQueriesContext(connection) as queries:
+            tracemalloc.start()
+            try:
+                self.func()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        data = {
+            'cold_ms': round(cold * 1000, 2),
+            'min_ms': round(min(times) * 1000, 2),
+            'median_ms': round(statistics.median(times) * 1000, 2),
+            'max_ms': round(max(times) * 1000, 2),
+            'queries': len(queries),
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+        if hasattr(result, 'status_code'):
+            data['status_code'] = result.status_code
+        return data
+
+
+def view_benchmarks(name, url_name, kwargs=None, paginated=False):
+    "A list of Benchmarks for a view; one per page depth if `paginated`."
+    path = reverse(url_name, kwargs=kwargs)
+
+    if not paginated:
+        return [Benchmark(name, lambda: render_view(path))]
+
+    return [
+        Benchmark('{} p={}'.format(name, p),
+                  lambda p=p: render_view(path, {'p': p}))
+        for p in PAGE_DEPTHS
+    ]
+
+
+def card_benchmark(library, tag, context=None):
+    source = '{{% load {} %}}{{% {} %}}'.format(library, tag)
+    return Benchmark('card {}'.format(tag),
+                     lambda: render_template(source, context))
+
+
+def get_benchmarks():
+    """
+    Returns a list of Benchmarks for every public view and card template
+    tag in the enabled apps.
+
+    Detail pages are of the busiest objects, like the Creator with the most
+    Events, and a typical one, with the median pk.
+    """
+    benchmarks = []
+
+    def add_views(*args, **kwargs):
+        benchmarks.extend(view_benchmarks(*args, **kwargs))
+
+    def median(queryset):
+        count = queryset.count()
+        return queryset.order_by('pk')[count // 2] if count else None
+
+    add_views('home', 'spectator:core:home')
+    add_views('creator list', 'spectator:creators:creator_list',
+              paginated=True)
+    add_views('creator list groups', 'spectator:creators:creator_list_group',
+              paginated=True)
+
+    # The Creator in the most Events, or Publications:
+    if spectator_apps.is_enabled('events'):
+        creators = Creator.objects.annotate(num=Count('event_roles'))
+    elif spectator_apps.is_enabled('reading'):
+        creators = Creator.objects.annotate(num=Count('publication_roles'))
+    else:
+        creators = Creator.objects.annotate(num=Count('pk'))
+    busiest_creator = creators.order_by('-num', 'pk').first()
+
+    for label, creator in (('busiest', busiest_creator),
+                           ('typical', median(Creator.objects.all()))):
+        if creator is not None:
+            add_views('creator detail {}'.format(label),
+                      'spectator:creators:creator_detail',
+                      {'slug': creator.slug})
+
+    if app_settings.SEARCH_INDEX:
+        benchmarks.append(Benchmark('search', lambda: render_view(
+                        reverse('spectator:core:search'), {'q': 'the'})))
+
+    if spectator_apps.is_enabled('events'):
+        benchmarks.extend(get_event_benchmarks(median))
+
+    if spectator_apps.is_enabled('reading'):
+        benchmarks.extend(get_reading_benchmarks(median))
+
+    return benchmarks
+
+
+def get_event_benchmarks(median):
+    from spectator.events.models import Event, Venue, Work
+
+    benchmarks = []
+
+    def add_views(*args, **kwargs):
+        benchmarks.extend(view_benchmarks(*args, **kwargs))
+
+    add_views('event list', 'spectator:events:home', paginated=True)
+    add_views('event list gigs', 'spectator:events:event_list',
+              {'kind_slug': 'gigs'}, paginated=True)
+    add_views('venue list', 'spectator:events:venue_list', paginated=True)
+    add_views('work list movies', 'spectator:events:work_list',
+              {'kind_slug': 'movies'}, paginated=True)
+
+    venues = Venue.objects.annotate(num=Count('event'))
+    events = Event.objects.annotate(num=Count('work_selections'))
+    works = Work.objects.annotate(num=Count('events'))
+
+    for label, get in (('busiest', lambda qs: qs.order_by('-num', 'pk')
+                                                .first()),
+                       ('typical', median)):
+        venue, event, work = get(venues), get(events), get(works)
+        if venue is not None:
+            add_views('venue detail {}'.format(label),
+                      'spectator:events:venue_detail', {'slug': venue.slug})
+        if event is not None:
+            add_views('event detail {}'.format(label),
+                      'spectator:events:event_detail', {'slug': event.slug})
+        if work is not None:
+            add_views('work detail {}'.format(label),
+                      'spectator:events:work_detail',
+                      {'kind_slug': Work.KIND_SLUGS[work.kind],
+                       'slug': work.slug})
+
+    busiest_year = Event.objects.filter(date__isnull=False) \
+                        .annotate(year=ExtractYear('date')) \
+                        .values('year') \
+                        .annotate(num=Count('pk')) \
+                        .order_by('-num', '-year') \
+                        .values_list('year', flat=True).first()
+    if busiest_year is not None:
+        add_views('event year archive', 'spectator:events:event_year_archive',
+                  {'year': busiest_year})
+
+    latest = Event.objects.filter(date__isnull=False).order_by('-date') \
+                            .values_list('date', flat=True).first()
+    context = {'date': latest or datetime.date.today()}
+
+    for tag in ('annual_event_counts_card', 'recent_events_card',
+                'events_years_card', 'most_seen_creators_card',
+                'most_seen_creators_by_works_card', 'most_seen_works_card'):
+        benchmarks.append(card_benchmark('spectator_events', tag))
+    benchmarks.append(card_benchmark('spectator_events',
+                                     'day_events_card date', context))
+    for tag in ('most_read_creators_card', 'most_visited_venues_card'):
+        benchmarks.append(card_benchmark('spectator_core', tag))
+
+    return benchmarks
+
+
+def get_reading_benchmarks(median):
+    from spectator.reading.models import (
+        Publication, PublicationSeries, Reading
+    )
+
+    benchmarks = []
+
+    def add_views(*args, **kwargs):
+        benchmarks.extend(view_benchmarks(*args, **kwargs))
+
+    add_views('reading home', 'spectator:reading:home')
+    add_views('publication series list',
+              'spectator:reading:publicationseries_list', paginated=True)
+    add_views('publication list', 'spectator:reading:publication_list',
+              paginated=True)
+
+    publications = Publication.objects.annotate(num=Count('reading'))
+    series = PublicationSeries.objects.annotate(num=Count('publication'))
+
+    for label, get in (('busiest', lambda qs: qs.order_by('-num', 'pk')
+                                                .first()),
+                       ('typical', median)):
+        publication, one_series = get(publications), get(series)
+        if publication is not None:
+            add_views('publication detail {}'.format(label),
+                      'spectator:reading:publication_detail',
+                      {'slug': publication.slug})
+        if one_series is not None:
+            add_views('publication series detail {}'.format(label),
+                      'spectator:reading:publicationseries_detail',
+                      {'slug': one_series.slug})
+
+    latest = Reading.objects.filter(end_date__isnull=False) \
+                            .dates('end_date', 'year').last()
+    if latest is not None:
+        add_views('reading year archive',
+                  'spectator:reading:reading_year_archive',
+                  {'year': latest.year})
+
+    latest_end = Reading.objects.filter(end_date__isnull=False) \
+                    .order_by('-end_date') \
+                    .values_list('end_date', flat=True).first()
+    context = {'date': latest_end or datetime.date.today()}
+
+    for tag in ('annual_reading_counts_card', 'in_progress_publications_card',
+                'reading_years_card'):
+        benchmarks.append(card_benchmark('spectator_reading', tag))
+    benchmarks.append(card_benchmark('spectator_reading',
+                                     'day_publications_card date', context))
+
+    return benchmarks
+
+
+def run_benchmarks(benchmarks, repeats=3):
+    "Returns a dict of {benchmark name: results dict}."
+    return {b.name: b.run(repeats=repeats) for b in benchmarks}
+
+
+def make_report(results, **info):
+    """
+    Returns a dict, to save as JSON, of the benchmark `results`, plus
+    `info`, like the size of the catalog, and details of the environment
+    and settings, so that reports can be compared.
+    """
+    report = {
+        'time': datetime.datetime.utcnow().isoformat() + 'Z',
+        'spectator': spectator.__version__,
+        'django': django.get_version(),
+        'python': platform.python_version(),
+        'database': connection.vendor,
+        'settings': {
+            name: getattr(app_settings, name) for name in dir(app_settings)
+            if name.isupper() and name not in SECRET_SETTINGS
+        },
+    }
+    report.update(info)
+    report['results'] = results
+    return report
+
+
+def compare_reports(old, new, field='median_ms'):
+    """
+    Yields a tuple of (name, old value, new value, change as a fraction or
+    None) for `field` of each result in the `new` report.
+    """
+    old_results = old.get('results', {})
+
+    for name, result in sorted(new['results'].items()):
+        before = old_results.get(name, {}).get(field)
+        after = result.get(field)
+        change = None
+        if before and after is not None:
+            change = (after - before) / before
+        yield name, before, after, change
@@ -0,0 +1,269 @@
+import hashlib
+import threading
+import time
+
+from django.apps import apps
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.template import Node
+
+from . import app_settings
+
+
+def get_cache():
+    "The cache Spectator uses, set by the SPECTATOR_CACHE_ALIAS setting."
+    return caches[app_settings.CACHE_ALIAS]
+
+
+def _generation_key(name):
+    return 'spectator:generation:{}'.format(name)
+
+
+def _new_generation():
+    # Start from the current time, rather than 1, so that if a generation
+    # is evicted from the cache, we don't reuse an old one.
+    return int(time.time() * 1000)
+
+
+def get_generations(models):
+    """
+    Returns a dict of the current generation number for each of `models`.
+
+    A model's generation changes whenever bump_generation() is called for it,
+    which happens when one of its objects is saved or deleted. So they can
+    be put in cache keys to make the cached values out of date when any of
+    the models change. e.g.:
+
+        get_generations([Event, Venue])
+
+    returns something like:
+
+        {Event: 1539881234567, Venue: 1539881234570}
+    """
+    cache = get_cache()
+    keys = {_generation_key(model._meta.label_lower): model
+            for model in models}
+
+    generations = {
+        keys[key]: value for key, value in cache.get_many(keys.keys()).items()
+    }
+
+    for key, model in keys.items():
+        if model not in generations:
+            generation = _new_generation()
+            cache.add(key, generation, None)
+            # In case another process has just added one:
+            generations[model] = cache.get(key, generation)
+
+    return generations
+
+
+def get_named_generation(name):
+    """
+    Like get_generations(), for a generation that isn't bumped whenever a
+    model is saved, but by calling bump_named_generation(name) only when
+    something particular changes. e.g. see spectator.events.maps.
+    """
+    cache = get_cache()
+    key = _generation_key(name)
+    generation = cache.get(key)
+    if generation is None:
+        generation = _new_generation()
+        cache.add(key, generation, None)
+        # In case another process has just added one:
+        generation = cache.get(key, generation)
+    return generation
+
+
+def generations_enabled():
+    """
+    Whether anything is cached using models' generations, in which case
+    they need bumping when the models change.
+    """
+    return app_settings.CACHE_PAGINATOR_COUNTS or app_settings.CACHE_CARDS
+
+
+def bump_generation(model, using=None):
+    """
+    Change the generation number for `model`, making anything cached using
+    its old generation out of date. See bump_named_generation().
+
+    using -- The database alias. Defaults to `model`'s write database.
+    """
+    if using is None:
+        using = router.db_for_write(model)
+    bump_named_generation(model._meta.label_lower, using=using)
+
+
+_local = threading.local()
+
+
+def _pending_bumps(using):
+    "The set of generation names waiting for `using`'s commit."
+    if not hasattr(_local, 'pending'):
+        _local.pending = {}
+    return _local.pending.setdefault(using, set())
+
+
+def _bump(name):
+    cache = get_cache()
+    key = _generation_key(name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # It's not in the cache.
+        cache.set(key, _new_generation(), None)
+
+
+def _flush_bumps(using):
+    pending = _pending_bumps(using)
+    _local.pending[using] = set()
+    for name in pending:
+        _bump(name)
+
+
+def bump_named_generation(name, using=DEFAULT_DB_ALIAS):
+    """
+    Change the generation number from get_named_generation(name).
+
+    If we're in a transaction on `using` it's bumped now, and again when the
+    transaction is committed. Otherwise another request could read the rows
+    from before the transaction and cache them under the new generation,
+    where they'd stay until the next bump. Bumps of the same generation in
+    one transaction only bump it once on commit.
+    """
+    _bump(name)
+
+    if connections[using].in_atomic_block:
+        _pending_bumps(using).add(name)
+        # Register every time, in case an earlier callback is discarded
+        # because its savepoint is rolled back. Once the first one has run
+        # the rest will have nothing to do.
+        transaction.on_commit(lambda: _flush_bumps(using), using=using)
+
+
+def _get_models_by_table(connection):
+    "A dict of {quoted table name: model} for all installed models."
+    cache_attr = '_spectator_models_by_table'
+    if not hasattr(connection, cache_attr):
+        setattr(connection, cache_attr, {
+            connection.ops.quote_name(model._meta.db_table): model
+            for model in apps.get_models(include_auto_created=True)
+        })
+    return getattr(connection, cache_attr)
+
+
+def get_queryset_models(queryset, sql=None):
+    """
+    Returns a list of all the models whose tables are used in `queryset`'s
+    SQL, including in joins and subqueries.
+
+    sql -- The queryset's SQL, if we already have it.
+    """
+    if sql is None:
+        sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+
+    models_by_table = _get_models_by_table(connections[queryset.db])
+
+    return [model for table, model in models_by_table.items() if table in sql]
+
+
+def get_cached_count(queryset):
+    """
+    Returns queryset.count(), cached until any of the models whose tables
+    it uses are saved or deleted.
+
+    Ordering and select_related() don't change the count, so are removed
+    before making the cache key from the queryset's SQL.
+    """
+    queryset = queryset.order_by().select_related(None)
+
+    sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+
+    generations = get_generations(get_queryset_models(queryset, sql))
+
+    key = 'spectator:count:{}'.format(hashlib.sha1('{}|{}|{!r}|{}'.format(
+            queryset.db, sql, params,
+            sorted((m._meta.label, g) for m, g in generations.items())
+        ).encode()).hexdigest())
+
+    cache = get_cache()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, None)
+
+    return count
+
+
+class CachedCardNode(Node):
+    """
+    Wraps the Node of an inclusion tag, caching its rendered HTML until any
+    of the models it depends on change. See cache_card().
+    """
+
+    def __init__(self, node, name, model_labels):
+        self.node = node
+        self.name = name
+        self.model_labels = model_labels
+
+    def render(self, context):
+        if not app_settings.CACHE_CARDS:
+            return self.node.render(context)
+
+        args, kwargs = self.node.get_resolved_arguments(context)
+
+        # Cards can display differently depending on the current page:
+        url_name = None
+        request = getattr(context, 'request', None)
+        if request is not None and request.resolver_match:
+            url_name = '{}:{}'.format(request.resolver_match.namespace,
+                                      request.resolver_match.url_name)
+
+        models = [apps.get_model(label) for label in self.model_labels]
+        generations = get_generations(models)
+
+        key = 'spectator:card:{}'.format(hashlib.sha1(
+                '{}|{!r}|{!r}|{}|{}'.format(
+                    self.name, args, sorted(kwargs.items()), url_name,
+                    sorted((m._meta.label, g) for m, g in generations.items())
+                ).encode()).hexdigest())
+
+        cache = get_cache()
+        html = cache.get(key)
+        if html is None:
+            html = self.node.render(context)
+            cache.set(key, html, None)
+
+        return html
+
+
+def cache_card(register, *model_labels):
+    """
+    Decorator for inclusion tags, like the sidebar cards, which caches the
+    HTML they render if the SPECTATOR_CACHE_CARDS setting is True.
+
+    The HTML is cached by the tag's name, its arguments, the current URL name
+    and the generations of `model_labels`, so it's used until one of those
+    models is next saved or deleted. Put it above the inclusion_tag decorator:
+
+        @cache_card(register, 'spectator_events.Event')
+        @register.inclusion_tag('spectator_events/includes/card_years.html')
+        def events_years_card(current_year=None):
+            ...
+
+    The models are given as 'app_label.ModelName' strings, so tags in one
+    app can depend on models in another app that might not be installed.
+    """
+    def decorator(func):
+        name = getattr(func, '_decorated_function', func).__name__
+        compile_func = register.tags[name]
+
+        def cached_compile_func(parser, token):
+            return CachedCardNode(compile_func(parser, token), name,
+                                  model_labels)
+
+        register.tags[name] = cached_compile_func
+        return func
+
+    return decorator
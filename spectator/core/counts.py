@@ -0,0 +1,393 @@
+import django
+from django.db.models import Case, Count, F, Q, When
+from django.db.models.functions import TruncYear
+
+from . import app_settings
+from .cache import bump_generation, generations_enabled
+from .models import AnnualCount, KindCount
+
+
+def count_if(condition):
+    """
+    A Count() of only the rows matching `condition`, a Q object, so that
+    several differently-filtered counts can be made in one query.
+
+    Count(filter=...) only exists from Django 2.0, so use Case/When before.
+    """
+    if django.VERSION >= (2, 0):
+        return Count('pk', filter=condition)
+    else:
+        return Count(Case(When(condition, then='pk')))
+
+
+def count_kinds(queryset, kinds, kind_field='kind'):
+    """
+    Counts the objects in `queryset` of each kind with a single query.
+
+    Returns a dict like:
+
+        {'all': 30, 'gig': 12, 'movie': 18, 'play': 0}
+
+    queryset -- The QuerySet of objects to count.
+    kinds -- A list of all the possible kind values, e.g. ['gig', 'movie'].
+             There will be a count, maybe 0, for each of these.
+    kind_field -- The name of the field to group by, e.g. 'publication__kind'.
+    """
+    counts = {k: 0 for k in kinds}
+
+    qs = queryset.order_by() \
+                .values(kind_field) \
+                .annotate(kind_count=Count('pk'))
+
+    for row in qs:
+        counts[row[kind_field]] = row['kind_count']
+
+    counts['all'] = sum(counts.values())
+
+    return counts
+
+
+def get_kind_counts(model):
+    """
+    Returns a dict of the number of objects of each kind for `model`, e.g.:
+
+        get_kind_counts(Event)
+
+    returns:
+
+        {'all': 30, 'gig': 12, 'movie': 18, 'play': 0}
+
+    If the SPECTATOR_KIND_COUNTS_TABLE setting is True these come from the
+    KindCount table, which is built the first time it's needed. Otherwise all
+    the objects are counted.
+
+    `model` must have a `kind` field and `KIND_CHOICES`.
+    """
+    kinds = [k for k, v in model.KIND_CHOICES]
+
+    if not app_settings.KIND_COUNTS_TABLE:
+        return count_kinds(model._default_manager.all(), kinds)
+
+    rows = KindCount.objects.filter(model_label=model._meta.label_lower) \
+                            .values_list('kind', 'count')
+
+    counts = {k: 0 for k in kinds}
+    counts.update(rows)
+
+    if len(rows) == 0:
+        # The table hasn't been built for this model yet.
+        counts = rebuild_kind_counts(model)
+    else:
+        counts['all'] = sum(counts.values())
+
+    return counts
+
+
+def rebuild_kind_counts(model, using=None):
+    """
+    Replaces any KindCount rows for `model` with freshly-counted ones.
+    Returns the counts, as get_kind_counts() does.
+
+    using -- The database alias to use, if not the default.
+    """
+    label = model._meta.label_lower
+    kinds = [k for k, v in model.KIND_CHOICES]
+
+    counts = count_kinds(model._default_manager.using(using).all(), kinds)
+
+    KindCount.objects.using(using).filter(model_label=label).delete()
+    KindCount.objects.using(using).bulk_create([
+        KindCount(model_label=label, kind=k, count=v)
+        for k, v in counts.items() if k != 'all'
+    ])
+
+    return counts
+
+
+def change_kind_count(model, kind, delta, using=None):
+    """
+    Add `delta` (e.g. 1 or -1) to the KindCount for `model` and `kind`.
+
+    If the table hasn't been built for this model yet, does nothing; it will
+    be built when it's next needed.
+
+    Counts never go below zero. If there's nothing to subtract from, the
+    count was wrong, so all of the model's counts are rebuilt.
+
+    using -- The database alias to use, if not the default.
+    """
+    label = model._meta.label_lower
+    qs = KindCount.objects.using(using).filter(model_label=label)
+
+    kind_qs = qs.filter(kind=kind)
+    if delta < 0:
+        kind_qs = kind_qs.filter(count__gte=-delta)
+
+    updated = kind_qs.update(count=F('count') + delta)
+
+    if updated == 0 and qs.exists():
+        if delta < 0:
+            rebuild_kind_counts(model, using=using)
+        else:
+            # A kind that's not been counted before.
+            qs.create(model_label=label, kind=kind, count=delta)
+
+
+class AnnualKindCounter(object):
+    """
+    Counts the objects of a model, like Events or Readings, of each kind in
+    each year.
+
+    If the SPECTATOR_ANNUAL_COUNTS_TABLE setting is True the counts come from
+    the AnnualCount table, which is built the first time it's needed, and
+    kept up to date by this object's signal handlers. Otherwise they're
+    counted each time, with a single query.
+
+    e.g.:
+
+        counter = AnnualKindCounter(Reading, date_field='end_date',
+                                    kind_field='publication__kind',
+                                    kinds=['book', 'periodical'])
+        counter.get_counts()
+
+    returns a list of dicts, in year order, like:
+
+        [{'year': datetime.date(2017, 1, 1),
+          'book': 12, 'periodical': 18, 'total': 30}, ...]
+
+    Objects with no date aren't counted.
+    """
+
+    def __init__(self, model, date_field, kind_field, kinds):
+        """
+        model -- The model whose objects are counted.
+        date_field -- The name of the date field to get the years from.
+        kind_field -- The name of the field holding the kind. Can span
+                      relationships, e.g. 'publication__kind'.
+        kinds -- A list of all the possible kind values.
+        """
+        self.model = model
+        self.date_field = date_field
+        self.kind_field = kind_field
+        self.kinds = list(kinds)
+
+    @property
+    def label(self):
+        return self.model._meta.label_lower
+
+    def get_counts(self, kind='all'):
+        """
+        Returns a list of dicts, one per year, in year order.
+
+        kind -- One of the kinds, or 'all' (default). Each dict has a 'year'
+                (a date) and a count for each kind, plus a 'total' if kind is
+                'all'. If kind is a single kind, only years that have objects
+                of that kind are included.
+        """
+        if app_settings.ANNUAL_COUNTS_TABLE:
+            counts = self._get_table_counts(kind)
+        else:
+            counts = self.count(kind)
+
+        if kind != 'all':
+            counts = [{'year': c['year'], kind: c[kind]}
+                      for c in counts if c[kind] > 0]
+
+        return counts
+
+    def count(self, kind='all', years=None, using=None):
+        """
+        Counts the objects of each kind in each year with a single query.
+        Returns a list of dicts like get_counts(), but always including
+        every kind and a 'total'.
+
+        kind -- If not 'all' (default), only objects of this kind are counted.
+        years -- If supplied, a list of ints; only these years are counted.
+        using -- The database alias to use, if not the default.
+        """
+        qs = self.model._default_manager.using(using).exclude(
+                                    **{self.date_field + '__isnull': True})
+
+        if kind != 'all':
+            qs = qs.filter(**{self.kind_field: kind})
+
+        if years is not None:
+            qs = qs.filter(**{self.date_field + '__year__in': list(years)})
+
+        # Prefixing the names so they can't clash with any of the model's
+        # field names:
+        annotations = {
+            'count_' + k: count_if(Q(**{self.kind_field: k}))
+            for k in self.kinds
+        }
+
+        qs = qs.order_by() \
+                .annotate(year=TruncYear(self.date_field)) \
+                .values('year') \
+                .annotate(total=Count('pk'), **annotations) \
+                .order_by('year')
+
+        return [
+            dict([('year', row['year']), ('total', row['total'])] +
+                 [(k, row['count_' + k]) for k in self.kinds])
+            for row in qs
+        ]
+
+    def _get_table_counts(self, kind):
+        "Like count(), but reading from the AnnualCount table."
+        all_rows = AnnualCount.objects.filter(model_label=self.label)
+        qs = all_rows if kind == 'all' else all_rows.filter(kind=kind)
+
+        rows = list(qs.order_by('year').values_list('year', 'kind', 'count'))
+
+        if len(rows) == 0 and not all_rows.exists():
+            # The table hasn't been built for this model yet.
+            self.rebuild()
+            return self.count(kind)
+
+        counts = []
+        for year, k, num in rows:
+            if len(counts) == 0 or counts[-1]['year'] != year:
+                counts.append(dict([('year', year), ('total', 0)] +
+                                   [(kk, 0) for kk in self.kinds]))
+            counts[-1][k] = num
+            counts[-1]['total'] += num
+
+        return counts
+
+    def rebuild(self, years=None, using=None):
+        """
+        Replaces the AnnualCount rows for this model with freshly-counted
+        ones.
+
+        years -- If supplied, a list of ints; only these years are rebuilt.
+        using -- The database alias to use, if not the default.
+        """
+        qs = AnnualCount.objects.using(using).filter(model_label=self.label)
+        if years is not None:
+            qs = qs.filter(year__year__in=list(years))
+        qs.delete()
+
+        AnnualCount.objects.using(using).bulk_create([
+            AnnualCount(model_label=self.label, year=row['year'], kind=k,
+                        count=row[k])
+            for row in self.count(years=years, using=using)
+            for k in self.kinds if row[k] > 0
+        ])
+
+        if generations_enabled():
+            bump_generation(AnnualCount, using=using)
+
+    def update_years(self, years):
+        """
+        Rebuilds the counts for `years`, an iterable of dates, after objects
+        in those years have changed.
+
+        If the table hasn't been built for this model yet, does nothing; it
+        will be built when it's next needed.
+        """
+        years = {d.year for d in years if d is not None}
+
+        if len(years) > 0 and \
+            AnnualCount.objects.filter(model_label=self.label).exists():
+            self.rebuild(years=years)
+
+    def _get_values(self, sender, pk):
+        "The object's current (date, kind) in the database, or None."
+        return sender._base_manager.filter(pk=pk) \
+                            .values_list(self.date_field, self.kind_field) \
+                            .first()
+
+    # Signal handlers.
+    # These are connected to models in SpectatorCoreAppConfig.ready().
+
+    def pre_save(self, sender, instance, raw=False, **kwargs):
+        """
+        Note the date and kind that an existing object had before it's saved,
+        in case they change.
+        """
+        if app_settings.ANNUAL_COUNTS_TABLE and not raw:
+            if instance.pk is not None and not instance._state.adding:
+                instance._annual_counts_old_values = self._get_values(
+                                                        sender, instance.pk)
+            else:
+                instance._annual_counts_old_values = None
+
+    def post_save(self, sender, instance, raw=False, **kwargs):
+        if app_settings.ANNUAL_COUNTS_TABLE and not raw:
+            old_values = getattr(instance, '_annual_counts_old_values', None)
+            new_values = self._get_values(sender, instance.pk)
+
+            if old_values != new_values:
+                self.update_years([v[0] for v in (old_values, new_values)
+                                   if v is not None])
+
+    def post_delete(self, sender, instance, **kwargs):
+        if app_settings.ANNUAL_COUNTS_TABLE:
+            self.update_years([getattr(instance, self.date_field)])
+
+    def related_pre_save(self, sender, instance, raw=False, **kwargs):
+        """
+        For a related model that holds the kind, e.g. a Reading's Publication.
+        Note the kind an existing object had before it's saved.
+        """
+        if app_settings.ANNUAL_COUNTS_TABLE and not raw:
+            if instance.pk is not None and not instance._state.adding:
+                instance._annual_counts_old_kind = sender._base_manager \
+                                .filter(pk=instance.pk) \
+                                .values_list('kind', flat=True).first()
+            else:
+                instance._annual_counts_old_kind = None
+
+    def related_post_save(self, sender, instance, created=False, raw=False,
+                                                                    **kwargs):
+        """
+        If a related object's kind changed, rebuild the years of all our
+        objects that are related to it.
+        """
+        if app_settings.ANNUAL_COUNTS_TABLE and not raw and not created:
+            old_kind = getattr(instance, '_annual_counts_old_kind', None)
+            if old_kind is not None and old_kind != instance.kind:
+                # e.g. 'publication__kind' -> {'publication': instance}
+                lookup = self.kind_field.rsplit('__', 1)[0]
+                self.update_years(
+                    self.model._default_manager
+                            .filter(**{lookup: instance})
+                            .dates(self.date_field, 'year'))
+
+
+# Signal handlers.
+# These are connected to models in SpectatorCoreAppConfig.ready().
+
+def kind_counts_pre_save(sender, instance, raw=False, using=None,
+                         **kwargs):
+    """
+    Note the kind that an existing object had before it's saved, in case
+    it's changed.
+    """
+    if app_settings.KIND_COUNTS_TABLE and not raw:
+        if instance.pk is not None and not instance._state.adding:
+            instance._kind_counts_old_kind = sender._base_manager \
+                                .using(using) \
+                                .filter(pk=instance.pk) \
+                                .values_list('kind', flat=True).first()
+        else:
+            instance._kind_counts_old_kind = None
+
+
+def kind_counts_post_save(sender, instance, created, raw=False, using=None,
+                          **kwargs):
+    if app_settings.KIND_COUNTS_TABLE and not raw:
+        old_kind = getattr(instance, '_kind_counts_old_kind', None)
+
+        if created or old_kind is None:
+            change_kind_count(sender, instance.kind, 1, using=using)
+        elif old_kind != instance.kind:
+            # Add before subtracting, in case subtracting rebuilds them all:
+            change_kind_count(sender, instance.kind, 1, using=using)
+            change_kind_count(sender, old_kind, -1, using=using)
+
+
+def kind_counts_post_delete(sender, instance, using=None, **kwargs):
+    if app_settings.KIND_COUNTS_TABLE:
+        change_kind_count(sender, instance.kind, -1, using=using)
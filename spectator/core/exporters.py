@@ -0,0 +1,294 @@
+import csv
+import datetime
+import decimal
+import json
+import os
+import sqlite3
+from collections import OrderedDict
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .apps import spectator_apps
+from .models import Creator
+
+
+# Exporting every Spectator object to CSV or JSON Lines files, or to a
+# standalone SQLite database. See spectator_export for the management command.
+
+
+# The name of the file, in a CSV or JSON Lines export's directory, that
+# stores the time of the last export:
+STATE_FILENAME = 'spectator_export.json'
+
+# How long before an export started its watermark is. An object's
+# time_modified is set when it's saved, but it might not be committed until
+# after we've exported its table, so the next incremental export starts this
+# far back to include it:
+WATERMARK_MARGIN = datetime.timedelta(minutes=10)
+
+
+def get_export_models():
+    """
+    Returns an OrderedDict of {name: (model, lookup)} for each model to
+    export in the enabled apps. `lookup` is the field that changes when an
+    object does, for incremental exports.
+    """
+    models = OrderedDict([
+        ('creators', (Creator, 'time_modified')),
+    ])
+
+    if spectator_apps.is_enabled('events'):
+        from spectator.events.models import (
+            Event, EventRole, Venue, Work, WorkRole, WorkSelection
+        )
+        models['venues'] = (Venue, 'time_modified')
+        models['works'] = (Work, 'time_modified')
+        models['workroles'] = (WorkRole, 'time_modified')
+        models['events'] = (Event, 'time_modified')
+        models['eventroles'] = (EventRole, 'time_modified')
+        # Changing an Event's Works updates its time_modified:
+        models['workselections'] = (WorkSelection, 'event__time_modified')
+
+    if spectator_apps.is_enabled('reading'):
+        from spectator.reading.models import (
+            Publication, PublicationRole, PublicationSeries, Reading
+        )
+        models['publicationseries'] = (PublicationSeries, 'time_modified')
+        models['publications'] = (Publication, 'time_modified')
+        models['publicationroles'] = (PublicationRole, 'time_modified')
+        models['readings'] = (Reading, 'time_modified')
+
+    return models
+
+
+def get_export_fields(model):
+    """
+    The names of the columns to export for `model`, e.g. 'venue_id', with
+    the pk first.
+    """
+    pk = model._meta.pk.attname
+    return [pk] + [f.attname for f in model._meta.concrete_fields
+                   if f.attname != pk]
+
+
+def iterate_rows(queryset, fields, chunk_size=1000):
+    """
+    Yields a tuple of the values of `fields` for every object in
+    `queryset`, in pk order, which must include the pk.
+
+    Rows are fetched `chunk_size` at a time, each chunk in its own query by
+    seeking from the previous chunk's last pk, so none are held in memory
+    and no query or transaction lasts for the whole export.
+    """
+    pk_index = fields.index(queryset.model._meta.pk.attname)
+    last_pk = None
+
+    while True:
+        qs = queryset.order_by('pk')
+        if last_pk is not None:
+            qs = qs.filter(pk__gt=last_pk)
+
+        row = None
+        count = 0
+        for row in qs.values_list(*fields)[:chunk_size].iterator():
+            yield row
+            count += 1
+
+        if count < chunk_size:
+            return
+        last_pk = row[pk_index]
+
+
+def serialize_value(value):
+    "Makes dates, times and Decimals into strings."
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    elif isinstance(value, decimal.Decimal):
+        return str(value)
+    return value
+
+
+class FileExportWriter(object):
+    """
+    Base class for writers that write a file per model into a directory,
+    like 'events.csv'.
+
+    If `incremental` is True, rows are added to the end of any existing
+    files. Otherwise the files are replaced.
+    """
+    extension = None
+
+    def __init__(self, path, incremental=False):
+        self.path = path
+        self.incremental = incremental
+        os.makedirs(path, exist_ok=True)
+
+    def get_filename(self, name):
+        return os.path.join(self.path, '{}.{}'.format(name, self.extension))
+
+    def get_watermark(self):
+        "The time of the last export to this directory, or None."
+        try:
+            with open(os.path.join(self.path, STATE_FILENAME)) as f:
+                return parse_datetime(json.load(f)['watermark'])
+        except FileNotFoundError:
+            return None
+
+    def set_watermark(self, watermark):
+        with open(os.path.join(self.path, STATE_FILENAME), 'w') as f:
+            json.dump({'watermark': watermark.isoformat()}, f)
+
+    def write(self, name, fields, rows):
+        "Writes `rows`, tuples of `fields`' values. Returns the number."
+        filename = self.get_filename(name)
+        is_new = not self.incremental or not os.path.exists(filename)
+
+        with open(filename, 'w' if is_new else 'a', newline='',
+                                                    encoding='utf-8') as f:
+            return self.write_rows(f, fields, rows, is_new)
+
+    def write_rows(self, f, fields, rows, is_new):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class CSVExportWriter(FileExportWriter):
+    extension = 'csv'
+
+    def write_rows(self, f, fields, rows, is_new):
+        writer = csv.writer(f)
+        if is_new:
+            writer.writerow(fields)
+
+        count = 0
+        for row in rows:
+            writer.writerow(['' if v is None else serialize_value(v)
+                             for v in row])
+            count += 1
+        return count
+
+
+class JSONLExportWriter(FileExportWriter):
+    extension = 'jsonl'
+
+    def write_rows(self, f, fields, rows, is_new):
+        count = 0
+        for row in rows:
+            f.write(json.dumps(OrderedDict(
+                        zip(fields, [serialize_value(v) for v in row]))))
+            f.write('\n')
+            count += 1
+        return count
+
+
+class SQLiteExportWriter(object):
+    """
+    Writes a table per model into a standalone SQLite database file.
+
+    If `incremental` is True, rows replace any existing ones with the same
+    pk. Otherwise the tables are recreated.
+    """
+    # How many rows to insert per executemany():
+    batch_size = 1000
+
+    def __init__(self, path, incremental=False):
+        self.incremental = incremental
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS spectator_export '
+                                '(key TEXT PRIMARY KEY, value TEXT)')
+
+    def get_watermark(self):
+        row = self.connection.execute('SELECT value FROM spectator_export '
+                                      "WHERE key = 'watermark'").fetchone()
+        return None if row is None else parse_datetime(row[0])
+
+    def set_watermark(self, watermark):
+        self.connection.execute('INSERT OR REPLACE INTO spectator_export '
+                                "VALUES ('watermark', ?)",
+                                [watermark.isoformat()])
+
+    def write(self, name, fields, rows):
+        if not self.incremental:
+            self.connection.execute('DROP TABLE IF EXISTS "{}"'.format(name))
+
+        # The first field is the pk:
+        self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS "{}" ("{}" INTEGER PRIMARY KEY, {})'
+                .format(name, fields[0],
+                        ', '.join('"{}"'.format(f) for f in fields[1:])))
+
+        sql = 'INSERT OR REPLACE INTO "{}" VALUES ({})'.format(
+                                        name, ', '.join('?' * len(fields)))
+        count = 0
+        batch = []
+        for row in rows:
+            batch.append([serialize_value(v) for v in row])
+            if len(batch) == self.batch_size:
+                self.connection.executemany(sql, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            self.connection.executemany(sql, batch)
+            count += len(batch)
+
+        self.connection.commit()
+        return count
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+
+def get_export_writers():
+    "A dict of the writer classes for each export format."
+    return {
+        'csv': CSVExportWriter,
+        'jsonl': JSONLExportWriter,
+        'sqlite': SQLiteExportWriter,
+    }
+
+
+def export(writer, chunk_size=1000, margin=None):
+    """
+    Writes every object using `writer`, or, if it's incremental, only those
+    that have changed since its last export. e.g.:
+
+        writer = CSVExportWriter('/path/to/dir', incremental=True)
+        counts = export(writer)
+
+    Deleted objects aren't removed from incremental exports. Objects changed
+    within WATERMARK_MARGIN of the previous export are exported again, so
+    the same rows can be appended to CSV and JSON Lines files more than
+    once; the last is the latest. (In SQLite they replace the old rows.)
+
+    margin -- How long before now to set the watermark for the next
+              incremental export. Defaults to WATERMARK_MARGIN.
+
+    Returns an OrderedDict of the number of rows written for each model.
+    """
+    since = writer.get_watermark() if writer.incremental else None
+    # Objects changed while exporting, or saved earlier but not yet
+    # committed, will be exported again next time:
+    watermark = timezone.now() - (WATERMARK_MARGIN if margin is None
+                                  else margin)
+
+    counts = OrderedDict()
+
+    try:
+        for name, (model, lookup) in get_export_models().items():
+            qs = model._default_manager.all()
+            if since is not None:
+                qs = qs.filter(**{lookup + '__gte': since})
+
+            fields = get_export_fields(model)
+            counts[name] = writer.write(
+                            name, fields, iterate_rows(qs, fields, chunk_size))
+
+        writer.set_watermark(watermark)
+    finally:
+        writer.close()
+
+    return counts
@@ -2,6 +2,7 @@ import logging
 import re
 
 from django.db import models
+from django.utils.safestring import mark_safe
 
 from .utils import truncate_string
 
@@ -245,6 +246,23 @@ class NaturalSortField(models.CharField):
         return string
 
 
+class SafeHTMLTextField(models.TextField):
+    """
+    A TextField for storing HTML that has already been escaped, e.g. the
+    result of `format_html()`.
+
+    Values loaded from the database are marked as safe so that they can be
+    output in templates without being escaped again.
+    """
+
+    description = "Pre-escaped HTML that is safe to output"
+
+    def from_db_value(self, value, expression, connection, *args):
+        if value is None:
+            return value
+        return mark_safe(value)
+
+
 class PersonNaturalSortField(NaturalSortField):
     pass
 
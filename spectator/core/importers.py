@@ -0,0 +1,410 @@
+import csv
+import json
+from collections import Counter, OrderedDict
+
+from django.core.management.color import no_style
+from django.db import connections, router, transaction
+from django.db.models import Max
+from django.utils.dateparse import parse_date as django_parse_date
+
+from . import app_settings
+from .apps import spectator_apps
+from .cache import bump_generation, generations_enabled
+from .counts import rebuild_kind_counts
+from .leaderboards import rebuild_leaderboards
+from .models import AnnualCount, Creator, KindCount
+from .search import get_searchable_models, index_is_built, index_objects
+
+
+# Importing lots of Events, Works and Readings from CSV or JSON Lines files.
+# See spectator_import for the management command, and Importer for the
+# format of the rows.
+
+
+class RowError(ValueError):
+    "A row that can't be imported. `line` is its number in the file."
+
+    def __init__(self, line, message):
+        self.line = line
+        super().__init__('Row {}: {}'.format(line, message))
+
+
+def read_rows(f, format='csv'):
+    """
+    Yields a dict for each row in the open file `f`.
+
+    format -- 'csv' for a CSV file with a header row of field names, or
+              'jsonl' for a JSON object on each line.
+    """
+    if format == 'csv':
+        for row in csv.DictReader(f):
+            yield row
+    elif format == 'jsonl':
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        raise ValueError("Unknown format '{}'".format(format))
+
+
+def normalize(value):
+    "The version of a name or title used to find an existing object."
+    return ' '.join(str(value).split()).casefold()
+
+
+def text(row, field):
+    "The stripped string value of `field` in `row`, or ''."
+    value = row.get(field)
+    return '' if value is None else str(value).strip()
+
+
+def parse_date(value):
+    "A date from an ISO 8601 string like '2018-03-31', or None if empty."
+    value = '' if value is None else str(value).strip()
+    if not value:
+        return None
+    date = django_parse_date(value)
+    if date is None:
+        raise ValueError("'{}' is not a date like YYYY-MM-DD".format(value))
+    return date
+
+
+def parse_int(value):
+    "An int, or None if `value` is empty."
+    if value is None or str(value).strip() == '':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError("'{}' is not a number".format(value))
+
+
+def parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value or '').strip().lower() in ('1', 'true', 'yes', 'y')
+
+
+def parse_items(value, keys):
+    """
+    Returns a list of dicts from a field holding a list, like creators.
+
+    In JSON the value is a list of objects, or of strings for the first key.
+    In CSV it's a string of items separated by ';', each with parts separated
+    by '|'. e.g. with keys ('name', 'role', 'kind'):
+
+        'Nick Cave|Vocals; The Bad Seeds||group'
+    """
+    if not value:
+        return []
+
+    if isinstance(value, str):
+        value = [item for item in value.split(';') if item.strip()]
+
+    items = []
+    for item in value:
+        if isinstance(item, str):
+            item = dict(zip(keys, item.split('|')))
+        item = {k: text(item, k) for k in keys}
+        if not item[keys[0]]:
+            raise ValueError('Every item in a list needs a {}'.format(keys[0]))
+        items.append(item)
+    return items
+
+
+def parse_kind(value, model, default=None):
+    "Checks `value` is one of `model`'s kinds, like 'gig' for Event."
+    value = value or default
+    kinds = [k for k, v in model.KIND_CHOICES]
+    if value not in kinds:
+        raise ValueError("'{}' is not a {} kind. Use one of: {}".format(
+                        value, model._meta.verbose_name, ', '.join(kinds)))
+    return value
+
+
+class NameIndex(object):
+    """
+    An in-memory dict of a model's existing objects, keyed by the normalized
+    values of `fields`, like ('kind', 'title') for Works, so that rows can
+    refer to objects by name without a query each.
+
+    Each value is a (pk, values) tuple, so that lookups can return unsaved
+    objects with the pk and those fields set. If several objects have the
+    same name, the first created is used.
+    """
+
+    def __init__(self, model, fields, using=None):
+        self.model = model
+        self.fields = fields
+        self._index = {}
+
+        values = model._default_manager.using(using) \
+                        .order_by('pk').values_list('pk', *fields)
+        for row in values.iterator():
+            self._index.setdefault(self.key(row[1:]), (row[0], row[1:]))
+
+    def key(self, values):
+        return tuple(normalize(v) for v in values)
+
+    def get(self, values):
+        "An unsaved object with the pk and fields of a match, or None."
+        found = self._index.get(self.key(values))
+        if found is None:
+            return None
+        return self.model(pk=found[0], **dict(zip(self.fields, found[1])))
+
+    def add(self, obj):
+        values = tuple(getattr(obj, f) for f in self.fields)
+        self._index.setdefault(self.key(values), (obj.pk, values))
+
+
+class Importer(object):
+    """
+    Base class for importing rows of one type, such as Events, using a few
+    queries per batch of rows rather than saving each object.
+
+    Objects referred to by name, like Creators and Venues, are found in
+    in-memory NameIndexes, or created if they don't exist yet. New objects
+    are given pks before they're inserted, so that rows can refer to each
+    other, slugs can be set, and no queries are needed to fetch the pks
+    afterwards. All the objects are inserted with bulk_create() once every
+    `batch_size` rows, so no save() methods or signals are called.
+
+    At the end, anything that signals would have updated, like the search
+    index or the KindCount table, is updated. Everything happens in a single
+    transaction, so nothing's imported if there's an error.
+
+    On PostgreSQL the pks are reserved from the tables' sequences, so other
+    objects can be created while importing. On other databases they follow
+    the largest existing pk, and no other objects of the same models should
+    be created while importing.
+
+    Child classes should set `models`, the models they create objects of,
+    with each before any that refer to it, and implement `add_row(row)`.
+
+    Usage:
+
+        from spectator.core.importers import get_importers, read_rows
+
+        with open('events.csv', newline='', encoding='utf-8') as f:
+            importer = get_importers()['events']()
+            created = importer.run(read_rows(f, format='csv'))
+
+    `created` is a Counter of the number of objects of each model created,
+    keyed by the model's verbose_name_plural.
+    """
+    models = ()
+
+    # Leaderboards (see spectator.core.leaderboards) affected by the rows:
+    leaderboards = ()
+
+    # AnnualKindCounters (see spectator.core.counts) affected by the rows:
+    annual_counters = ()
+
+    batch_size = 1000
+
+    # The fields of items in a row's list of creators (see parse_items()):
+    creator_keys = ('name', 'role', 'kind')
+
+    def __init__(self, using=None, batch_size=None):
+        self.using = using or router.db_for_write(self.models[0])
+        if batch_size is not None:
+            self.batch_size = batch_size
+
+        self.created = Counter()
+        self._pending = OrderedDict((model, []) for model in self.models)
+        self._first_pks = {}
+        self._next_pks = {}
+        self._reserved_pks = {}
+
+        self.creators = NameIndex(Creator, ('name',), using=self.using)
+
+    def run(self, rows):
+        """
+        Imports all the rows, an iterable of dicts, e.g. from read_rows().
+        Raises RowError if a row is invalid.
+        Returns self.created.
+        """
+        with transaction.atomic(using=self.using):
+            line = 0
+            for line, row in enumerate(rows, start=1):
+                try:
+                    self.add_row(row)
+                except ValueError as e:
+                    raise RowError(line, str(e))
+
+                if line % self.batch_size == 0:
+                    self.flush()
+
+            self.flush()
+            self.reset_sequences()
+            self.finish()
+
+        return self.created
+
+    def add_row(self, row):
+        """
+        Creates unsaved objects for one row, a dict, adding each with add().
+        Raises ValueError if the row is invalid.
+        """
+        raise NotImplementedError
+
+    def add(self, obj):
+        "Gives `obj` a pk and queues it to be inserted at the next flush()."
+        model = type(obj)
+
+        if not self._reserved_pks.get(model):
+            self._reserved_pks[model] = self.reserve_pks(model,
+                                                         self.batch_size)
+            self._first_pks.setdefault(model, self._reserved_pks[model][0])
+
+        obj.pk = self._reserved_pks[model].pop(0)
+
+        self._pending[model].append(obj)
+        self.created[model._meta.verbose_name_plural] += 1
+        return obj
+
+    def uses_sequences(self):
+        "Can pks be reserved from the tables' sequences?"
+        return connections[self.using].vendor == 'postgresql'
+
+    def reserve_pks(self, model, count):
+        """
+        Returns a list of `count` new pks, in ascending order, for objects of
+        `model`.
+
+        On PostgreSQL they're taken from the table's sequence, like any
+        other insert's, so nothing created while we're importing can use
+        them. Elsewhere they follow the largest pk in the table, or the last
+        one reserved.
+        """
+        if self.uses_sequences():
+            connection = connections[self.using]
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT nextval(pg_get_serial_sequence(%s, %s)) '
+                    'FROM generate_series(1, %s)',
+                    [connection.ops.quote_name(model._meta.db_table),
+                     model._meta.pk.column, count])
+                return sorted(row[0] for row in cursor.fetchall())
+
+        if model not in self._next_pks:
+            max_pk = model._default_manager.using(self.using) \
+                        .aggregate(max_pk=Max('pk'))['max_pk']
+            self._next_pks[model] = (max_pk or 0) + 1
+
+        first = self._next_pks[model]
+        self._next_pks[model] += count
+        return list(range(first, first + count))
+
+    def get_or_add(self, index, **values):
+        """
+        Returns an unsaved object of `index.model` whose `index.fields` match
+        `values`, or a new one with those values, which is added.
+        """
+        obj = index.get([values[f] for f in index.fields])
+        if obj is None:
+            obj = self.add(index.model(**values))
+            index.add(obj)
+        return obj
+
+    def get_creator(self, item):
+        "A Creator for an item from parse_items(row, self.creator_keys)."
+        return self.get_or_add(self.creators, name=item['name'],
+                            kind=parse_kind(item['kind'], Creator,
+                                            default='individual'))
+
+    def add_roles(self, role_model, field, obj, creators):
+        """
+        Adds a role, like an EventRole, for each item in `creators`, in
+        order, linking them to `obj`. Returns the list of roles.
+        """
+        return [
+            self.add(role_model(**{
+                field: obj,
+                'creator': self.get_creator(item),
+                'role_name': item['role'],
+                'role_order': order,
+            }))
+            for order, item in enumerate(creators, start=1)
+        ]
+
+    def flush(self):
+        "Inserts all the queued objects."
+        for model, objs in self._pending.items():
+            if objs:
+                model._default_manager.using(self.using).bulk_create(objs)
+                self._pending[model] = []
+
+    def reset_sequences(self):
+        """
+        Because we chose the new objects' pks, databases with sequences need
+        them resetting, as the loaddata command does. Not on PostgreSQL,
+        whose sequences the pks were reserved from; resetting them to the
+        largest pk could hand out pks that another import has reserved.
+        """
+        if self.uses_sequences():
+            return
+
+        connection = connections[self.using]
+        sql = connection.ops.sequence_reset_sql(no_style(),
+                                                list(self._first_pks))
+        if sql:
+            with connection.cursor() as cursor:
+                for statement in sql:
+                    cursor.execute(statement)
+
+    def finish(self):
+        """
+        Updates the tables, indexes and caches that signals would have
+        updated if the objects had been saved one at a time.
+        Those that haven't been built yet will be built when next needed.
+        """
+        new_models = list(self._first_pks)
+
+        if app_settings.KIND_COUNTS_TABLE:
+            for model in new_models:
+                if KindCount.objects.using(self.using).filter(
+                            model_label=model._meta.label_lower).exists():
+                    rebuild_kind_counts(model, using=self.using)
+
+        if app_settings.ANNUAL_COUNTS_TABLE:
+            for counter in self.annual_counters:
+                if AnnualCount.objects.using(self.using).filter(
+                                    model_label=counter.label).exists():
+                    counter.rebuild(using=self.using)
+
+        if app_settings.LEADERBOARD_TABLES and self.leaderboards:
+            rebuild_leaderboards(boards=self.leaderboards, using=self.using)
+
+        if app_settings.SEARCH_INDEX and index_is_built(self.using):
+            searchable = get_searchable_models()
+            for model in new_models:
+                if model in searchable:
+                    index_objects(
+                        model._default_manager.filter(
+                                            pk__gte=self._first_pks[model]),
+                        using=self.using)
+
+        if generations_enabled():
+            for model in new_models:
+                bump_generation(model, using=self.using)
+
+
+def get_importers():
+    """
+    Returns a dict of the Importer classes for the enabled apps, keyed by
+    the type of rows they import.
+    """
+    importers = {}
+
+    if spectator_apps.is_enabled('events'):
+        from spectator.events.importers import EventImporter, WorkImporter
+        importers['events'] = EventImporter
+        importers['works'] = WorkImporter
+
+    if spectator_apps.is_enabled('reading'):
+        from spectator.reading.importers import ReadingImporter
+        importers['readings'] = ReadingImporter
+
+    return importers
@@ -0,0 +1,276 @@
+import threading
+
+from django.db import router, transaction
+from django.db.models import Count
+
+from . import app_settings
+from .cache import bump_generation, generations_enabled
+from .apps import spectator_apps
+from .models import Creator, LeaderboardEntry
+
+if spectator_apps.is_enabled('events'):
+    from spectator.events.models import EventRole, WorkRole
+
+if spectator_apps.is_enabled('reading'):
+    from spectator.reading.models import PublicationRole
+
+
+def _count_rows(queryset, fields, count):
+    """
+    Yields a tuple of (creator_id, {field: value}, count) for each group of
+    `queryset` grouped by 'creator_id' and `fields`.
+    count -- The Count() expression.
+    """
+    rows = queryset.order_by() \
+                    .values('creator_id', *fields) \
+                    .annotate(num=count) \
+                    .filter(num__gt=0)
+    for row in rows:
+        yield row.pop('creator_id'), row, row.pop('num')
+
+
+def _events_entries(creator_ids):
+    "LeaderboardEntries for CreatorManager.by_events()."
+    qs = EventRole.objects.all()
+    if creator_ids is not None:
+        qs = qs.filter(creator_id__in=creator_ids)
+
+    count = Count('event_id', distinct=True)
+
+    for kind_field in [None, 'event__kind']:
+        fields = [kind_field] if kind_field else []
+        for creator_id, values, num in _count_rows(qs, fields, count):
+            yield LeaderboardEntry(creator_id=creator_id, board='events',
+                                   kind=values.get(kind_field, ''),
+                                   count=num)
+
+
+def _works_entries(creator_ids):
+    "LeaderboardEntries for CreatorManager.by_works()."
+    qs = WorkRole.objects.all()
+    if creator_ids is not None:
+        qs = qs.filter(creator_id__in=creator_ids)
+
+    count = Count('work_id', distinct=True)
+
+    # Every combination of any/one kind and any/one role_name:
+    for kind_field in [None, 'work__kind']:
+        for role_field in [None, 'role_name']:
+            fields = [f for f in [kind_field, role_field] if f]
+            for creator_id, values, num in _count_rows(qs, fields, count):
+                yield LeaderboardEntry(creator_id=creator_id, board='works',
+                                       kind=values.get(kind_field, ''),
+                                       role_name=values.get(role_field),
+                                       count=num)
+
+
+def _readings_entries(creator_ids):
+    "LeaderboardEntries for CreatorManager.by_readings()."
+    qs = PublicationRole.objects.all()
+    if creator_ids is not None:
+        qs = qs.filter(creator_id__in=creator_ids)
+
+    count = Count('publication__reading')
+
+    for creator_id, values, num in _count_rows(qs, ['role_name'], count):
+        yield LeaderboardEntry(creator_id=creator_id, board='readings',
+                               role_name=values['role_name'], count=num)
+
+
+def _publications_entries(creator_ids):
+    "LeaderboardEntries for CreatorManager.by_publications()."
+    qs = PublicationRole.objects.filter(publication__reading__isnull=False)
+    if creator_ids is not None:
+        qs = qs.filter(creator_id__in=creator_ids)
+
+    count = Count('publication_id', distinct=True)
+
+    for creator_id, values, num in _count_rows(qs, [], count):
+        yield LeaderboardEntry(creator_id=creator_id, board='publications',
+                               count=num)
+
+
+def get_boards():
+    "A dict of {board name: function} for the enabled Spectator apps."
+    boards = {}
+    if spectator_apps.is_enabled('events'):
+        boards['events'] = _events_entries
+        boards['works'] = _works_entries
+    if spectator_apps.is_enabled('reading'):
+        boards['readings'] = _readings_entries
+        boards['publications'] = _publications_entries
+    return boards
+
+
+def rebuild_leaderboards(creator_ids=None, boards=None, using=None):
+    """
+    Recalculates LeaderboardEntries.
+
+    creator_ids -- If supplied, only these Creators' entries are rebuilt.
+    boards -- If supplied, a list of board names, like ['events', 'works'],
+              to rebuild. Otherwise all of them are.
+    using -- The database alias to use, if not the default.
+
+    Returns the number of LeaderboardEntries created.
+    """
+    all_boards = get_boards()
+    if boards is None:
+        boards = all_boards.keys()
+
+    created = 0
+
+    with transaction.atomic(using=using):
+        for board in boards:
+            qs = LeaderboardEntry.objects.using(using).filter(board=board)
+            if creator_ids is not None:
+                qs = qs.filter(creator_id__in=creator_ids)
+            qs.delete()
+
+            entries = list(all_boards[board](creator_ids))
+            LeaderboardEntry.objects.using(using).bulk_create(
+                                                    entries, batch_size=500)
+            created += len(entries)
+
+    if generations_enabled():
+        bump_generation(LeaderboardEntry, using=using)
+
+    return created
+
+
+class DirtyCreatorsCollector(object):
+    """
+    Collects the pks of Creators whose LeaderboardEntries need rebuilding,
+    and rebuilds them all once the current transaction is committed.
+
+    Like spectator.events.utils.DirtyEventsCollector, this means saving an
+    Event with a dozen EventRoles in one transaction only rebuilds each
+    Creator's entries once.
+
+    Usage:
+
+        from spectator.core.leaderboards import dirty_creators
+
+        dirty_creators.add([creator.pk], boards=['events'])
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _pending(self, using):
+        "The dict of {board: set(pks)} waiting for `using`'s commit."
+        if not hasattr(self._local, 'pending'):
+            self._local.pending = {}
+        return self._local.pending.setdefault(using, {})
+
+    def add(self, creator_ids, boards, using=None):
+        """
+        Mark Creators' entries as needing rebuilding.
+        creator_ids -- An iterable of Creator pks.
+        boards -- A list of board names, like ['events', 'works'].
+        using -- The database alias. Defaults to the Creator write database.
+        """
+        if using is None:
+            using = router.db_for_write(Creator)
+
+        creator_ids = {pk for pk in creator_ids if pk is not None}
+        if not creator_ids:
+            return
+
+        pending = self._pending(using)
+        for board in boards:
+            pending.setdefault(board, set()).update(creator_ids)
+
+        # Register every time, in case an earlier callback is discarded
+        # because its savepoint is rolled back.
+        transaction.on_commit(lambda: self.flush(using), using=using)
+
+    def flush(self, using=None):
+        "Rebuild the pending Creators' entries now."
+        if using is None:
+            using = router.db_for_write(Creator)
+
+        pending = self._pending(using)
+        if not pending:
+            return
+
+        self._local.pending[using] = {}
+
+        for board, creator_ids in pending.items():
+            rebuild_leaderboards(creator_ids, boards=[board], using=using)
+
+
+dirty_creators = DirtyCreatorsCollector()
+
+
+# Signal handlers.
+# These are connected to models in SpectatorCoreAppConfig.ready().
+
+def role_pre_save(sender, instance, raw=False, **kwargs):
+    """
+    Note the Creator that an existing role had before it's saved, in case
+    it's changed.
+    """
+    if app_settings.LEADERBOARD_TABLES and not raw and instance.pk is not None:
+        instance._leaderboards_old_creator_id = sender._base_manager \
+                                .filter(pk=instance.pk) \
+                                .values_list('creator_id', flat=True).first()
+
+
+def _role_boards(sender):
+    if sender._meta.label_lower == 'spectator_events.eventrole':
+        return ['events']
+    elif sender._meta.label_lower == 'spectator_events.workrole':
+        return ['works']
+    else:
+        return ['readings', 'publications']
+
+
+def role_changed(sender, instance, raw=False, **kwargs):
+    "An EventRole, WorkRole or PublicationRole was saved or deleted."
+    if app_settings.LEADERBOARD_TABLES and not raw:
+        creator_ids = [
+            instance.creator_id,
+            getattr(instance, '_leaderboards_old_creator_id', None),
+        ]
+        dirty_creators.add(creator_ids, boards=_role_boards(sender),
+                           using=kwargs.get('using'))
+
+
+def event_changed(sender, instance, created=False, raw=False, **kwargs):
+    "An Event was saved, so its kind might have changed."
+    if app_settings.LEADERBOARD_TABLES and not raw and not created:
+        dirty_creators.add(
+            instance.roles.values_list('creator_id', flat=True),
+            boards=['events'], using=kwargs.get('using'))
+
+
+def work_changed(sender, instance, created=False, raw=False, **kwargs):
+    "A Work was saved, so its kind might have changed."
+    if app_settings.LEADERBOARD_TABLES and not raw and not created:
+        dirty_creators.add(
+            instance.roles.values_list('creator_id', flat=True),
+            boards=['works'], using=kwargs.get('using'))
+
+
+def reading_pre_save(sender, instance, raw=False, **kwargs):
+    """
+    Note the Publication that an existing Reading had before it's saved, in
+    case it's changed.
+    """
+    if app_settings.LEADERBOARD_TABLES and not raw and instance.pk is not None:
+        instance._leaderboards_old_publication_id = sender._base_manager \
+                                .filter(pk=instance.pk) \
+                                .values_list('publication_id', flat=True).first()
+
+
+def reading_changed(sender, instance, raw=False, **kwargs):
+    "A Reading was saved or deleted."
+    if app_settings.LEADERBOARD_TABLES and not raw:
+        publication_ids = [
+            instance.publication_id,
+            getattr(instance, '_leaderboards_old_publication_id', None),
+        ]
+        dirty_creators.add(
+            PublicationRole.objects.filter(publication_id__in=publication_ids)
+                                .values_list('creator_id', flat=True),
+            boards=['readings', 'publications'], using=kwargs.get('using'))
@@ -0,0 +1,197 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from spectator.core.benchmark.catalog import CatalogGenerator
+from spectator.core.benchmark.runner import (
+    compare_reports, get_benchmarks, isolated_cache, make_report,
+    run_benchmarks
+)
+from spectator.core.cache import bump_generation
+from spectator.core.apps import spectator_apps
+from spectator.core.importers import get_importers
+
+
+class Command(BaseCommand):
+    """
+    Generates a synthetic catalog of Events, Works, Readings, etc, in a
+    throwaway test database, times every view and card template tag against
+    it, and writes a JSON report.
+
+        ./manage.py spectator_benchmark --events 100000 --output report.json
+
+    Typical sizes are 10000, 100000 and 1000000 Events; everything else is
+    in proportion. The same --seed always generates the same catalog.
+
+    Use --compare with an earlier report to see the change in each median
+    time, and --keepdb to keep the test database, and its catalog, for the
+    next run.
+
+    Spectator uses a separate local-memory cache while benchmarking, so
+    nothing cached from the catalog is seen by the real site.
+    """
+
+    help = "Times views and template tags against a synthetic catalog."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--events',
+            action='store',
+            default=10000,
+            type=int,
+            help="How many Events to generate. Default 10000.",
+        )
+        parser.add_argument(
+            '--seed',
+            action='store',
+            default=0,
+            type=int,
+            help="The random seed for generating the catalog.",
+        )
+        parser.add_argument(
+            '--repeats',
+            action='store',
+            default=5,
+            type=int,
+            help="How many times to time each view or tag. Default 5.",
+        )
+        parser.add_argument(
+            '--output',
+            action='store',
+            default=None,
+            help="The file to write the JSON report to.",
+        )
+        parser.add_argument(
+            '--compare',
+            action='store',
+            default=None,
+            help="An earlier JSON report to compare the results with.",
+        )
+        parser.add_argument(
+            '--keepdb',
+            action='store_true',
+            default=False,
+            help="Keep the test database, and use any catalog already in it.",
+        )
+        parser.add_argument(
+            '--use-existing-database',
+            action='store_true',
+            default=False,
+            help="Use the current database, instead of a test database. "
+                 "A catalog is only generated if it has none of the kinds "
+                 "of object in a catalog, e.g. no Creators or Events.",
+        )
+
+    def handle(self, *args, **options):
+        verbosity = options.get('verbosity', 1)
+        use_test_db = not options['use_existing_database']
+
+        if use_test_db:
+            old_name = connection.settings_dict['NAME']
+            connection.creation.create_test_db(verbosity=max(0, verbosity-1),
+                                               autoclobber=True,
+                                               serialize=False,
+                                               keepdb=options['keepdb'])
+        try:
+            with isolated_cache():
+                report = self.benchmark(options)
+        finally:
+            if use_test_db:
+                connection.creation.destroy_test_db(
+                                    old_name, verbosity=max(0, verbosity-1),
+                                    keepdb=options['keepdb'])
+
+        if not use_test_db and report['generation_seconds'] is not None:
+            # The catalog was added to the real database while Spectator was
+            # using the isolated cache, so anything in the real cache is out
+            # of date:
+            for model in self.get_models():
+                bump_generation(model)
+            if spectator_apps.is_enabled('events'):
+                from spectator.events.maps import bump_map_generation
+                bump_map_generation()
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+
+        if verbosity > 0:
+            if options['compare']:
+                with open(options['compare']) as f:
+                    self.write_comparison(json.load(f), report)
+            else:
+                self.write_results(report)
+
+    def benchmark(self, options):
+        generator = CatalogGenerator(options['events'], seed=options['seed'])
+        generation_seconds = None
+
+        if self.is_empty():
+            self.log(options, "Generating a catalog of {} Events...".format(
+                                                            options['events']))
+            start = time.perf_counter()
+            generator.generate()
+            generation_seconds = round(time.perf_counter() - start, 2)
+        else:
+            self.log(options, "Using the existing catalog.")
+
+        self.log(options, "Running benchmarks...")
+        results = run_benchmarks(get_benchmarks(), repeats=options['repeats'])
+
+        # The catalog's actual size, which isn't --events if it already
+        # existed:
+        counts = self.get_counts()
+
+        return make_report(results,
+                           events=counts.get('events', 0),
+                           seed=options['seed'],
+                           repeats=options['repeats'],
+                           counts=counts,
+                           generation_seconds=generation_seconds)
+
+    def get_models(self):
+        "All the models the catalog's importers create."
+        return {model for importer in get_importers().values()
+                for model in importer.models}
+
+    def is_empty(self):
+        "Are there no objects of any of the models in a catalog?"
+        return not any(model._default_manager.exists()
+                       for model in self.get_models())
+
+    def get_counts(self):
+        "The number of objects of each model in the catalog."
+        return {str(model._meta.verbose_name_plural):
+                                        model._default_manager.count()
+                for model in self.get_models()}
+
+    def log(self, options, message):
+        if options.get('verbosity', 1) > 0:
+            self.stdout.write(message)
+
+    def write_results(self, report):
+        for name, result in sorted(report['results'].items()):
+            self.stdout.write("{}: {} ms, {} queries{}".format(
+                name, result['median_ms'], result['queries'],
+                '' if result.get('status_code', 200) == 200
+                else ' (status {})'.format(result['status_code'])))
+
+    def write_comparison(self, old, new):
+        old_counts = old.get('counts', {})
+        new_counts = new.get('counts', {})
+        if old_counts != new_counts:
+            self.stdout.write(self.style.WARNING(
+                "The reports are of different catalogs, so their times may "
+                "not be comparable:"))
+            for name in sorted(set(old_counts) | set(new_counts)):
+                if old_counts.get(name) != new_counts.get(name):
+                    self.stdout.write(self.style.WARNING(
+                        "  {}: {} -> {}".format(name, old_counts.get(name),
+                                                new_counts.get(name))))
+
+        for name, before, after, change in compare_reports(old, new):
+            self.stdout.write("{}: {} ms -> {} ms{}".format(
+                name, before, after,
+                '' if change is None else ' ({:+.0%})'.format(change)))
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+
+from spectator.core.exporters import export, get_export_writers
+
+
+class Command(BaseCommand):
+    """
+    Exports every Creator, Event, Venue, Work, Publication, Reading, etc,
+    and their roles, to CSV or JSON Lines files (one per model) in a
+    directory, or to a standalone SQLite database file.
+
+        ./manage.py spectator_export csv /path/to/dir
+        ./manage.py spectator_export sqlite /path/to/spectator.sqlite3
+
+    With --incremental, only objects changed since the previous export to the
+    same place are exported, and added to it. This includes objects changed
+    a little before the previous export, in case they weren't committed in
+    time for it (see exporters.WATERMARK_MARGIN), so rows can be repeated.
+    """
+
+    help = "Exports all objects to CSV, JSON Lines or SQLite."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'format',
+            choices=sorted(get_export_writers().keys()),
+            help="The format to export to.",
+        )
+        parser.add_argument(
+            'path',
+            help="The directory for CSV or JSON Lines files, or the SQLite "
+                 "file.",
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            default=False,
+            help="Only export objects changed since the previous export.",
+        )
+        parser.add_argument(
+            '--chunk-size',
+            action='store',
+            default=1000,
+            type=int,
+            help="How many objects to fetch from the database at a time.",
+        )
+
+    def handle(self, *args, **options):
+        writer = get_export_writers()[options['format']](
+                            options['path'], incremental=options['incremental'])
+
+        counts = export(writer, chunk_size=options['chunk_size'])
+
+        if options.get('verbosity', 1) > 0:
+            for name, count in counts.items():
+                self.stdout.write("{}: {}".format(name, count))
@@ -0,0 +1,73 @@
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from spectator.core.importers import RowError, get_importers, read_rows
+
+
+class Command(BaseCommand):
+    """
+    Imports Events, Works or Readings from a CSV or JSON Lines file, using a
+    few queries per batch of rows, rather than saving each object.
+
+        ./manage.py spectator_import events events.csv
+        ./manage.py spectator_import readings readings.jsonl
+
+    See the Importer classes in spectator.events.importers and
+    spectator.reading.importers for the fields each type of row can have.
+    """
+
+    help = "Imports Events, Works or Readings from a CSV or JSON Lines file."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'type',
+            choices=sorted(get_importers().keys()),
+            help="The type of thing each row describes.",
+        )
+        parser.add_argument(
+            'path',
+            help="The file to import, or '-' to read from stdin.",
+        )
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'jsonl'],
+            help="The file's format. By default, 'jsonl' if the filename "
+                 "ends in '.jsonl' or '.json', otherwise 'csv'.",
+        )
+        parser.add_argument(
+            '--batch-size',
+            action='store',
+            default=1000,
+            type=int,
+            help="How many rows to insert at a time.",
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format']
+        if format is None:
+            ext = os.path.splitext(path)[1].lower()
+            format = 'jsonl' if ext in ('.jsonl', '.json') else 'csv'
+
+        importer = get_importers()[options['type']](
+                                        batch_size=options['batch_size'])
+
+        if path == '-':
+            f = sys.stdin
+        else:
+            f = open(path, newline='', encoding='utf-8')
+
+        try:
+            created = importer.run(read_rows(f, format=format))
+        except (RowError, ValueError) as e:
+            raise CommandError(str(e))
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+        if options.get('verbosity', 1) > 0:
+            self.stdout.write("Created {}.".format(
+                    ', '.join('{} {}'.format(v, k)
+                            for k, v in sorted(created.items())) or 'nothing'))
@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand
+
+from spectator.core.benchmark.runner import render_view
+from spectator.core.profiling import TemplateProfiler
+
+
+class Command(BaseCommand):
+    """
+    Renders pages and shows how long each {% include %} and Spectator
+    template tag took, how often it was rendered, and how many queries it
+    made, within the nodes that included it. e.g.:
+
+        ./manage.py spectator_profile_templates /events/ /reading/
+
+    With --folded the output can be made into an SVG flame graph with
+    flamegraph.pl (https://github.com/brendangregg/FlameGraph).
+    """
+
+    help = "Profiles the rendering of templates and template tags for URLs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths',
+            nargs='+',
+            help="The paths of the pages to profile, e.g. /events/",
+        )
+        parser.add_argument(
+            '--repeats',
+            action='store',
+            default=1,
+            type=int,
+            help="How many times to render each page, after a first "
+                 "unprofiled one. Default 1.",
+        )
+        parser.add_argument(
+            '--min-percent',
+            action='store',
+            default=1,
+            type=float,
+            help="Leave out nodes that took less than this percentage of the "
+                 "time. Default 1.",
+        )
+        parser.add_argument(
+            '--folded',
+            action='store_true',
+            default=False,
+            help="Output folded stacks for flame graph tools.",
+        )
+
+    def handle(self, *args, **options):
+        for path in options['paths']:
+            # So that the profile doesn't include things like loading
+            # templates for the first time:
+            render_view(path)
+
+            with TemplateProfiler() as profiler:
+                for i in range(options['repeats']):
+                    response = render_view(path)
+
+            if options['folded']:
+                self.stdout.write(profiler.format_folded())
+                continue
+
+            self.stdout.write('{} ({}): {:.1f}ms, {} queries'.format(
+                path, response.status_code,
+                profiler.time * 1000, profiler.queries))
+            tree = profiler.format_tree(min_percent=options['min_percent'])
+            if tree:
+                self.stdout.write(tree)
+            self.stdout.write('')
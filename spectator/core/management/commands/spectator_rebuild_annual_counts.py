@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from spectator.core.apps import spectator_apps
+
+
+class Command(BaseCommand):
+    """
+    Recounts the numbers of Events and Readings of each kind in each year and
+    saves them in the AnnualCount table.
+
+    Only needed if the SPECTATOR_ANNUAL_COUNTS_TABLE setting is True, and the
+    counts have got out of step, e.g. after objects have been added or
+    deleted without sending signals.
+
+        ./manage.py spectator_rebuild_annual_counts
+    """
+
+    help = "Rebuilds the table of numbers of objects of each kind per year."
+
+    def handle(self, *args, **options):
+        counters = []
+
+        if spectator_apps.is_enabled('events'):
+            from spectator.events.utils import annual_event_counter
+            counters.append(annual_event_counter)
+
+        if spectator_apps.is_enabled('reading'):
+            from spectator.reading.utils import annual_reading_counter
+            counters.append(annual_reading_counter)
+
+        for counter in counters:
+            counter.rebuild()
+
+            if options.get('verbosity', 1) > 0:
+                self.stdout.write("{}: {} years".format(
+                        counter.model._meta.verbose_name_plural.capitalize(),
+                        len(counter.count())))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from spectator.core.apps import spectator_apps
+from spectator.core.counts import rebuild_kind_counts
+from spectator.core.models import Creator
+
+
+class Command(BaseCommand):
+    """
+    Recounts the numbers of Creators, Events and Publications of each kind
+    and saves them in the KindCount table.
+
+    Only needed if the SPECTATOR_KIND_COUNTS_TABLE setting is True, and the
+    counts have got out of step, e.g. after objects have been added or
+    deleted without sending signals.
+
+        ./manage.py spectator_rebuild_kind_counts
+    """
+
+    help = "Rebuilds the table of numbers of objects of each kind."
+
+    def handle(self, *args, **options):
+        models = [Creator]
+
+        if spectator_apps.is_enabled('events'):
+            from spectator.events.models import Event
+            models.append(Event)
+
+        if spectator_apps.is_enabled('reading'):
+            from spectator.reading.models import Publication
+            models.append(Publication)
+
+        for model in models:
+            counts = rebuild_kind_counts(model)
+
+            if options.get('verbosity', 1) > 0:
+                self.stdout.write("{}: {}".format(
+                        model._meta.verbose_name_plural.capitalize(),
+                        ', '.join('{} {}'.format(v, k)
+                                    for k, v in sorted(counts.items()))))
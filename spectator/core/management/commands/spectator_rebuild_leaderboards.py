@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from spectator.core.leaderboards import get_boards, rebuild_leaderboards
+
+
+class Command(BaseCommand):
+    """
+    Recalculates all of the LeaderboardEntry table, used for the charts of
+    Creators with the most Events, Works, Readings and Publications.
+
+    Run this after setting SPECTATOR_LEADERBOARD_TABLES to True, or if the
+    table has got out of step, e.g. after objects have been added or deleted
+    without sending signals.
+
+        ./manage.py spectator_rebuild_leaderboards
+    """
+
+    help = "Rebuilds the tables of Creators' chart positions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--board',
+            action='append',
+            dest='boards',
+            choices=sorted(get_boards().keys()),
+            help="Only rebuild this board. Can be used more than once.",
+        )
+
+    def handle(self, *args, **options):
+        created = rebuild_leaderboards(boards=options['boards'])
+
+        if options.get('verbosity', 1) > 0:
+            self.stdout.write(
+                    "Created {} leaderboard entries.".format(created))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from spectator.core.search import get_backend, rebuild_index
+
+
+class Command(BaseCommand):
+    """
+    Empties the search index and adds every searchable object to it.
+
+    Only needed if the SPECTATOR_SEARCH_INDEX setting is True, and the index
+    hasn't been built by the migrate command, or has got out of step, e.g.
+    after objects have been added or changed without sending signals, or
+    after changing SPECTATOR_SEARCH_BACKEND.
+
+        ./manage.py spectator_rebuild_search_index
+    """
+
+    help = "Rebuilds the full-text search index."
+
+    def handle(self, *args, **options):
+        indexed = rebuild_index()
+
+        if options.get('verbosity', 1) > 0:
+            self.stdout.write("Indexed {} objects using the '{}' backend."
+                                        .format(indexed, get_backend().name))
@@ -1,11 +1,115 @@
 from django.core.exceptions import ImproperlyConfigured
 from django.db import models
-from django.db.models import Count
+from django.db.models import Case, CharField, Count, F, Q, Sum, Value, When
 
+from . import app_settings
 from .apps import spectator_apps
+from .cache import bump_generation, generations_enabled
+from .utils import generate_slug
 
 
-class CreatorManager(models.Manager):
+class SluggedModelQuerySet(models.QuerySet):
+    """
+    For models using SluggedModelMixin.
+
+    Makes bulk_create() set the objects' slugs, which it otherwise wouldn't,
+    because it doesn't call each object's save() method.
+    """
+
+    # How many objects' slugs to set in a single UPDATE. Each needs a few
+    # query parameters, and SQLite can have as few as 999 per query.
+    slug_update_batch_size = 300
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        As the standard bulk_create() but also sets the slugs.
+
+        If an object already has a pk its slug is set before it's inserted.
+
+        Otherwise, if the database returns the new objects' pks (e.g.
+        PostgreSQL), their slugs are set with a single UPDATE per batch.
+
+        Otherwise (e.g. SQLite), the objects won't have pks or slugs after
+        this, but all objects in the database without slugs will have them
+        set with a single UPDATE per batch.
+        """
+        objs = list(objs)
+
+        for obj in objs:
+            if not obj.slug and obj.pk is not None:
+                obj.slug = generate_slug(obj.pk)
+
+        objs = super().bulk_create(objs, *args, **kwargs)
+
+        unslugged = [obj for obj in objs if not obj.slug]
+
+        if len(unslugged) > 0:
+            if all(obj.pk is not None for obj in unslugged):
+                slugs = {}
+                for obj in unslugged:
+                    obj.slug = generate_slug(obj.pk)
+                    slugs[obj.pk] = obj.slug
+                self._update_slugs(slugs)
+            else:
+                self.set_missing_slugs()
+
+        if generations_enabled():
+            # There are no post_save signals to do this:
+            bump_generation(self.model, using=self.db)
+
+        return objs
+
+    def set_missing_slugs(self):
+        """
+        Sets the slugs of any objects in the QuerySet that don't have one,
+        using one UPDATE per batch of objects, rather than saving each one.
+
+        Returns the number of objects updated.
+        """
+        pks = self.filter(Q(slug__isnull=True) | Q(slug='')) \
+                    .values_list('pk', flat=True)
+
+        return self._update_slugs({pk: generate_slug(pk) for pk in pks})
+
+    def _update_slugs(self, slugs):
+        """
+        slugs is a dict of {pk: slug}.
+        Returns the number of objects updated.
+        """
+        qs = self.model._base_manager.using(self.db)
+        pks = list(slugs.keys())
+        updated = 0
+
+        for i in range(0, len(pks), self.slug_update_batch_size):
+            batch = pks[i:i + self.slug_update_batch_size]
+            updated += qs.filter(pk__in=batch).update(
+                slug=Case(
+                    *[When(pk=pk, then=Value(slugs[pk])) for pk in batch],
+                    output_field=CharField()
+                )
+            )
+
+        return updated
+
+
+class SluggedModelManager(models.Manager):
+    """
+    The default manager for models using SluggedModelMixin.
+    """
+
+    def get_queryset(self):
+        return SluggedModelQuerySet(self.model, using=self._db)
+
+    def set_missing_slugs(self):
+        return self.get_queryset().set_missing_slugs()
+
+
+class CreatorManager(SluggedModelManager):
+    """
+    If the SPECTATOR_LEADERBOARD_TABLES setting is True, the by_*() methods
+    get their counts from the LeaderboardEntry table, rather than counting
+    all the roles, Events, Readings, etc. See spectator.core.leaderboards.
+    """
 
     def by_publications(self):
         """
@@ -20,9 +124,14 @@ class CreatorManager(models.Manager):
 
         qs = self.get_queryset()
 
-        qs = qs.exclude(publications__reading__isnull=True) \
-                    .annotate(num_publications=Count('publications')) \
-                    .order_by('-num_publications', 'name_sort')
+        if app_settings.LEADERBOARD_TABLES:
+            qs = qs.filter(leaderboard_entries__board='publications') \
+                .annotate(num_publications=F('leaderboard_entries__count'))
+        else:
+            qs = qs.filter(publications__reading__isnull=False) \
+                .annotate(num_publications=Count('publications', distinct=True))
+
+        qs = qs.order_by('-num_publications', 'name_sort')
 
         return qs
 
@@ -40,10 +149,17 @@ class CreatorManager(models.Manager):
 
         qs = self.get_queryset()
 
-        qs = qs.filter(publication_roles__role_name__in=role_names) \
-                .exclude(publications__reading__isnull=True) \
-                .annotate(num_readings=Count('publications__reading')) \
-                .order_by('-num_readings', 'name_sort')
+        if app_settings.LEADERBOARD_TABLES:
+            qs = qs.filter(leaderboard_entries__board='readings',
+                           leaderboard_entries__role_name__in=role_names) \
+                .annotate(num_readings=Sum('leaderboard_entries__count'))
+        else:
+            qs = qs.filter(publication_roles__role_name__in=role_names) \
+                .annotate(num_readings=Count(
+                                    'publication_roles__publication__reading')) \
+                .filter(num_readings__gt=0)
+
+        qs = qs.order_by('-num_readings', 'name_sort')
 
         return qs
 
@@ -63,11 +179,17 @@ class CreatorManager(models.Manager):
 
         qs = self.get_queryset()
 
-        if kind is not None:
-            qs = qs.filter(events__kind=kind)
+        if app_settings.LEADERBOARD_TABLES:
+            qs = qs.filter(leaderboard_entries__board='events',
+                           leaderboard_entries__kind=(kind or '')) \
+                    .annotate(num_events=F('leaderboard_entries__count'))
+        else:
+            if kind is not None:
+                qs = qs.filter(events__kind=kind)
 
-        qs = qs.annotate(num_events=Count('events', distinct=True)) \
-                .order_by('-num_events', 'name_sort')
+            qs = qs.annotate(num_events=Count('events', distinct=True))
+
+        qs = qs.order_by('-num_events', 'name_sort')
 
         return qs
 
@@ -87,18 +209,26 @@ class CreatorManager(models.Manager):
 
         qs = self.get_queryset()
 
-        filter_kwargs = {}
+        if app_settings.LEADERBOARD_TABLES:
+            # A role_name of None is the entry for all roles:
+            qs = qs.filter(leaderboard_entries__board='works',
+                           leaderboard_entries__kind=(kind or ''),
+                           leaderboard_entries__role_name=role_name) \
+                    .annotate(num_works=F('leaderboard_entries__count'))
+        else:
+            filter_kwargs = {}
+
+            if kind is not None:
+                filter_kwargs['works__kind'] = kind
 
-        if kind is not None:
-            filter_kwargs['works__kind'] = kind
+            if role_name is not None:
+                filter_kwargs['work_roles__role_name'] = role_name
 
-        if role_name is not None:
-            filter_kwargs['work_roles__role_name'] = role_name
+            if filter_kwargs:
+                qs = qs.filter(**filter_kwargs)
 
-        if filter_kwargs:
-            qs = qs.filter(**filter_kwargs)
+            qs = qs.annotate(num_works=Count('works', distinct=True))
 
-        qs = qs.annotate(num_works=Count('works', distinct=True)) \
-                .order_by('-num_works', 'name_sort')
+        qs = qs.order_by('-num_works', 'name_sort')
 
         return qs
@@ -0,0 +1,18 @@
+# Generated by Django 2.1.15 on 2026-10-18 16:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spectator_core', '0005_slug_null'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='creator',
+            name='slug',
+            field=models.SlugField(blank=True, max_length=10, null=True, unique=True),
+        ),
+    ]
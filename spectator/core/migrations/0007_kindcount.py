@@ -0,0 +1,26 @@
+# Generated by Django 2.1.15 on 2026-10-18 16:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spectator_core', '0006_slug_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KindCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=100)),
+                ('kind', models.CharField(max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='kindcount',
+            unique_together={('model_label', 'kind')},
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 2.1.15 on 2026-10-18 17:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spectator_core', '0007_kindcount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(choices=[('events', 'Events'), ('works', 'Works'), ('readings', 'Readings'), ('publications', 'Publications')], max_length=20)),
+                ('kind', models.CharField(blank=True, max_length=20)),
+                ('role_name', models.CharField(blank=True, max_length=50, null=True)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('creator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='spectator_core.Creator')),
+            ],
+            options={
+                'verbose_name_plural': 'leaderboard entries',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['board', 'kind', 'role_name', '-count'], name='spectator_c_board_664943_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 2.1.15 on 2026-10-18 17:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spectator_core', '0008_leaderboardentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnnualCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=100)),
+                ('year', models.DateField()),
+                ('kind', models.CharField(max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ('year',),
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='annualcount',
+            unique_together={('model_label', 'year', 'kind')},
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 2.1.15 on 2026-10-18 17:14
+
+from django.db import migrations, models
+from django.db.utils import OperationalError
+import django.db.models.deletion
+
+
+def create_fts_table(apps, schema_editor):
+    """
+    On SQLite, if it has the FTS5 extension, create the full-text search
+    table used by spectator.core.search. Otherwise the SearchToken table is
+    used instead.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE VIRTUAL TABLE spectator_core_searchdocument_fts "
+                "USING fts5(title, body, "
+                "tokenize='unicode61 remove_diacritics 1')")
+    except OperationalError:
+        # No FTS5.
+        pass
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                "DROP TABLE IF EXISTS spectator_core_searchdocument_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spectator_core', '0009_annualcount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=100)),
+                ('object_id', models.PositiveIntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SearchToken',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=100)),
+                ('weight', models.PositiveIntegerField(default=1)),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tokens', to='spectator_core.SearchDocument')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='searchdocument',
+            unique_together={('model_label', 'object_id')},
+        ),
+        migrations.AddIndex(
+            model_name='searchtoken',
+            index=models.Index(fields=['token', 'document'], name='spectator_c_token_ab7a5e_idx'),
+        ),
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.1.15 on 2026-10-18 17:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spectator_core', '0010_search_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='creator',
+            name='time_modified',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='The time this item was last saved to the database.'),
+        ),
+    ]
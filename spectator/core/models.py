@@ -1,18 +1,18 @@
 from django.db import models
 from django.urls import reverse
 
-from hashids import Hashids
-
-from . import app_settings
 from .fields import NaturalSortField
-from .managers import CreatorManager
+from .managers import CreatorManager, SluggedModelManager
+from .utils import generate_slug
 
 
 class TimeStampedModelMixin(models.Model):
     "Should be mixed in to all models."
     time_created = models.DateTimeField(auto_now_add=True,
                 help_text="The time this item was created in the database.")
-    time_modified = models.DateTimeField(auto_now=True,
+    # Indexed so that the latest one can be found quickly, e.g. by
+    # spectator.core.views.ConditionalGetMixin:
+    time_modified = models.DateTimeField(auto_now=True, db_index=True,
                 help_text="The time this item was last saved to the database.")
 
     class Meta:
@@ -23,36 +23,56 @@ class SluggedModelMixin(models.Model):
     """
     Adds a `slug` field which is generated from a Hashid of the model's pk.
 
-    `slug` is generated on save, if it doesn't already exist.
+    `slug` is generated on save, if it doesn't already exist. If the object
+    has no pk before it's inserted, the slug is set afterwards by an UPDATE
+    of only the `slug` field (and any others returned by
+    `get_pk_dependent_values()`).
+
+    Objects created with the manager's `bulk_create()` will also have slugs
+    set. See SluggedModelQuerySet.
+
+    The slug can be decoded to get the object's pk, which is what
+    spectator.core.views.DecodeSlugMixin does, checking the object found has
+    the same slug. Slugs created with different SLUG_ALPHABET or SLUG_SALT
+    settings won't decode correctly, so don't rely on that alone.
 
-    In theory we could use the Hashid'd slug in reverse to get the object's
-    pk (e.g. in a view). But we're not relying on that, and simply using
-    Hashid as a good method to generate unique, short URL-friendly slugs.
+    `slug` is unique. It's null, rather than empty, until it's set.
     """
-    slug = models.SlugField(max_length=10, null=False, blank=True)
+    slug = models.SlugField(max_length=10, null=True, blank=True, unique=True)
+
+    objects = SluggedModelManager()
 
     class Meta:
         abstract = True
 
     def save(self, *args, **kwargs):
+        if not self.slug and self.pk is not None:
+            # We already know the pk, so can set the slug before saving:
+            self.slug = self._generate_slug(self.pk)
+
         super().save(*args, **kwargs)
 
         if not self.slug:
-            self.slug = self._generate_slug(self.pk)
-            # Don't want to insert again, if that's what was forced:
-            kwargs['force_insert'] = False
-            self.save(*args, **kwargs)
+            # The database has only now given us a pk.
+            values = self.get_pk_dependent_values()
+            for name, value in values.items():
+                setattr(self, name, value)
+
+            type(self)._base_manager.using(self._state.db) \
+                                .filter(pk=self.pk).update(**values)
+
+    def get_pk_dependent_values(self):
+        """
+        Returns a dict of field names and values that can only be set once
+        a newly-inserted object has a pk. Child classes can add to it.
+        """
+        return {'slug': self._generate_slug(self.pk)}
 
     def _generate_slug(self, value):
         """
         Generates a slug using a Hashid of `value`.
         """
-        alphabet = app_settings.SLUG_ALPHABET
-        salt = app_settings.SLUG_SALT
-
-        hashids = Hashids(alphabet=alphabet, salt=salt, min_length=5)
-
-        return hashids.encode(value)
+        return generate_slug(value)
 
 
 class BaseRole(TimeStampedModelMixin, models.Model):
@@ -175,3 +195,135 @@ class Creator(TimeStampedModelMixin, SluggedModelMixin, models.Model):
 
     def get_plays(self):
         return self.works.filter(kind='play').distinct()
+
+
+class KindCount(models.Model):
+    """
+    The number of objects of a model, like Event or Publication, that are of
+    each kind. Only used if the SPECTATOR_KIND_COUNTS_TABLE setting is True.
+
+    Kept up to date by signals; see spectator.core.counts.
+    """
+    # e.g. 'spectator_events.event':
+    model_label = models.CharField(max_length=100)
+
+    kind = models.CharField(max_length=20)
+
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = (('model_label', 'kind'),)
+
+    def __str__(self):
+        return '{} {}: {}'.format(self.model_label, self.kind, self.count)
+
+
+class LeaderboardEntry(models.Model):
+    """
+    One Creator's score in one of the charts used by CreatorManager's
+    by_events(), by_works(), by_readings() and by_publications() methods.
+    Only used if the SPECTATOR_LEADERBOARD_TABLES setting is True.
+
+    e.g. the number of movie Works a Creator was the 'Director' of would be:
+
+        LeaderboardEntry(creator=c, board='works', kind='movie',
+                         role_name='Director', count=12)
+
+    Kept up to date by signals; see spectator.core.leaderboards.
+    """
+
+    BOARD_CHOICES = (
+        ('events', 'Events'),
+        ('works', 'Works'),
+        ('readings', 'Readings'),
+        ('publications', 'Publications'),
+    )
+
+    creator = models.ForeignKey('spectator_core.Creator',
+                on_delete=models.CASCADE, related_name='leaderboard_entries')
+
+    board = models.CharField(max_length=20, choices=BOARD_CHOICES)
+
+    # An Event or Work kind, or '' for all kinds:
+    kind = models.CharField(max_length=20, blank=True)
+
+    # A role name, or None for all roles:
+    role_name = models.CharField(max_length=50, null=True, blank=True)
+
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'leaderboard entries'
+        indexes = [
+            models.Index(fields=['board', 'kind', 'role_name', '-count']),
+        ]
+
+    def __str__(self):
+        return '{} {}: {}'.format(self.creator_id, self.board, self.count)
+
+
+class AnnualCount(models.Model):
+    """
+    The number of objects, like Events or Readings, of each kind in each
+    year. Only used if the SPECTATOR_ANNUAL_COUNTS_TABLE setting is True.
+
+    Kept up to date by signals; see spectator.core.counts.AnnualKindCounter.
+    """
+    # e.g. 'spectator_reading.reading':
+    model_label = models.CharField(max_length=100)
+
+    # e.g. 2018-01-01:
+    year = models.DateField()
+
+    kind = models.CharField(max_length=20)
+
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ('year',)
+        unique_together = (('model_label', 'year', 'kind'),)
+
+    def __str__(self):
+        return '{} {} {}: {}'.format(
+                    self.model_label, self.year.year, self.kind, self.count)
+
+
+class SearchDocument(models.Model):
+    """
+    One searchable object, like a Creator or Venue, in the search index.
+
+    Its words are either in the SQLite FTS5 table, whose rowids are these
+    objects' pks, or in SearchTokens. See spectator.core.search.
+    """
+    # e.g. 'spectator_events.venue':
+    model_label = models.CharField(max_length=100)
+
+    object_id = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = (('model_label', 'object_id'),)
+
+    def __str__(self):
+        return '{} {}'.format(self.model_label, self.object_id)
+
+
+class SearchToken(models.Model):
+    """
+    One word in one SearchDocument, for databases that can't use SQLite's
+    FTS5. See spectator.core.search.
+    """
+    document = models.ForeignKey('spectator_core.SearchDocument',
+                on_delete=models.CASCADE, related_name='tokens')
+
+    token = models.CharField(max_length=100)
+
+    # Higher if the word appears more often, or in a title:
+    weight = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['token', 'document']),
+        ]
+
+    def __str__(self):
+        return '{}: {}'.format(self.document_id, self.token)
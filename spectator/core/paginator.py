@@ -1,7 +1,18 @@
+import base64
+import binascii
+import datetime
+import json
 import math
+import operator
 from functools import reduce
 from django.core.paginator import \
-    Paginator, QuerySetPaginator, Page, InvalidPage
+    Paginator, QuerySetPaginator, Page, InvalidPage, EmptyPage
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+
+from .cache import get_cached_count
 
 # From https://djangosnippets.org/snippets/773/
 # Lets us do better pagination, so we don't need to show *every* page.
@@ -11,6 +22,8 @@ __all__ = (
     'ExPaginator',
     'DiggPaginator',
     'QuerySetDiggPaginator',
+    'CachedCountDiggPaginator',
+    'KeysetPaginator',
 )
 
 class ExPaginator(Paginator):
@@ -200,6 +213,14 @@ class DiggPaginator(ExPaginator):
         page = super().page(number, *args, **kwargs)
         number = int(number) # we know this will work
 
+        self._set_page_ranges(page, number)
+
+        page.__class__ = DiggPage
+        return page
+
+    def _set_page_ranges(self, page, number):
+        """Add the Digg-style page ranges for page ``number`` to ``page``.
+        """
         # easier access
         num_pages, body, tail, padding, margin = \
             self.num_pages, self.body, self.tail, self.padding, self.margin
@@ -265,9 +286,6 @@ class DiggPaginator(ExPaginator):
         page.page_range = reduce(lambda x, y: x+((x and y) and [False])+y,
             [page.leading_range, page.main_range, page.trailing_range])
 
-        page.__class__ = DiggPage
-        return page
-
 class DiggPage(Page):
     def __str__(self):
         return " ... ".join(filter(None, [
@@ -278,6 +296,269 @@ class DiggPage(Page):
 class QuerySetDiggPaginator(DiggPaginator, QuerySetPaginator):
     pass
 
+
+class CachedCountDiggPaginator(DiggPaginator):
+    """A DiggPaginator for QuerySets that caches the total number of objects
+    until any of the models involved is saved or deleted. See
+    ``spectator.core.cache.get_cached_count()``.
+    """
+    @cached_property
+    def count(self):
+        return get_cached_count(self.object_list)
+
+
+class KeysetPaginator(DiggPaginator):
+    """A DiggPaginator for QuerySets that can also fetch pages by "seeking"
+    from the previous or next page's last or first object, rather than by
+    using an OFFSET. So moving to page 500 via the "next" link costs the
+    same as moving to page 2.
+
+    ``ordering`` is the list of field names to order by, which must end with
+    a unique field, e.g. ``('-date', '-pk')`` or ``('title_sort', 'pk')``.
+    Each one must be a field on the QuerySet's model, not a related model.
+    Nullable fields are allowed; null values always come last.
+
+    ``count`` is an optional total number of objects (or a callable returning
+    it) to use for the page ranges, instead of doing a ``COUNT(*)``. e.g.
+    a cached or estimated total. If it's wrong the page ranges will be
+    slightly wrong, but the previous/next links will still work.
+
+    Use ``page_from_cursor()`` with a page's ``previous_cursor`` or
+    ``next_cursor`` to get the neighbouring pages. ``page()`` works as
+    normal, using an OFFSET, for jumping to numbered pages.
+
+    >>> paginator = KeysetPaginator(Event.objects.all(), 10,
+    ...                             ordering=('-date', '-pk'))
+    >>> page = paginator.page(1)
+    >>> paginator.page_from_cursor(page.next_cursor)
+    <Page 2 of 30>
+    """
+    def __init__(self, object_list, per_page, ordering=('pk',), count=None,
+                                                                **kwargs):
+        # Orphans don't make sense when we don't know what comes next:
+        kwargs['orphans'] = 0
+        super().__init__(object_list, per_page, **kwargs)
+        self._count = count
+
+        model = self.object_list.model
+        self.ordering = []
+        for name in ordering:
+            descending = name.startswith('-')
+            name = name.lstrip('-')
+            if name == 'pk':
+                field = model._meta.pk
+            else:
+                field = model._meta.get_field(name)
+            self.ordering.append((name, field, descending))
+
+    @cached_property
+    def count(self):
+        count = self._count() if callable(self._count) else self._count
+        if count is None:
+            count = self.object_list.count()
+        return count
+
+    def page(self, number, softlimit=False):
+        """Returns the page with this number, found using an OFFSET.
+        """
+        try:
+            number = self.validate_number(number)
+        except InvalidPage as e:
+            number = self._ensure_int(number, e)
+            if number > self.num_pages and softlimit:
+                number = self.num_pages
+            else:
+                raise e
+
+        bottom = (number - 1) * self.per_page
+        objects = list(self._ordered()[bottom:bottom + self.per_page + 1])
+
+        if len(objects) == 0 and number > 1:
+            # Our count was too high.
+            raise EmptyPage('That page contains no results')
+
+        return self._get_page(objects[:self.per_page], number,
+                              has_previous=(number > 1),
+                              has_next=(len(objects) > self.per_page))
+
+    def page_from_cursor(self, cursor):
+        """Returns the page before or after the object encoded in
+        ``cursor``, which should be a page's ``previous_cursor`` or
+        ``next_cursor``.
+        """
+        number, forwards, values = self.decode_cursor(cursor)
+
+        qs = self._ordered(reverse=not forwards) \
+                        .filter(self._seek_filter(values, forwards))
+        objects = list(qs[:self.per_page + 1])
+        has_more = len(objects) > self.per_page
+        objects = objects[:self.per_page]
+
+        if len(objects) == 0:
+            raise EmptyPage('That page contains no results')
+
+        if forwards:
+            return self._get_page(objects, number,
+                                  has_previous=True, has_next=has_more)
+        else:
+            if not has_more:
+                # Whatever the cursor said, this is the first page.
+                number = 1
+            return self._get_page(objects[::-1], max(number, 1),
+                                  has_previous=has_more, has_next=True)
+
+    def iterate(self, cursor=None, limit=None):
+        """Returns an iterator of up to ``limit`` objects (or all of them),
+        in order, starting after the object encoded in ``cursor``, which
+        should be a ``next_cursor`` or made by ``encode_cursor()``.
+
+        Objects are fetched ``per_page`` at a time, each batch by seeking
+        from the previous batch's last object, so they're never counted and
+        no OFFSET is used. Raises InvalidPage if the cursor isn't valid.
+        """
+        values = None
+        if cursor is not None:
+            number, forwards, values = self.decode_cursor(cursor)
+            if not forwards:
+                raise InvalidPage('That cursor is not valid')
+        return self._iterate(values, limit)
+
+    def _iterate(self, values, limit):
+        while limit is None or limit > 0:
+            qs = self._ordered()
+            if values is not None:
+                qs = qs.filter(self._seek_filter(values, True))
+
+            size = self.per_page if limit is None else min(self.per_page, limit)
+            objects = list(qs[:size])
+            yield from objects
+
+            if len(objects) < size:
+                return
+            if limit is not None:
+                limit -= len(objects)
+            values = [getattr(objects[-1], field.attname)
+                      for name, field, descending in self.ordering]
+
+    def encode_cursor(self, obj, number, forwards=True):
+        """Returns an opaque string to use to get page ``number``, which
+        is the page after (if ``forwards``) or before ``obj``.
+        """
+        values = []
+        for name, field, descending in self.ordering:
+            value = getattr(obj, field.attname)
+            if isinstance(value, (datetime.date, datetime.time)):
+                value = value.isoformat()
+            elif value is not None and not isinstance(value, (int, float)):
+                value = str(value)
+            values.append(value)
+
+        data = json.dumps([number, int(forwards), values],
+                          separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Returns a tuple of (page number, forwards, [field values]) from
+        a cursor made by ``encode_cursor()``. Raises InvalidPage if it's
+        not valid.
+        """
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            number, forwards, values = json.loads(
+                            base64.urlsafe_b64decode(padded.encode()).decode())
+            if len(values) != len(self.ordering):
+                raise ValueError
+            values = [
+                None if value is None else field.to_python(value)
+                for (name, field, descending), value
+                in zip(self.ordering, values)
+            ]
+            number = int(number)
+        except (binascii.Error, TypeError, ValueError, ValidationError):
+            raise InvalidPage('That cursor is not valid')
+
+        return number, bool(forwards), values
+
+    def _get_page(self, objects, number, has_previous, has_next):
+        if number > self.num_pages:
+            # Our count was too low, so make sure the ranges include this page.
+            self.num_pages = number
+        page = KeysetPage(objects, number, self,
+                          has_previous=has_previous, has_next=has_next)
+        self._set_page_ranges(page, number)
+        return page
+
+    def _ordered(self, reverse=False):
+        """The QuerySet ordered by our fields, or in the opposite order if
+        ``reverse`` is True. Nulls come last (or first, if reversed).
+        """
+        nulls_largest = connections[self.object_list.db] \
+                                            .features.nulls_order_largest
+        order_by = []
+        for name, field, descending in self.ordering:
+            expression = F(name).desc() if descending else F(name).asc()
+            if field.null and descending == nulls_largest:
+                # The database won't put nulls last by default. Only do this
+                # when needed because it can stop indexes being used.
+                expression.nulls_last = not reverse
+                expression.nulls_first = reverse
+            expression.descending = (descending != reverse)
+            order_by.append(expression)
+        return self.object_list.order_by(*order_by)
+
+    def _seek_filter(self, values, forwards):
+        """A Q object matching objects after (or before, if not
+        ``forwards``) the object with these ``values`` in our ordering.
+        """
+        conditions = []
+        # Objects that have the same values for all the fields so far:
+        same = Q()
+        for (name, field, descending), value in zip(self.ordering, values):
+            if value is None:
+                if not forwards:
+                    # Everything non-null comes before nulls.
+                    conditions.append(same & Q(**{name + '__isnull': False}))
+                equal = Q(**{name + '__isnull': True})
+            else:
+                lookup = 'lt' if descending == forwards else 'gt'
+                condition = Q(**{'{}__{}'.format(name, lookup): value})
+                if forwards and field.null:
+                    condition |= Q(**{name + '__isnull': True})
+                conditions.append(same & condition)
+                equal = Q(**{name: value})
+            same &= equal
+
+        return reduce(operator.or_, conditions)
+
+
+class KeysetPage(DiggPage):
+    """A page from a KeysetPaginator, which knows whether there are previous
+    and next pages, and has cursors for getting them.
+    """
+    def __init__(self, object_list, number, paginator, has_previous=False,
+                                                        has_next=False):
+        super().__init__(object_list, number, paginator)
+        self._has_previous = has_previous
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    @cached_property
+    def next_cursor(self):
+        if self.has_next():
+            return self.paginator.encode_cursor(
+                            self.object_list[-1], self.number + 1, forwards=True)
+
+    @cached_property
+    def previous_cursor(self):
+        if self.has_previous():
+            return self.paginator.encode_cursor(
+                            self.object_list[0], self.number - 1, forwards=False)
+
 #if __name__ == "__main__":
     #import doctest
     #doctest.testmod()
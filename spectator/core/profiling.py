@@ -0,0 +1,253 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.template.base import Node
+from django.template.loader_tags import IncludeNode
+from django.utils.html import escape
+
+from .querybudget import QueryRecorder
+
+
+# Timing the rendering of every {% include %} and Spectator template tag,
+# like the sidebar cards, with how often each is rendered and how many SQL
+# queries it makes. See TemplateProfiler, TemplateProfilerMiddleware and the
+# spectator_profile_templates management command.
+
+
+_local = threading.local()
+
+# Node.render_annotated(), before it's replaced by install():
+_render_annotated = Node.render_annotated
+
+
+def _profiled_render_annotated(node, context):
+    profiler = getattr(_local, 'profiler', None)
+    if profiler is None or not is_profiled(node):
+        return _render_annotated(node, context)
+    return profiler.render_node(node, context)
+
+
+def install():
+    """
+    Makes every template Node's rendering go through the active
+    TemplateProfiler, if any. Called when the first TemplateProfiler is
+    used, so there's no cost unless profiling is used.
+    """
+    Node.render_annotated = _profiled_render_annotated
+
+
+def is_profiled(node):
+    "Is `node` an {% include %} or one of Spectator's template tags?"
+    if isinstance(node, IncludeNode):
+        return True
+    if type(node).__module__.startswith('spectator.'):
+        # e.g. CachedCardNode:
+        return True
+    func = getattr(node, 'func', None)
+    return getattr(func, '__module__', '').startswith('spectator.')
+
+
+def get_label(node):
+    "e.g. \"{% include 'spectator_core/includes/card_chart.html' %}\""
+    token = getattr(node, 'token', None)
+    if token is None:
+        return '{{% {} %}}'.format(type(node).__name__)
+    return '{% ' + token.contents + ' %}'
+
+
+class ProfileEntry(object):
+    """
+    The totals for one node label, within its parent entry. `children` are
+    the entries for nodes rendered within it, keyed by label.
+    """
+
+    def __init__(self, label):
+        self.label = label
+        self.calls = 0
+        self.time = 0.0
+        self.queries = 0
+        self.children = OrderedDict()
+
+    def get_child(self, label):
+        if label not in self.children:
+            self.children[label] = ProfileEntry(label)
+        return self.children[label]
+
+    @property
+    def self_time(self):
+        "Time spent in this entry, excluding its children."
+        return self.time - sum(c.time for c in self.children.values())
+
+    def walk(self, path=()):
+        "Yields (path, entry) for every descendant, depth first."
+        for child in self.children.values():
+            child_path = path + (child.label,)
+            yield child_path, child
+            yield from child.walk(child_path)
+
+
+class TemplateProfiler(object):
+    """
+    A context manager that records the rendering of every {% include %} and
+    Spectator template tag within it, in this thread:
+
+        with TemplateProfiler() as profiler:
+            response.render()
+        print(profiler.format_tree())
+
+    Times and numbers of queries include those of the nodes within each
+    node. Queries are only counted in Django 2.0 or later.
+    """
+
+    def __init__(self):
+        self.root = ProfileEntry('')
+        self.time = 0.0
+        self.queries = 0
+        self._stack = [self.root]
+
+    def __enter__(self):
+        install()
+        self._previous = getattr(_local, 'profiler', None)
+        _local.profiler = self
+
+        self._recorder = None
+        if QueryRecorder.is_available():
+            self._recorder = QueryRecorder(capture_stacks=False).__enter__()
+
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.time += time.perf_counter() - self._start
+        if self._recorder is not None:
+            self._recorder.__exit__(*exc_info)
+            self.queries += self._recorder.count
+        _local.profiler = self._previous
+
+    def _count_queries(self):
+        return 0 if self._recorder is None else self._recorder.count
+
+    def render_node(self, node, context):
+        entry = self._stack[-1].get_child(get_label(node))
+        self._stack.append(entry)
+        start = time.perf_counter()
+        queries = self._count_queries()
+        try:
+            return _render_annotated(node, context)
+        finally:
+            entry.calls += 1
+            entry.time += time.perf_counter() - start
+            entry.queries += self._count_queries() - queries
+            self._stack.pop()
+
+    def get_totals(self):
+        """
+        Returns a list of (label, calls, time, queries) for each label,
+        wherever it was rendered, slowest first.
+        """
+        totals = OrderedDict()
+        for path, entry in self.root.walk():
+            # Don't count a node twice if it's within itself:
+            if entry.label in path[:-1]:
+                continue
+            calls, duration, queries = totals.get(entry.label, (0, 0.0, 0))
+            totals[entry.label] = (calls + entry.calls,
+                                   duration + entry.time,
+                                   queries + entry.queries)
+
+        return sorted(((label,) + values for label, values in totals.items()),
+                      key=lambda t: -t[2])
+
+    def format_tree(self, min_percent=0):
+        """
+        Returns a string showing each node within its parents, like a flame
+        graph on its side, e.g.:
+
+             120.5ms 100%  1x  14q  {% include 'events_paginated.html' %}
+              98.1ms  81% 20x  12q    {% include 'event.html' %}
+
+        Nodes that took less than `min_percent` of the total time are left
+        out.
+        """
+        lines = []
+        total = self.time or 1
+
+        for path, entry in self.root.walk():
+            percent = 100 * entry.time / total
+            if percent < min_percent:
+                continue
+            lines.append('{:>9.1f}ms {:>4.0f}% {:>4}x {:>4}q  {}{}'.format(
+                    entry.time * 1000, percent, entry.calls, entry.queries,
+                    '  ' * (len(path) - 1), entry.label))
+
+        return '\n'.join(lines)
+
+    def format_folded(self):
+        """
+        Returns the 'folded' stacks format used by flame graph tools, like
+        flamegraph.pl: a line for each path of nodes and its self time in
+        microseconds, e.g.:
+
+            {% include 'events_paginated.html' %};{% include 'event.html' %} 98100
+        """
+        return '\n'.join(
+            '{} {}'.format(';'.join(label.replace(';', ',')
+                                    for label in path),
+                           int(round(entry.self_time * 1000000)))
+            for path, entry in self.root.walk())
+
+    def get_header(self):
+        "A short summary, e.g. for a response header."
+        totals = self.get_totals()
+        header = 'time={:.1f}ms; queries={}'.format(self.time * 1000,
+                                                    self.queries)
+        if totals:
+            header += '; slowest={} {:.1f}ms'.format(totals[0][0],
+                                                     totals[0][2] * 1000)
+        # Headers can only be ASCII:
+        return header.encode('ascii', 'backslashreplace').decode('ascii')
+
+
+class TemplateProfilerMiddleware(object):
+    """
+    Profiles the rendering of every response's templates, adding an
+    'X-Spectator-Template-Profile' header, like:
+
+        time=35.2ms; queries=9; slowest={% most_seen_creators_card %} 8.1ms
+
+    If DEBUG is True, a panel showing the whole profile (see
+    TemplateProfiler.format_tree()) is added to the end of HTML pages.
+
+    Only for use while developing.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with TemplateProfiler() as profiler:
+            response = self.get_response(request)
+            # Views return TemplateResponses that haven't been rendered yet:
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.render()
+
+        response['X-Spectator-Template-Profile'] = profiler.get_header()
+
+        if settings.DEBUG and not response.streaming and \
+                response.get('Content-Type', '').startswith('text/html'):
+            self.add_panel(response, profiler)
+
+        return response
+
+    def add_panel(self, response, profiler):
+        panel = ('<pre class="spectator-template-profile">{}</pre>'.format(
+                    escape(profiler.format_tree())).encode(response.charset))
+        content = response.content
+        i = content.rfind(b'</body>')
+        if i == -1:
+            i = len(content)
+        response.content = content[:i] + panel + content[i:]
+        if response.has_header('Content-Length'):
+            response['Content-Length'] = len(response.content)
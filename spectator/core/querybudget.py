@@ -0,0 +1,337 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import ExitStack
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.template.base import Node, Template, TextNode, VariableNode
+
+from . import app_settings
+
+
+# Counting and timing the SQL queries made for each view, to find views that
+# make more than they should, and N+1 problems: the same SQL run again and
+# again with different parameters, e.g. once per object in a list.
+# See QueryBudgetMiddleware and QueryBudgetTestMixin.
+
+
+logger = logging.getLogger(__name__)
+
+# So we can recognise frames of rendering nodes, and of our own code:
+_NODE_RENDER_CODE = Node.render_annotated.__code__
+_SPECTATOR_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Our instrumentation, which isn't where queries come from:
+_IGNORED_FILES = {
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+    for name in ('querybudget.py', 'profiling.py')
+}
+
+
+def get_budget(url_name):
+    """
+    The most queries the view with `url_name`, like
+    'spectator:events:event_list', should make, or None for no limit.
+    """
+    return app_settings.QUERY_BUDGETS.get(url_name,
+                                          app_settings.QUERY_BUDGET_DEFAULT)
+
+
+def get_stack(frame):
+    """
+    Returns a list of strings describing where a query came from, outermost
+    first: each template being rendered, each template tag within them, and
+    the innermost line of Spectator's Python code. e.g.:
+
+        ['spectator_events/work_detail.html',
+         '{% include "spectator_events/includes/events.html" %}',
+         'spectator_events/includes/events.html',
+         '{% for event in event_list %}',
+         'spectator/events/models.py:187 in make_title']
+    """
+    stack = []
+    code_line = None
+    # Not fixed, because the test runner replaces it:
+    template_render_code = Template._render.__code__
+
+    while frame is not None:
+        code = frame.f_code
+        if code is template_render_code:
+            template = frame.f_locals.get('self')
+            stack.append(getattr(template.origin, 'template_name', None)
+                         or template.name or '<unknown template>')
+        elif code is _NODE_RENDER_CODE:
+            node = frame.f_locals.get('self')
+            token = getattr(node, 'token', None)
+            if token is not None and \
+                    not isinstance(node, (TextNode, VariableNode)):
+                stack.append('{% ' + token.contents + ' %}')
+        elif code_line is None and \
+                code.co_filename.startswith(_SPECTATOR_DIR) and \
+                code.co_filename not in _IGNORED_FILES:
+            code_line = '{}:{} in {}'.format(
+                    os.path.relpath(code.co_filename,
+                                    os.path.dirname(_SPECTATOR_DIR)),
+                    frame.f_lineno, code.co_name)
+        frame = frame.f_back
+
+    stack.reverse()
+    if code_line is not None:
+        stack.append(code_line)
+    return stack
+
+
+class QueryRecord(object):
+    "One SQL query, run by QueryRecorder."
+
+    def __init__(self, sql, params, duration, stack):
+        self.sql = sql
+        self.params = params
+        self.duration = duration
+        self.stack = stack
+
+
+class QueryRecorder(object):
+    """
+    A context manager that records every SQL query made within it, on any
+    database, with its duration and where it came from (see get_stack()):
+
+        with QueryRecorder() as recorder:
+            response = view(request)
+        report = recorder.get_report('spectator:events:event_list', budget=5)
+
+    Needs Django 2.0 or later, for execute_wrapper().
+    """
+
+    def __init__(self, capture_stacks=True):
+        self.capture_stacks = capture_stacks
+        self.queries = []
+
+    @staticmethod
+    def is_available():
+        return hasattr(connections[DEFAULT_DB_ALIAS],
+                       'execute_wrapper')
+
+    def __enter__(self):
+        self._exit_stack = ExitStack()
+        for connection in connections.all():
+            self._exit_stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._exit_stack.close()
+
+    def __call__(self, execute, sql, params, many, context):
+        stack = get_stack(sys._getframe(1)) if self.capture_stacks else []
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(QueryRecord(
+                    sql, params, time.perf_counter() - start, stack))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def duration(self):
+        return sum(q.duration for q in self.queries)
+
+    def get_repeated(self, limit=None):
+        """
+        Returns a list of (QueryRecord, count) for each SQL statement that was
+        run with more than `limit` different parameters (default
+        app_settings.QUERY_REPEAT_LIMIT). The QueryRecord is of the first
+        run beyond the limit.
+        """
+        if limit is None:
+            limit = app_settings.QUERY_REPEAT_LIMIT
+
+        params = OrderedDict()
+        firsts = {}
+        for query in self.queries:
+            seen = params.setdefault(query.sql, set())
+            seen.add(repr(query.params))
+            if len(seen) == limit + 1:
+                firsts[query.sql] = query
+
+        return [(firsts[sql], len(seen)) for sql, seen in params.items()
+                if sql in firsts]
+
+    def get_report(self, url_name, budget=None, repeat_limit=None):
+        return QueryReport(url_name, self.queries, budget,
+                           self.get_repeated(repeat_limit))
+
+
+class QueryReport(object):
+    """
+    The queries made for one request to the view with `url_name`.
+
+    `violation` is the first QueryRecord that was over `budget`, if any, and
+    `repeated` is a list of (QueryRecord, count) of likely N+1 problems.
+    """
+
+    def __init__(self, url_name, queries, budget=None, repeated=()):
+        self.url_name = url_name
+        self.count = len(queries)
+        self.duration = sum(q.duration for q in queries)
+        self.budget = budget
+        self.repeated = list(repeated)
+        self.violation = None
+        if budget is not None and self.count > budget:
+            self.violation = queries[budget]
+
+    @property
+    def is_ok(self):
+        return self.violation is None and not self.repeated
+
+    def __str__(self):
+        lines = ['{}: {} queries in {:.1f} ms'.format(
+                    self.url_name, self.count, self.duration * 1000)]
+
+        if self.violation is not None:
+            lines.append('Over the budget of {} queries, from:'.format(
+                                                                self.budget))
+            lines.extend(self._format_query(self.violation))
+
+        for query, count in self.repeated:
+            lines.append('Same SQL run with {} different parameters, '
+                         'from:'.format(count))
+            lines.extend(self._format_query(query))
+
+        return '\n'.join(lines)
+
+    def _format_query(self, query):
+        return (['    ' + s for s in query.stack] +
+                ['    SQL: ' + query.sql])
+
+
+class QueryStats(object):
+    """
+    Totals of QueryReports for each URL name, collected by
+    QueryBudgetMiddleware in this process. See get_query_stats().
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+
+    def add(self, report):
+        with self.lock:
+            stats = self.views.setdefault(report.url_name, {
+                'requests': 0,
+                'queries': 0,
+                'max_queries': 0,
+                'time_ms': 0.0,
+                'over_budget': 0,
+                'repeated': 0,
+            })
+            stats['requests'] += 1
+            stats['queries'] += report.count
+            stats['max_queries'] = max(stats['max_queries'], report.count)
+            stats['time_ms'] += report.duration * 1000
+            stats['over_budget'] += int(report.violation is not None)
+            stats['repeated'] += int(bool(report.repeated))
+
+    def get(self):
+        with self.lock:
+            return {name: dict(stats) for name, stats in self.views.items()}
+
+    def reset(self):
+        with self.lock:
+            self.views = {}
+
+
+query_stats = QueryStats()
+
+
+def get_query_stats():
+    """
+    Returns a dict, keyed by URL name, of dicts of the number of 'requests'
+    recorded by QueryBudgetMiddleware, their total number of 'queries',
+    'max_queries' in one request, total 'time_ms' spent on queries, and how
+    many requests were 'over_budget' or had 'repeated' queries.
+    """
+    return query_stats.get()
+
+
+def reset_query_stats():
+    query_stats.reset()
+
+
+class QueryBudgetMiddleware(object):
+    """
+    Records the number and time of SQL queries for every request to a view
+    with a URL name, and logs a warning, to the 'spectator.core.querybudget'
+    logger, for any that are over their budget (see get_budget()) or seem to
+    have N+1 problems.
+
+    Adds an 'X-Spectator-Queries' header to responses, like
+    '12; time=3.4ms', and totals to get_query_stats().
+
+    Only for use while developing: recording where every query came from is
+    slow. Queries made while streaming a response aren't counted.
+    """
+
+    def __init__(self, get_response):
+        if not QueryRecorder.is_available():
+            raise MiddlewareNotUsed('QueryBudgetMiddleware needs Django 2.0+')
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+
+        match = getattr(request, 'resolver_match', None)
+        if match is None or not match.url_name:
+            return response
+
+        report = recorder.get_report(match.view_name,
+                                     budget=get_budget(match.view_name))
+        query_stats.add(report)
+
+        if not report.is_ok:
+            logger.warning(str(report))
+
+        response['X-Spectator-Queries'] = '{}; time={:.1f}ms'.format(
+                                        report.count, report.duration * 1000)
+        return response
+
+
+class QueryBudgetTestMixin(object):
+    """
+    For TestCases, to check that views keep within their query budgets:
+
+        class MyTestCase(QueryBudgetTestMixin, TestCase):
+
+            def test_event_list(self):
+                self.assertQueryBudget('/events/', budget=5)
+
+    If `budget` isn't given, the view's budget from get_budget() is used.
+    """
+
+    def assertQueryBudget(self, path, budget=None, data=None,
+                          repeat_limit=None):
+        """
+        GETs `path` with the test client and fails if it makes more than
+        `budget` queries, or runs the same SQL with more than `repeat_limit`
+        different parameters. Returns the QueryReport.
+        """
+        if not QueryRecorder.is_available():
+            self.skipTest('Query budgets need Django 2.0+')
+
+        with QueryRecorder() as recorder:
+            response = self.client.get(path, data or {})
+
+        url_name = response.resolver_match.view_name
+        if budget is None:
+            budget = get_budget(url_name)
+
+        report = recorder.get_report(url_name, budget, repeat_limit)
+        if not report.is_ok:
+            self.fail(str(report))
+        return report
@@ -0,0 +1,491 @@
+import re
+import unicodedata
+from collections import Counter
+from functools import reduce
+from operator import or_
+
+from django.apps import apps
+from django.db import connections, router, transaction
+from django.db.models import Q, Sum
+from django.utils.html import strip_tags
+
+from . import app_settings
+from .apps import spectator_apps
+from .counts import count_if
+from .models import Creator, SearchDocument, SearchToken
+
+if spectator_apps.is_enabled('events'):
+    from spectator.events.models import Event, Venue, Work
+
+if spectator_apps.is_enabled('reading'):
+    from spectator.reading.models import Publication, PublicationSeries
+
+
+# Created by migration spectator_core 0010, if SQLite has FTS5:
+FTS_TABLE = 'spectator_core_searchdocument_fts'
+
+# A word in a title counts this many times more than one elsewhere:
+TITLE_WEIGHT = 10
+
+# How many objects to index at once when rebuilding the index:
+BATCH_SIZE = 500
+
+TOKEN_RE = re.compile(r'\w+')
+
+# The model_label of a SearchDocument, with no words, that's added when the
+# index is built, so that an index of no objects still counts as built:
+BUILT_LABEL = 'spectator_core.index_built'
+
+
+def get_searchable_models():
+    """
+    Returns a dict of {model: (title field names, body field names)} for
+    each model that's searchable in the enabled Spectator apps.
+    """
+    searchable = {
+        Creator: (['name'], []),
+    }
+
+    if spectator_apps.is_enabled('events'):
+        # title_plain includes titles made from an Event's Works or Creators:
+        searchable[Event] = (['title_plain'], ['note'])
+        searchable[Venue] = (['name'], ['address'])
+        searchable[Work] = (['title'], [])
+
+    if spectator_apps.is_enabled('reading'):
+        searchable[Publication] = (['title'], [])
+        searchable[PublicationSeries] = (['title'], [])
+
+    return searchable
+
+
+def tokenize(text):
+    """
+    Splits `text` into a list of lowercase words, without any HTML tags or
+    accents. e.g. 'The <b>Café</b> Royal' -> ['the', 'cafe', 'royal'].
+    """
+    text = unicodedata.normalize('NFKD', strip_tags(text))
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return [t[:100] for t in TOKEN_RE.findall(text.lower())]
+
+
+class TokensBackend(object):
+    """
+    Stores each SearchDocument's words as SearchTokens. Works with any
+    database.
+
+    Every word in a query must match, the last one as a prefix. Results are
+    ranked by the total weight of the matching words.
+    """
+    name = 'tokens'
+
+    def index(self, using, rows):
+        "rows -- A list of (SearchDocument pk, title, body) tuples."
+        tokens = []
+        for document_id, title, body in rows:
+            weights = Counter()
+            for token in tokenize(title):
+                weights[token] += TITLE_WEIGHT
+            for token in tokenize(body):
+                weights[token] += 1
+
+            tokens.extend(
+                SearchToken(document_id=document_id, token=t, weight=w)
+                for t, w in weights.items())
+
+        SearchToken.objects.using(using).bulk_create(tokens,
+                                                     batch_size=BATCH_SIZE)
+
+    def unindex(self, using, document_ids):
+        SearchToken.objects.using(using) \
+                            .filter(document_id__in=document_ids).delete()
+
+    def clear(self, using):
+        SearchToken.objects.using(using).all().delete()
+
+    def _matches(self, using, tokens, model_label=None):
+        "A values QuerySet of the matching documents, best first."
+        conditions = [Q(token=t) for t in tokens[:-1]]
+        conditions.append(Q(token__startswith=tokens[-1]))
+
+        # Count the matches for each word, so we can require them all:
+        annotations = {
+            'match_{}'.format(i): count_if(c) for i, c in enumerate(conditions)
+        }
+
+        qs = SearchToken.objects.using(using)
+        if model_label is not None:
+            qs = qs.filter(document__model_label=model_label)
+
+        return qs.filter(reduce(or_, conditions)) \
+                    .values('document_id', 'document__model_label',
+                            'document__object_id') \
+                    .annotate(score=Sum('weight'), **annotations) \
+                    .filter(**{'{}__gt'.format(a): 0 for a in annotations}) \
+                    .order_by('-score', 'document_id')
+
+    def count(self, using, tokens):
+        return self._matches(using, tokens).count()
+
+    def rows(self, using, tokens, offset, limit, model_label=None):
+        """
+        A list of (model_label, object_id, score) tuples, best first.
+        model_label -- If supplied, only documents for this model are found.
+        """
+        matches = self._matches(using, tokens, model_label)
+        return [
+            (r['document__model_label'], r['document__object_id'], r['score'])
+            for r in matches[offset:offset + limit]
+        ]
+
+
+class FTS5Backend(object):
+    """
+    Stores each SearchDocument's text in SQLite's FTS5 full-text search
+    table, with the document's pk as its rowid.
+
+    Every word in a query must match, the last one as a prefix. Results are
+    ranked by bm25(), with titles counting more than other text.
+    """
+    name = 'fts5'
+
+    def _execute(self, using, sql, params=(), many=False):
+        table = connections[using].ops.quote_name(FTS_TABLE)
+        with connections[using].cursor() as cursor:
+            if many:
+                cursor.executemany(sql.format(table=table), params)
+            else:
+                cursor.execute(sql.format(table=table), params)
+                return cursor.fetchall()
+
+    def index(self, using, rows):
+        "rows -- A list of (SearchDocument pk, title, body) tuples."
+        self._execute(using,
+            'INSERT INTO {table} (rowid, title, body) VALUES (%s, %s, %s)',
+            [(pk, strip_tags(title), strip_tags(body))
+                                                for pk, title, body in rows],
+            many=True)
+
+    def unindex(self, using, document_ids):
+        document_ids = list(document_ids)
+        if document_ids:
+            self._execute(using,
+                'DELETE FROM {table} WHERE rowid IN (%s)' % ', '.join(
+                                                    ['%s'] * len(document_ids)),
+                document_ids)
+
+    def clear(self, using):
+        self._execute(using, 'DELETE FROM {table}')
+
+    def _match_expression(self, tokens):
+        # Our tokens only contain word characters, so are safe to quote:
+        words = ['"{}"'.format(t) for t in tokens]
+        words[-1] += '*'
+        return ' '.join(words)
+
+    def count(self, using, tokens):
+        return self._execute(using,
+                        'SELECT COUNT(*) FROM {table} WHERE {table} MATCH %s',
+                        [self._match_expression(tokens)])[0][0]
+
+    def rows(self, using, tokens, offset, limit, model_label=None):
+        """
+        A list of (model_label, object_id, score) tuples, best first.
+        model_label -- If supplied, only documents for this model are found.
+        """
+        document_table = connections[using].ops.quote_name(
+                                                SearchDocument._meta.db_table)
+        where = '{table} MATCH %s'
+        params = [TITLE_WEIGHT, self._match_expression(tokens)]
+        if model_label is not None:
+            where += ' AND d.model_label = %s'
+            params.append(model_label)
+
+        # bm25() scores are negative, lower being better:
+        return [
+            (label, object_id, -score)
+            for label, object_id, score in self._execute(using,
+                'SELECT d.model_label, d.object_id, '
+                '       bm25({table}, %s, 1.0) AS score '
+                'FROM {table} '
+                'INNER JOIN ' + document_table + ' d ON d.id = {table}.rowid '
+                'WHERE ' + where + ' '
+                'ORDER BY score, d.id LIMIT %s OFFSET %s',
+                params + [limit, offset])
+        ]
+
+
+BACKENDS = {
+    FTS5Backend.name: FTS5Backend,
+    TokensBackend.name: TokensBackend,
+}
+
+
+def _get_using(using):
+    return using or router.db_for_write(SearchDocument)
+
+
+def has_fts_table(using=None):
+    "Does the database have the FTS5 search table?"
+    connection = connections[_get_using(using)]
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        return FTS_TABLE in connection.introspection.table_names(cursor)
+
+
+def get_backend(using=None):
+    """
+    Returns the search backend set by the SPECTATOR_SEARCH_BACKEND setting.
+    If that's 'auto', uses FTS5 if the database has the table for it.
+    """
+    name = app_settings.SEARCH_BACKEND
+    if name == 'auto':
+        name = 'fts5' if has_fts_table(using) else 'tokens'
+    return BACKENDS[name]()
+
+
+def _get_text(obj, field_names):
+    return ' '.join(str(getattr(obj, name) or '') for name in field_names)
+
+
+def index_object(obj, using=None):
+    "Adds `obj` to the search index, replacing any existing entry."
+    using = _get_using(using)
+    title_fields, body_fields = get_searchable_models()[type(obj)]
+    backend = get_backend(using)
+
+    with transaction.atomic(using=using):
+        document, created = SearchDocument.objects.using(using).get_or_create(
+                        model_label=obj._meta.label_lower, object_id=obj.pk)
+        if not created:
+            backend.unindex(using, [document.pk])
+
+        backend.index(using, [(document.pk, _get_text(obj, title_fields),
+                                            _get_text(obj, body_fields))])
+
+
+def unindex_object(model, pk, using=None):
+    "Removes the object of `model` with `pk` from the search index."
+    using = _get_using(using)
+    documents = SearchDocument.objects.using(using).filter(
+                            model_label=model._meta.label_lower, object_id=pk)
+
+    with transaction.atomic(using=using):
+        get_backend(using).unindex(using,
+                                   documents.values_list('pk', flat=True))
+        documents.delete()
+
+
+def index_is_built(using=None):
+    """
+    Has the index been built? Until it has, searches find nothing and saved
+    objects aren't added to it.
+    """
+    return SearchDocument.objects.using(_get_using(using)).exists()
+
+
+def rebuild_index(using=None):
+    """
+    Empties the search index and adds every searchable object to it.
+    Returns the number of objects indexed.
+    """
+    using = _get_using(using)
+    indexed = 0
+
+    with transaction.atomic(using=using):
+        get_backend(using).clear(using)
+        SearchDocument.objects.using(using).all().delete()
+        SearchDocument.objects.using(using).create(model_label=BUILT_LABEL,
+                                                   object_id=0)
+
+        for model in get_searchable_models():
+            indexed += index_objects(model._default_manager.all(), using)
+
+    return indexed
+
+
+def index_objects(queryset, using=None):
+    """
+    Adds all the objects in `queryset`, which mustn't already be in the
+    index, in batches. e.g. after they've been created with bulk_create().
+    Returns the number of objects indexed.
+    """
+    using = _get_using(using)
+    backend = get_backend(using)
+    model = queryset.model
+    label = model._meta.label_lower
+    title_fields, body_fields = get_searchable_models()[model]
+    num_title_fields = len(title_fields)
+
+    values = queryset.using(using) \
+                .order_by('pk') \
+                .values_list('pk', *(title_fields + body_fields))
+    indexed = 0
+
+    with transaction.atomic(using=using):
+        batch = []
+        for row in values.iterator():
+            batch.append(row)
+            if len(batch) == BATCH_SIZE:
+                _index_batch(using, backend, label, batch, num_title_fields)
+                indexed += len(batch)
+                batch = []
+        if batch:
+            _index_batch(using, backend, label, batch, num_title_fields)
+            indexed += len(batch)
+
+    return indexed
+
+
+def _index_batch(using, backend, label, rows, num_title_fields):
+    """
+    Index a batch of objects of one model.
+    rows -- A list of (pk, title field values..., body field values...).
+    """
+    documents = SearchDocument.objects.using(using)
+    documents.bulk_create([
+        SearchDocument(model_label=label, object_id=row[0]) for row in rows
+    ])
+
+    # Some databases don't give bulk-created objects pks, so fetch them:
+    document_ids = dict(documents.filter(
+                                    model_label=label,
+                                    object_id__in=[row[0] for row in rows])
+                                .values_list('object_id', 'pk'))
+
+    def join(values):
+        return ' '.join(str(v or '') for v in values)
+
+    backend.index(using, [
+        (document_ids[row[0]],
+         join(row[1:num_title_fields + 1]),
+         join(row[num_title_fields + 1:]))
+        for row in rows
+    ])
+
+
+class SearchResults(object):
+    """
+    The results of a search, ranked best first.
+
+    Can be counted, sliced and iterated over like a QuerySet, so can be used
+    with a Paginator. Each slice makes one query to the search index, and one
+    per model to fetch the objects. Each object has these extra attributes:
+
+        search_score -- Higher is better.
+        search_kind -- e.g. 'venue' or 'publication series'.
+    """
+
+    def __init__(self, query, using=None):
+        self.query = query
+        self.tokens = tokenize(query)
+        self.using = _get_using(using)
+        self.backend = get_backend(self.using)
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            if self.tokens:
+                self._count = self.backend.count(self.using, self.tokens)
+            else:
+                self._count = 0
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        return iter(self[:self.count()])
+
+    def __getitem__(self, k):
+        if not isinstance(k, slice):
+            try:
+                return self[k:k + 1][0]
+            except IndexError:
+                raise IndexError('SearchResults index out of range')
+
+        if k.step is not None or (k.start or 0) < 0 or \
+                                    (k.stop is not None and k.stop < 0):
+            raise ValueError('SearchResults only support positive slices.')
+
+        offset = k.start or 0
+        stop = self.count() if k.stop is None else k.stop
+
+        if not self.tokens or stop <= offset:
+            return []
+
+        rows = self.backend.rows(self.using, self.tokens, offset,
+                                                                stop - offset)
+        return self._get_objects(rows)
+
+    def _get_objects(self, rows):
+        "Fetch the objects for (model_label, object_id, score) rows."
+        ids_by_label = {}
+        for label, object_id, score in rows:
+            ids_by_label.setdefault(label, []).append(object_id)
+
+        objects = {}
+        for label, ids in ids_by_label.items():
+            model = apps.get_model(label)
+            for pk, obj in model._default_manager.using(self.using) \
+                                                    .in_bulk(ids).items():
+                obj.search_kind = model._meta.verbose_name
+                objects[(label, pk)] = obj
+
+        results = []
+        for label, object_id, score in rows:
+            obj = objects.get((label, object_id))
+            # It might have been deleted without being removed from the index.
+            if obj is not None:
+                obj.search_score = score
+                results.append(obj)
+
+        return results
+
+
+def search(query, using=None):
+    """
+    Returns a SearchResults of the objects matching `query`, a string of
+    words.
+
+    The index is built after migrating, or by the
+    spectator_rebuild_search_index command, never during a search, which
+    finds nothing until it's built. After that it's kept up to date by
+    signals when searchable objects are saved or deleted.
+    """
+    return SearchResults(query, using=using)
+
+
+# Signal handlers.
+# These are connected to models in SpectatorCoreAppConfig.ready().
+
+def search_post_migrate(sender, using=None, **kwargs):
+    """
+    Build the index, if it's enabled and hasn't been built yet, so that it
+    exists before anything's searched for.
+    """
+    if not app_settings.SEARCH_INDEX or \
+                not router.allow_migrate_model(using, SearchDocument):
+        return
+
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        tables = connection.introspection.table_names(cursor)
+    # e.g. after migrating spectator_core backwards:
+    if SearchDocument._meta.db_table in tables and not index_is_built(using):
+        rebuild_index(using)
+
+
+def search_post_save(sender, instance, raw=False, using=None, **kwargs):
+    """
+    Update the object's entry in the index, if the index has been built. If
+    not, it will be when it's built.
+    """
+    if app_settings.SEARCH_INDEX and not raw and index_is_built(using):
+        index_object(instance, using=using)
+
+
+def search_post_delete(sender, instance, using=None, **kwargs):
+    if app_settings.SEARCH_INDEX:
+        unindex_object(sender, instance.pk, using=using)
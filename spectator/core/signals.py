@@ -0,0 +1,145 @@
+from django.apps import apps
+from django.db.models.signals import (
+    post_delete, post_migrate, post_save, pre_save
+)
+
+from .apps import spectator_apps
+from .cache import bump_generation, generations_enabled
+from . import leaderboards
+from . import search
+from .counts import (
+    kind_counts_post_delete, kind_counts_post_save, kind_counts_pre_save
+)
+from .models import (
+    AnnualCount, Creator, KindCount, LeaderboardEntry, SearchDocument,
+    SearchToken
+)
+
+
+def connect_kind_counts(model):
+    """
+    Keep the KindCount table up to date for `model`, if the
+    SPECTATOR_KIND_COUNTS_TABLE setting is True.
+    """
+    uid = 'spectator.kind_counts.{}'.format(model._meta.label_lower)
+
+    pre_save.connect(kind_counts_pre_save, sender=model,
+                                                dispatch_uid=uid + '.pre_save')
+    post_save.connect(kind_counts_post_save, sender=model,
+                                                dispatch_uid=uid + '.post_save')
+    post_delete.connect(kind_counts_post_delete, sender=model,
+                                                dispatch_uid=uid + '.post_delete')
+
+
+def connect_leaderboards(sender, pre_save_handler=None, save_handler=None,
+                                                        delete_handler=None):
+    """
+    Keep the LeaderboardEntry table up to date when `sender` objects change,
+    if the SPECTATOR_LEADERBOARD_TABLES setting is True.
+    """
+    uid = 'spectator.leaderboards.{}'.format(sender._meta.label_lower)
+
+    if pre_save_handler:
+        pre_save.connect(pre_save_handler, sender=sender,
+                                                dispatch_uid=uid + '.pre_save')
+    if save_handler:
+        post_save.connect(save_handler, sender=sender,
+                                                dispatch_uid=uid + '.post_save')
+    if delete_handler:
+        post_delete.connect(delete_handler, sender=sender,
+                                                dispatch_uid=uid + '.post_delete')
+
+
+def connect_annual_counts(counter, related_model=None):
+    """
+    Keep the AnnualCount table up to date for `counter`, an
+    AnnualKindCounter, if the SPECTATOR_ANNUAL_COUNTS_TABLE setting is True.
+
+    related_model -- The model holding the kind, if it's not counter.model.
+    """
+    model = counter.model
+    uid = 'spectator.annual_counts.{}'.format(model._meta.label_lower)
+
+    pre_save.connect(counter.pre_save, sender=model,
+                                                dispatch_uid=uid + '.pre_save')
+    post_save.connect(counter.post_save, sender=model,
+                                                dispatch_uid=uid + '.post_save')
+    post_delete.connect(counter.post_delete, sender=model,
+                                                dispatch_uid=uid + '.post_delete')
+
+    if related_model is not None:
+        uid += '.' + related_model._meta.label_lower
+        pre_save.connect(counter.related_pre_save, sender=related_model,
+                                                dispatch_uid=uid + '.pre_save')
+        post_save.connect(counter.related_post_save, sender=related_model,
+                                                dispatch_uid=uid + '.post_save')
+
+
+for searchable_model in search.get_searchable_models():
+    # Keep the search index up to date.
+    uid = 'spectator.search.{}'.format(searchable_model._meta.label_lower)
+    post_save.connect(search.search_post_save, sender=searchable_model,
+                                            dispatch_uid=uid + '.post_save')
+    post_delete.connect(search.search_post_delete, sender=searchable_model,
+                                            dispatch_uid=uid + '.post_delete')
+
+# Build the search index, if it's enabled, after migrating:
+post_migrate.connect(search.search_post_migrate,
+                     sender=apps.get_app_config('spectator_core'),
+                     dispatch_uid='spectator.search.post_migrate')
+
+
+connect_kind_counts(Creator)
+
+if spectator_apps.is_enabled('events'):
+    from spectator.events.models import Event, EventRole, Work, WorkRole
+    from spectator.events.utils import annual_event_counter
+    connect_kind_counts(Event)
+    connect_annual_counts(annual_event_counter)
+
+    for role_model in (EventRole, WorkRole):
+        connect_leaderboards(role_model,
+                             pre_save_handler=leaderboards.role_pre_save,
+                             save_handler=leaderboards.role_changed,
+                             delete_handler=leaderboards.role_changed)
+    connect_leaderboards(Event, save_handler=leaderboards.event_changed)
+    connect_leaderboards(Work, save_handler=leaderboards.work_changed)
+
+if spectator_apps.is_enabled('reading'):
+    from spectator.reading.models import Publication, PublicationRole, Reading
+    from spectator.reading.utils import annual_reading_counter
+    connect_kind_counts(Publication)
+    connect_annual_counts(annual_reading_counter, related_model=Publication)
+
+    connect_leaderboards(PublicationRole,
+                         pre_save_handler=leaderboards.role_pre_save,
+                         save_handler=leaderboards.role_changed,
+                         delete_handler=leaderboards.role_changed)
+    connect_leaderboards(Reading,
+                         pre_save_handler=leaderboards.reading_pre_save,
+                         save_handler=leaderboards.reading_changed,
+                         delete_handler=leaderboards.reading_changed)
+
+
+def model_changed(sender, **kwargs):
+    """
+    When any Spectator object is saved or deleted, make anything cached
+    using its model's generation out of date. See spectator.core.cache.
+    """
+    if generations_enabled():
+        bump_generation(sender, using=kwargs['using'])
+
+
+for app_config in apps.get_app_configs():
+    if app_config.name.startswith('spectator.'):
+        for model in app_config.get_models():
+            if model in (AnnualCount, KindCount, LeaderboardEntry,
+                         SearchDocument, SearchToken):
+                # These are only derived from other models' data. And having
+                # no signals means they can be deleted without fetching.
+                continue
+            uid = 'spectator.generation.{}'.format(model._meta.label_lower)
+            post_save.connect(model_changed, sender=model,
+                                            dispatch_uid=uid + '.post_save')
+            post_delete.connect(model_changed, sender=model,
+                                            dispatch_uid=uid + '.post_delete')
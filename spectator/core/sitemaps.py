@@ -1,15 +1,137 @@
+import pickle
+import zlib
+
 from django.contrib.sitemaps import Sitemap
+from django.core.paginator import Paginator
+from django.db.models import Count, Max
+from django.urls import reverse
 
+from .apps import spectator_apps
+from .cache import get_cache
 from .models import Creator
 
 
-class CreatorSitemap(Sitemap):
+class SectionedSitemap(Sitemap):
+    """
+    A Sitemap for models with lots of objects.
+
+    The objects are split into sections (the sitemap's pages) of `limit`
+    consecutive pks, so that each object always stays in the same section.
+    With Django's sitemap `index` view each section gets its own URL,
+    e.g. '/sitemap-events.xml?p=2'.
+
+    Only the fields in `fields` are fetched, with .values().iterator(),
+    rather than whole objects. Child classes should set `fields` and
+    implement `get_queryset()` and `location(item)`, where `item` is a dict
+    of those fields.
+
+    Each section's URLs are cached, and only regenerated when the number of
+    objects in it, or the latest `time_modified`, changes.
+    """
+    fields = ('slug', 'time_modified')
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def items(self):
+        return self.get_queryset().order_by('pk').values('pk', *self.fields)
+
+    def lastmod(self, item):
+        return item['time_modified']
+
+    @property
+    def paginator(self):
+        # Only used for its number of pages, one per section:
+        max_pk = self.get_queryset().aggregate(max_pk=Max('pk'))['max_pk']
+        return Paginator(range(max_pk or 0), self.limit)
+
+    def _urls(self, page, protocol, domain):
+        # Raises EmptyPage or PageNotAnInteger for invalid pages:
+        page = self.paginator.validate_number(page)
+
+        items = self.items().filter(pk__gt=(page - 1) * self.limit,
+                                    pk__lte=page * self.limit)
+
+        stamp = items.aggregate(count=Count('pk'),
+                                modified=Max('time_modified'))
+
+        if stamp['modified'] is not None:
+            self.latest_lastmod = stamp['modified']
+
+        key = 'spectator:sitemap:{}.{}:{}:{}:{}:{}:{}'.format(
+                    type(self).__module__, type(self).__name__, page,
+                    protocol, domain, stamp['count'],
+                    stamp['modified'].timestamp() if stamp['modified'] else 0)
+
+        cache = get_cache()
+        rows = cache.get(key)
+
+        if rows is None:
+            rows = [
+                ('{}://{}{}'.format(protocol, domain, self.location(item)),
+                 self.lastmod(item))
+                for item in items.iterator()
+            ]
+            # Compressed, because tens of thousands of URLs can be too big
+            # for some caches:
+            cache.set(key, zlib.compress(pickle.dumps(rows)), None)
+        else:
+            rows = pickle.loads(zlib.decompress(rows))
+
+        priority = '' if self.priority is None else str(self.priority)
+
+        return [
+            {'item': None, 'location': location, 'lastmod': lastmod,
+             'changefreq': self.changefreq, 'priority': priority}
+            for location, lastmod in rows
+        ]
+
+
+class CreatorSitemap(SectionedSitemap):
     changefreq = 'yearly'
     priority = 0.5
 
-    def items(self):
+    def get_queryset(self):
         return Creator.objects.all()
 
-    def lastmod(self, obj):
-        return obj.time_modified
+    def location(self, item):
+        return reverse('spectator:creators:creator_detail',
+                       kwargs={'slug': item['slug']})
+
+
+def get_sitemaps():
+    """
+    Returns a dict of all the Spectator sitemaps for the enabled apps, to
+    use with Django's sitemap views, e.g. in a project's urls.py:
+
+        from django.contrib.sitemaps import views as sitemaps_views
+        from spectator.core.sitemaps import get_sitemaps
+
+        sitemaps = get_sitemaps()
+
+        urlpatterns = [
+            url(r'^sitemap\\.xml$', sitemaps_views.index,
+                {'sitemaps': sitemaps,
+                 'sitemap_url_name': 'sitemaps'}),
+            url(r'^sitemap-(?P<section>.+)\\.xml$', sitemaps_views.sitemap,
+                {'sitemaps': sitemaps}, name='sitemaps'),
+        ]
+    """
+    sitemaps = {'creators': CreatorSitemap}
+
+    if spectator_apps.is_enabled('events'):
+        from spectator.events.sitemaps import (
+            EventSitemap, VenueSitemap, WorkSitemap
+        )
+        sitemaps['events'] = EventSitemap
+        sitemaps['venues'] = VenueSitemap
+        sitemaps['works'] = WorkSitemap
+
+    if spectator_apps.is_enabled('reading'):
+        from spectator.reading.sitemaps import (
+            PublicationSeriesSitemap, PublicationSitemap
+        )
+        sitemaps['publications'] = PublicationSitemap
+        sitemaps['publicationseries'] = PublicationSeriesSitemap
 
+    return sitemaps
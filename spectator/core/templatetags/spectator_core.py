@@ -6,8 +6,9 @@ from django.urls import reverse
 from django.utils.html import format_html
 
 from ..apps import spectator_apps
+from ..cache import cache_card
 from ..models import Creator
-from ..utils import chartify
+from ..utils import chartify_queryset
 
 if spectator_apps.is_enabled('events'):
     from spectator.events.models import Venue
@@ -111,7 +112,7 @@ def current_url_name(context):
 
 
 @register.simple_tag(takes_context=True)
-def query_string(context, key, value):
+def query_string(context, key, value, remove=None):
     """
     For adding/replacing a key=value pair to the GET string for a URL.
 
@@ -121,6 +122,10 @@ def query_string(context, key, value):
     And, if we're viewing ?p=3&order=uploaded and we do the same thing, we get
     the same result (ie, the existing "order=uploaded" is replaced).
 
+    Optionally, another key can be removed. eg, if we're viewing
+    ?cursor=abc&order=taken and we do {% query_string 'p' 3 remove='cursor' %}
+    then this returns "order=taken&p=3"
+
     Expects the request object in context to do the above; otherwise it will
     just return a query string with the supplied key=value pair.
     """
@@ -129,6 +134,8 @@ def query_string(context, key, value):
         args = request.GET.copy()
     except KeyError:
         args = QueryDict('').copy()
+    if remove is not None:
+        args.pop(remove, None)
     args[key] = value
     return args.urlencode()
 
@@ -145,6 +152,9 @@ def most_read_creators(num=10):
     return Creator.objects.by_readings()[:num]
 
 
+@cache_card(register, 'spectator_core.Creator',
+            'spectator_reading.PublicationRole', 'spectator_reading.Reading',
+            'spectator_core.LeaderboardEntry')
 @register.inclusion_tag('spectator_core/includes/card_chart.html')
 def most_read_creators_card(num=10):
     """
@@ -156,9 +166,8 @@ def most_read_creators_card(num=10):
     """
     if spectator_apps.is_enabled('reading'):
 
-        object_list = most_read_creators(num=num)
-
-        object_list = chartify(object_list, 'num_readings', cutoff=1)
+        object_list = chartify_queryset(Creator.objects.by_readings(),
+                                        'num_readings', num=num, cutoff=1)
 
         return {
             'card_title': 'Most read authors',
@@ -175,6 +184,7 @@ def most_visited_venues(num=10):
     return Venue.objects.by_visits()[:num]
 
 
+@cache_card(register, 'spectator_events.Venue', 'spectator_events.Event')
 @register.inclusion_tag('spectator_core/includes/card_chart.html')
 def most_visited_venues_card(num=10):
     """
@@ -185,9 +195,8 @@ def most_visited_venues_card(num=10):
     """
     if spectator_apps.is_enabled('events'):
 
-        object_list = most_visited_venues(num=num)
-
-        object_list = chartify(object_list, 'num_visits', cutoff=1)
+        object_list = chartify_queryset(Venue.objects.by_visits(),
+                                        'num_visits', num=num, cutoff=1)
 
         return {
             'card_title': 'Most visited venues',
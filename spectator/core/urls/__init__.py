@@ -13,6 +13,8 @@ urlpatterns = [
     url(r'^', include('spectator.core.urls.core')),
 
     url(r'^creators/', include('spectator.core.urls.creators')),
+
+    url(r'^api/', include('spectator.core.urls.api')),
 ]
 
 if spectator_apps.is_enabled('events'):
@@ -0,0 +1,90 @@
+from django.conf.urls import url
+
+from .. import api
+from ..apps import spectator_apps
+
+
+# The read-only JSON API. See spectator.core.api.
+# This should be under the namespace 'spectator:api'.
+
+app_name = 'api'
+
+urlpatterns = [
+    url(
+        regex=r"^creators/$",
+        view=api.CreatorListAPIView.as_view(),
+        name='creator_list'
+    ),
+    url(
+        regex=r"^creators/(?P<slug>[\w-]+)/$",
+        view=api.CreatorDetailAPIView.as_view(),
+        name='creator_detail'
+    ),
+]
+
+if spectator_apps.is_enabled('events'):
+    from spectator.events import api as events_api
+
+    urlpatterns += [
+        url(
+            regex=r"^events/$",
+            view=events_api.EventListAPIView.as_view(),
+            name='event_list'
+        ),
+        url(
+            regex=r"^events/(?P<slug>[\w-]+)/$",
+            view=events_api.EventDetailAPIView.as_view(),
+            name='event_detail'
+        ),
+        url(
+            regex=r"^works/$",
+            view=events_api.WorkListAPIView.as_view(),
+            name='work_list'
+        ),
+        url(
+            regex=r"^works/(?P<slug>[\w-]+)/$",
+            view=events_api.WorkDetailAPIView.as_view(),
+            name='work_detail'
+        ),
+        url(
+            regex=r"^venues/$",
+            view=events_api.VenueListAPIView.as_view(),
+            name='venue_list'
+        ),
+        url(
+            regex=r"^venues/map/(?P<zoom>\d+)/(?P<x>\d+)/(?P<y>\d+)/$",
+            view=events_api.VenueMapTileAPIView.as_view(),
+            name='venue_map_tile'
+        ),
+        url(
+            regex=r"^venues/(?P<slug>[\w-]+)/$",
+            view=events_api.VenueDetailAPIView.as_view(),
+            name='venue_detail'
+        ),
+    ]
+
+if spectator_apps.is_enabled('reading'):
+    from spectator.reading import api as reading_api
+
+    urlpatterns += [
+        url(
+            regex=r"^publications/$",
+            view=reading_api.PublicationListAPIView.as_view(),
+            name='publication_list'
+        ),
+        url(
+            regex=r"^publications/(?P<slug>[\w-]+)/$",
+            view=reading_api.PublicationDetailAPIView.as_view(),
+            name='publication_detail'
+        ),
+        url(
+            regex=r"^readings/$",
+            view=reading_api.ReadingListAPIView.as_view(),
+            name='reading_list'
+        ),
+        url(
+            regex=r"^readings/(?P<pk>\d+)/$",
+            view=reading_api.ReadingDetailAPIView.as_view(),
+            name='reading_detail'
+        ),
+    ]
@@ -3,7 +3,7 @@ from django.conf.urls import url
 from .. import views
 
 
-# Only the home page.
+# The home page and search.
 # This should be under the namespace 'spectator:core'.
 
 app_name='core'
@@ -14,4 +14,14 @@ urlpatterns = [
         view=views.HomeView.as_view(),
         name='home'
     ),
+    url(
+        regex=r"^search/$",
+        view=views.SearchView.as_view(),
+        name='search'
+    ),
+    url(
+        regex=r"^search/json/$",
+        view=views.SearchJSONView.as_view(),
+        name='search_json'
+    ),
 ]
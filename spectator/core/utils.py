@@ -1,6 +1,21 @@
+from functools import lru_cache
+
+from django.db import connections
+from django.db.models import F
 from django.utils.html import strip_tags
 from django.utils.text import Truncator
 
+from hashids import Hashids
+
+from . import app_settings
+
+try:
+    from django.db.models import Window
+    from django.db.models.functions import Rank
+except ImportError:
+    # Django < 2.0
+    Window = None
+
 
 def truncate_string(text, strip_html=True, chars=255, truncate='…', at_word_boundary=False):
     """Truncate a string to a certain length, removing line breaks and mutliple
@@ -69,3 +84,100 @@ def chartify(qs, score_field, cutoff=0, ensure_chartiness=True):
             chart = []
 
     return chart
+
+
+def supports_window_functions(using):
+    "Can the database with alias `using` do RANK() OVER (...)?"
+    if Window is None:
+        return False
+
+    connection = connections[using]
+
+    if connection.features.supports_over_clause:
+        return True
+    elif connection.vendor == 'sqlite':
+        # Django < 2.2 doesn't know that SQLite 3.25+ can.
+        import sqlite3
+        return sqlite3.sqlite_version_info >= (3, 25, 0)
+    else:
+        return False
+
+
+def chartify_queryset(qs, score_field, num=None, cutoff=0,
+                                                    ensure_chartiness=True):
+    """
+    Does the same as chartify() but, if the database supports window
+    functions, calculates each object's `chart_position` with RANK() in SQL,
+    and removes objects at or below the `cutoff` in SQL. So only the objects
+    in the chart are fetched.
+
+    If the database doesn't support window functions, it fetches the first
+    `num` objects and uses chartify().
+
+    Returns a list of the objects.
+
+    Keyword arguments:
+    qs -- The QuerySet, ordered by `score_field`, descending. Not sliced.
+    score_field -- The name of the numeric field or annotation that each
+                   object has, that will be used to compare their positions.
+    num -- The maximum number of objects to return, or None for all of them.
+    cutoff -- As for chartify().
+    ensure_chartiness -- As for chartify().
+    """
+    if not supports_window_functions(qs.db):
+        if num is not None:
+            qs = qs[:num]
+        return chartify(qs, score_field, cutoff=cutoff,
+                                        ensure_chartiness=ensure_chartiness)
+
+    if cutoff is not None:
+        qs = qs.filter(**{'{}__gt'.format(score_field): cutoff})
+
+    qs = qs.annotate(chart_position=Window(
+                            expression=Rank(),
+                            order_by=F(score_field).desc()))
+
+    if num is not None:
+        qs = qs[:num]
+
+    chart = list(qs)
+
+    if ensure_chartiness and len(chart) > 0:
+        if getattr(chart[0], score_field) == getattr(chart[-1], score_field):
+            chart = []
+
+    return chart
+
+
+@lru_cache(maxsize=None)
+def _get_hashids(alphabet, salt):
+    "So that we only create one Hashids object per alphabet and salt."
+    return Hashids(alphabet=alphabet, salt=salt, min_length=5)
+
+
+def get_hashids():
+    """
+    Returns a Hashids object for encoding/decoding slugs, using the current
+    SLUG_ALPHABET and SLUG_SALT settings.
+    """
+    return _get_hashids(app_settings.SLUG_ALPHABET, app_settings.SLUG_SALT)
+
+
+def generate_slug(value):
+    """
+    Generates a slug using a Hashid of `value`, e.g. an object's pk.
+    """
+    return get_hashids().encode(value)
+
+
+def decode_slug(slug):
+    """
+    The reverse of generate_slug(). Returns the value (e.g. pk) that `slug`
+    was generated from, or None if it's not a valid slug.
+    """
+    values = get_hashids().decode(slug)
+
+    if len(values) == 1:
+        return values[0]
+    else:
+        return None
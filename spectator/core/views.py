@@ -1,18 +1,175 @@
+import hashlib
+import json
+
+from django.apps import apps
 from django.core.paginator import InvalidPage
-from django.http import Http404
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max, Prefetch
+from django.http import Http404, JsonResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
 from django.utils.translation import ugettext as _
 from django.views.generic import DetailView, ListView, YearArchiveView,\
         TemplateView
 
+from . import app_settings
 from .apps import spectator_apps
+from .cache import get_cached_count
+from .counts import get_kind_counts
 from .models import Creator
-from .paginator import DiggPaginator
+from .paginator import (
+    CachedCountDiggPaginator, DiggPaginator, KeysetPaginator
+)
+from .search import search
+from .utils import decode_slug
 
 if spectator_apps.is_enabled('events'):
-    from spectator.events.models import Event
+    from spectator.events.models import Event, Venue, Work, WorkRole
 
 if spectator_apps.is_enabled('reading'):
-    from spectator.reading.models import Publication
+    from spectator.reading.models import Publication, PublicationRole
+
+
+class DecodeSlugMixin(object):
+    """
+    For use with views that use SingleObjectMixin to get an object, of a
+    model using SluggedModelMixin, by its slug.
+
+    Rather than looking the object up by its `slug` field, the slug is
+    decoded to get the object's pk, which is used to fetch it. The object's
+    slug must match the one in the URL.
+
+    If the slug can't be decoded, or the object's slug doesn't match (e.g.
+    because it was created with a different SLUG_SALT), we fall back to
+    looking it up by its `slug` field as normal.
+    """
+
+    def get_object(self, queryset=None):
+        if queryset is None:
+            queryset = self.get_queryset()
+
+        slug = self.kwargs.get(self.slug_url_kwarg)
+
+        if slug is not None:
+            pk = decode_slug(slug)
+            if pk is not None:
+                try:
+                    obj = queryset.get(pk=pk)
+                except queryset.model.DoesNotExist:
+                    pass
+                else:
+                    if obj.slug == slug:
+                        return obj
+
+        return super().get_object(queryset=queryset)
+
+
+class ConditionalGetMixin(object):
+    """
+    If the SPECTATOR_CONDITIONAL_GET setting is True, adds an ETag header to
+    responses, and answers requests whose If-None-Match header matches it
+    with a 304 Not Modified response, before anything else is fetched or
+    rendered.
+
+    The ETag is made from the number of objects, and the latest
+    `time_modified`, in each QuerySet returned by get_validator_querysets(),
+    and of every object of each of `card_models`, plus the `time_modified`
+    of the object returned by get_validator_object(), if any. Override
+    those to include everything the page displays.
+
+    There's no Last-Modified header, because the latest `time_modified`
+    doesn't change when an object is deleted.
+
+    Pages for logged-in users have different ETags, because they can
+    include things like links to the admin.
+    """
+
+    # Models whose objects can be shown in the page's sidebar cards, like
+    # 'spectator_events.Event', as for cache_card(). Cards can show any of
+    # their objects, so all of them are included in the ETag:
+    card_models = ()
+
+    def get(self, request, *args, **kwargs):
+        if not app_settings.CONDITIONAL_GET:
+            return super().get(request, *args, **kwargs)
+
+        etag = self.get_etag()
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+
+        if not response.has_header('ETag'):
+            response['ETag'] = etag
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+    def get_validator_object(self):
+        "The main object displayed on the page, if any."
+        return None
+
+    def get_validator_querysets(self):
+        "A list of QuerySets of the other objects displayed on the page."
+        return [self.model._default_manager.all()]
+
+    def get_card_querysets(self, querysets):
+        """
+        A list of QuerySets of all the objects of each of `card_models`,
+        except those whose objects are all in `querysets` already.
+        """
+        included = {qs.model for qs in querysets if not qs.query.where}
+        card_models = [apps.get_model(label) for label in self.card_models]
+        return [model._default_manager.all() for model in card_models
+                if model not in included]
+
+    def get_etag(self):
+        "Returns the ETag for the page."
+        stamps = []
+
+        obj = self.get_validator_object()
+        if obj is not None:
+            stamps.append((obj._meta.label_lower, obj.pk, obj.time_modified))
+
+        querysets = list(self.get_validator_querysets())
+        querysets += self.get_card_querysets(querysets)
+
+        for qs in querysets:
+            aggregates = {'count': Count('pk')}
+            # e.g. WorkSelections don't have one:
+            if any(f.name == 'time_modified' for f in qs.model._meta.fields):
+                aggregates['modified'] = Max('time_modified')
+            row = qs.order_by().aggregate(**aggregates)
+            stamps.append((qs.model._meta.label_lower, row['count'],
+                           row.get('modified')))
+
+        user = getattr(self.request, 'user', None)
+        user_id = user.pk if user is not None and user.is_authenticated \
+                                                                    else None
+
+        key = json.dumps([user_id, self.request.path, stamps],
+                         cls=DjangoJSONEncoder)
+        return quote_etag(hashlib.sha1(key.encode()).hexdigest())
+
+
+class ConditionalDetailMixin(ConditionalGetMixin):
+    """
+    A ConditionalGetMixin for views with a single object. The object is
+    only fetched once, however many times get_object() is called.
+
+    get_validator_querysets() should return QuerySets of the object's
+    related objects, like its roles, that are displayed.
+    """
+
+    def get_object(self, queryset=None):
+        if getattr(self, '_object', None) is None:
+            self._object = super().get_object(queryset=queryset)
+        return self._object
+
+    def get_validator_object(self):
+        return self.get_object()
+
+    def get_validator_querysets(self):
+        return []
 
 
 class PaginatedListView(ListView):
@@ -27,9 +184,44 @@ class PaginatedListView(ListView):
     paginator_padding = 2
     paginator_tail = 2
 
+    # Set to a list of fields, ending with a unique one, like
+    # ('-date', '-pk'), to use a KeysetPaginator. Then the previous/next links
+    # find pages by seeking from the current page's first/last object, which
+    # is equally quick however many pages in we are.
+    keyset_ordering = None
+    cursor_kwarg = 'cursor'
+
     def __init__(self, **kwargs):
         return super().__init__(**kwargs)
 
+    def get_paginator(self, queryset, per_page, orphans=0,
+                                    allow_empty_first_page=True, **kwargs):
+        if self.keyset_ordering:
+            return KeysetPaginator(
+                queryset, per_page,
+                ordering=self.keyset_ordering,
+                count=self.get_paginator_count(queryset),
+                allow_empty_first_page=allow_empty_first_page,
+                **kwargs)
+        elif app_settings.CACHE_PAGINATOR_COUNTS:
+            return CachedCountDiggPaginator(queryset, per_page,
+                orphans=orphans, allow_empty_first_page=allow_empty_first_page,
+                **kwargs)
+        else:
+            return super().get_paginator(queryset, per_page, orphans=orphans,
+                        allow_empty_first_page=allow_empty_first_page, **kwargs)
+
+    def get_paginator_count(self, queryset):
+        """
+        If using keyset_ordering, this can return the total number of objects
+        in queryset, or a cached or estimated total, if it's quicker than
+        counting them. Otherwise return None and they'll be counted.
+        """
+        if app_settings.CACHE_PAGINATOR_COUNTS:
+            return lambda: get_cached_count(queryset)
+        else:
+            return None
+
     def paginate_queryset(self, queryset, page_size):
         """
         Paginate the queryset, if needed.
@@ -54,6 +246,16 @@ class PaginatedListView(ListView):
             padding = self.paginator_padding,
             tail    = self.paginator_tail,
         )
+        cursor = self.request.GET.get(self.cursor_kwarg)
+        if self.keyset_ordering and cursor:
+            try:
+                page = paginator.page_from_cursor(cursor)
+                return (paginator, page, page.object_list, page.has_other_pages())
+            except InvalidPage as e:
+                raise Http404(_('Invalid cursor: %(message)s') % {
+                    'message': str(e)
+                })
+
         page_kwarg = self.page_kwarg
         page = self.kwargs.get(page_kwarg) or self.request.GET.get(page_kwarg) or 1
         try:
@@ -110,7 +312,7 @@ class HomeView(TemplateView):
         return context
 
 
-class CreatorListView(PaginatedListView):
+class CreatorListView(ConditionalGetMixin, PaginatedListView):
     model = Creator
     creator_kind = 'individual'
 
@@ -123,10 +325,9 @@ class CreatorListView(PaginatedListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['creator_kind'] = self.creator_kind
-        context['individual_count'] = Creator.objects.filter(
-                                                    kind='individual').count()
-        context['group_count'] = Creator.objects.filter(
-                                                    kind='group').count()
+        counts = get_kind_counts(Creator)
+        context['individual_count'] = counts['individual']
+        context['group_count'] = counts['group']
 
         return context
 
@@ -136,5 +337,141 @@ class CreatorListView(PaginatedListView):
         return queryset
 
 
-class CreatorDetailView(DetailView):
+class CreatorDetailView(ConditionalDetailMixin, DecodeSlugMixin, DetailView):
+    """
+    Loads all the Creator's Publications, Events and Works, and everything
+    needed to display them, in a fixed number of queries, however prolific
+    they are.
+    """
     model = Creator
+
+    def get_validator_querysets(self):
+        creator = self.get_object()
+        querysets = []
+        if spectator_apps.is_enabled('reading'):
+            querysets += [
+                creator.publication_roles.all(),
+                Publication.objects.filter(roles__creator=creator),
+                Creator.objects.filter(publications__roles__creator=creator),
+            ]
+        if spectator_apps.is_enabled('events'):
+            querysets += [
+                creator.event_roles.all(),
+                creator.work_roles.all(),
+                Event.objects.filter(roles__creator=creator),
+                Venue.objects.filter(event__roles__creator=creator),
+                Work.objects.filter(roles__creator=creator),
+                Creator.objects.filter(works__roles__creator=creator),
+            ]
+        return querysets
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+
+        if spectator_apps.is_enabled('reading'):
+            context.update(self.get_reading_context())
+
+        if spectator_apps.is_enabled('events'):
+            context.update(self.get_events_context())
+
+        return context
+
+    def get_reading_context(self):
+        "The Creator's Publications with their series, roles and Creators."
+        roles = PublicationRole.objects.select_related('creator')
+
+        return {
+            'publication_list': list(
+                        self.object.publications.distinct()
+                                .select_related('series')
+                                .prefetch_related(Prefetch('roles', roles))),
+        }
+
+    def get_events_context(self):
+        """
+        The Creator's Events with their Venues, and all their Works, with
+        roles and Creators, fetched together and grouped by kind, like:
+
+            {'movie': [<Work>, <Work>], 'play': [<Work>], ...}
+        """
+        works = {kind: [] for kind in Work.KIND_SLUGS.keys()}
+
+        roles = WorkRole.objects.select_related('creator')
+
+        for work in self.object.works.distinct() \
+                                .prefetch_related(Prefetch('roles', roles)):
+            works[work.kind].append(work)
+
+        return {
+            'event_list': list(self.object.get_events()
+                                                .select_related('venue')),
+            'works': works,
+        }
+
+
+class SearchView(PaginatedListView):
+    """
+    Searches Creators, Events, Works, Venues, Publications and Publication
+    Series for the words in the `q` GET parameter. See spectator.core.search.
+
+    Only available if the SPECTATOR_SEARCH_INDEX setting is True.
+    """
+    template_name = 'spectator_core/search.html'
+    paginate_by = 20
+    query_kwarg = 'q'
+
+    def get(self, request, *args, **kwargs):
+        if not app_settings.SEARCH_INDEX:
+            raise Http404(_('Search is not enabled.'))
+        return super().get(request, *args, **kwargs)
+
+    def get_query(self):
+        return self.request.GET.get(self.query_kwarg, '').strip()
+
+    def get_queryset(self):
+        return search(self.get_query())
+
+    def get_paginator(self, queryset, per_page, orphans=0,
+                                    allow_empty_first_page=True, **kwargs):
+        # The results aren't a QuerySet so can't be counted or seeked like
+        # one, but they can be sliced.
+        return DiggPaginator(queryset, per_page, orphans=orphans,
+                    allow_empty_first_page=allow_empty_first_page, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.get_query()
+        return context
+
+
+class SearchJSONView(SearchView):
+    """
+    The same as SearchView, but returns a page of results as JSON, like:
+
+        {
+          "query": "royal",
+          "count": 31,
+          "page": 1,
+          "num_pages": 2,
+          "results": [
+            {"type": "venue", "title": "Royal Albert Hall",
+             "url": "/events/venues/a8k3m/", "score": 10.0},
+            ...
+          ]
+        }
+    """
+
+    def render_to_response(self, context, **response_kwargs):
+        page = context['page_obj']
+        return JsonResponse({
+            'query': context['query'],
+            'count': page.paginator.count if page else 0,
+            'page': page.number if page else 1,
+            'num_pages': page.paginator.num_pages if page else 1,
+            'results': [{
+                'type': obj._meta.model_name,
+                'title': str(obj),
+                'url': obj.get_absolute_url(),
+                'score': obj.search_score,
+            } for obj in context['object_list']],
+        })
@@ -5,6 +5,7 @@ from django.db.models import Count
 from django.templatetags.l10n import unlocalize
 
 from ..core import app_settings
+from ..core.admin import AutocompleteAdminMixin, LookupFieldsMixin
 from .models import (
     Event, EventRole,
     Work, WorkRole, WorkSelection,
@@ -14,22 +15,22 @@ from .models import (
 
 # INLINES
 
-class EventRoleInline(admin.TabularInline):
+class EventRoleInline(LookupFieldsMixin, admin.TabularInline):
     model = EventRole
     fields = ( 'creator', 'role_name', 'role_order',)
-    raw_id_fields = ('creator',)
+    lookup_fields = ('creator',)
     extra = 0
 
-class WorkRoleInline(admin.TabularInline):
+class WorkRoleInline(LookupFieldsMixin, admin.TabularInline):
     model = WorkRole
     fields = ( 'creator', 'role_name', 'role_order',)
-    raw_id_fields = ('creator',)
+    lookup_fields = ('creator',)
     extra = 0
 
-class WorkSelectionInline(admin.TabularInline):
+class WorkSelectionInline(LookupFieldsMixin, admin.TabularInline):
     model = WorkSelection
     fields = ('work', 'order',)
-    raw_id_fields = ('work',)
+    lookup_fields = ('work',)
     extra = 0
 
 
@@ -37,7 +38,7 @@ class WorkSelectionInline(admin.TabularInline):
 # MODEL ADMINS.
 
 @admin.register(Event)
-class EventAdmin(admin.ModelAdmin):
+class EventAdmin(LookupFieldsMixin, admin.ModelAdmin):
 
     list_display = ('__str__', 'date', 'kind_name', 'venue',)
     list_filter = ('kind', 'date',)
@@ -54,27 +55,14 @@ class EventAdmin(admin.ModelAdmin):
         }),
     )
 
-    raw_id_fields = ('venue',)
+    lookup_fields = ('venue',)
     readonly_fields = ('title_sort', 'slug', 'time_created', 'time_modified',)
 
     inlines = [WorkSelectionInline, EventRoleInline, ]
 
-    def save_related(self, request, form, formsets, change):
-        """
-        When the Admin saves the Event, the related M2M things, like Movies,
-        haven't yet been saved. So when the Event's title_sort field has
-        nothing to go on.
-
-        So, cheekily, after the parent's save_related() method has saved
-        all the M2M fields, we save the Event again. This time its
-        title_sort will be set correctly.
-        """
-        super().save_related(request, form, formsets, change)
-        form.instance.save()
-
 
 @admin.register(Work)
-class WorkAdmin(admin.ModelAdmin):
+class WorkAdmin(AutocompleteAdminMixin, admin.ModelAdmin):
     list_display = ('title', 'kind', 'tidy_year',)
     search_fields = ('title',)
     list_filter = ('kind', 'year',)
@@ -159,7 +147,7 @@ class CountryListFilter(admin.SimpleListFilter):
 
 
 @admin.register(Venue)
-class VenueAdmin(admin.ModelAdmin):
+class VenueAdmin(AutocompleteAdminMixin, admin.ModelAdmin):
     list_display = ('name', 'address', 'country',)
     list_filter = (CountryListFilter,)
     search_fields = ('name',)
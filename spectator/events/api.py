@@ -0,0 +1,137 @@
+from django.http import Http404, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.utils.translation import ugettext as _
+from django.views.generic import View
+
+from spectator.core.api import (
+    APIDetailView, APIListView, APIMixin, object_data, object_ref,
+    role_objects, roles_data, roles_prefetch
+)
+from . import maps
+from .models import Event, Venue, Work, WorkRole
+
+
+class EventAPIMixin(object):
+    model = Event
+
+    def get_queryset(self):
+        return Event.objects.with_details()
+
+    def serialize(self, obj):
+        return object_data(obj,
+            title=str(obj),
+            kind=obj.kind,
+            date=obj.date,
+            venue=object_ref(obj.venue) if obj.venue else None,
+            venue_name=obj.venue_name,
+            note=obj.note,
+            roles=roles_data(obj.roles.all()),
+            works=[
+                object_ref(selection.work, kind=selection.work.kind,
+                           roles=roles_data(selection.work.roles.all()))
+                for selection in obj.work_selections.all()
+            ])
+
+    def get_related_objects(self, obj):
+        objects = [obj.venue] if obj.venue else []
+        objects.extend(role_objects(obj.roles.all()))
+        for selection in obj.work_selections.all():
+            objects.extend([selection, selection.work])
+            objects.extend(role_objects(selection.work.roles.all()))
+        return objects
+
+
+class EventListAPIView(EventAPIMixin, APIListView):
+    pass
+
+
+class EventDetailAPIView(EventAPIMixin, APIDetailView):
+    pass
+
+
+class WorkAPIMixin(object):
+    model = Work
+
+    def get_queryset(self):
+        return Work.objects.prefetch_related(roles_prefetch(WorkRole))
+
+    def serialize(self, obj):
+        return object_data(obj,
+            title=obj.title,
+            title_sort=obj.title_sort,
+            kind=obj.kind,
+            year=obj.year,
+            imdb_id=obj.imdb_id,
+            roles=roles_data(obj.roles.all()))
+
+    def get_related_objects(self, obj):
+        return role_objects(obj.roles.all())
+
+
+class WorkListAPIView(WorkAPIMixin, APIListView):
+    pass
+
+
+class WorkDetailAPIView(WorkAPIMixin, APIDetailView):
+    pass
+
+
+class VenueAPIMixin(object):
+    model = Venue
+
+    def serialize(self, obj):
+        return object_data(obj,
+            name=obj.name,
+            name_sort=obj.name_sort,
+            address=obj.address,
+            country=obj.country,
+            latitude=None if obj.latitude is None else float(obj.latitude),
+            longitude=None if obj.longitude is None else float(obj.longitude),
+            cinema_treasures_id=obj.cinema_treasures_id,
+            note=obj.note)
+
+
+class VenueListAPIView(VenueAPIMixin, APIListView):
+    pass
+
+
+class VenueDetailAPIView(VenueAPIMixin, APIDetailView):
+    pass
+
+
+class VenueMapTileAPIView(APIMixin, View):
+    """
+    Returns the clusters of Venues in one tile of a world map as JSON, e.g.
+    for /api/venues/map/3/3/2/:
+
+        {
+          "zoom": 3, "x": 3, "y": 2,
+          "clusters": [{"latitude": 51.51, "longitude": -0.12, "count": 3,
+                        "visits": 27, "bounds": [...]}, ...]
+        }
+
+    See spectator.events.maps.make_cluster(). Tiles are cached until the
+    Venues on the map or their visits change, and the ETag header changes
+    with them, so requests with a matching If-None-Match header get a 304
+    Not Modified response.
+    """
+    model = Venue
+
+    def get(self, request, *args, **kwargs):
+        zoom, x, y = (int(kwargs[k]) for k in ('zoom', 'x', 'y'))
+        if not maps.is_valid_tile(zoom, x, y):
+            raise Http404(_('There is no such map tile.'))
+
+        generation = maps.get_map_generation()
+        etag = quote_etag(str(generation))
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = JsonResponse({
+                'zoom': zoom, 'x': x, 'y': y,
+                'clusters': maps.get_tile(zoom, x, y, generation=generation),
+            })
+
+        response['ETag'] = etag
+        return response
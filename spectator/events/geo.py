@@ -0,0 +1,153 @@
+import math
+
+
+# Geohashes, for finding Venues near a point, or within a map's bounds,
+# using an ordinary indexed column rather than a spatial database.
+#
+# A geohash divides the world into a grid of cells, and each character
+# divides a cell into 32 smaller ones, so the geohash of every point within a
+# cell starts with that cell's geohash. e.g. 'gcpv' is a cell about 39km by
+# 20km in London, containing 'gcpvj0', etc. See
+# https://en.wikipedia.org/wiki/Geohash
+
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# The length of the geohashes stored for Venues; about 5m by 5m:
+PRECISION = 9
+
+# The mean radius of the Earth:
+EARTH_RADIUS_KM = 6371.0088
+
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def _num_bits(precision):
+    "Returns (longitude bits, latitude bits) in a geohash of `precision`."
+    bits = 5 * precision
+    return (bits + 1) // 2, bits // 2
+
+
+def _cell_index(value, minimum, maximum, bits):
+    "Which of the 2**bits cells between minimum and maximum `value` is in."
+    index = int((value - minimum) / (maximum - minimum) * (1 << bits))
+    return min(max(index, 0), (1 << bits) - 1)
+
+
+def _geohash_from_indexes(x, y, precision):
+    "The geohash of the cell in column `x` and row `y` of the grid."
+    lon_bits, lat_bits = _num_bits(precision)
+
+    # Interleave the bits, starting with longitude's:
+    value = 0
+    for i in range(5 * precision):
+        if i % 2 == 0:
+            lon_bits -= 1
+            value = (value << 1) | ((x >> lon_bits) & 1)
+        else:
+            lat_bits -= 1
+            value = (value << 1) | ((y >> lat_bits) & 1)
+
+    return ''.join(BASE32[(value >> shift) & 31]
+                   for shift in range(5 * (precision - 1), -1, -5))
+
+
+def encode(latitude, longitude, precision=PRECISION):
+    """
+    Returns the geohash of a point, e.g.:
+
+        encode(51.5034, -0.1276) == 'gcpuvpgj4'
+    """
+    lon_bits, lat_bits = _num_bits(precision)
+    return _geohash_from_indexes(
+                _cell_index(float(longitude), -180, 180, lon_bits),
+                _cell_index(float(latitude), -90, 90, lat_bits),
+                precision)
+
+
+def get_cells(south, west, north, east, max_cells=16):
+    """
+    Returns a list of the geohashes of the fewest, smallest, cells that
+    cover a bounding box, using no more than `max_cells` cells, e.g.:
+
+        get_cells(51.4, -0.3, 51.6, 0.1) == ['gcpu', 'gcpv', 'u10h', 'u10j']
+
+    If `west` is greater than `east` the box crosses the 180th meridian.
+    Returns None if the box can't be covered with that many cells, when
+    it's very large.
+    """
+    for precision in range(PRECISION, 0, -1):
+        lon_bits, lat_bits = _num_bits(precision)
+        y0 = _cell_index(south, -90, 90, lat_bits)
+        y1 = _cell_index(north, -90, 90, lat_bits)
+        x0 = _cell_index(west, -180, 180, lon_bits)
+        x1 = _cell_index(east, -180, 180, lon_bits)
+
+        if west <= east:
+            columns = list(range(x0, x1 + 1))
+        else:
+            columns = list(range(x0, 1 << lon_bits)) + list(range(0, x1 + 1))
+
+        if len(columns) * (y1 - y0 + 1) <= max_cells:
+            return sorted(_geohash_from_indexes(x, y, precision)
+                          for x in columns for y in range(y0, y1 + 1))
+
+    return None
+
+
+def get_next_cell(geohash):
+    """
+    Returns the geohash of the next cell of the same size, in geohash order,
+    e.g. 'gcpu' -> 'gcpv', 'gcpz' -> 'gcq0'. Every geohash starting with
+    `geohash` is at least `geohash` and less than this.
+
+    Returns None for the last cell, e.g. 'zz'.
+    """
+    chars = list(geohash)
+    for i in range(len(chars) - 1, -1, -1):
+        index = BASE32.index(chars[i])
+        if index < len(BASE32) - 1:
+            chars[i] = BASE32[index + 1]
+            return ''.join(chars)
+        # Carry on to the previous character:
+        chars[i] = BASE32[0]
+    return None
+
+
+def get_bounding_box(latitude, longitude, radius_km):
+    """
+    Returns (south, west, north, east) of a box containing everything within
+    `radius_km` of a point. If it crosses the 180th meridian, west will be
+    greater than east; if it includes a pole, it covers all longitudes.
+    """
+    latitude, longitude = float(latitude), float(longitude)
+    delta_lat = radius_km / KM_PER_DEGREE
+    south = latitude - delta_lat
+    north = latitude + delta_lat
+
+    if south <= -90 or north >= 90:
+        return max(south, -90), -180, min(north, 90), 180
+
+    # The longitude that's the radius away from the point, at the latitude
+    # where lines of longitude are closest together:
+    cos_lat = math.cos(math.radians(max(abs(south), abs(north))))
+    delta_lon = radius_km / (KM_PER_DEGREE * cos_lat)
+    if delta_lon >= 180:
+        return south, -180, north, 180
+
+    west = longitude - delta_lon
+    east = longitude + delta_lon
+    if west < -180:
+        west += 360
+    if east > 180:
+        east -= 360
+    return south, west, north, east
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    "The distance between two points, along the Earth's surface."
+    lat1, lon1, lat2, lon2 = map(math.radians, map(float,
+                                                   (lat1, lon1, lat2, lon2)))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + \
+        math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1, math.sqrt(a)))
@@ -0,0 +1,135 @@
+from spectator.core.importers import (
+    Importer, NameIndex, parse_date, parse_int, parse_items, parse_kind, text
+)
+from spectator.core.models import Creator
+from .maps import bump_map_generation
+from .models import Event, EventRole, Venue, Work, WorkRole, WorkSelection
+from .utils import annual_event_counter
+
+
+class WorkIndexMixin(object):
+    "For Importers that find Works by their kind and title."
+
+    # The fields of items in a row's list of works (see parse_items()):
+    work_keys = ('title', 'kind')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.works = NameIndex(Work, ('kind', 'title'), using=self.using)
+
+    def get_work(self, item, default_kind=None):
+        return self.get_or_add(self.works, title=item['title'],
+                        kind=parse_kind(item['kind'], Work, default_kind))
+
+
+class EventImporter(WorkIndexMixin, Importer):
+    """
+    Imports one Event per row, with these fields:
+
+        kind -- Required. e.g. 'gig' or 'cinema'.
+        date -- e.g. '2018-03-31'.
+        title -- Optional; otherwise made from the Works or Creators.
+        venue -- The name of a Venue, which is created if it doesn't exist.
+        venue_name -- Optional; the Venue's name at the time.
+        note
+        creators -- See parse_items(). e.g. 'Nick Cave|Vocals; Warren Ellis'
+        works -- e.g. 'Alien|movie; Aliens|movie'. In JSON: a list of
+                 objects like {"title": "Alien", "kind": "movie"}.
+
+    A Work's kind can be left out for cinema, theatre, concert, dance and
+    museum Events, for which it defaults to the matching kind of Work.
+    """
+    models = (Creator, Venue, Work, WorkRole, Event, EventRole, WorkSelection)
+
+    leaderboards = ('events', 'works')
+
+    annual_counters = (annual_event_counter,)
+
+    # The default kind of each Work for each kind of Event:
+    work_kinds = {
+        'cinema': 'movie',
+        'concert': 'classicalwork',
+        'dance': 'dancepiece',
+        'museum': 'exhibition',
+        'theatre': 'play',
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.venues = NameIndex(Venue, ('name',), using=self.using)
+
+    def finish(self):
+        super().finish()
+        # The Events were inserted without the signals that make the venue
+        # map's tiles out of date:
+        if Event in self._first_pks:
+            bump_map_generation(using=self.using)
+
+    def add_row(self, row):
+        kind = parse_kind(text(row, 'kind'), Event)
+
+        event = Event(kind=kind,
+                      kind_slug=Event.KIND_SLUGS[kind],
+                      date=parse_date(row.get('date')),
+                      title=text(row, 'title'),
+                      venue_name=text(row, 'venue_name'),
+                      note=text(row, 'note'))
+
+        if text(row, 'venue'):
+            event.venue = self.get_or_add(self.venues,
+                                          name=text(row, 'venue'))
+            event.venue_name = event.venue_name or event.venue.name
+
+        self.add(event)
+
+        roles = self.add_roles(EventRole, 'event', event,
+                        parse_items(row.get('creators'), self.creator_keys))
+
+        selections = [
+            self.add(WorkSelection(event=event, order=order,
+                    work=self.get_work(item, self.work_kinds.get(kind))))
+            for order, item in enumerate(
+                        parse_items(row.get('works'), self.work_keys), start=1)
+        ]
+
+        # Make the titles from the roles and Works we already have, as if
+        # they'd been fetched with prefetch_related(), rather than updating
+        # every Event's titles after they've all been inserted:
+        event._prefetched_objects_cache = {
+            'roles': roles,
+            'work_selections': selections,
+        }
+        event.set_titles()
+
+
+class WorkImporter(WorkIndexMixin, Importer):
+    """
+    Imports one Work per row, with these fields:
+
+        kind -- Required. e.g. 'movie' or 'play'.
+        title -- Required.
+        year -- e.g. '1979'.
+        imdb_id -- e.g. 'tt0078748'.
+        creators -- See parse_items(). e.g. 'Ridley Scott|Director'
+
+    Rows for Works that already exist, with the same kind and title, are
+    skipped.
+    """
+    models = (Creator, Work, WorkRole)
+
+    leaderboards = ('works',)
+
+    def add_row(self, row):
+        item = {'title': text(row, 'title'), 'kind': text(row, 'kind')}
+        if not item['title']:
+            raise ValueError('A Work needs a title')
+
+        if self.works.get([item['kind'], item['title']]) is not None:
+            return
+
+        work = self.get_work(item)
+        work.year = parse_int(row.get('year'))
+        work.imdb_id = text(row, 'imdb_id')
+
+        self.add_roles(WorkRole, 'work', work,
+                        parse_items(row.get('creators'), self.creator_keys))
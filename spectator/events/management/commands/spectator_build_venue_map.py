@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from spectator.events.maps import MAX_CACHED_ZOOM, build_tiles
+
+
+class Command(BaseCommand):
+    """
+    Makes and caches the venue map's tiles for every zoom level up to
+    --max-zoom, fetching the Venues once, so that the first requests for
+    them are served from the cache. e.g. after deploying or importing:
+
+        ./manage.py spectator_build_venue_map --max-zoom 10
+
+    Tiles at higher zoom levels, up to maps.MAX_CACHED_ZOOM, are cached when
+    they're first requested; beyond that they aren't cached.
+    """
+
+    help = "Caches the clustered venue map's tiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-zoom',
+            action='store',
+            default=8,
+            type=int,
+            help="The most zoomed-in level to build tiles for, up to {}. "
+                 "Default 8.".format(MAX_CACHED_ZOOM),
+        )
+
+    def handle(self, *args, **options):
+        max_zoom = min(options['max_zoom'], MAX_CACHED_ZOOM)
+
+        num_tiles = build_tiles(max_zoom)
+
+        if options.get('verbosity', 1) > 0:
+            self.stdout.write("Cached {} tile(s) for zoom levels 0 to {}."
+                              .format(num_tiles, max_zoom))
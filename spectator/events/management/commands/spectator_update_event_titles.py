@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+
+from spectator.events.models import Event
+from spectator.events.utils import update_event_titles
+
+
+class Command(BaseCommand):
+    """
+    Recreates the stored `title_plain`, `title_html` and `title_sort` fields
+    of Events, e.g. after upgrading or after importing data without saving
+    each Event.
+
+        ./manage.py spectator_update_event_titles
+    """
+
+    help = "Recreates the stored titles of all Events."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            action='store',
+            default=500,
+            type=int,
+            help="How many Events to fetch from the database at a time.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+
+        updated = 0
+        last_pk = 0
+
+        while True:
+            # Go through in pk order, rather than with offsets, so that each
+            # chunk is equally quick to fetch:
+            pks = list(Event.objects.filter(pk__gt=last_pk)
+                                    .order_by('pk')
+                                    .values_list('pk', flat=True)[:chunk_size])
+
+            if len(pks) == 0:
+                break
+
+            updated += len(update_event_titles(pks))
+
+            last_pk = pks[-1]
+
+        if options.get('verbosity', 1) > 0:
+            self.stdout.write("Updated the titles of {} Event(s).".format(updated))
@@ -1,8 +1,81 @@
 from django.db import models
-from django.db.models import Count
+from django.db.models import Count, Prefetch, Q
 
+from spectator.core.managers import SluggedModelManager, SluggedModelQuerySet
+from . import geo
 
-class VenueManager(models.Manager):
+
+class EventManager(SluggedModelManager):
+
+    def with_details(self):
+        """
+        Gets Events with everything needed to display them in full, using a
+        fixed number of queries however many Works and Creators they have:
+
+        * The Venue.
+        * The WorkSelections, with their Works, and the Works' roles and
+          Creators.
+        * The Event's own roles and their Creators.
+
+        Event's get_works(), get_movies(), get_plays(), etc. then use the
+        prefetched WorkSelections rather than querying.
+        """
+        # Avoiding circular imports:
+        from .models import EventRole, WorkRole, WorkSelection
+
+        return self.get_queryset() \
+                .select_related('venue') \
+                .prefetch_related(
+                    Prefetch('work_selections',
+                        queryset=WorkSelection.objects.select_related('work')),
+                    Prefetch('work_selections__work__roles',
+                        queryset=WorkRole.objects.select_related('creator')),
+                    Prefetch('roles',
+                        queryset=EventRole.objects.select_related('creator')),
+                )
+
+
+class VenueQuerySet(SluggedModelQuerySet):
+
+    def in_bounds(self, south, west, north, east):
+        """
+        Venues within a bounding box, like a map's viewport. If `west` is
+        greater than `east` the box crosses the 180th meridian.
+
+        Venues are found by the indexed `geohash` of the cells covering the
+        box, and then filtered by their exact latitude and longitude.
+        """
+        qs = self
+
+        cells = geo.get_cells(south, west, north, east)
+        if cells is not None:
+            # Ranges, rather than startswith, so that the index is used with
+            # any database. The upper bound is the next cell, rather than
+            # something like cell + '~', because geohashes only contain
+            # [0-9a-z], which every common collation sorts the same way:
+            q = Q()
+            for cell in cells:
+                next_cell = geo.get_next_cell(cell)
+                if next_cell is None:
+                    q |= Q(geohash__gte=cell)
+                else:
+                    q |= Q(geohash__gte=cell, geohash__lt=next_cell)
+            qs = qs.filter(q)
+
+        qs = qs.filter(latitude__gte=south, latitude__lte=north)
+
+        if west <= east:
+            qs = qs.filter(longitude__gte=west, longitude__lte=east)
+        else:
+            qs = qs.filter(Q(longitude__gte=west) | Q(longitude__lte=east))
+
+        return qs
+
+
+class VenueManager(SluggedModelManager):
+
+    def get_queryset(self):
+        return VenueQuerySet(self.model, using=self._db)
 
     def by_visits(self, event_kind=None):
         """
@@ -21,8 +94,35 @@ class VenueManager(models.Manager):
 
         return qs
 
+    def in_bounds(self, south, west, north, east):
+        """
+        Gets Venues within a bounding box. See VenueQuerySet.in_bounds(),
+        which can also be used after by_visits(), etc.
+        """
+        return self.get_queryset().in_bounds(south, west, north, east)
+
+    def near(self, latitude, longitude, radius_km):
+        """
+        Returns a list of Venues within `radius_km` of a point, nearest
+        first, each with a `distance_km` attribute.
+
+        Venues in the bounding box around the circle are fetched with
+        in_bounds(), and their distances calculated in Python, so it works
+        without any spatial database functions.
+        """
+        venues = []
+
+        for venue in self.in_bounds(*geo.get_bounding_box(
+                                            latitude, longitude, radius_km)):
+            venue.distance_km = geo.haversine_km(
+                    latitude, longitude, venue.latitude, venue.longitude)
+            if venue.distance_km <= radius_km:
+                venues.append(venue)
+
+        return sorted(venues, key=lambda v: v.distance_km)
+
 
-class WorkManager(models.Manager):
+class WorkManager(SluggedModelManager):
 
     def by_views(self, kind=None):
         """
@@ -0,0 +1,231 @@
+import math
+
+from django.db import DEFAULT_DB_ALIAS
+from django.urls import reverse
+
+from spectator.core.cache import (
+    bump_named_generation, get_cache, get_named_generation
+)
+from .models import Venue
+
+
+# Clusters of Venues for a map of the whole world, in the standard "slippy
+# map" tiles used by Google Maps, Leaflet, OpenStreetMap, etc. Each tile at
+# each zoom level is a list of clusters of the Venues within it, with their
+# numbers of visits, so a map can show thousands of Venues without sending
+# them all to the browser. See
+# https://wiki.openstreetmap.org/wiki/Slippy_map_tilenames
+#
+# Tiles are cached until a Venue's location or name changes, or an Event is
+# added at, moved to, or removed from a Venue; see spectator.events.signals.
+# They're made when first requested, or all at once by the
+# spectator_build_venue_map management command. Empty tiles, and those
+# beyond MAX_CACHED_ZOOM, are made for every request.
+
+
+# The most zoomed-in level tiles can be fetched at:
+MAX_ZOOM = 20
+
+# Each tile is divided into a grid of this many cells by this many, and the
+# Venues in each cell are one cluster. On 256 pixel tiles, that's 32 pixels
+# per cell:
+GRID_SIZE = 8
+
+# Tiles are only cached up to this zoom level, so that requests for any of
+# the billions of more zoomed-in tiles can't fill the cache. They're quick
+# to make, with the geohash index, having few Venues each:
+MAX_CACHED_ZOOM = 12
+
+# How long to cache tiles for, in seconds, so that those of old generations
+# are eventually removed:
+TILE_TIMEOUT = 60 * 60 * 24 * 7
+
+# Web Mercator maps stop at the latitude that makes them square:
+MAX_LATITUDE = 85.0511287798
+
+# The name of the generation that's bumped when tiles are out of date:
+MAP_GENERATION = 'spectator_events.venue_map'
+
+
+def get_map_generation():
+    "The current generation of the map's tiles."
+    return get_named_generation(MAP_GENERATION)
+
+
+def bump_map_generation(using=DEFAULT_DB_ALIAS):
+    "Make every cached tile out of date."
+    bump_named_generation(MAP_GENERATION, using=using)
+
+
+def is_valid_tile(zoom, x, y):
+    return 0 <= zoom <= MAX_ZOOM and 0 <= x < 2 ** zoom and 0 <= y < 2 ** zoom
+
+
+def _tile_latitude(y, num_tiles):
+    "The latitude of the top edge of tiles in row `y`."
+    return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / num_tiles))))
+
+
+def get_tile_bounds(zoom, x, y):
+    """
+    Returns (south, west, north, east) of a tile. The top and bottom rows
+    extend to the poles, so that Venues beyond MAX_LATITUDE are included.
+    """
+    num_tiles = 2 ** zoom
+    west = x / num_tiles * 360 - 180
+    east = (x + 1) / num_tiles * 360 - 180
+    north = 90 if y == 0 else _tile_latitude(y, num_tiles)
+    south = -90 if y == num_tiles - 1 else _tile_latitude(y + 1, num_tiles)
+    return south, west, north, east
+
+
+def get_tile_cell(latitude, longitude, zoom):
+    """
+    Returns (x, y, column, row): the tile containing a point at `zoom`, and
+    the cell within the tile's grid.
+    """
+    num_tiles = 2 ** zoom
+    latitude = max(min(float(latitude), MAX_LATITUDE), -MAX_LATITUDE)
+
+    tile_x = (float(longitude) + 180) / 360 * num_tiles
+    tile_y = (1 - math.asinh(math.tan(math.radians(latitude))) / math.pi) \
+        / 2 * num_tiles
+
+    x = min(max(int(tile_x), 0), num_tiles - 1)
+    y = min(max(int(tile_y), 0), num_tiles - 1)
+    column = min(max(int((tile_x - x) * GRID_SIZE), 0), GRID_SIZE - 1)
+    row = min(max(int((tile_y - y) * GRID_SIZE), 0), GRID_SIZE - 1)
+    return x, y, column, row
+
+
+def get_venues():
+    """
+    A QuerySet of dicts about every Venue with a location, and its number of
+    visits, from VenueManager.by_visits().
+    """
+    return Venue.objects.by_visits() \
+                .filter(latitude__isnull=False, longitude__isnull=False) \
+                .order_by() \
+                .values('slug', 'name', 'latitude', 'longitude', 'num_visits')
+
+
+def make_cluster(venues):
+    """
+    Returns a dict about a cluster of Venues (dicts from get_venues()):
+
+        {
+          "latitude": 51.51245,     # The middle of the Venues
+          "longitude": -0.12771,
+          "count": 3,               # The number of Venues
+          "visits": 27,             # Their total number of Events
+          "bounds": [51.5, -0.14, 51.52, -0.11],   # South, west, north, east
+        }
+
+    A cluster of one Venue also has a "venue" with its "slug", "name" and
+    "url".
+    """
+    latitudes = [float(v['latitude']) for v in venues]
+    longitudes = [float(v['longitude']) for v in venues]
+
+    cluster = {
+        'latitude': round(sum(latitudes) / len(venues), 6),
+        'longitude': round(sum(longitudes) / len(venues), 6),
+        'count': len(venues),
+        'visits': sum(v['num_visits'] for v in venues),
+        'bounds': [min(latitudes), min(longitudes),
+                   max(latitudes), max(longitudes)],
+    }
+
+    if len(venues) == 1:
+        cluster['venue'] = {
+            'slug': venues[0]['slug'],
+            'name': venues[0]['name'],
+            'url': reverse('spectator:events:venue_detail',
+                           kwargs={'slug': venues[0]['slug']}),
+        }
+
+    return cluster
+
+
+def cluster_venues(venues, zoom):
+    """
+    Returns a dict of the clusters in each tile at `zoom` that contains
+    any of `venues` (dicts from get_venues()), keyed by (x, y). Each tile's
+    clusters are in the order of their cells, row by row.
+    """
+    cells = {}
+    for venue in venues:
+        x, y, column, row = get_tile_cell(venue['latitude'],
+                                          venue['longitude'], zoom)
+        cells.setdefault((x, y), {}).setdefault((row, column), []) \
+                                                            .append(venue)
+
+    return {
+        tile: [make_cluster(tile_cells[cell]) for cell in sorted(tile_cells)]
+        for tile, tile_cells in cells.items()
+    }
+
+
+def make_tile(zoom, x, y):
+    "Returns the list of clusters in a tile, fetching its Venues."
+    venues = get_venues().in_bounds(*get_tile_bounds(zoom, x, y))
+    # Venues on a tile's edge are fetched for both tiles, but only belong
+    # in one of them:
+    return cluster_venues(venues, zoom).get((x, y), [])
+
+
+def _tile_key(generation, zoom, x, y):
+    return 'spectator:venue_map:{}:{}:{}:{}'.format(generation, zoom, x, y)
+
+
+def get_tile(zoom, x, y, generation=None):
+    """
+    Returns the list of clusters in a tile (see make_cluster()), from the
+    cache if it's there, otherwise making it.
+
+    Tiles containing Venues, up to MAX_CACHED_ZOOM, are cached, so the
+    number of cached tiles is limited by the number of Venues, however many
+    different tiles are requested.
+
+    generation -- The result of get_map_generation(), if we already have it.
+    """
+    if zoom > MAX_CACHED_ZOOM:
+        return make_tile(zoom, x, y)
+
+    if generation is None:
+        generation = get_map_generation()
+
+    cache = get_cache()
+    key = _tile_key(generation, zoom, x, y)
+    clusters = cache.get(key)
+    if clusters is None:
+        clusters = make_tile(zoom, x, y)
+        if clusters:
+            cache.set(key, clusters, TILE_TIMEOUT)
+    return clusters
+
+
+def build_tiles(max_zoom=MAX_CACHED_ZOOM):
+    """
+    Makes and caches all the tiles containing any Venues, at every zoom
+    level from 0 to `max_zoom` (no more than MAX_CACHED_ZOOM), fetching the
+    Venues only once.
+
+    Returns the number of tiles cached.
+    """
+    # Get the generation first so that, if anything changes while we're
+    # building, we're not caching out of date tiles as the new generation:
+    generation = get_map_generation()
+    venues = list(get_venues())
+
+    cache = get_cache()
+    num_tiles = 0
+    for zoom in range(min(max_zoom, MAX_CACHED_ZOOM) + 1):
+        tiles = cluster_venues(venues, zoom)
+        cache.set_many({
+            _tile_key(generation, zoom, x, y): clusters
+            for (x, y), clusters in tiles.items()
+        }, TILE_TIMEOUT)
+        num_tiles += len(tiles)
+
+    return num_tiles
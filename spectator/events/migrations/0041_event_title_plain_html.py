@@ -0,0 +1,24 @@
+# Generated by Django 2.1.15 on 2026-10-18 16:46
+
+from django.db import migrations, models
+import spectator.core.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spectator_events', '0040_auto_20180417_1721'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='title_html',
+            field=spectator.core.fields.SafeHTMLTextField(blank=True, default='', editable=False, help_text="As title_plain but with Works' titles in &lt;cite&gt; tags. Set when the event is saved."),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='title_plain',
+            field=models.CharField(blank=True, default='', editable=False, help_text='The title, or one made from the Works or Creators. Set when the event is saved.', max_length=255),
+        ),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 2.1.15 on 2026-10-18 16:50
+
+from django.db import migrations
+from django.utils.html import conditional_escape, format_html, strip_tags
+from django.utils.safestring import mark_safe
+
+
+# Copied from the Event model, because migrations can't use model methods.
+KIND_CHOICES = {
+    'cinema':   'Cinema',
+    'concert':  'Concert',
+    'comedy':   'Comedy',
+    'dance':    'Dance',
+    'museum':   'Gallery/Museum',
+    'gig':      'Gig',
+    'theatre':  'Theatre',
+    'misc':     'Other',
+}
+
+
+def get_kind_name_plural(kind):
+    "Taken from spectator.events.models.Event.get_kind_name_plural()"
+    if kind in ['comedy', 'cinema', 'dance', 'theatre']:
+        return kind.title()
+    elif kind == 'museum':
+        return 'Galleries/Museums'
+    else:
+        return '{}s'.format(KIND_CHOICES[kind])
+
+
+def make_title(event, html=False):
+    """
+    Taken from spectator.events.models.Event.make_title()
+    """
+    if event.title == '':
+        title = '{} #{}'.format(get_kind_name_plural(event.kind), event.pk)
+
+        work_titles = [str(sel.work.title) for sel in event.work_selections.all()]
+
+        if len(work_titles) == 1:
+            title = work_titles[0]
+            if html is True:
+                title = format_html('<cite>{}</cite>', title)
+
+        elif len(work_titles) > 1:
+            if html is True:
+                title = format_html(
+                            '<cite>{}</cite> and <cite>{}</cite>',
+                            mark_safe('</cite>, <cite>'.join(work_titles[:-1])),
+                            work_titles[-1]
+                        )
+            else:
+                title = '{} and {}'.format(
+                                ', '.join(work_titles[:-1]), work_titles[-1])
+
+        else:
+            roles = [r.creator.name for r in event.roles.all()]
+            if len(roles) == 1:
+                title = str(roles[0])
+            elif len(roles) == 0:
+                title = 'Event #{}'.format(event.pk)
+            else:
+                title = '{} and {}'.format(', '.join(roles[:-1]), roles[-1])
+    else:
+        title = event.title
+
+    if html is False:
+        # Like spectator.core.utils.truncate_string():
+        title = ' '.join(strip_tags(title).replace('\r', '').split())
+        if len(title) > 255:
+            title = title[:255].rsplit(' ', 1)[0] + '…'
+
+    return title
+
+
+def forwards(apps, schema_editor):
+    """
+    Set the new title_plain and title_html fields on all existing Events.
+    """
+    Event = apps.get_model('spectator_events', 'Event')
+
+    events = Event.objects.prefetch_related('work_selections__work',
+                                            'roles__creator')
+
+    for event in events:
+        Event.objects.filter(pk=event.pk).update(
+            title_plain=make_title(event),
+            title_html=conditional_escape(make_title(event, html=True)),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spectator_events', '0041_event_title_plain_html'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
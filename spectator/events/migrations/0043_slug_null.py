@@ -0,0 +1,47 @@
+# Generated by Django 2.1.15 on 2026-10-18 16:52
+
+from django.db import migrations, models
+
+
+MODEL_NAMES = ['event', 'venue', 'work']
+
+
+def forwards(apps, schema_editor):
+    """
+    Empty slugs become null, so that they don't clash once slugs are unique.
+    """
+    for name in MODEL_NAMES:
+        Model = apps.get_model('spectator_events', name)
+        Model.objects.filter(slug='').update(slug=None)
+
+
+def backwards(apps, schema_editor):
+    for name in MODEL_NAMES:
+        Model = apps.get_model('spectator_events', name)
+        Model.objects.filter(slug__isnull=True).update(slug='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spectator_events', '0042_populate_event_titles'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='event',
+            name='slug',
+            field=models.SlugField(blank=True, max_length=10, null=True),
+        ),
+        migrations.AlterField(
+            model_name='venue',
+            name='slug',
+            field=models.SlugField(blank=True, max_length=10, null=True),
+        ),
+        migrations.AlterField(
+            model_name='work',
+            name='slug',
+            field=models.SlugField(blank=True, max_length=10, null=True),
+        ),
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 2.1.15 on 2026-10-18 16:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spectator_events', '0043_slug_null'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='event',
+            name='slug',
+            field=models.SlugField(blank=True, max_length=10, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='venue',
+            name='slug',
+            field=models.SlugField(blank=True, max_length=10, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='work',
+            name='slug',
+            field=models.SlugField(blank=True, max_length=10, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.1.15 on 2026-10-18 16:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spectator_events', '0044_slug_unique'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['date', 'id'], name='spectator_e_date_915e22_idx'),
+        ),
+    ]
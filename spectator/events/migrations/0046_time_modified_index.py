@@ -0,0 +1,38 @@
+# Generated by Django 2.1.15 on 2026-10-18 17:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spectator_events', '0045_event_date_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='event',
+            name='time_modified',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='The time this item was last saved to the database.'),
+        ),
+        migrations.AlterField(
+            model_name='eventrole',
+            name='time_modified',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='The time this item was last saved to the database.'),
+        ),
+        migrations.AlterField(
+            model_name='venue',
+            name='time_modified',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='The time this item was last saved to the database.'),
+        ),
+        migrations.AlterField(
+            model_name='work',
+            name='time_modified',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='The time this item was last saved to the database.'),
+        ),
+        migrations.AlterField(
+            model_name='workrole',
+            name='time_modified',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='The time this item was last saved to the database.'),
+        ),
+    ]
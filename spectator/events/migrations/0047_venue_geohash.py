@@ -0,0 +1,18 @@
+# Generated by Django 2.1.15 on 2026-10-18 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spectator_events', '0046_time_modified_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venue',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=9),
+        ),
+    ]
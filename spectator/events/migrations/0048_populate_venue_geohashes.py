@@ -0,0 +1,56 @@
+# Generated by Django 2.1.15 on 2026-10-18 17:50
+
+from django.db import migrations
+
+
+# Copied from spectator.events.geo, because migrations shouldn't depend on
+# code that might change.
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def encode(latitude, longitude, precision=9):
+    "Taken from spectator.events.geo.encode()"
+    bits = 5 * precision
+    lon_bits, lat_bits = (bits + 1) // 2, bits // 2
+
+    x = min(max(int((float(longitude) + 180) / 360 * (1 << lon_bits)), 0),
+            (1 << lon_bits) - 1)
+    y = min(max(int((float(latitude) + 90) / 180 * (1 << lat_bits)), 0),
+            (1 << lat_bits) - 1)
+
+    value = 0
+    for i in range(bits):
+        if i % 2 == 0:
+            lon_bits -= 1
+            value = (value << 1) | ((x >> lon_bits) & 1)
+        else:
+            lat_bits -= 1
+            value = (value << 1) | ((y >> lat_bits) & 1)
+
+    return ''.join(BASE32[(value >> shift) & 31]
+                   for shift in range(5 * (precision - 1), -1, -5))
+
+
+def forwards(apps, schema_editor):
+    """
+    Set the new geohash field on all existing Venues with a location.
+    """
+    Venue = apps.get_model('spectator_events', 'Venue')
+
+    venues = Venue.objects.filter(latitude__isnull=False,
+                                  longitude__isnull=False)
+
+    for venue in venues:
+        Venue.objects.filter(pk=venue.pk).update(
+                            geohash=encode(venue.latitude, venue.longitude))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spectator_events', '0047_venue_geohash'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
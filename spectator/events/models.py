@@ -4,14 +4,15 @@ import datetime
 from django.core.validators import RegexValidator
 from django.db import models
 from django.urls import reverse
-from django.utils.html import format_html
+from django.utils.html import conditional_escape, format_html
 from django.utils.safestring import mark_safe
 from django.utils.translation import ugettext_lazy as _
 
-from .managers import VenueManager, WorkManager
+from . import geo
+from .managers import EventManager, VenueManager, WorkManager
 from spectator.core.models import BaseRole, SluggedModelMixin,\
         TimeStampedModelMixin
-from spectator.core.fields import NaturalSortField
+from spectator.core.fields import NaturalSortField, SafeHTMLTextField
 from spectator.core.utils import truncate_string
 
 
@@ -20,8 +21,9 @@ class EventRole(BaseRole):
     Through model for linking a Creator to an Event, optionally via their role
     (e.g. 'Headliner', 'Support', 'Pianist', 'Actor', etc.)
 
-    Every time one of these is saved/deleted a signal re-saves the Event
-    in case its `title_sort` needs to change.
+    Every time one of these is saved/deleted a signal marks the Event as
+    needing its `title_plain`, `title_html` and `title_sort` recreating, which
+    happens once the current transaction is committed.
     """
     creator = models.ForeignKey('spectator_core.Creator', blank=False,
                         on_delete=models.CASCADE, related_name='event_roles')
@@ -77,6 +79,11 @@ class Event(TimeStampedModelMixin, SluggedModelMixin, models.Model):
         role = event.roles.first()
         print(role.creator.name)
         print(role.role_order)
+
+    The Event's title, which might be made from its Works or Creators, is
+    stored in `title_plain` and `title_html` whenever the Event is saved, so
+    that listing Events doesn't require extra queries per Event. Use
+    `make_title()` to generate a fresh version instead.
     """
 
     KIND_CHOICES = (
@@ -119,6 +126,14 @@ class Event(TimeStampedModelMixin, SluggedModelMixin, models.Model):
     title_sort = NaturalSortField('title_to_sort', max_length=255, default='',
             help_text="e.g. 'reading festival, the' or 'drifters, the'.")
 
+    title_plain = models.CharField(null=False, blank=True, max_length=255,
+            default='', editable=False,
+            help_text="The title, or one made from the Works or Creators. Set when the event is saved.")
+
+    title_html = SafeHTMLTextField(null=False, blank=True, default='',
+            editable=False,
+            help_text="As title_plain but with Works' titles in &lt;cite&gt; tags. Set when the event is saved.")
+
     note = models.TextField(null=False, blank=True,
         help_text="Optional. Paragraphs will be surrounded with &lt;p&gt;&lt;/p&gt; tags. HTML allowed.")
 
@@ -132,15 +147,35 @@ class Event(TimeStampedModelMixin, SluggedModelMixin, models.Model):
     kind_slug = models.SlugField(null=False, blank=True,
             help_text="Set when the event is saved.")
 
+    objects = EventManager()
+
     class Meta:
         ordering = ['-date',]
+        indexes = [
+            # For paging through Events by date. See EventListView.
+            models.Index(fields=['date', 'id']),
+        ]
 
     def __str__(self):
-        return self.make_title()
+        if self.title_plain:
+            return self.title_plain
+        else:
+            return self.make_title()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # So that saving can tell if the Venue has changed without fetching
+        # it again. See spectator.events.signals.event_map_changed().
+        if 'venue_id' not in instance.get_deferred_fields():
+            instance._loaded_venue_id = instance.venue_id
+        return instance
 
     def save(self, *args, **kwargs):
         self.kind_slug = self.KIND_SLUGS[self.kind]
 
+        self.set_titles()
+
         if self.venue_name == '' and self.venue is not None:
             # Set the venue_name, if it's not already set and there's a Venue.
             self.venue_name = self.venue.name
@@ -201,31 +236,62 @@ class Event(TimeStampedModelMixin, SluggedModelMixin, models.Model):
 
         return title
 
+    def get_pk_dependent_values(self):
+        """
+        If there's no title, the generated titles of a newly-inserted Event
+        include its pk, which it didn't have until now.
+        """
+        values = super().get_pk_dependent_values()
+
+        if self.title == '':
+            self.set_titles()
+            values['title_plain'] = self.title_plain
+            values['title_html'] = self.title_html
+            values['title_sort'] = self._meta.get_field('title_sort')\
+                                                        .pre_save(self, False)
+
+        return values
+
+    def set_titles(self):
+        """
+        Sets the stored `title_plain` and `title_html` fields using
+        `make_title()`. Doesn't save the Event.
+        """
+        self.title_plain = self.make_title()
+        # Escape it in case it's a plain title that contains HTML characters:
+        self.title_html = conditional_escape(self.make_title(html=True))
+
     def get_works(self):
         return self.work_selections.all()
 
     def get_classical_works(self):
-        return self.work_selections.filter(work__kind='classicalwork')
+        return self._get_work_selections('classicalwork')
 
     def get_dance_pieces(self):
-        return self.work_selections.filter(work__kind='dancepiece')
+        return self._get_work_selections('dancepiece')
 
     def get_exhibitions(self):
-        return self.work_selections.filter(work__kind='exhibition')
+        return self._get_work_selections('exhibition')
 
     def get_movies(self):
-        return self.work_selections.filter(work__kind='movie')
+        return self._get_work_selections('movie')
 
     def get_plays(self):
-        return self.work_selections.filter(work__kind='play')
+        return self._get_work_selections('play')
 
-    @property
-    def title_html(self):
+    def _get_work_selections(self, kind):
         """
-        Returns the title of the Event, the same as using __str__(), except
-        it will add <cite></cite> tags around the names of all Works.
+        The WorkSelections whose Works are of `kind`.
+
+        If the WorkSelections have been prefetched (e.g. by
+        Event.objects.with_details()) returns a list of those, rather than
+        making a query.
         """
-        return self.make_title(html=True)
+        if 'work_selections' in getattr(self, '_prefetched_objects_cache', {}):
+            return [s for s in self.work_selections.all()
+                    if s.work.kind == kind]
+        else:
+            return self.work_selections.filter(work__kind=kind)
 
     @property
     def kind_name(self):
@@ -244,7 +310,11 @@ class Event(TimeStampedModelMixin, SluggedModelMixin, models.Model):
         We want to be able to sort by the event's Creators, if it doesn't
         have a title.
         """
-        return self.make_title()
+        if self.title_plain:
+            # Already set in save():
+            return self.title_plain
+        else:
+            return self.make_title()
 
     @staticmethod
     def get_kind_name_plural(kind):
@@ -731,6 +801,11 @@ class Venue(TimeStampedModelMixin, SluggedModelMixin, models.Model):
     longitude = models.DecimalField(max_digits=9, decimal_places=6,
                                                         null=True, blank=True)
 
+    # Set from the latitude and longitude when saved, so the index can be
+    # used to find nearby Venues. See VenueManager.near():
+    geohash = models.CharField(max_length=geo.PRECISION, blank=True,
+                               default='', editable=False, db_index=True)
+
     address = models.CharField(null=False, blank=True, max_length=255)
 
     country = models.CharField(null=False, blank=True, max_length=2,
@@ -742,12 +817,51 @@ class Venue(TimeStampedModelMixin, SluggedModelMixin, models.Model):
     class Meta:
         ordering = ['name_sort',]
 
+    # The fields shown in the venue map's tiles. See spectator.events.maps.
+    MAP_FIELDS = ('latitude', 'longitude', 'name', 'slug')
+
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # So that saving can tell if the map's tiles are out of date without
+        # fetching them again. See spectator.events.signals.
+        instance._loaded_map_values = instance.get_map_values()
+        return instance
+
     def get_absolute_url(self):
         return reverse('spectator:events:venue_detail', kwargs={'slug':self.slug})
 
+    def get_map_values(self):
+        """
+        A tuple of the values of MAP_FIELDS, as the database would store
+        them, or None if any of them haven't been loaded.
+        """
+        deferred = self.get_deferred_fields()
+        if any(name in deferred for name in self.MAP_FIELDS):
+            return None
+        # Values from forms, etc, might be floats rather than Decimals:
+        return tuple(self._meta.get_field(name).to_python(getattr(self, name))
+                     for name in self.MAP_FIELDS)
+
+    def save(self, *args, **kwargs):
+        self.geohash = self.make_geohash()
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and \
+                ('latitude' in update_fields or 'longitude' in update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'geohash'}
+
+        super().save(*args, **kwargs)
+
+    def make_geohash(self):
+        "The geohash of the Venue's location, or '' if it has none."
+        if self.latitude is None or self.longitude is None:
+            return ''
+        return geo.encode(self.latitude, self.longitude)
+
     @property
     def country_name(self):
         if self.country:
@@ -1,15 +1,116 @@
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import EventRole
+from spectator.core.models import Creator
+from .maps import bump_map_generation
+from .models import Event, EventRole, Venue, Work, WorkSelection
+from .utils import dirty_events
 
 
 @receiver(post_delete, sender=EventRole, dispatch_uid='spectator.delete.event_role')
 @receiver(post_save, sender=EventRole, dispatch_uid='spectator.save.event_role')
 def eventrole_changed(sender, **kwargs):
     """
-    When an Event's creators are changed we want to re-save the Event
-    itself so that its title_sort can be recreated if necessary
+    When an Event's creators are changed we want to recreate the Event's
+    stored titles and title_sort, if necessary.
+
+    This happens once the current transaction is committed, so changing
+    several EventRoles at once only does it once.
+    """
+    dirty_events.add(kwargs['instance'].event, using=kwargs['using'])
+
+
+@receiver(post_delete, sender=WorkSelection, dispatch_uid='spectator.delete.work_selection')
+@receiver(post_save, sender=WorkSelection, dispatch_uid='spectator.save.work_selection')
+def workselection_changed(sender, **kwargs):
+    """
+    When an Event's works are changed we want to recreate the Event's
+    stored titles and title_sort, if necessary.
+    """
+    dirty_events.add(kwargs['instance'].event, using=kwargs['using'])
+
+
+@receiver(post_save, sender=Work, dispatch_uid='spectator.save.work')
+def work_changed(sender, **kwargs):
+    """
+    If a Work's title has changed, any untitled Events it's part of might
+    need their stored titles recreating.
+    """
+    if not kwargs['created']:
+        events = Event.objects.using(kwargs['using']) \
+                            .filter(title='', works=kwargs['instance'])
+        for pk in events.values_list('pk', flat=True).distinct():
+            dirty_events.add(pk, using=kwargs['using'])
+
+
+@receiver(post_save, sender=Creator, dispatch_uid='spectator.save.creator')
+def creator_changed(sender, **kwargs):
+    """
+    If a Creator's name has changed, any untitled Events they're directly
+    involved in might need their stored titles recreating.
+    """
+    if not kwargs['created']:
+        events = Event.objects.using(kwargs['using']) \
+                            .filter(title='', roles__creator=kwargs['instance'])
+        for pk in events.values_list('pk', flat=True).distinct():
+            dirty_events.add(pk, using=kwargs['using'])
+
+
+@receiver(post_save, sender=Venue, dispatch_uid='spectator.save.venue.map')
+def venue_map_saved(sender, instance, created, **kwargs):
     """
-    kwargs['instance'].event.save()
+    When a Venue with a location is added, or its location or name changes,
+    the venue map's cached tiles are out of date.
+
+    Compared with the values the Venue was loaded with (see Venue.from_db())
+    or last saved with, so saving doesn't have to fetch them again.
+    """
+    values = instance.get_map_values()
+
+    if created:
+        changed = instance.latitude is not None and \
+                  instance.longitude is not None
+        # A new Venue's slug is set after this, so there are no values to
+        # compare with next time:
+        values = None
+    else:
+        loaded = getattr(instance, '_loaded_map_values', None)
+        changed = loaded is None or loaded != values
+
+    instance._loaded_map_values = values
+
+    if changed:
+        bump_map_generation(using=kwargs['using'])
+
+
+@receiver(post_delete, sender=Venue, dispatch_uid='spectator.delete.venue.map')
+def venue_map_deleted(sender, instance, **kwargs):
+    if instance.latitude is not None and instance.longitude is not None:
+        bump_map_generation(using=kwargs['using'])
+
+
+@receiver(post_save, sender=Event, dispatch_uid='spectator.save.event.map')
+def event_map_saved(sender, instance, created, **kwargs):
+    """
+    When an Event is added at a Venue, or moved between Venues, the
+    Venues' numbers of visits in the venue map's tiles are out of date.
+
+    Compared with the Venue the Event was loaded with (see Event.from_db())
+    or last saved with, so saving doesn't have to fetch it again.
+    """
+    if created:
+        changed = instance.venue_id is not None
+    else:
+        changed = not hasattr(instance, '_loaded_venue_id') or \
+                  instance._loaded_venue_id != instance.venue_id
+
+    instance._loaded_venue_id = instance.venue_id
+
+    if changed:
+        bump_map_generation(using=kwargs['using'])
+
 
+@receiver(post_delete, sender=Event, dispatch_uid='spectator.delete.event.map')
+def event_map_deleted(sender, instance, **kwargs):
+    if instance.venue_id is not None:
+        bump_map_generation(using=kwargs['using'])
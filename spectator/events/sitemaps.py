@@ -1,39 +1,45 @@
-from django.contrib.sitemaps import Sitemap
+from django.urls import reverse
 
+from spectator.core.sitemaps import SectionedSitemap
 from .models import Event, Venue, Work
 
 
-class EventSitemap(Sitemap):
+class EventSitemap(SectionedSitemap):
     changefreq = 'never'
     priority = 0.5
 
-    def items(self):
+    def get_queryset(self):
         # Exclude movies and plays because they'll have the same URLs as their
         # Movie and Play objects.
         return Event.objects.exclude(kind='movie')\
                             .exclude(kind='play')
 
-    def lastmod(self, obj):
-        return obj.time_modified
+    def location(self, item):
+        return reverse('spectator:events:event_detail',
+                       kwargs={'slug': item['slug']})
 
 
-class VenueSitemap(Sitemap):
+class VenueSitemap(SectionedSitemap):
     changefreq = 'monthly'
     priority = 0.5
 
-    def items(self):
+    def get_queryset(self):
         return Venue.objects.all()
 
-    def lastmod(self, obj):
-        return obj.time_modified
+    def location(self, item):
+        return reverse('spectator:events:venue_detail',
+                       kwargs={'slug': item['slug']})
 
 
-class WorkSitemap(Sitemap):
+class WorkSitemap(SectionedSitemap):
     changefreq = 'monthly'
     priority = 0.5
+    fields = ('slug', 'kind', 'time_modified')
 
-    def items(self):
+    def get_queryset(self):
         return Work.objects.all()
 
-    def lastmod(self, obj):
-        return obj.time_modified
+    def location(self, item):
+        return reverse('spectator:events:work_detail', kwargs={
+                                    'kind_slug': Work.KIND_SLUGS[item['kind']],
+                                    'slug': item['slug']})
@@ -1,13 +1,13 @@
 from django import template
 
-from django.db.models import Count
-from django.db.models.functions import TruncYear
 from django.utils.html import format_html
 
+from spectator.core.cache import cache_card
 from spectator.core.models import Creator
-from spectator.core.utils import chartify
+from spectator.core.utils import chartify_queryset
 from spectator.core import app_settings
 from ..models import Event, Work
+from ..utils import annual_event_counter
 
 
 register = template.Library()
@@ -16,26 +16,26 @@ register = template.Library()
 @register.simple_tag
 def annual_event_counts(kind='all'):
     """
-    Returns a QuerySet of dicts, each one with these keys:
+    Returns a list of dicts, in year order, each one with these keys:
 
         * year - a date object representing the year
         * total - the number of events of `kind` that year
 
     kind - The Event `kind`, or 'all' for all kinds (default).
+
+    All the kinds are counted with one query, or read from the AnnualCount
+    table if the SPECTATOR_ANNUAL_COUNTS_TABLE setting is True. Events with
+    no date aren't counted.
     """
-    qs = Event.objects
+    counts = annual_event_counter.get_counts(kind=kind)
 
     if kind != 'all':
-        qs = qs.filter(kind=kind)
-
-    qs = qs.annotate(year=TruncYear('date')) \
-            .values('year') \
-            .annotate(total=Count('id')) \
-            .order_by('year')
+        return [{'year': c['year'], 'total': c[kind]} for c in counts]
 
-    return qs
+    return [{'year': c['year'], 'total': c['total']} for c in counts]
 
 
+@cache_card(register, 'spectator_events.Event', 'spectator_core.AnnualCount')
 @register.inclusion_tag('spectator_events/includes/card_annual_event_counts.html')
 def annual_event_counts_card(kind='all', current_year=None):
     """
@@ -153,6 +153,7 @@ def events_years():
     return Event.objects.dates('date', 'year')
 
 
+@cache_card(register, 'spectator_events.Event')
 @register.inclusion_tag('spectator_events/includes/card_years.html')
 def events_years_card(current_year=None):
     """
@@ -175,14 +176,15 @@ def most_seen_creators(event_kind=None, num=10):
     return Creator.objects.by_events(kind=event_kind)[:num]
 
 
+@cache_card(register, 'spectator_core.Creator', 'spectator_events.EventRole',
+            'spectator_events.Event', 'spectator_core.LeaderboardEntry')
 @register.inclusion_tag('spectator_core/includes/card_chart.html')
 def most_seen_creators_card(event_kind=None, num=10):
     """
     Displays a card showing the Creators that are associated with the most Events.
     """
-    object_list = most_seen_creators(event_kind=event_kind, num=num)
-
-    object_list = chartify(object_list, 'num_events', cutoff=1)
+    object_list = chartify_queryset(Creator.objects.by_events(kind=event_kind),
+                                    'num_events', num=num, cutoff=1)
 
     return {
         'card_title': 'Most seen people/groups',
@@ -199,6 +201,8 @@ def most_seen_creators_by_works(work_kind=None, role_name=None, num=10):
     return Creator.objects.by_works(kind=work_kind, role_name=role_name)[:num]
 
 
+@cache_card(register, 'spectator_core.Creator', 'spectator_events.WorkRole',
+            'spectator_events.Work', 'spectator_core.LeaderboardEntry')
 @register.inclusion_tag('spectator_core/includes/card_chart.html')
 def most_seen_creators_by_works_card(work_kind=None, role_name=None, num=10):
     """
@@ -208,10 +212,9 @@ def most_seen_creators_by_works_card(work_kind=None, role_name=None, num=10):
 
       {% most_seen_creators_by_works_card work_kind='movie' role_name='Director' num=5 %}
     """
-    object_list = most_seen_creators_by_works(
-                            work_kind=work_kind, role_name=role_name, num=num)
-
-    object_list = chartify(object_list, 'num_works', cutoff=1)
+    object_list = chartify_queryset(
+                Creator.objects.by_works(kind=work_kind, role_name=role_name),
+                'num_works', num=num, cutoff=1)
 
     # Attempt to create a sensible card title...
 
@@ -243,14 +246,15 @@ def most_seen_works(kind=None, num=10):
     return Work.objects.by_views(kind=kind)[:num]
 
 
+@cache_card(register, 'spectator_events.Work',
+            'spectator_events.WorkSelection', 'spectator_events.Event')
 @register.inclusion_tag('spectator_core/includes/card_chart.html')
 def most_seen_works_card(kind=None, num=10):
     """
     Displays a card showing the Works that are associated with the most Events.
     """
-    object_list = most_seen_works(kind=kind, num=num)
-
-    object_list = chartify(object_list, 'num_views', cutoff=1)
+    object_list = chartify_queryset(Work.objects.by_views(kind=kind),
+                                    'num_views', num=num, cutoff=1)
 
     if kind:
         card_title = 'Most seen {}'.format(
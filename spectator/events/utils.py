@@ -0,0 +1,152 @@
+import threading
+
+from django.db import router, transaction
+from django.utils import timezone
+
+from spectator.core import app_settings
+from spectator.core.cache import bump_generation, generations_enabled
+from spectator.core.counts import AnnualKindCounter
+from spectator.core.search import index_is_built, index_object
+from .models import Event
+
+
+annual_event_counter = AnnualKindCounter(
+                    Event, date_field='date', kind_field='kind',
+                    kinds=Event.get_kinds())
+
+
+def update_event_titles(event_ids, touch=False, using=None):
+    """
+    Recreates the stored `title_plain`, `title_html` and `title_sort` fields
+    of the Events whose pks are in `event_ids`.
+
+    Fetches all the Events, and their Works and Creators, in a fixed number of
+    queries, then does one UPDATE per Event whose titles have changed.
+
+    touch -- If True, every Event's `time_modified` will also be updated, and
+             all the Events will be updated, whether their titles have changed
+             or not.
+    using -- The database alias to use, if not the default.
+
+    Returns a list of the updated Events.
+    """
+    title_sort_field = Event._meta.get_field('title_sort')
+
+    qs = Event.objects.using(using) if using else Event.objects.all()
+
+    events = qs.filter(pk__in=list(event_ids)) \
+                        .prefetch_related('work_selections__work',
+                                          'roles__creator')
+
+    updated = []
+
+    for event in events:
+        old_titles = (event.title_plain, event.title_html, event.title_sort)
+
+        event.set_titles()
+        event.title_sort = title_sort_field.pre_save(event, False)
+
+        new_titles = (event.title_plain, event.title_html, event.title_sort)
+
+        if touch or new_titles != old_titles:
+            fields = {
+                'title_plain': event.title_plain,
+                'title_html': event.title_html,
+                'title_sort': event.title_sort,
+            }
+            if touch:
+                event.time_modified = timezone.now()
+                fields['time_modified'] = event.time_modified
+
+            # Using update() so that we don't go through save() again:
+            qs.filter(pk=event.pk).update(**fields)
+            updated.append(event)
+
+    # The signals that usually do these aren't sent by update():
+    if updated and generations_enabled():
+        bump_generation(Event, using=using)
+
+    if updated and app_settings.SEARCH_INDEX and index_is_built(using):
+        for event in updated:
+            index_object(event, using=using)
+
+    return updated
+
+
+class DirtyEventsCollector(object):
+    """
+    Collects Events whose stored titles need recreating, because their Works
+    or Creators have changed, and recreates them all once the current
+    transaction is committed.
+
+    So saving an Event with a dozen EventRoles in one transaction (as the
+    Admin does) only recreates the Event's titles once, rather than once per
+    EventRole. Outside of a transaction the titles are recreated immediately.
+
+    Usage:
+
+        from spectator.events.utils import dirty_events
+
+        dirty_events.add(event)   # Or an Event's pk.
+
+    Any Event objects passed in will also have their title attributes updated
+    when the titles are recreated.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _pending(self, using):
+        "The dict of {pk: [Event objects]} waiting for `using`'s commit."
+        if not hasattr(self._local, 'pending'):
+            self._local.pending = {}
+        return self._local.pending.setdefault(using, {})
+
+    def add(self, event, using=None):
+        """
+        Mark an Event as needing its titles recreating.
+        event -- An Event object, or an Event's pk.
+        using -- The database alias. Defaults to the Event write database.
+        """
+        if using is None:
+            using = router.db_for_write(Event)
+
+        if isinstance(event, Event):
+            pk = event.pk
+        else:
+            pk, event = event, None
+
+        if pk is None:
+            return
+
+        instances = self._pending(using).setdefault(pk, [])
+        # Comparing Events with `in` would only compare their pks:
+        if event is not None and not any(i is event for i in instances):
+            instances.append(event)
+
+        # Register every time, in case an earlier callback is discarded
+        # because its savepoint is rolled back. Once the first one has run
+        # the rest will have nothing to do.
+        transaction.on_commit(lambda: self.flush(using), using=using)
+
+    def flush(self, using=None):
+        "Recreate the titles of all the pending Events now."
+        if using is None:
+            using = router.db_for_write(Event)
+
+        pending = self._pending(using)
+        if not pending:
+            return
+
+        self._local.pending[using] = {}
+
+        for event in update_event_titles(pending.keys(), touch=True,
+                                                                using=using):
+            for instance in pending[event.pk]:
+                instance.title_plain = event.title_plain
+                instance.title_html = event.title_html
+                instance.title_sort = event.title_sort
+                instance.time_modified = event.time_modified
+
+
+dirty_events = DirtyEventsCollector()
@@ -7,12 +7,21 @@ from django.views.generic import DetailView, ListView, YearArchiveView
 from django.views.generic.detail import SingleObjectMixin
 
 from spectator.core import app_settings
+from spectator.core.counts import get_kind_counts
 from spectator.core.models import Creator
-from spectator.core.views import PaginatedListView
-from .models import Event, Venue, Work
+from spectator.core.views import (
+    ConditionalDetailMixin, ConditionalGetMixin, DecodeSlugMixin,
+    PaginatedListView
+)
+from .models import Event, EventRole, Venue, Work, WorkRole
 
 
-class EventListView(PaginatedListView):
+# The models shown by the cards in spectator_events/base.html's sidebar, on
+# every page (recent_events_card and annual_event_counts_card):
+CARD_MODELS = ('spectator_events.Event', 'spectator_events.Venue')
+
+
+class EventListView(ConditionalGetMixin, PaginatedListView):
     """
     Includes context of counts of all different Event types,
     plus the kind of event this page is for,
@@ -22,6 +31,13 @@ class EventListView(PaginatedListView):
     """
     model = Event
     ordering = ['-date',]
+    keyset_ordering = ['-date', '-pk']
+    # Plus those of most_seen_creators_card:
+    card_models = CARD_MODELS + ('spectator_core.Creator',
+                                 'spectator_events.EventRole')
+
+    # Will be the dict of counts of each kind, once we've fetched it:
+    kind_counts = None
 
     def get(self, request, *args, **kwargs):
         slug = self.kwargs.get('kind_slug', None)
@@ -58,13 +74,14 @@ class EventListView(PaginatedListView):
                 'gig': 10,
             }}
         """
-        counts = {'all': Event.objects.count(),}
+        if self.kind_counts is None:
+            self.kind_counts = get_kind_counts(Event)
+        return {'counts': self.kind_counts,}
 
-        for k,v in Event.KIND_CHOICES:
-            # e.g. 'movie_count':
-            counts[k] = Event.objects.filter(kind=k).count()
-
-        return {'counts': counts,}
+    def get_paginator_count(self, queryset):
+        "We already know how many Events of this kind there are."
+        counts = self.get_event_counts()['counts']
+        return counts[self.get_event_kind() or 'all']
 
     def get_event_kind(self):
         """
@@ -90,17 +107,37 @@ class EventListView(PaginatedListView):
 
         return qs
 
+    def get_validator_querysets(self):
+        return [Event.objects.all(), Venue.objects.all()]
 
-class EventDetailView(DetailView):
-    model = Event
 
+class EventDetailView(ConditionalDetailMixin, DecodeSlugMixin, DetailView):
+    model = Event
+    card_models = CARD_MODELS
 
-class EventYearArchiveView(YearArchiveView):
+    def get_queryset(self):
+        "Fetch all the Works and Creators up front."
+        return Event.objects.with_details()
+
+    def get_validator_querysets(self):
+        event = self.get_object()
+        return [
+            Venue.objects.filter(pk=event.venue_id),
+            EventRole.objects.filter(event=event),
+            Creator.objects.filter(events=event),
+            Work.objects.filter(events__event=event),
+            WorkRole.objects.filter(work__events__event=event),
+            Creator.objects.filter(works__events__event=event),
+        ]
+
+
+class EventYearArchiveView(ConditionalGetMixin, YearArchiveView):
     allow_empty = True
     date_field = 'date'
     make_object_list = True
     model = Event
     ordering = 'date'
+    card_models = CARD_MODELS
 
     def get_queryset(self):
         "Reduce the number of queries and speed things up."
@@ -108,6 +145,9 @@ class EventYearArchiveView(YearArchiveView):
         qs = qs.select_related('venue')
         return qs
 
+    def get_validator_querysets(self):
+        return [Event.objects.all(), Venue.objects.all()]
+
     def get_dated_items(self):
         items, qs, info = super().get_dated_items()
 
@@ -153,8 +193,14 @@ class WorkMixin():
         return slugs_to_kinds.get(self.kind_slug, None)
 
 
-class WorkListView(WorkMixin, PaginatedListView):
+class WorkListView(WorkMixin, ConditionalGetMixin, PaginatedListView):
     model = Work
+    # Plus those of most_seen_works_card:
+    card_models = CARD_MODELS + ('spectator_events.WorkSelection',)
+
+    def get_validator_querysets(self):
+        return [Work.objects.all(), WorkRole.objects.all(),
+                Creator.objects.all()]
 
     def get_queryset(self):
         kind = self.get_work_kind()
@@ -184,8 +230,19 @@ class WorkListView(WorkMixin, PaginatedListView):
         return context
 
 
-class WorkDetailView(WorkMixin, DetailView):
+class WorkDetailView(WorkMixin, ConditionalDetailMixin, DecodeSlugMixin,
+                                                                DetailView):
     model = Work
+    card_models = CARD_MODELS
+
+    def get_validator_querysets(self):
+        work = self.get_object()
+        return [
+            WorkRole.objects.filter(work=work),
+            Creator.objects.filter(works=work),
+            Event.objects.filter(works=work),
+            Venue.objects.filter(event__works=work),
+        ]
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -202,9 +259,11 @@ class WorkDetailView(WorkMixin, DetailView):
 
 # VENUES
 
-class VenueListView(PaginatedListView):
+class VenueListView(ConditionalGetMixin, PaginatedListView):
     model = Venue
     ordering = ['name_sort']
+    # Including those of most_visited_venues_card:
+    card_models = CARD_MODELS
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -237,13 +296,20 @@ class VenueListView(PaginatedListView):
         return sorted(countries, key=lambda k: k['name'])
 
 
-class VenueDetailView(SingleObjectMixin, PaginatedListView):
+class VenueDetailView(ConditionalDetailMixin, DecodeSlugMixin,
+                                    SingleObjectMixin, PaginatedListView):
     template_name = 'spectator_events/venue_detail.html'
+    keyset_ordering = ['-date', '-pk']
+    # Including those of most_visited_venues_card:
+    card_models = CARD_MODELS
 
     def get(self, request, *args, **kwargs):
         self.object = self.get_object(queryset=Venue.objects.all())
         return super().get(request, *args, **kwargs)
 
+    def get_validator_querysets(self):
+        return [self.object.event_set.all()]
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
@@ -1,20 +1,21 @@
 from django.contrib import admin
 
+from ..core.admin import AutocompleteAdminMixin, LookupFieldsMixin
 from .models import Publication, PublicationRole, PublicationSeries, Reading
 
 
-class ReadingInline(admin.TabularInline):
+class ReadingInline(LookupFieldsMixin, admin.TabularInline):
     model = Reading
     fields = ('publication', 'start_date', 'end_date', 'is_finished',
                         'start_granularity', 'end_granularity',)
-    raw_id_fields = ('publication',)
+    lookup_fields = ('publication',)
     extra = 1
 
 
-class PublicationRoleInline(admin.TabularInline):
+class PublicationRoleInline(LookupFieldsMixin, admin.TabularInline):
     model = PublicationRole
     fields = ( 'creator', 'role_name', 'role_order',)
-    raw_id_fields = ('creator',)
+    lookup_fields = ('creator',)
     extra = 1
 
 
@@ -60,7 +61,7 @@ class ReadingsListFilter(admin.SimpleListFilter):
 
 
 @admin.register(Publication)
-class PublicationAdmin(admin.ModelAdmin):
+class PublicationAdmin(AutocompleteAdminMixin, admin.ModelAdmin):
     list_display = ('title', 'kind', 'show_creators', 'series', )
     list_filter = (ReadingsListFilter, 'kind', 'series', )
     search_fields = ('title',)
@@ -0,0 +1,65 @@
+from spectator.core.api import (
+    APIDetailView, APIListView, object_data, object_ref, role_objects,
+    roles_data, roles_prefetch
+)
+from .models import Publication, PublicationRole, Reading
+
+
+class PublicationAPIMixin(object):
+    model = Publication
+
+    def get_queryset(self):
+        return Publication.objects.select_related('series') \
+                            .prefetch_related(roles_prefetch(PublicationRole))
+
+    def serialize(self, obj):
+        return object_data(obj,
+            title=obj.title,
+            title_sort=obj.title_sort,
+            kind=obj.kind,
+            series=object_ref(obj.series) if obj.series else None,
+            isbn_uk=obj.isbn_uk,
+            isbn_us=obj.isbn_us,
+            official_url=obj.official_url,
+            notes_url=obj.notes_url,
+            roles=roles_data(obj.roles.all()))
+
+    def get_related_objects(self, obj):
+        objects = [obj.series] if obj.series else []
+        objects.extend(role_objects(obj.roles.all()))
+        return objects
+
+
+class PublicationListAPIView(PublicationAPIMixin, APIListView):
+    pass
+
+
+class PublicationDetailAPIView(PublicationAPIMixin, APIDetailView):
+    pass
+
+
+class ReadingAPIMixin(object):
+    model = Reading
+
+    def get_queryset(self):
+        return Reading.objects.select_related('publication')
+
+    def serialize(self, obj):
+        return object_data(obj,
+            publication=object_ref(obj.publication),
+            start_date=obj.start_date,
+            start_granularity=obj.start_granularity,
+            end_date=obj.end_date,
+            end_granularity=obj.end_granularity,
+            is_finished=obj.is_finished)
+
+    def get_related_objects(self, obj):
+        return [obj.publication]
+
+
+class ReadingListAPIView(ReadingAPIMixin, APIListView):
+    pass
+
+
+class ReadingDetailAPIView(ReadingAPIMixin, APIDetailView):
+    pass
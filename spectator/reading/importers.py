@@ -0,0 +1,104 @@
+import datetime
+import re
+
+from spectator.core.importers import (
+    Importer, NameIndex, parse_bool, parse_date, parse_items, parse_kind, text
+)
+from spectator.core.models import Creator
+from .models import Publication, PublicationRole, PublicationSeries, Reading
+from .utils import annual_reading_counter
+
+
+PARTIAL_DATE_RE = re.compile(r'^(\d{4})(?:-(\d{1,2}))?$')
+
+
+def parse_reading_date(value):
+    """
+    Returns a (date, granularity) tuple for a Reading's start or end date.
+    `value` can be like '2018-03-31', or just '2018-03' or '2018', with
+    the matching granularity (see Reading.DATE_GRANULARITIES).
+    """
+    match = PARTIAL_DATE_RE.match('' if value is None else str(value).strip())
+    if match is None:
+        return parse_date(value), 3
+    elif match.group(2) is None:
+        return datetime.date(int(match.group(1)), 1, 1), 6
+    else:
+        return datetime.date(int(match.group(1)), int(match.group(2)), 1), 4
+
+
+class ReadingImporter(Importer):
+    """
+    Imports a Publication, and optionally a Reading of it, per row, with
+    these fields:
+
+        title -- Required. The Publication's title.
+        kind -- 'book' (the default) or 'periodical'.
+        series -- The title of a PublicationSeries, which is created if it
+                  doesn't exist.
+        isbn_uk, isbn_us, official_url, notes_url
+        creators -- See parse_items(). e.g. 'Jane Austen; Tony Tanner|Editor'
+        start_date, end_date -- e.g. '2018-03-31', '2018-03' or '2018'.
+        is_finished -- e.g. 'true' or '1'.
+
+    Publications that already exist, with the same title, are used rather
+    than created, leaving their kind, series, etc unchanged. A Reading is
+    only created if the row has a start_date, end_date or is_finished.
+    """
+    models = (Creator, PublicationSeries, Publication, PublicationRole,
+              Reading)
+
+    leaderboards = ('readings', 'publications')
+
+    annual_counters = (annual_reading_counter,)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.series = NameIndex(PublicationSeries, ('title',),
+                                using=self.using)
+        self.publications = NameIndex(Publication, ('title',),
+                                      using=self.using)
+
+    def add_row(self, row):
+        title = text(row, 'title')
+        if not title:
+            raise ValueError('A Publication needs a title')
+
+        publication = self.publications.get([title])
+
+        if publication is None:
+            publication = Publication(
+                            title=title,
+                            kind=parse_kind(text(row, 'kind'), Publication,
+                                            default='book'),
+                            isbn_uk=text(row, 'isbn_uk'),
+                            isbn_us=text(row, 'isbn_us'),
+                            official_url=text(row, 'official_url'),
+                            notes_url=text(row, 'notes_url'))
+
+            if text(row, 'series'):
+                publication.series = self.get_or_add(self.series,
+                                                     title=text(row, 'series'))
+
+            self.add(publication)
+            self.publications.add(publication)
+
+            self.add_roles(PublicationRole, 'publication', publication,
+                        parse_items(row.get('creators'), self.creator_keys))
+
+        start_date, start_granularity = parse_reading_date(
+                                                        row.get('start_date'))
+        end_date, end_granularity = parse_reading_date(row.get('end_date'))
+        is_finished = parse_bool(row.get('is_finished'))
+
+        if start_date or end_date or is_finished:
+            if start_date and end_date and start_date > end_date:
+                raise ValueError(
+                    "A Reading's end date can't be before its start date.")
+
+            self.add(Reading(publication=publication,
+                             start_date=start_date,
+                             start_granularity=start_granularity,
+                             end_date=end_date,
+                             end_granularity=end_granularity,
+                             is_finished=is_finished))
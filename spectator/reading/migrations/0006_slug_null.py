@@ -0,0 +1,42 @@
+# Generated by Django 2.1.15 on 2026-10-18 16:52
+
+from django.db import migrations, models
+
+
+MODEL_NAMES = ['publication', 'publicationseries']
+
+
+def forwards(apps, schema_editor):
+    """
+    Empty slugs become null, so that they don't clash once slugs are unique.
+    """
+    for name in MODEL_NAMES:
+        Model = apps.get_model('spectator_reading', name)
+        Model.objects.filter(slug='').update(slug=None)
+
+
+def backwards(apps, schema_editor):
+    for name in MODEL_NAMES:
+        Model = apps.get_model('spectator_reading', name)
+        Model.objects.filter(slug__isnull=True).update(slug='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spectator_reading', '0005_auto_20180125_1348'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='publication',
+            name='slug',
+            field=models.SlugField(blank=True, max_length=10, null=True),
+        ),
+        migrations.AlterField(
+            model_name='publicationseries',
+            name='slug',
+            field=models.SlugField(blank=True, max_length=10, null=True),
+        ),
+        migrations.RunPython(forwards, backwards),
+    ]
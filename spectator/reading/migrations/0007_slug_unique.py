@@ -0,0 +1,23 @@
+# Generated by Django 2.1.15 on 2026-10-18 16:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spectator_reading', '0006_slug_null'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='publication',
+            name='slug',
+            field=models.SlugField(blank=True, max_length=10, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='publicationseries',
+            name='slug',
+            field=models.SlugField(blank=True, max_length=10, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 2.1.15 on 2026-10-18 17:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spectator_reading', '0007_slug_unique'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='publication',
+            name='time_modified',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='The time this item was last saved to the database.'),
+        ),
+        migrations.AlterField(
+            model_name='publicationrole',
+            name='time_modified',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='The time this item was last saved to the database.'),
+        ),
+        migrations.AlterField(
+            model_name='publicationseries',
+            name='time_modified',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='The time this item was last saved to the database.'),
+        ),
+        migrations.AlterField(
+            model_name='reading',
+            name='time_modified',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='The time this item was last saved to the database.'),
+        ),
+    ]
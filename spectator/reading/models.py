@@ -3,6 +3,7 @@ from django.core.exceptions import ValidationError
 from django.db import models
 from django.urls import reverse
 
+from spectator.core.managers import SluggedModelManager
 from spectator.core.models import BaseRole, Creator, SluggedModelMixin,\
         TimeStampedModelMixin
 from . import managers
@@ -108,7 +109,7 @@ class Publication(TimeStampedModelMixin, SluggedModelMixin, models.Model):
     creators = models.ManyToManyField('spectator_core.Creator',
                     through='PublicationRole', related_name='publications')
 
-    objects = models.Manager()
+    objects = SluggedModelManager()
     # Publications that are currently being read:
     in_progress_objects = managers.InProgressPublicationsManager()
     # Publications that haven't been started (have no Readings):
@@ -1,26 +1,28 @@
-from django.contrib.sitemaps import Sitemap
+from django.urls import reverse
 
+from spectator.core.sitemaps import SectionedSitemap
 from .models import Publication, PublicationSeries
 
 
-class PublicationSitemap(Sitemap):
+class PublicationSitemap(SectionedSitemap):
     changefreq = 'yearly'
     priority = 0.5
 
-    def items(self):
+    def get_queryset(self):
         return Publication.objects.all()
 
-    def lastmod(self, obj):
-        return obj.time_modified
+    def location(self, item):
+        return reverse('spectator:reading:publication_detail',
+                       kwargs={'slug': item['slug']})
 
 
-class PublicationSeriesSitemap(Sitemap):
+class PublicationSeriesSitemap(SectionedSitemap):
     changefreq = 'monthly'
     priority = 0.5
 
-    def items(self):
+    def get_queryset(self):
         return PublicationSeries.objects.all()
 
-    def lastmod(self, obj):
-        return obj.time_modified
-
+    def location(self, item):
+        return reverse('spectator:reading:publicationseries_detail',
+                       kwargs={'slug': item['slug']})
@@ -3,6 +3,7 @@ from django.db.models import Q
 from django.utils.html import format_html
 
 from spectator.core import app_settings
+from spectator.core.cache import cache_card
 from ..models import Publication, Reading
 from .. import utils
 
@@ -29,6 +30,8 @@ def annual_reading_counts(kind='all'):
     return utils.annual_reading_counts(kind=kind)
 
 
+@cache_card(register, 'spectator_reading.Reading',
+            'spectator_reading.Publication', 'spectator_core.AnnualCount')
 @register.inclusion_tag('spectator_reading/includes/card_annual_reading_counts.html')
 def annual_reading_counts_card(kind='all', current_year=None):
     """
@@ -63,6 +66,9 @@ def in_progress_publications():
                         .prefetch_related('roles__creator')
 
 
+@cache_card(register, 'spectator_reading.Publication',
+            'spectator_reading.Reading', 'spectator_reading.PublicationSeries',
+            'spectator_reading.PublicationRole', 'spectator_core.Creator')
 @register.inclusion_tag('spectator_reading/includes/card_publications.html')
 def in_progress_publications_card():
     """
@@ -119,6 +125,7 @@ def reading_years():
     return Reading.objects.dates('end_date', 'year')
 
 
+@cache_card(register, 'spectator_reading.Reading')
 @register.inclusion_tag('spectator_reading/includes/card_years.html')
 def reading_years_card(current_year=None):
     """
@@ -5,13 +5,25 @@ from django.utils.translation import ugettext as _
 from django.views.generic import DetailView, ListView, YearArchiveView
 from django.views.generic.detail import SingleObjectMixin
 
+from spectator.core.counts import count_kinds, get_kind_counts
 from spectator.core.models import Creator
-from spectator.core.views import PaginatedListView
-from .models import Publication, PublicationSeries, Reading
+from spectator.core.views import (
+    ConditionalDetailMixin, ConditionalGetMixin, DecodeSlugMixin,
+    PaginatedListView
+)
+from .models import Publication, PublicationRole, PublicationSeries, Reading
 
 
-class ReadingHomeView(ListView):
+# The models shown by the cards in spectator_reading/base.html's sidebar, on
+# every page (in_progress_publications_card and annual_reading_counts_card):
+CARD_MODELS = ('spectator_reading.Publication', 'spectator_reading.Reading',
+               'spectator_reading.PublicationSeries',
+               'spectator_reading.PublicationRole', 'spectator_core.Creator')
+
+
+class ReadingHomeView(ConditionalGetMixin, ListView):
     model = Publication
+    card_models = CARD_MODELS
     template_name = 'spectator_reading/home.html'
     queryset = Publication.unread_objects.select_related('series')\
                             .prefetch_related('roles__creator').all()
@@ -26,18 +38,32 @@ class ReadingHomeView(ListView):
                                             .all()
         return context
 
+    def get_validator_querysets(self):
+        return [Publication.objects.all(), PublicationRole.objects.all(),
+                Reading.objects.all(), Creator.objects.all()]
 
-class PublicationSeriesListView(ListView):
+
+class PublicationSeriesListView(ConditionalGetMixin, ListView):
     model = PublicationSeries
+    card_models = CARD_MODELS
 
 
-class PublicationSeriesDetailView(SingleObjectMixin, PaginatedListView):
+class PublicationSeriesDetailView(ConditionalDetailMixin, DecodeSlugMixin,
+                                    SingleObjectMixin, PaginatedListView):
     template_name = 'spectator_reading/publicationseries_detail.html'
+    card_models = CARD_MODELS
 
     def get(self, request, *args, **kwargs):
         self.object = self.get_object(queryset=PublicationSeries.objects.all())
         return super().get(request, *args, **kwargs)
 
+    def get_validator_querysets(self):
+        return [
+            self.object.publication_set.all(),
+            PublicationRole.objects.filter(publication__series=self.object),
+            Creator.objects.filter(publications__series=self.object),
+        ]
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['publicationseries'] = self.object
@@ -49,8 +75,9 @@ class PublicationSeriesDetailView(SingleObjectMixin, PaginatedListView):
                             .prefetch_related('roles__creator').all()
 
 
-class PublicationListView(PaginatedListView):
+class PublicationListView(ConditionalGetMixin, PaginatedListView):
     model = Publication
+    card_models = CARD_MODELS
     publication_kind = 'book'
 
     def get(self, request, *args, **kwargs):
@@ -62,9 +89,9 @@ class PublicationListView(PaginatedListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['publication_kind'] = self.publication_kind
-        context['book_count'] = Publication.objects.filter(kind='book').count()
-        context['periodical_count'] = Publication.objects.filter(
-                                                    kind='periodical').count()
+        counts = get_kind_counts(Publication)
+        context['book_count'] = counts['book']
+        context['periodical_count'] = counts['periodical']
         return context
 
     def get_queryset(self):
@@ -74,6 +101,10 @@ class PublicationListView(PaginatedListView):
                 .prefetch_related('roles__creator')
         return qs
 
+    def get_validator_querysets(self):
+        return [Publication.objects.all(), PublicationSeries.objects.all(),
+                PublicationRole.objects.all(), Creator.objects.all()]
+
     def get_ordering(self):
         if self.publication_kind == 'periodical':
             return ('series__title_sort', 'title_sort',)
@@ -81,16 +112,28 @@ class PublicationListView(PaginatedListView):
             return ('title_sort',)
 
 
-class PublicationDetailView(DetailView):
+class PublicationDetailView(ConditionalDetailMixin, DecodeSlugMixin,
+                                                                DetailView):
     model = Publication
+    card_models = CARD_MODELS
+
+    def get_validator_querysets(self):
+        publication = self.get_object()
+        return [
+            PublicationSeries.objects.filter(pk=publication.series_id),
+            PublicationRole.objects.filter(publication=publication),
+            Creator.objects.filter(publications=publication),
+            Reading.objects.filter(publication=publication),
+        ]
 
 
-class ReadingYearArchiveView(YearArchiveView):
+class ReadingYearArchiveView(ConditionalGetMixin, YearArchiveView):
     allow_empty = True
     date_field = 'end_date'
     make_object_list = True
     model = Reading
     ordering = 'end_date'
+    card_models = CARD_MODELS
     # Could be set to 'periodical' or 'book' in get():
     publication_kind = None
     # Will be a QS of all publications finished this year:
@@ -112,11 +155,13 @@ class ReadingYearArchiveView(YearArchiveView):
         context = super().get_context_data(**kwargs)
         context['publication_kind'] = self.publication_kind
 
-        context['publication_count'] = self.all_publications_queryset.count()
-        context['book_count'] = self.all_publications_queryset \
-                                .filter(publication__kind='book').count()
-        context['periodical_count'] = self.all_publications_queryset \
-                                .filter(publication__kind='periodical').count()
+        # All three counts in one query:
+        counts = count_kinds(self.all_publications_queryset,
+                                kinds=[k for k, v in Publication.KIND_CHOICES],
+                                kind_field='publication__kind')
+        context['publication_count'] = counts['all']
+        context['book_count'] = counts['book']
+        context['periodical_count'] = counts['periodical']
         return context
 
     def get_queryset(self):
@@ -128,6 +173,11 @@ class ReadingYearArchiveView(YearArchiveView):
 
         return qs
 
+    def get_validator_querysets(self):
+        return [Reading.objects.all(), Publication.objects.all(),
+                PublicationSeries.objects.all(),
+                PublicationRole.objects.all(), Creator.objects.all()]
+
     def get_dated_items(self):
         items, qs, info = super().get_dated_items()
 
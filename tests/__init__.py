@@ -36,11 +36,10 @@ def override_app_settings(**test_settings):
                 old_values[key] = getattr(app_settings, key)
                 setattr(app_settings, key, value)
 
-            result = func(*args, **kwargs)
-
-            for key, value in test_settings.items():
-                setattr(app_settings, key, old_values[key])
-
-            return result
+            try:
+                return func(*args, **kwargs)
+            finally:
+                for key, value in test_settings.items():
+                    setattr(app_settings, key, old_values[key])
         return __override_app_settings
     return _override_app_settings
@@ -0,0 +1,153 @@
+import json
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import http_date
+
+from .. import override_app_settings
+from spectator.core.factories import *
+from spectator.core.models import Creator
+
+
+class APITestCase(TestCase):
+    "Parent class for the API view test cases."
+
+    def get(self, url, **kwargs):
+        response = self.client.get(url, **kwargs)
+        if response.streaming:
+            content = b''.join(response.streaming_content)
+        else:
+            content = response.content
+        return response, json.loads(content.decode()) if content else None
+
+
+class APIListViewTestCase(APITestCase):
+
+    def setUp(self):
+        self.creators = [IndividualCreatorFactory(name='Bob {}'.format(n))
+                         for n in range(5)]
+        self.url = reverse('spectator:api:creator_list')
+
+    def test_not_enabled(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+
+    @override_app_settings(API=True)
+    def test_streams_results(self):
+        response, data = self.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual([c['slug'] for c in data['results']],
+                         [c.slug for c in self.creators])
+        self.assertIsNone(data['next'])
+
+    @override_app_settings(API=True)
+    def test_creator_data(self):
+        response, data = self.get(self.url)
+        creator = self.creators[0]
+        result = data['results'][0]
+        self.assertEqual(result['name'], 'Bob 0')
+        self.assertEqual(result['name_sort'], '00000000, bob')
+        self.assertEqual(result['kind'], 'individual')
+        self.assertEqual(result['url'], creator.get_absolute_url())
+        self.assertIn('time_modified', result)
+
+    @override_app_settings(API=True)
+    def test_cursors(self):
+        response, data = self.get(self.url, data={'limit': 2})
+        self.assertEqual(len(data['results']), 2)
+
+        slugs = []
+        pages = 0
+        while True:
+            slugs += [c['slug'] for c in data['results']]
+            pages += 1
+            if data['next'] is None:
+                break
+            response, data = self.get(data['next'])
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(slugs, [c.slug for c in self.creators])
+
+    @override_app_settings(API=True)
+    def test_exact_limit_has_no_next(self):
+        response, data = self.get(self.url, data={'limit': 5})
+        self.assertEqual(len(data['results']), 5)
+        self.assertIsNone(data['next'])
+
+    @override_app_settings(API=True)
+    def test_invalid_limit(self):
+        for limit in ['0', '1001', 'foo']:
+            response = self.client.get(self.url, {'limit': limit})
+            self.assertEqual(response.status_code, 400)
+
+    @override_app_settings(API=True)
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'nonsense'})
+        self.assertEqual(response.status_code, 400)
+
+    @override_app_settings(API=True)
+    def test_queries(self):
+        "Fetching a page takes one query."
+        with CaptureQueriesContext(connection) as queries:
+            self.get(self.url, data={'limit': 3})
+        self.assertEqual(len(queries), 1)
+
+
+class APIDetailViewTestCase(APITestCase):
+
+    def setUp(self):
+        self.creator = IndividualCreatorFactory(name='Bob Ferris')
+        self.url = reverse('spectator:api:creator_detail',
+                           kwargs={'slug': self.creator.slug})
+
+    def test_not_enabled(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+
+    @override_app_settings(API=True)
+    def test_data(self):
+        response, data = self.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['slug'], self.creator.slug)
+        self.assertEqual(data['name'], 'Bob Ferris')
+
+    @override_app_settings(API=True)
+    def test_404(self):
+        response = self.client.get(reverse('spectator:api:creator_detail',
+                                           kwargs={'slug': 'nope'}))
+        self.assertEqual(response.status_code, 404)
+
+    @override_app_settings(API=True)
+    def test_headers(self):
+        response = self.client.get(self.url)
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertEqual(response['Last-Modified'],
+                    http_date(int(self.creator.time_modified.timestamp())))
+
+    @override_app_settings(API=True)
+    def test_if_none_match(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    @override_app_settings(API=True)
+    def test_if_modified_since(self):
+        last_modified = self.client.get(self.url)['Last-Modified']
+        response = self.client.get(self.url,
+                                   HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    @override_app_settings(API=True)
+    def test_etag_changes(self):
+        etag = self.client.get(self.url)['ETag']
+        self.creator.name = 'Terry Collier'
+        self.creator.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
@@ -0,0 +1,182 @@
+import json
+from unittest import skipIf
+
+import django
+from django.contrib.admin import site
+from django.contrib.admin.sites import AdminSite
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase
+from django.urls import resolve
+
+from .. import override_app_settings
+from spectator.core.autocomplete import (
+    MAX_CHAR, autocomplete, autocomplete_ids, get_sort_field
+)
+from spectator.core.factories import *
+from spectator.core.models import Creator
+from spectator.core.search import index_is_built, rebuild_index
+from spectator.events.admin import EventAdmin, EventRoleInline
+from spectator.events.factories import *
+from spectator.events.models import Event, Venue, Work
+from spectator.reading.factories import *
+from spectator.reading.models import Publication
+
+
+class AutocompleteTestCase(TestCase):
+
+    def names(self, queryset, term, **kwargs):
+        return [str(obj) for obj in autocomplete(queryset, term, **kwargs)]
+
+    def test_get_sort_field(self):
+        self.assertEqual(get_sort_field(Creator), 'name_sort')
+        self.assertEqual(get_sort_field(Work), 'title_sort')
+        self.assertEqual(get_sort_field(Venue), 'name_sort')
+        self.assertEqual(get_sort_field(Publication), 'title_sort')
+
+    def test_matches_sort_field_prefix(self):
+        GroupCreatorFactory(name='The Long Blondes')
+        GroupCreatorFactory(name='The Long Ryders')
+        GroupCreatorFactory(name='Longpigs')
+        GroupCreatorFactory(name='Blondie')
+
+        self.assertEqual(self.names(Creator.objects.all(), 'LONG '),
+                         ['The Long Blondes', 'The Long Ryders'])
+        self.assertEqual(self.names(Creator.objects.all(), 'long'),
+                         ['The Long Blondes', 'The Long Ryders', 'Longpigs'])
+
+    def test_matches_person_surname(self):
+        IndividualCreatorFactory(name='Douglas Adams')
+        IndividualCreatorFactory(name='Adam Ant')
+
+        self.assertEqual(self.names(Creator.objects.all(), 'adams'),
+                         ['Douglas Adams'])
+
+    def test_limit(self):
+        for n in range(5):
+            MovieFactory(title='Movie {}'.format(n))
+
+        self.assertEqual(len(autocomplete_ids(Work.objects.all(), 'movie',
+                                              limit=3)), 3)
+
+    def test_empty_term(self):
+        VenueFactory(name='Venue')
+
+        self.assertEqual(self.names(Venue.objects.all(), ' '), [])
+
+    def test_respects_queryset(self):
+        PublicationFactory(title='Apple Book', kind='book')
+        PublicationFactory(title='Apple Magazine', kind='periodical')
+
+        qs = Publication.objects.filter(kind='book')
+        self.assertEqual(self.names(qs, 'apple'), ['Apple Book'])
+
+    def test_no_word_matches_without_search_index(self):
+        VenueFactory(name='Cafe Oto')
+
+        self.assertEqual(self.names(Venue.objects.all(), 'oto'), [])
+
+    def test_max_char_in_basic_multilingual_plane(self):
+        "So it can be used with MySQL's 3-byte utf8 columns."
+        self.assertLessEqual(ord(MAX_CHAR), 0xffff)
+
+    @override_app_settings(SEARCH_INDEX=True)
+    def test_no_word_matches_before_index_built(self):
+        VenueFactory(name='Cafe Oto')
+
+        self.assertEqual(self.names(Venue.objects.all(), 'oto'), [])
+        self.assertFalse(index_is_built())
+
+    @override_app_settings(SEARCH_INDEX=True)
+    def test_word_matches_with_search_index(self):
+        "Prefix matches come first, then words from the search index."
+        rebuild_index()
+        IndividualCreatorFactory(name='Douglas Adams')
+        IndividualCreatorFactory(name='Bob Douglas')
+        IndividualCreatorFactory(name='Terry Pratchett')
+
+        self.assertEqual(self.names(Creator.objects.all(), 'douglas'),
+                         ['Bob Douglas', 'Douglas Adams'])
+        self.assertEqual(self.names(Creator.objects.all(), 'douglas ad'),
+                         ['Douglas Adams'])
+
+    @override_app_settings(SEARCH_INDEX=True)
+    def test_word_matches_only_this_model(self):
+        rebuild_index()
+        IndividualCreatorFactory(name='Bob Apple')
+        MovieFactory(title='An Apple Movie')
+
+        self.assertEqual(self.names(Work.objects.all(), 'apple'),
+                         ['An Apple Movie'])
+
+
+class LookupFieldsTestCase(TestCase):
+
+    def test_widgets(self):
+        site = AdminSite()
+        admin = EventAdmin(Event, site)
+        inline = EventRoleInline(Event, site)
+
+        if django.VERSION >= (2, 0):
+            self.assertEqual(admin.autocomplete_fields, ('venue',))
+            self.assertEqual(inline.autocomplete_fields, ('creator',))
+        else:
+            self.assertEqual(admin.raw_id_fields, ('venue',))
+            self.assertEqual(inline.raw_id_fields, ('creator',))
+
+
+@skipIf(django.VERSION < (2, 0), "The admin has autocompletion from 2.0")
+class AutocompleteAdminTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_superuser(
+                                        'admin', 'a@example.com', 'pass')
+
+    def get_results(self, model, term):
+        path = '/admin/{}/{}/autocomplete/'.format(model._meta.app_label,
+                                                   model._meta.model_name)
+        request = RequestFactory().get(path, {'term': term})
+        request.user = self.user
+        request.resolver_match = resolve(path)
+
+        response = site._registry[model].autocomplete_view(request)
+        self.assertEqual(response.status_code, 200)
+        return [r['text'] for r in
+                            json.loads(response.content.decode())['results']]
+
+    def test_creator(self):
+        GroupCreatorFactory(name='The Long Blondes')
+        GroupCreatorFactory(name='Blondie')
+
+        self.assertEqual(self.get_results(Creator, 'long b'),
+                         ['The Long Blondes'])
+
+    def test_work(self):
+        MovieFactory(title='Alien')
+        MovieFactory(title='Aliens')
+        MovieFactory(title='Blade Runner')
+
+        self.assertEqual(self.get_results(Work, 'alien'), ['Alien', 'Aliens'])
+
+    def test_venue(self):
+        VenueFactory(name='Cafe Oto')
+        VenueFactory(name='Royal Albert Hall')
+
+        self.assertEqual(self.get_results(Venue, 'caf'), ['Cafe Oto'])
+
+    def test_publication(self):
+        PublicationFactory(title='The Hobbit')
+        PublicationFactory(title='Hobbies')
+
+        self.assertEqual(self.get_results(Publication, 'hobbit'),
+                         ['The Hobbit'])
+
+    def test_changelist_search_unchanged(self):
+        "Other searches still use search_fields."
+        VenueFactory(name='Cafe Oto')
+
+        request = RequestFactory().get('/admin/spectator_events/venue/')
+        request.resolver_match = resolve('/admin/spectator_events/venue/')
+
+        qs, use_distinct = site._registry[Venue].get_search_results(
+                                        request, Venue.objects.all(), 'oto')
+        self.assertEqual([str(v) for v in qs], ['Cafe Oto'])
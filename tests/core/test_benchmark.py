@@ -0,0 +1,189 @@
+import json
+import os
+import random
+import shutil
+import tempfile
+from collections import Counter
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from spectator.core.benchmark.catalog import CatalogGenerator, SkewedChooser
+from spectator.core.benchmark.runner import (
+    Benchmark, compare_reports, get_benchmarks, isolated_cache, make_report,
+    run_benchmarks
+)
+from spectator.core.cache import get_cache, get_generations
+from spectator.core.models import Creator
+from spectator.events.models import Event, Venue, Work
+from spectator.reading.models import Publication, Reading
+
+
+class SkewedChooserTestCase(TestCase):
+
+    def test_range(self):
+        chooser = SkewedChooser(10, random.Random(1))
+        self.assertTrue(all(0 <= chooser.choose() < 10 for i in range(500)))
+
+    def test_skewed(self):
+        chooser = SkewedChooser(100, random.Random(1))
+        counts = Counter(chooser.choose() for i in range(2000))
+        # The most popular is chosen far more often than a typical one:
+        self.assertEqual(counts.most_common(1)[0][0], 0)
+        self.assertGreater(counts[0], 10 * counts[50])
+
+    def test_sample(self):
+        chooser = SkewedChooser(100, random.Random(1))
+        sample = chooser.sample(5)
+        self.assertLessEqual(len(sample), 5)
+        self.assertEqual(len(sample), len(set(sample)))
+
+
+class CatalogGeneratorTestCase(TestCase):
+
+    def test_generate(self):
+        created = CatalogGenerator(300, seed=1).generate()
+
+        self.assertEqual(Event.objects.count(), 300)
+        self.assertEqual(created['events'], 300)
+        self.assertEqual(Reading.objects.count(), 75)
+        self.assertGreater(Creator.objects.count(), 0)
+        self.assertGreater(Venue.objects.count(), 0)
+        self.assertGreater(Work.objects.count(), 0)
+        self.assertGreater(Publication.objects.count(), 0)
+
+    def test_unfinished_readings(self):
+        CatalogGenerator(300, seed=1).generate()
+        self.assertEqual(Reading.objects.filter(end_date__isnull=True).count(),
+                         5)
+
+    def test_seed(self):
+        "The same seed generates the same rows."
+        rows1 = list(CatalogGenerator(100, seed=1).event_rows())
+        rows2 = list(CatalogGenerator(100, seed=1).event_rows())
+        rows3 = list(CatalogGenerator(100, seed=2).event_rows())
+        self.assertEqual(rows1, rows2)
+        self.assertNotEqual(rows1, rows3)
+
+
+class RunnerTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        CatalogGenerator(200, seed=1).generate()
+
+    def test_benchmarks(self):
+        results = run_benchmarks(get_benchmarks(), repeats=1)
+
+        self.assertEqual(results['home']['status_code'], 200)
+        self.assertEqual(results['event list p=1']['status_code'], 200)
+        self.assertEqual(results['event list p=last']['status_code'], 200)
+        self.assertEqual(results['work detail busiest']['status_code'], 200)
+        self.assertIn('card most_seen_creators_card', results)
+        # There aren't this many pages:
+        self.assertEqual(results['venue list p=100']['status_code'], 404)
+        for result in results.values():
+            self.assertGreaterEqual(result['queries'], 0)
+            self.assertLessEqual(result['min_ms'], result['max_ms'])
+
+    def test_run(self):
+        calls = []
+        result = Benchmark('test', lambda: calls.append(1)).run(repeats=3)
+        # A cold call, 3 timed ones, and one counting queries and memory:
+        self.assertEqual(len(calls), 5)
+        self.assertEqual(result['queries'], 0)
+        self.assertNotIn('status_code', result)
+
+    def test_report(self):
+        report = make_report({'home': {'median_ms': 1}}, events=200)
+        self.assertEqual(report['events'], 200)
+        self.assertEqual(report['database'], 'sqlite')
+        self.assertIn('CACHE_CARDS', report['settings'])
+        self.assertNotIn('GOOGLE_MAPS_API_KEY', report['settings'])
+
+    def test_compare_reports(self):
+        old = {'results': {'a': {'median_ms': 10}}}
+        new = {'results': {'a': {'median_ms': 5}, 'b': {'median_ms': 2}}}
+        self.assertEqual(list(compare_reports(old, new)),
+                         [('a', 10, 5, -0.5), ('b', None, 2, None)])
+
+
+class BenchmarkCommandTestCase(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+
+    def test_command(self):
+        output = os.path.join(self.path, 'report.json')
+        out = StringIO()
+        call_command('spectator_benchmark', '--use-existing-database',
+                     events=100, repeats=1, output=output, stdout=out)
+
+        with open(output) as f:
+            report = json.load(f)
+
+        self.assertEqual(report['events'], 100)
+        self.assertEqual(report['counts']['events'], 100)
+        self.assertIsNotNone(report['generation_seconds'])
+        self.assertEqual(report['results']['home']['status_code'], 200)
+        self.assertIn('Generating a catalog of 100 Events', out.getvalue())
+
+    def test_isolated_cache(self):
+        get_cache().set('spectator:test', 'real')
+        with isolated_cache():
+            self.assertIsNone(get_cache().get('spectator:test'))
+            get_cache().set('spectator:test', 'benchmark')
+        self.assertEqual(get_cache().get('spectator:test'), 'real')
+
+    def test_bumps_real_generations(self):
+        "The real cache's generations change if a catalog is generated."
+        old = get_generations([Event])
+        call_command('spectator_benchmark', '--use-existing-database',
+                     events=20, repeats=1, stdout=StringIO())
+        self.assertNotEqual(get_generations([Event]), old)
+
+    def test_existing_catalog(self):
+        "It doesn't generate a catalog if there's already one."
+        CatalogGenerator(50).generate()
+        out = StringIO()
+        call_command('spectator_benchmark', '--use-existing-database',
+                     events=100, repeats=1, stdout=out)
+
+        self.assertEqual(Event.objects.count(), 50)
+        self.assertIn('Using the existing catalog', out.getvalue())
+
+    def test_existing_catalog_size_reported(self):
+        "The report has the size of the catalog used, not --events."
+        CatalogGenerator(50).generate()
+        output = os.path.join(self.path, 'report.json')
+        call_command('spectator_benchmark', '--use-existing-database',
+                     events=100, repeats=1, output=output, stdout=StringIO())
+
+        with open(output) as f:
+            report = json.load(f)
+
+        self.assertEqual(report['events'], 50)
+        self.assertEqual(report['counts']['events'], 50)
+
+    def test_compare_different_catalogs(self):
+        old = os.path.join(self.path, 'old.json')
+        with open(old, 'w') as f:
+            json.dump({'counts': {'events': 1000}, 'results': {}}, f)
+        out = StringIO()
+        call_command('spectator_benchmark', '--use-existing-database',
+                     events=20, repeats=1, compare=old, stdout=out)
+
+        self.assertIn('The reports are of different catalogs', out.getvalue())
+        self.assertIn('events: 1000 -> 20', out.getvalue())
+
+    def test_compare_same_catalog(self):
+        new = os.path.join(self.path, 'new.json')
+        call_command('spectator_benchmark', '--use-existing-database',
+                     events=20, repeats=1, output=new, stdout=StringIO())
+        out = StringIO()
+        call_command('spectator_benchmark', '--use-existing-database',
+                     events=20, repeats=1, compare=new, stdout=out)
+
+        self.assertNotIn('different catalogs', out.getvalue())
@@ -0,0 +1,246 @@
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.template import RequestContext, Template
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from .. import make_date, override_app_settings
+from ..core.test_views import ViewTestCase
+from spectator.core import views
+from spectator.core.cache import (
+    bump_generation, bump_named_generation, get_cached_count, get_generations,
+    get_named_generation, get_queryset_models
+)
+from spectator.core.factories import *
+from spectator.core.models import Creator
+from spectator.events.factories import *
+from spectator.events.models import Event, EventRole, Venue
+
+
+class GenerationsTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_same_generation(self):
+        self.assertEqual(get_generations([Event]), get_generations([Event]))
+
+    def test_bump_generation(self):
+        old = get_generations([Event, Venue])
+        bump_generation(Event)
+        new = get_generations([Event, Venue])
+        self.assertNotEqual(old[Event], new[Event])
+        self.assertEqual(old[Venue], new[Venue])
+
+    def test_bump_missing_generation(self):
+        "It should be fine if there's no generation yet."
+        bump_generation(Event)
+        self.assertIn(Event, get_generations([Event]))
+
+    def test_named_generation(self):
+        old = get_named_generation('test')
+        self.assertEqual(get_named_generation('test'), old)
+        bump_named_generation('test')
+        self.assertNotEqual(get_named_generation('test'), old)
+
+    @override_app_settings(CACHE_PAGINATOR_COUNTS=True)
+    def test_bumped_on_save(self):
+        old = get_generations([Creator])
+        IndividualCreatorFactory()
+        self.assertNotEqual(old, get_generations([Creator]))
+
+    @override_app_settings(CACHE_PAGINATOR_COUNTS=True)
+    def test_bumped_on_delete(self):
+        creator = IndividualCreatorFactory()
+        old = get_generations([Creator])
+        creator.delete()
+        self.assertNotEqual(old, get_generations([Creator]))
+
+    @override_app_settings(CACHE_PAGINATOR_COUNTS=True)
+    def test_bumped_on_bulk_create(self):
+        old = get_generations([Creator])
+        Creator.objects.bulk_create([Creator(name='Bob')])
+        self.assertNotEqual(old, get_generations([Creator]))
+
+    @override_app_settings(CACHE_CARDS=True)
+    def test_bumped_on_bulk_create_for_cards(self):
+        old = get_generations([Creator])
+        Creator.objects.bulk_create([Creator(name='Bob')])
+        self.assertNotEqual(old, get_generations([Creator]))
+
+
+class BumpOnCommitTestCase(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_bumped_again_on_commit(self):
+        """
+        Anything cached using the new generation before the commit could be
+        from before the transaction, so it's bumped again.
+        """
+        old = get_generations([Event])[Event]
+        with transaction.atomic():
+            bump_generation(Event)
+            bump_generation(Event)
+            during = get_generations([Event])[Event]
+            self.assertNotEqual(during, old)
+        self.assertEqual(get_generations([Event])[Event], during + 1)
+
+    def test_not_bumped_on_rollback(self):
+        try:
+            with transaction.atomic():
+                bump_named_generation('test')
+                during = get_named_generation('test')
+                raise ValueError
+        except ValueError:
+            pass
+        self.assertEqual(get_named_generation('test'), during)
+
+    def test_outside_transaction(self):
+        old = get_named_generation('test')
+        bump_named_generation('test')
+        self.assertEqual(get_named_generation('test'), old + 1)
+
+
+class GetCachedCountTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_queryset_models(self):
+        qs = Event.objects.filter(roles__creator__name='Bob')
+        self.assertEqual(set(get_queryset_models(qs)),
+                         {Event, EventRole, Creator})
+
+    def test_caches_count(self):
+        GigEventFactory.create_batch(2)
+        qs = Event.objects.filter(kind='gig')
+        self.assertEqual(get_cached_count(qs), 2)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_cached_count(qs), 2)
+
+    def test_ignores_ordering(self):
+        GigEventFactory()
+        get_cached_count(Event.objects.order_by('date'))
+
+        with self.assertNumQueries(0):
+            get_cached_count(Event.objects.order_by('-pk')
+                                          .select_related('venue'))
+
+    def test_different_querysets(self):
+        GigEventFactory.create_batch(2)
+        self.assertEqual(get_cached_count(Event.objects.filter(kind='gig')), 2)
+        self.assertEqual(get_cached_count(Event.objects.filter(kind='play')),
+                         0)
+
+    @override_app_settings(CACHE_PAGINATOR_COUNTS=True)
+    def test_invalidated_by_joined_model(self):
+        creator = IndividualCreatorFactory(name='Bob')
+        EventRoleFactory(creator=creator)
+        qs = Event.objects.filter(roles__creator__name='Bob')
+        self.assertEqual(get_cached_count(qs), 1)
+
+        creator.name = 'Terry'
+        creator.save()
+
+        self.assertEqual(get_cached_count(qs), 0)
+
+
+class CachedCountViewTestCase(ViewTestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    @override_app_settings(CACHE_PAGINATOR_COUNTS=True)
+    def test_creator_list_count(self):
+        IndividualCreatorFactory.create_batch(2)
+        view = views.CreatorListView.as_view()
+
+        response = view(self.request)
+        self.assertEqual(response.context_data['paginator'].count, 2)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = view(self.request)
+        self.assertEqual(response.context_data['paginator'].count, 2)
+        self.assertFalse(any('"__count"' in q['sql']
+                             for q in queries.captured_queries))
+
+        IndividualCreatorFactory()
+
+        response = view(self.request)
+        self.assertEqual(response.context_data['paginator'].count, 3)
+
+
+class CachedCardTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        GigEventFactory(date=make_date('2017-01-01'))
+
+    def render(self, template_string):
+        request = RequestFactory().get('/')
+        request.resolver_match = None
+        return Template(
+            '{% load spectator_events %}' + template_string
+        ).render(RequestContext(request))
+
+    @override_app_settings(CACHE_CARDS=True)
+    def test_caches_html(self):
+        html = self.render('{% events_years_card %}')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.render('{% events_years_card %}'), html)
+
+    def test_not_cached_by_default(self):
+        self.render('{% events_years_card %}')
+
+        with self.assertNumQueries(1):
+            self.render('{% events_years_card %}')
+
+    @override_app_settings(CACHE_CARDS=True)
+    def test_invalidated_by_save(self):
+        self.render('{% events_years_card %}')
+        GigEventFactory(date=make_date('2018-01-01'))
+
+        self.assertIn('2018', self.render('{% events_years_card %}'))
+
+    @override_app_settings(CACHE_CARDS=True)
+    def test_other_models_dont_invalidate(self):
+        self.render('{% events_years_card %}')
+        IndividualCreatorFactory()
+
+        with self.assertNumQueries(0):
+            self.render('{% events_years_card %}')
+
+    @override_app_settings(CACHE_CARDS=True)
+    def test_arguments_in_key(self):
+        all_html = self.render("{% annual_event_counts_card kind='all' %}")
+        cinema_html = self.render(
+                                "{% annual_event_counts_card kind='cinema' %}")
+
+        self.assertIn('Events per year', all_html)
+        self.assertNotIn('Events per year', cinema_html)
+
+    @override_app_settings(CACHE_CARDS=True, LEADERBOARD_TABLES=True)
+    def test_invalidated_by_leaderboard_rebuild(self):
+        "Charts read from tables that are rebuilt without sending signals."
+        from spectator.core.leaderboards import rebuild_leaderboards
+
+        def add_events(name, num):
+            creator = IndividualCreatorFactory(name=name)
+            for i in range(num):
+                EventRoleFactory(event=GigEventFactory(), creator=creator)
+
+        add_events('Bob', 3)
+        add_events('Terry', 2)
+        rebuild_leaderboards()
+        self.assertNotIn('Kate', self.render('{% most_seen_creators_card %}'))
+
+        add_events('Kate', 4)
+        # As if the roles were added in a transaction that's just committed:
+        rebuild_leaderboards()
+
+        self.assertIn('Kate', self.render('{% most_seen_creators_card %}'))
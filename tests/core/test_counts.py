@@ -0,0 +1,293 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from .. import make_date, override_app_settings
+from spectator.core.counts import count_kinds, get_kind_counts
+from spectator.core.factories import *
+from spectator.core.models import AnnualCount, Creator, KindCount
+from spectator.events.factories import *
+from spectator.events.models import Event
+from spectator.events.utils import annual_event_counter
+from spectator.reading.factories import PublicationFactory, ReadingFactory
+from spectator.reading.utils import annual_reading_counter
+
+
+class CountKindsTestCase(TestCase):
+
+    def test_counts(self):
+        GigEventFactory.create_batch(3)
+        CinemaEventFactory()
+
+        with self.assertNumQueries(1):
+            counts = count_kinds(Event.objects.all(),
+                                    kinds=[k for k, v in Event.KIND_CHOICES])
+
+        self.assertEqual(counts['all'], 4)
+        self.assertEqual(counts['gig'], 3)
+        self.assertEqual(counts['cinema'], 1)
+        self.assertEqual(counts['theatre'], 0)
+
+    def test_kind_field(self):
+        event = GigEventFactory()
+        WorkSelectionFactory(event=event, work=MovieFactory())
+        WorkSelectionFactory(event=event, work=PlayFactory())
+        WorkSelectionFactory(event=GigEventFactory(), work=MovieFactory())
+
+        counts = count_kinds(Event.objects.all(),
+                                kinds=['movie', 'play'],
+                                kind_field='works__kind')
+
+        self.assertEqual(counts, {'all': 3, 'movie': 2, 'play': 1})
+
+
+class GetKindCountsTestCase(TestCase):
+
+    def setUp(self):
+        IndividualCreatorFactory.create_batch(2)
+        GroupCreatorFactory()
+
+    def test_without_table(self):
+        with self.assertNumQueries(1):
+            counts = get_kind_counts(Creator)
+
+        self.assertEqual(counts, {'all': 3, 'individual': 2, 'group': 1})
+        self.assertEqual(KindCount.objects.count(), 0)
+
+    @override_app_settings(KIND_COUNTS_TABLE=True)
+    def test_builds_table(self):
+        counts = get_kind_counts(Creator)
+
+        self.assertEqual(counts, {'all': 3, 'individual': 2, 'group': 1})
+        self.assertEqual(
+            KindCount.objects.get(model_label='spectator_core.creator',
+                                  kind='individual').count,
+            2)
+
+    @override_app_settings(KIND_COUNTS_TABLE=True)
+    def test_reads_table(self):
+        get_kind_counts(Creator)
+
+        with self.assertNumQueries(1):
+            counts = get_kind_counts(Creator)
+
+        self.assertEqual(counts, {'all': 3, 'individual': 2, 'group': 1})
+
+    @override_app_settings(KIND_COUNTS_TABLE=True)
+    def test_create(self):
+        get_kind_counts(Creator)
+        GroupCreatorFactory()
+
+        self.assertEqual(get_kind_counts(Creator)['group'], 2)
+
+    @override_app_settings(KIND_COUNTS_TABLE=True)
+    def test_change_kind(self):
+        get_kind_counts(Creator)
+        creator = Creator.objects.filter(kind='individual').first()
+        creator.kind = 'group'
+        creator.save()
+
+        self.assertEqual(get_kind_counts(Creator),
+                        {'all': 3, 'individual': 1, 'group': 2})
+
+    @override_app_settings(KIND_COUNTS_TABLE=True)
+    def test_save_unchanged(self):
+        get_kind_counts(Creator)
+        creator = Creator.objects.filter(kind='individual').first()
+        creator.save()
+
+        self.assertEqual(get_kind_counts(Creator),
+                        {'all': 3, 'individual': 2, 'group': 1})
+
+    @override_app_settings(KIND_COUNTS_TABLE=True)
+    def test_delete(self):
+        get_kind_counts(Creator)
+        Creator.objects.filter(kind='group').first().delete()
+
+        self.assertEqual(get_kind_counts(Creator),
+                        {'all': 2, 'individual': 2, 'group': 0})
+
+    @override_app_settings(KIND_COUNTS_TABLE=True)
+    def test_delete_never_below_zero(self):
+        "A count that's already too low is rebuilt, not subtracted from."
+        get_kind_counts(Creator)
+        KindCount.objects.filter(model_label='spectator_core.creator',
+                                 kind='group').update(count=0)
+        Creator.objects.filter(kind='group').first().delete()
+
+        self.assertEqual(get_kind_counts(Creator),
+                        {'all': 2, 'individual': 2, 'group': 0})
+
+    @override_app_settings(KIND_COUNTS_TABLE=True)
+    def test_change_kind_from_uncounted(self):
+        get_kind_counts(Creator)
+        KindCount.objects.filter(model_label='spectator_core.creator',
+                                 kind='individual').delete()
+        creator = Creator.objects.filter(kind='individual').first()
+        creator.kind = 'group'
+        creator.save()
+
+        self.assertEqual(get_kind_counts(Creator),
+                        {'all': 3, 'individual': 1, 'group': 2})
+
+    @override_app_settings(KIND_COUNTS_TABLE=True)
+    def test_no_rows_before_built(self):
+        "Saving shouldn't create partial counts before the table's built."
+        GigEventFactory()
+
+        self.assertEqual(KindCount.objects.count(), 0)
+
+
+class RebuildKindCountsTestCase(TestCase):
+
+    def test_rebuilds(self):
+        IndividualCreatorFactory.create_batch(2)
+        GigEventFactory()
+        KindCount.objects.create(model_label='spectator_core.creator',
+                                 kind='individual', count=99)
+
+        out = StringIO()
+        call_command('spectator_rebuild_kind_counts', stdout=out)
+
+        self.assertEqual(
+            KindCount.objects.get(model_label='spectator_core.creator',
+                                  kind='individual').count,
+            2)
+        self.assertEqual(
+            KindCount.objects.get(model_label='spectator_events.event',
+                                  kind='gig').count,
+            1)
+        self.assertIn('Creators: 2 all', out.getvalue())
+
+
+class AnnualKindCounterTestCase(TestCase):
+
+    def setUp(self):
+        GigEventFactory.create_batch(2, date=make_date('2017-03-01'))
+        CinemaEventFactory(date=make_date('2017-06-01'))
+        GigEventFactory(date=make_date('2018-01-01'))
+
+    def counts(self, kind='all'):
+        "Only the non-zero counts, to keep things readable."
+        return [{k: v for k, v in c.items() if v != 0}
+                for c in annual_event_counter.get_counts(kind=kind)]
+
+    def test_count(self):
+        with self.assertNumQueries(1):
+            counts = annual_event_counter.count()
+
+        self.assertEqual(len(counts), 2)
+        self.assertEqual(counts[0]['year'], make_date('2017-01-01'))
+        self.assertEqual(counts[0]['total'], 3)
+        self.assertEqual(counts[0]['gig'], 2)
+        self.assertEqual(counts[0]['cinema'], 1)
+        self.assertEqual(counts[0]['theatre'], 0)
+
+    def test_count_years(self):
+        counts = annual_event_counter.count(years=[2018])
+
+        self.assertEqual(len(counts), 1)
+        self.assertEqual(counts[0]['year'], make_date('2018-01-01'))
+
+    def test_kind(self):
+        self.assertEqual(self.counts(kind='cinema'), [
+            {'year': make_date('2017-01-01'), 'cinema': 1},
+        ])
+
+    @override_app_settings(ANNUAL_COUNTS_TABLE=True)
+    def test_builds_table(self):
+        self.assertEqual(self.counts(), [
+            {'year': make_date('2017-01-01'), 'total': 3, 'gig': 2,
+             'cinema': 1},
+            {'year': make_date('2018-01-01'), 'total': 1, 'gig': 1},
+        ])
+        self.assertEqual(
+            AnnualCount.objects.filter(
+                    model_label='spectator_events.event').count(),
+            3)
+
+    @override_app_settings(ANNUAL_COUNTS_TABLE=True)
+    def test_reads_table(self):
+        annual_event_counter.rebuild()
+        AnnualCount.objects.filter(kind='cinema').update(count=99)
+
+        with self.assertNumQueries(1):
+            counts = self.counts()
+
+        self.assertEqual(counts[0]['cinema'], 99)
+        self.assertEqual(counts[0]['total'], 101)
+
+    @override_app_settings(ANNUAL_COUNTS_TABLE=True)
+    def test_create(self):
+        annual_event_counter.rebuild()
+        CinemaEventFactory(date=make_date('2019-05-01'))
+
+        self.assertEqual(self.counts()[-1],
+                    {'year': make_date('2019-01-01'), 'total': 1, 'cinema': 1})
+
+    @override_app_settings(ANNUAL_COUNTS_TABLE=True)
+    def test_change_date_and_kind(self):
+        annual_event_counter.rebuild()
+        event = Event.objects.get(kind='cinema')
+        event.kind = 'theatre'
+        event.date = make_date('2018-02-01')
+        event.save()
+
+        self.assertEqual(self.counts(), [
+            {'year': make_date('2017-01-01'), 'total': 2, 'gig': 2},
+            {'year': make_date('2018-01-01'), 'total': 2, 'gig': 1,
+             'theatre': 1},
+        ])
+
+    @override_app_settings(ANNUAL_COUNTS_TABLE=True)
+    def test_delete(self):
+        annual_event_counter.rebuild()
+        Event.objects.get(date=make_date('2018-01-01')).delete()
+
+        self.assertEqual(self.counts(), [
+            {'year': make_date('2017-01-01'), 'total': 3, 'gig': 2,
+             'cinema': 1},
+        ])
+
+    @override_app_settings(ANNUAL_COUNTS_TABLE=True)
+    def test_no_rows_before_built(self):
+        "Saving shouldn't create partial counts before the table's built."
+        GigEventFactory(date=make_date('2019-01-01'))
+
+        self.assertEqual(AnnualCount.objects.count(), 0)
+
+    @override_app_settings(ANNUAL_COUNTS_TABLE=True)
+    def test_reading_changes(self):
+        "Changing a Reading's end_date or its Publication's kind updates them"
+        publication = PublicationFactory(kind='book')
+        reading = ReadingFactory(publication=publication,
+                                 end_date=make_date('2017-02-01'))
+        annual_reading_counter.rebuild()
+
+        reading.end_date = make_date('2018-02-01')
+        reading.save()
+        publication.kind = 'periodical'
+        publication.save()
+
+        self.assertEqual(annual_reading_counter.get_counts(), [
+            {'year': make_date('2018-01-01'), 'total': 1, 'book': 0,
+             'periodical': 1},
+        ])
+
+
+class RebuildAnnualCountsTestCase(TestCase):
+
+    def test_rebuilds(self):
+        GigEventFactory(date=make_date('2017-01-01'))
+        AnnualCount.objects.create(model_label='spectator_events.event',
+                                   year=make_date('2017-01-01'), kind='gig',
+                                   count=99)
+
+        out = StringIO()
+        call_command('spectator_rebuild_annual_counts', stdout=out)
+
+        self.assertEqual(
+            AnnualCount.objects.get(model_label='spectator_events.event').count,
+            1)
+        self.assertIn('Events: 1 years', out.getvalue())
@@ -0,0 +1,208 @@
+import csv
+import datetime
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from spectator.core.exporters import (
+    CSVExportWriter, JSONLExportWriter, SQLiteExportWriter, export,
+    get_export_fields, iterate_rows
+)
+from spectator.core.factories import *
+from spectator.core.models import Creator
+from spectator.events.factories import *
+from spectator.events.models import Event, Venue
+from spectator.reading.factories import *
+
+
+class ExportTestCase(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+
+    def read_csv(self, name):
+        with open(os.path.join(self.path, name + '.csv'), newline='',
+                                                    encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+
+    def read_jsonl(self, name):
+        with open(os.path.join(self.path, name + '.jsonl'),
+                                                    encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def age(self, *objs):
+        "Make objects look like they were modified a day ago."
+        for obj in objs:
+            type(obj).objects.filter(pk=obj.pk).update(
+                time_modified=timezone.now() - datetime.timedelta(days=1))
+
+
+class IterateRowsTestCase(ExportTestCase):
+
+    def test_chunks(self):
+        creators = [IndividualCreatorFactory() for n in range(6)]
+        fields = get_export_fields(Creator)
+
+        # One query per chunk, plus one that finds there are no more:
+        with self.assertNumQueries(3):
+            rows = list(iterate_rows(Creator.objects.all(), fields,
+                                     chunk_size=3))
+
+        self.assertEqual([row[0] for row in rows], [c.pk for c in creators])
+        self.assertEqual(fields[0], 'id')
+
+    def test_queryset_filter(self):
+        IndividualCreatorFactory(name='Bob')
+        IndividualCreatorFactory(name='Alice')
+        rows = list(iterate_rows(Creator.objects.filter(name='Alice'),
+                                 ['id', 'name'], chunk_size=1))
+        self.assertEqual([row[1] for row in rows], ['Alice'])
+
+
+class CSVExportTestCase(ExportTestCase):
+
+    def test_export(self):
+        venue = VenueFactory(name='Cafe Oto', latitude='51.5')
+        event = GigEventFactory(venue=venue, date=datetime.date(2018, 3, 31))
+        EventRoleFactory(event=event, role_name='Headliner')
+        ReadingFactory()
+
+        counts = export(CSVExportWriter(self.path))
+
+        self.assertEqual(counts['events'], 1)
+        self.assertEqual(counts['eventroles'], 1)
+        self.assertEqual(counts['readings'], 1)
+
+        rows = self.read_csv('events')
+        self.assertEqual(rows[0]['id'], str(event.pk))
+        self.assertEqual(rows[0]['date'], '2018-03-31')
+        self.assertEqual(rows[0]['venue_id'], str(venue.pk))
+        self.assertEqual(self.read_csv('venues')[0]['latitude'], '51.500000')
+        self.assertEqual(self.read_csv('eventroles')[0]['role_name'],
+                         'Headliner')
+
+    def test_full_export_replaces(self):
+        IndividualCreatorFactory()
+        export(CSVExportWriter(self.path))
+        export(CSVExportWriter(self.path))
+        self.assertEqual(len(self.read_csv('creators')), 1)
+
+    def test_incremental(self):
+        old = IndividualCreatorFactory(name='Old')
+        self.age(old)
+        export(CSVExportWriter(self.path, incremental=True))
+
+        # Make the previous export's watermark a second ago:
+        self.age_watermark()
+        IndividualCreatorFactory(name='New')
+
+        counts = export(CSVExportWriter(self.path, incremental=True))
+
+        self.assertEqual(counts['creators'], 1)
+        self.assertEqual([r['name'] for r in self.read_csv('creators')],
+                         ['Old', 'New'])
+
+    def test_incremental_margin(self):
+        """
+        Objects modified shortly before an export started are exported
+        again, in case they were committed after it read their table.
+        """
+        creator = IndividualCreatorFactory(name='Bob')
+        export(CSVExportWriter(self.path, incremental=True))
+        counts = export(CSVExportWriter(self.path, incremental=True))
+
+        self.assertEqual(counts['creators'], 1)
+        self.assertEqual([r['name'] for r in self.read_csv('creators')],
+                         ['Bob', 'Bob'])
+
+    def test_incremental_no_margin(self):
+        IndividualCreatorFactory(name='Bob')
+        export(CSVExportWriter(self.path, incremental=True),
+               margin=datetime.timedelta(0))
+        counts = export(CSVExportWriter(self.path, incremental=True))
+        self.assertEqual(counts['creators'], 0)
+
+    def age_watermark(self):
+        with open(os.path.join(self.path, 'spectator_export.json'), 'w') as f:
+            json.dump({'watermark': (timezone.now() -
+                            datetime.timedelta(seconds=1)).isoformat()}, f)
+
+
+class JSONLExportTestCase(ExportTestCase):
+
+    def test_export(self):
+        creator = GroupCreatorFactory(name='The Tuts')
+        export(JSONLExportWriter(self.path))
+
+        rows = self.read_jsonl('creators')
+        self.assertEqual(rows[0]['id'], creator.pk)
+        self.assertEqual(rows[0]['name'], 'The Tuts')
+        self.assertEqual(rows[0]['kind'], 'group')
+        self.assertEqual(rows[0]['time_modified'],
+                         creator.time_modified.isoformat())
+
+
+class SQLiteExportTestCase(ExportTestCase):
+
+    def query(self, sql):
+        connection = sqlite3.connect(os.path.join(self.path, 'export.db'))
+        try:
+            return connection.execute(sql).fetchall()
+        finally:
+            connection.close()
+
+    def writer(self, **kwargs):
+        return SQLiteExportWriter(os.path.join(self.path, 'export.db'),
+                                  **kwargs)
+
+    def test_export(self):
+        work = MovieFactory(title='Alien')
+        export(self.writer())
+
+        self.assertEqual(self.query('SELECT id, title, kind FROM works'),
+                         [(work.pk, 'Alien', 'movie')])
+
+    def test_incremental_replaces_rows(self):
+        creator = IndividualCreatorFactory(name='Bob')
+        self.age(creator)
+        export(self.writer(incremental=True))
+
+        creator.name = 'Robert'
+        creator.save()
+        counts = export(self.writer(incremental=True))
+
+        self.assertEqual(counts['creators'], 1)
+        self.assertEqual(self.query('SELECT id, name FROM creators'),
+                         [(creator.pk, 'Robert')])
+
+    def test_incremental_work_selections(self):
+        "WorkSelections are exported when their Event has changed."
+        event = CinemaEventFactory()
+        WorkSelectionFactory(event=event)
+        self.age(event)
+
+        export(self.writer(incremental=True))
+        counts = export(self.writer(incremental=True))
+
+        self.assertEqual(counts['workselections'], 0)
+        self.assertEqual(len(self.query('SELECT * FROM workselections')), 1)
+
+
+class ExportCommandTestCase(ExportTestCase):
+
+    def test_command(self):
+        VenueFactory()
+        out = StringIO()
+        call_command('spectator_export', 'jsonl', self.path, stdout=out)
+
+        self.assertEqual(len(self.read_jsonl('venues')), 1)
+        self.assertIn('venues: 1', out.getvalue())
+        self.assertIn('events: 0', out.getvalue())
@@ -0,0 +1,173 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from .. import override_app_settings
+from spectator.core.counts import get_kind_counts
+from spectator.core.factories import *
+from spectator.core.importers import (
+    NameIndex, RowError, get_importers, parse_items, read_rows
+)
+from spectator.core.models import Creator, KindCount, LeaderboardEntry
+from spectator.core.search import rebuild_index, search
+from spectator.events.factories import *
+from spectator.events.models import Event
+
+
+class ReadRowsTestCase(TestCase):
+
+    def test_csv(self):
+        f = StringIO('kind,title\ngig,"Fest, 2018"\n')
+        self.assertEqual(list(read_rows(f, format='csv')),
+                         [{'kind': 'gig', 'title': 'Fest, 2018'}])
+
+    def test_jsonl(self):
+        f = StringIO('{"kind": "gig"}\n\n{"kind": "comedy"}\n')
+        self.assertEqual(list(read_rows(f, format='jsonl')),
+                         [{'kind': 'gig'}, {'kind': 'comedy'}])
+
+
+class ParseItemsTestCase(TestCase):
+    keys = ('name', 'role', 'kind')
+
+    def test_string(self):
+        self.assertEqual(
+            parse_items('Nick Cave|Vocals; The Bad Seeds||group;', self.keys),
+            [{'name': 'Nick Cave', 'role': 'Vocals', 'kind': ''},
+             {'name': 'The Bad Seeds', 'role': '', 'kind': 'group'}])
+
+    def test_list(self):
+        self.assertEqual(
+            parse_items(['Nick Cave', {'name': 'Bad Seeds', 'kind': 'group'}],
+                        self.keys),
+            [{'name': 'Nick Cave', 'role': '', 'kind': ''},
+             {'name': 'Bad Seeds', 'role': '', 'kind': 'group'}])
+
+    def test_empty(self):
+        self.assertEqual(parse_items('', self.keys), [])
+        self.assertEqual(parse_items(None, self.keys), [])
+
+    def test_missing_name(self):
+        with self.assertRaises(ValueError):
+            parse_items('|Vocals', self.keys)
+
+
+class NameIndexTestCase(TestCase):
+
+    def test_get(self):
+        creator = IndividualCreatorFactory(name='Nick  Cave')
+        IndividualCreatorFactory(name='nick cave')
+
+        index = NameIndex(Creator, ('name',))
+        found = index.get(['NICK CAVE '])
+        self.assertEqual(found.pk, creator.pk)
+        self.assertEqual(found.name, 'Nick  Cave')
+        self.assertIsNone(index.get(['Warren Ellis']))
+
+
+class ImporterTestCase(TestCase):
+
+    def run_import(self, rows, type='events', **kwargs):
+        return get_importers()[type](**kwargs).run(rows)
+
+    def test_get_importers(self):
+        self.assertEqual(sorted(get_importers().keys()),
+                         ['events', 'readings', 'works'])
+
+    def test_queries_per_batch(self):
+        "The number of queries doesn't depend on the number of rows."
+        rows = [{'kind': 'gig', 'creators': 'Band {}'.format(i)}
+                for i in range(20)]
+        # Loading 3 indexes, 3 max pks, and 3 bulk_creates, plus savepoint:
+        with self.assertNumQueries(11):
+            self.run_import(rows)
+        self.assertEqual(Event.objects.count(), 20)
+
+    def test_error_rolls_back(self):
+        rows = [{'kind': 'gig'}, {'kind': 'nope'}]
+        with self.assertRaisesMessage(RowError, 'Row 2:'):
+            self.run_import(rows, batch_size=1)
+        self.assertEqual(Event.objects.count(), 0)
+
+    def test_pks_follow_existing(self):
+        existing = GigEventFactory()
+        self.run_import([{'kind': 'gig', 'title': 'New'}])
+        self.assertEqual(Event.objects.get(title='New').pk, existing.pk + 1)
+
+    def test_reserve_pks(self):
+        existing = GigEventFactory()
+        importer = get_importers()['events']()
+        self.assertEqual(importer.reserve_pks(Event, 2),
+                         [existing.pk + 1, existing.pk + 2])
+        # The next pks follow those already reserved:
+        self.assertEqual(importer.reserve_pks(Event, 1), [existing.pk + 3])
+
+    def test_pks_reserved_per_batch(self):
+        rows = [{'kind': 'gig', 'title': str(i)} for i in range(5)]
+        self.run_import(rows, batch_size=2)
+        self.assertEqual(
+            list(Event.objects.order_by('pk').values_list('title', flat=True)),
+            ['0', '1', '2', '3', '4'])
+
+    @override_app_settings(KIND_COUNTS_TABLE=True)
+    def test_rebuilds_kind_counts(self):
+        get_kind_counts(Event)
+        self.run_import([{'kind': 'gig', 'creators': 'Bob'}])
+        self.assertEqual(get_kind_counts(Event)['gig'], 1)
+        # The Creator counts weren't built, so still aren't:
+        self.assertFalse(KindCount.objects.filter(
+                            model_label='spectator_core.creator').exists())
+
+    @override_app_settings(LEADERBOARD_TABLES=True)
+    def test_rebuilds_leaderboards(self):
+        self.run_import([{'kind': 'gig', 'creators': 'Bob'}])
+        self.assertEqual(
+            LeaderboardEntry.objects.get(board='events', kind='').count, 1)
+
+    @override_app_settings(SEARCH_INDEX=True)
+    def test_indexes_new_objects(self):
+        rebuild_index()
+        self.run_import([{'kind': 'gig', 'venue': 'Cafe Oto',
+                          'creators': 'The Apples'}])
+        # The Creator, and the Event titled after them:
+        self.assertEqual(
+            sorted(r._meta.model_name for r in search('apples')),
+            ['creator', 'event'])
+        self.assertEqual([str(r) for r in search('oto')], ['Cafe Oto'])
+
+
+class ImportCommandTestCase(TestCase):
+
+    def write_file(self, suffix, content):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_csv(self):
+        path = self.write_file('.csv', 'kind,title,creators\n'
+                                       'gig,Fest,Bob; Alice\n')
+        out = StringIO()
+        call_command('spectator_import', 'events', path, stdout=out)
+
+        self.assertEqual(Event.objects.get().title, 'Fest')
+        self.assertIn('Created 2 creators, 2 event roles, 1 events.',
+                      out.getvalue())
+
+    def test_jsonl(self):
+        path = self.write_file('.jsonl',
+                               '{"kind": "movie", "title": "Alien"}\n')
+        call_command('spectator_import', 'works', path, stdout=StringIO())
+        self.assertEqual(MovieFactory._meta.model.objects.get().title,
+                         'Alien')
+
+    def test_error(self):
+        path = self.write_file('.csv', 'kind\nnope\n')
+        with self.assertRaisesMessage(CommandError, 'Row 1:'):
+            call_command('spectator_import', 'events', path,
+                         stdout=StringIO())
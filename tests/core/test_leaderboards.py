@@ -0,0 +1,160 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from .. import make_date, override_app_settings
+from spectator.core.factories import *
+from spectator.core.leaderboards import rebuild_leaderboards
+from spectator.core.models import Creator, LeaderboardEntry
+from spectator.events.factories import *
+from spectator.events.models import Event
+from spectator.reading.factories import *
+
+
+d = make_date('2017-02-15')
+
+
+class RebuildLeaderboardsTestCase(TestCase):
+
+    def setUp(self):
+        self.bob = IndividualCreatorFactory(name='Bob')
+        EventRoleFactory(creator=self.bob, event=GigEventFactory())
+        EventRoleFactory(creator=self.bob, event=GigEventFactory())
+        EventRoleFactory(creator=self.bob, event=ComedyEventFactory())
+        WorkRoleFactory(creator=self.bob, work=MovieFactory(),
+                                                    role_name='Director')
+        pub = PublicationFactory()
+        PublicationRoleFactory(creator=self.bob, publication=pub,
+                                                    role_name='Author')
+        ReadingFactory(publication=pub, start_date=d, end_date=d)
+        ReadingFactory(publication=pub, start_date=d, end_date=d)
+
+    def get_count(self, **kwargs):
+        return LeaderboardEntry.objects.get(creator=self.bob, **kwargs).count
+
+    def test_entries(self):
+        rebuild_leaderboards()
+
+        self.assertEqual(self.get_count(board='events', kind=''), 3)
+        self.assertEqual(self.get_count(board='events', kind='gig'), 2)
+        self.assertEqual(self.get_count(board='events', kind='comedy'), 1)
+        self.assertEqual(self.get_count(board='works', kind='',
+                                        role_name=None), 1)
+        self.assertEqual(self.get_count(board='works', kind='movie',
+                                        role_name='Director'), 1)
+        self.assertEqual(self.get_count(board='readings',
+                                        role_name='Author'), 2)
+        self.assertEqual(self.get_count(board='publications'), 1)
+
+    def test_replaces_entries(self):
+        rebuild_leaderboards()
+        rebuild_leaderboards()
+        self.assertEqual(self.get_count(board='events', kind=''), 3)
+
+    def test_creator_ids(self):
+        "It should only rebuild the requested Creators."
+        terry = IndividualCreatorFactory()
+        EventRoleFactory(creator=terry, event=GigEventFactory())
+
+        rebuild_leaderboards(creator_ids=[self.bob.pk], boards=['events'])
+
+        self.assertFalse(
+                LeaderboardEntry.objects.filter(creator=terry).exists())
+        self.assertFalse(
+                LeaderboardEntry.objects.filter(board='works').exists())
+
+    @override_app_settings(LEADERBOARD_TABLES=True)
+    def test_uses_index(self):
+        "The chart query shouldn't touch the roles tables."
+        rebuild_leaderboards()
+        qs = Creator.objects.by_events(kind='gig')
+        self.assertNotIn('spectator_events_eventrole', str(qs.query))
+        self.assertEqual(qs[0].num_events, 2)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('spectator_rebuild_leaderboards', stdout=out)
+        self.assertEqual(self.get_count(board='events', kind='gig'), 2)
+        self.assertIn('Created 9 leaderboard entries.', out.getvalue())
+
+
+class LeaderboardSignalsTestCase(TransactionTestCase):
+    "The tables should be kept up to date when things change."
+
+    def setUp(self):
+        self.bob = IndividualCreatorFactory(name='Bob')
+
+    def get_count(self, **kwargs):
+        try:
+            return LeaderboardEntry.objects.get(creator=self.bob,
+                                                **kwargs).count
+        except LeaderboardEntry.DoesNotExist:
+            return 0
+
+    @override_app_settings(LEADERBOARD_TABLES=True)
+    def test_event_kind_changed(self):
+        event = GigEventFactory()
+        EventRoleFactory(creator=self.bob, event=event)
+        self.assertEqual(self.get_count(board='events', kind='gig'), 1)
+
+        event.kind = 'comedy'
+        event.save()
+
+        self.assertEqual(self.get_count(board='events', kind='gig'), 0)
+        self.assertEqual(self.get_count(board='events', kind='comedy'), 1)
+
+    @override_app_settings(LEADERBOARD_TABLES=True)
+    def test_role_creator_changed(self):
+        terry = IndividualCreatorFactory(name='Terry')
+        role = WorkRoleFactory(creator=self.bob, work=MovieFactory())
+
+        role.creator = terry
+        role.save()
+
+        self.assertEqual(self.get_count(board='works', kind=''), 0)
+        self.assertEqual(LeaderboardEntry.objects.get(creator=terry,
+                                board='works', kind='movie',
+                                role_name=None).count, 1)
+
+    @override_app_settings(LEADERBOARD_TABLES=True)
+    def test_reading_deleted(self):
+        pub = PublicationFactory()
+        PublicationRoleFactory(creator=self.bob, publication=pub,
+                                                            role_name='')
+        reading = ReadingFactory(publication=pub, start_date=d, end_date=d)
+        self.assertEqual(self.get_count(board='publications'), 1)
+
+        reading.delete()
+
+        self.assertEqual(self.get_count(board='publications'), 0)
+        self.assertEqual(self.get_count(board='readings', role_name=''), 0)
+
+    @override_app_settings(LEADERBOARD_TABLES=True)
+    def test_event_deleted(self):
+        event = GigEventFactory()
+        EventRoleFactory(creator=self.bob, event=event)
+
+        event.delete()
+
+        self.assertEqual(self.get_count(board='events', kind=''), 0)
+
+    @override_app_settings(LEADERBOARD_TABLES=True)
+    def test_once_per_transaction(self):
+        "It should only rebuild a Creator's entries once per transaction."
+        events = GigEventFactory.create_batch(3)
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                for event in events:
+                    EventRoleFactory(creator=self.bob, event=event)
+
+        deletes = [q for q in queries.captured_queries
+                if q['sql'].startswith('DELETE FROM "spectator_core_leaderboardentry"')]
+        self.assertEqual(len(deletes), 1)
+        self.assertEqual(self.get_count(board='events', kind='gig'), 3)
+
+    def test_not_enabled(self):
+        EventRoleFactory(creator=self.bob, event=GigEventFactory())
+        self.assertFalse(LeaderboardEntry.objects.exists())
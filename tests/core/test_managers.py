@@ -1,7 +1,7 @@
 # coding: utf-8
-from django.test import override_settings, TestCase
+from django.test import override_settings, TestCase, TransactionTestCase
 
-from .. import make_date
+from .. import make_date, override_app_settings
 from spectator.core.factories import *
 from spectator.events.factories import *
 from spectator.reading.factories import *
@@ -12,7 +12,16 @@ from spectator.core.models import Creator
 d = make_date('2017-02-15')
 
 
-class CreatorManagerByPublicationsTestCase(TestCase):
+class LeaderboardTablesMixin(object):
+    "For running tests with the SPECTATOR_LEADERBOARD_TABLES setting on."
+
+    # Wraps setUp(), the test and tearDown():
+    @override_app_settings(LEADERBOARD_TABLES=True)
+    def __call__(self, *args, **kwargs):
+        return super().__call__(*args, **kwargs)
+
+
+class ByPublicationsTests(object):
     """
     Testing the CreatorManager.by_publications() method.
     """
@@ -96,8 +105,31 @@ class CreatorManagerByPublicationsTestCase(TestCase):
         self.assertEqual(creators[1], bob) # 1 solo, 1 joint
         self.assertEqual(creators[1].num_publications, 2)
 
+    def test_includes_creators_with_unread_publications(self):
+        "It should count the read publications of partly-read Creators."
+        bob = IndividualCreatorFactory()
+        read_pub = PublicationFactory()
+        PublicationRoleFactory(publication=read_pub, creator=bob)
+        PublicationRoleFactory(publication=PublicationFactory(), creator=bob)
+        ReadingFactory(publication=read_pub, start_date=d, end_date=d)
+        ReadingFactory(publication=read_pub, start_date=d, end_date=d)
+
+        creators = Creator.objects.by_publications()
+
+        self.assertEqual(len(creators), 1)
+        self.assertEqual(creators[0].num_publications, 1)
+
+
+class CreatorManagerByPublicationsTestCase(ByPublicationsTests, TestCase):
+    pass
+
 
-class CreatorManagerByReadingsTestCase(TestCase):
+class CreatorManagerByPublicationsTablesTestCase(LeaderboardTablesMixin,
+                                ByPublicationsTests, TransactionTestCase):
+    pass
+
+
+class ByReadingsTests(object):
     """
     Testing the CreatorManager.by_readings() method.
     """
@@ -137,6 +169,21 @@ class CreatorManagerByReadingsTestCase(TestCase):
 
         self.assertEqual(creators[0].num_readings, 2)
 
+    def test_includes_creators_with_unread_publications(self):
+        "It should count the readings of partly-read Creators."
+        bob = IndividualCreatorFactory()
+        read_pub = PublicationFactory()
+        PublicationRoleFactory(publication=read_pub, creator=bob, role_name='')
+        PublicationRoleFactory(publication=PublicationFactory(), creator=bob,
+                                                                role_name='')
+        ReadingFactory(publication=read_pub, start_date=d, end_date=d)
+        ReadingFactory(publication=read_pub, start_date=d, end_date=d)
+
+        creators = Creator.objects.by_readings()
+
+        self.assertEqual(len(creators), 1)
+        self.assertEqual(creators[0].num_readings, 2)
+
     def test_sorts_by_name(self):
         "If counts are equal."
         terry = IndividualCreatorFactory(name='Terry')
@@ -195,7 +242,16 @@ class CreatorManagerByReadingsTestCase(TestCase):
         self.assertEqual(len(creators), 2)
 
 
-class CreatorManagerByEventsTestCase(TestCase):
+class CreatorManagerByReadingsTestCase(ByReadingsTests, TestCase):
+    pass
+
+
+class CreatorManagerByReadingsTablesTestCase(LeaderboardTablesMixin,
+                                ByReadingsTests, TransactionTestCase):
+    pass
+
+
+class ByEventsTests(object):
 
     def test_has_count_field(self):
         ev = ComedyEventFactory()
@@ -280,7 +336,16 @@ class CreatorManagerByEventsTestCase(TestCase):
         self.assertEqual(creators[0].num_events, 1)
 
 
-class CreatorManagerByWorksTestCase(TestCase):
+class CreatorManagerByEventsTestCase(ByEventsTests, TestCase):
+    pass
+
+
+class CreatorManagerByEventsTablesTestCase(LeaderboardTablesMixin,
+                                ByEventsTests, TransactionTestCase):
+    pass
+
+
+class ByWorksTests(object):
 
     def test_has_count_field(self):
         movie = MovieFactory()
@@ -388,3 +453,12 @@ class CreatorManagerByWorksTestCase(TestCase):
         creators = Creator.objects.by_works()
 
         self.assertEqual(creators[0].num_works, 1)
+
+
+class CreatorManagerByWorksTestCase(ByWorksTests, TestCase):
+    pass
+
+
+class CreatorManagerByWorksTablesTestCase(LeaderboardTablesMixin,
+                                ByWorksTests, TransactionTestCase):
+    pass
@@ -1,11 +1,15 @@
 # coding: utf-8
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from .. import override_app_settings
 from spectator.core.factories import *
 from spectator.events.factories import *
 from spectator.reading.factories import *
 from spectator.core.models import Creator
+from spectator.events.models import Venue, Work
+from spectator.reading.models import Publication, PublicationSeries
 
 
 class SluggedModelMixinTestCase(TestCase):
@@ -27,6 +31,70 @@ class SluggedModelMixinTestCase(TestCase):
         creator = IndividualCreatorFactory(pk=123)
         self.assertEqual(creator.slug, 'y9xgy')
 
+    def test_slug_set_before_insert_if_pk_known(self):
+        "If we know the pk in advance it should only need one query."
+        with self.assertNumQueries(1):
+            creator = IndividualCreatorFactory(pk=123)
+        self.assertEqual(Creator.objects.get(pk=123).slug, '9g5o8')
+
+    def test_slug_update_only_sets_slug(self):
+        "After the INSERT, the UPDATE should only set the slug."
+        with CaptureQueriesContext(connection) as queries:
+            creator = IndividualCreatorFactory()
+        self.assertEqual(len(queries.captured_queries), 2)
+        self.assertTrue(
+            queries.captured_queries[1]['sql'].startswith(
+                'UPDATE "spectator_core_creator" SET "slug" = '))
+        self.assertNotIn('"name"', queries.captured_queries[1]['sql'])
+        creator.refresh_from_db()
+        self.assertEqual(len(creator.slug), 5)
+
+
+class SluggedModelQuerySetTestCase(TestCase):
+
+    def test_bulk_create_sets_slugs(self):
+        Creator.objects.bulk_create([
+            Creator(name='Bob', kind='individual'),
+            Creator(name='Terry', kind='individual'),
+        ])
+        creators = Creator.objects.all()
+        self.assertEqual(len(creators), 2)
+        for creator in creators:
+            self.assertEqual(creator.slug,
+                            creator._generate_slug(creator.pk))
+
+    def test_bulk_create_with_pks(self):
+        "Slugs should be set before inserting, with no extra query."
+        with self.assertNumQueries(1):
+            creators = Creator.objects.bulk_create([
+                Creator(pk=123, name='Bob', kind='individual'),
+                Creator(pk=124, name='Terry', kind='individual'),
+            ])
+        self.assertEqual(creators[0].slug, '9g5o8')
+        self.assertEqual(Creator.objects.get(pk=123).slug, '9g5o8')
+
+    def test_bulk_create_other_models(self):
+        "Check other models have the manager."
+        PublicationSeries.objects.bulk_create([PublicationSeries(title='A')])
+        Publication.objects.bulk_create([Publication(title='B')])
+        Venue.objects.bulk_create([Venue(name='C')])
+        Work.objects.bulk_create([Work(title='D', kind='movie')])
+        self.assertNotEqual(PublicationSeries.objects.get().slug, '')
+        self.assertNotEqual(Publication.objects.get().slug, '')
+        self.assertNotEqual(Venue.objects.get().slug, '')
+        self.assertNotEqual(Work.objects.get().slug, '')
+
+    def test_set_missing_slugs(self):
+        creator = IndividualCreatorFactory()
+        Creator.objects.filter(pk=creator.pk).update(slug='')
+
+        with self.assertNumQueries(2):
+            # Getting the pks, and the UPDATE:
+            self.assertEqual(Creator.objects.set_missing_slugs(), 1)
+
+        creator.refresh_from_db()
+        self.assertEqual(creator.slug, creator._generate_slug(creator.pk))
+
 
 class CreatorTestCase(TestCase):
 
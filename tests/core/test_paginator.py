@@ -2,7 +2,12 @@
 from django.core import paginator as django_paginator
 from django.test import TestCase
 
-from spectator.core.paginator import DiggPaginator
+from spectator.core.factories import IndividualCreatorFactory
+from spectator.core.models import Creator
+from spectator.core.paginator import DiggPaginator, KeysetPaginator
+from spectator.events.factories import GigEventFactory
+from spectator.events.models import Event
+from .. import make_date
 
 
 class PaginatorTestCase(TestCase):
@@ -185,3 +190,116 @@ class PaginatorTestCase(TestCase):
             DiggPaginator(range(1,1000), 10, body=5, padding=3)
 
 
+
+
+class KeysetPaginatorTestCase(TestCase):
+
+    def setUp(self):
+        # 11 Events; two share each date, and one has no date.
+        self.events = []
+        for day in range(1, 6):
+            for i in range(2):
+                self.events.append(GigEventFactory(
+                            date=make_date('2017-02-{:02d}'.format(day))))
+        self.events.append(GigEventFactory(date=None))
+
+        # The order we expect, with the undated one last:
+        self.ordered = sorted(self.events[:-1],
+                              key=lambda e: (e.date, e.pk), reverse=True)
+        self.ordered.append(self.events[-1])
+
+    def get_paginator(self, **kwargs):
+        return KeysetPaginator(Event.objects.all(), 3,
+                               ordering=('-date', '-pk'), body=5, **kwargs)
+
+    def test_first_page(self):
+        page = self.get_paginator().page(1)
+        self.assertEqual(list(page.object_list), self.ordered[:3])
+        self.assertFalse(page.has_previous())
+        self.assertTrue(page.has_next())
+        self.assertIsNone(page.previous_cursor)
+        self.assertEqual(page.paginator.num_pages, 4)
+        self.assertEqual(page.page_range, [1, 2, 3, 4])
+
+    def test_next_pages(self):
+        paginator = self.get_paginator()
+        page = paginator.page(1)
+        objects = list(page.object_list)
+
+        while page.has_next():
+            page = paginator.page_from_cursor(page.next_cursor)
+            objects.extend(page.object_list)
+
+        self.assertEqual(page.number, 4)
+        self.assertEqual(objects, self.ordered)
+
+    def test_previous_pages(self):
+        paginator = self.get_paginator()
+        page = paginator.page(4)
+        objects = list(page.object_list)
+
+        while page.has_previous():
+            page = paginator.page_from_cursor(page.previous_cursor)
+            objects = list(page.object_list) + objects
+
+        self.assertEqual(page.number, 1)
+        self.assertEqual(objects, self.ordered)
+
+    def test_seek_query_has_no_offset(self):
+        paginator = self.get_paginator()
+        cursor = paginator.page(2).next_cursor
+
+        with self.assertNumQueries(1) as queries:
+            page = paginator.page_from_cursor(cursor)
+            list(page.object_list)
+        self.assertNotIn('OFFSET', queries.captured_queries[0]['sql'])
+        self.assertEqual(page.number, 3)
+
+    def test_count(self):
+        "It should use the supplied count instead of counting."
+        paginator = self.get_paginator(count=lambda: 30)
+        with self.assertNumQueries(1):
+            page = paginator.page(1)
+        self.assertEqual(page.paginator.num_pages, 10)
+        self.assertEqual(page.page_range, list(range(1, 11)))
+
+    def test_count_too_low(self):
+        "The page ranges should include pages past the supplied count."
+        paginator = self.get_paginator(count=3)
+        page = paginator.page_from_cursor(paginator.page(1).next_cursor)
+        self.assertEqual(page.number, 2)
+        self.assertTrue(page.has_next())
+        self.assertEqual(page.page_range, [1, 2])
+
+    def test_title_sort_ordering(self):
+        for name in ['Carol', 'alice', 'Bob', 'dave']:
+            IndividualCreatorFactory(name=name)
+        paginator = KeysetPaginator(Creator.objects.all(), 2,
+                                    ordering=('name_sort', 'pk'))
+        page = paginator.page_from_cursor(paginator.page(1).next_cursor)
+        self.assertEqual([c.name for c in page.object_list], ['Carol', 'dave'])
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(django_paginator.InvalidPage):
+            self.get_paginator().page_from_cursor('nope')
+
+    def test_iterate(self):
+        "It should fetch all the objects, per_page at a time."
+        with self.assertNumQueries(4):
+            objects = list(self.get_paginator().iterate())
+        self.assertEqual(objects, self.ordered)
+
+    def test_iterate_limit(self):
+        objects = list(self.get_paginator().iterate(limit=4))
+        self.assertEqual(objects, self.ordered[:4])
+
+    def test_iterate_from_cursor(self):
+        paginator = self.get_paginator()
+        cursor = paginator.encode_cursor(self.ordered[4], 0)
+        objects = list(paginator.iterate(cursor))
+        self.assertEqual(objects, self.ordered[5:])
+
+    def test_iterate_backwards_cursor(self):
+        paginator = self.get_paginator()
+        with self.assertRaises(django_paginator.InvalidPage):
+            paginator.iterate(paginator.page(2).previous_cursor)
@@ -0,0 +1,145 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.template import RequestContext, Template
+from django.test import TestCase, override_settings
+
+from spectator.core.benchmark.runner import make_request
+from spectator.core.factories import *
+from spectator.core.profiling import TemplateProfiler, is_profiled
+from spectator.events.factories import *
+from .. import make_date
+
+
+class TemplateProfilerTestCase(TestCase):
+
+    def render(self, source):
+        template = Template(source)
+        with TemplateProfiler() as profiler:
+            template.render(RequestContext(make_request('/')))
+        return profiler
+
+    def test_include(self):
+        profiler = self.render(
+            "{% include 'spectator_core/includes/card_nav.html' %}")
+        entries = list(profiler.root.walk())
+        self.assertEqual(entries[0][0], (
+                "{% include 'spectator_core/includes/card_nav.html' %}",))
+        self.assertEqual(entries[0][1].calls, 1)
+        # Spectator's tag within the include:
+        self.assertEqual(entries[1][0][-1],
+                         '{% current_url_name as url_name %}')
+
+    def test_spectator_tags_only(self):
+        profiler = self.render(
+            "{% load spectator_core %}{% if 1 %}{% now 'Y' %}{% endif %}"
+            "{% for i in '123' %}{% get_enabled_apps as apps %}{% endfor %}")
+        entries = list(profiler.root.walk())
+        # The for and if tags aren't profiled, but tags inside them are:
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0][1].label,
+                         '{% get_enabled_apps as apps %}')
+        self.assertEqual(entries[0][1].calls, 3)
+
+    def test_queries(self):
+        IndividualCreatorFactory()
+        profiler = self.render(
+            '{% load spectator_core %}{% most_read_creators_card %}')
+        entry = list(profiler.root.walk())[0][1]
+        self.assertEqual(entry.label, '{% most_read_creators_card %}')
+        self.assertGreaterEqual(entry.queries, 1)
+        self.assertEqual(profiler.queries, entry.queries)
+
+    def test_not_profiling(self):
+        "Nothing is recorded outside a profiler."
+        profiler = TemplateProfiler()
+        with profiler:
+            pass
+        Template("{% include 'spectator_core/includes/card_nav.html' %}"
+                 ).render(RequestContext(make_request('/')))
+        self.assertEqual(list(profiler.root.walk()), [])
+
+    def test_totals(self):
+        profiler = self.render(
+            "{% load spectator_core %}"
+            "{% for i in '12' %}{% get_enabled_apps as apps %}{% endfor %}"
+            "{% include 'spectator_core/includes/card_nav.html' %}")
+        totals = {t[0]: t for t in profiler.get_totals()}
+        self.assertEqual(totals['{% get_enabled_apps as apps %}'][1], 2)
+        self.assertEqual(totals['{% current_url_name as url_name %}'][1], 1)
+
+    def test_format_tree(self):
+        profiler = self.render(
+            "{% include 'spectator_core/includes/card_nav.html' %}")
+        lines = profiler.format_tree().split('\n')
+        self.assertRegex(lines[0], r"^ +[\d.]+ms +\d+% +1x +0q  "
+                                   r"\{% include 'spectator_core")
+        self.assertTrue(lines[1].endswith(
+                                    '    {% current_url_name as url_name %}'))
+
+    def test_format_folded(self):
+        profiler = self.render(
+            "{% include 'spectator_core/includes/card_nav.html' %}")
+        lines = profiler.format_folded().split('\n')
+        self.assertRegex(lines[1],
+                         r"^\{% include 'spectator_core/includes/card_nav.html'"
+                         r" %\};\{% current_url_name as url_name %\} \d+$")
+
+
+class IsProfiledTestCase(TestCase):
+
+    def get_node(self, source):
+        return Template(source).nodelist[-1]
+
+    def test_include(self):
+        self.assertTrue(is_profiled(self.get_node(
+                "{% include 'spectator_core/includes/card_nav.html' %}")))
+
+    def test_spectator_tag(self):
+        self.assertTrue(is_profiled(self.get_node(
+                "{% load spectator_core %}{% most_read_creators_card %}")))
+
+    def test_django_tag(self):
+        self.assertFalse(is_profiled(self.get_node("{% now 'Y' %}")))
+
+
+@override_settings(MIDDLEWARE=[
+                    'spectator.core.profiling.TemplateProfilerMiddleware'])
+class TemplateProfilerMiddlewareTestCase(TestCase):
+
+    def test_header(self):
+        response = self.client.get('/creators/')
+        self.assertRegex(response['X-Spectator-Template-Profile'],
+                         r'^time=[\d.]+ms; queries=\d+; slowest=\{% .+ %\} '
+                         r'[\d.]+ms$')
+
+    def test_no_panel(self):
+        response = self.client.get('/creators/')
+        self.assertNotContains(response, 'spectator-template-profile')
+
+    @override_settings(DEBUG=True)
+    def test_panel(self):
+        response = self.client.get('/creators/')
+        self.assertContains(response, '<pre class="spectator-template-profile">')
+        content = response.content.decode()
+        self.assertLess(content.index('spectator-template-profile'),
+                        content.index('</body>'))
+
+
+class ProfileTemplatesCommandTestCase(TestCase):
+
+    def test_tree(self):
+        GigEventFactory(date=make_date('2018-01-01'))
+        out = StringIO()
+        call_command('spectator_profile_templates', '/events/',
+                     '--min-percent', '0', stdout=out)
+        output = out.getvalue()
+        self.assertRegex(output, r'^/events/ \(200\): [\d.]+ms, \d+ queries')
+        self.assertIn("{% include 'spectator_events/includes/events.html'",
+                      output)
+
+    def test_folded(self):
+        out = StringIO()
+        call_command('spectator_profile_templates', '/creators/', '--folded',
+                     stdout=out)
+        self.assertRegex(out.getvalue().split('\n')[0], r'^\{% .+ %\} \d+$')
@@ -0,0 +1,163 @@
+import logging
+
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+
+from spectator.core.factories import *
+from spectator.core.models import Creator
+from spectator.core.querybudget import (
+    QueryBudgetTestMixin, QueryRecorder, get_budget, get_query_stats,
+    reset_query_stats
+)
+from spectator.events.factories import *
+from spectator.reading.factories import *
+from .. import override_app_settings
+
+
+class QueryRecorderTestCase(TestCase):
+
+    def test_count(self):
+        with QueryRecorder() as recorder:
+            list(Creator.objects.all())
+            list(Creator.objects.all())
+        self.assertEqual(recorder.count, 2)
+        self.assertGreaterEqual(recorder.duration, 0)
+
+    def test_stops_recording(self):
+        with QueryRecorder() as recorder:
+            list(Creator.objects.all())
+        list(Creator.objects.all())
+        self.assertEqual(recorder.count, 1)
+
+    def test_repeated(self):
+        creators = [IndividualCreatorFactory() for n in range(4)]
+        with QueryRecorder() as recorder:
+            for creator in creators:
+                Creator.objects.get(pk=creator.pk)
+            list(Creator.objects.all())
+
+        repeated = recorder.get_repeated(limit=3)
+        self.assertEqual(len(repeated), 1)
+        query, count = repeated[0]
+        self.assertEqual(count, 4)
+        self.assertEqual(query.params, (creators[3].pk,))
+
+        self.assertEqual(recorder.get_repeated(limit=4), [])
+
+    def test_same_params_not_repeated(self):
+        "Running exactly the same query again isn't an N+1 problem."
+        creator = IndividualCreatorFactory()
+        with QueryRecorder() as recorder:
+            for n in range(4):
+                Creator.objects.get(pk=creator.pk)
+        self.assertEqual(recorder.get_repeated(limit=3), [])
+
+    def test_template_stack(self):
+        IndividualCreatorFactory()
+        template = Template(
+            '{% for c in creators %}{% if c.event_roles.count %}{% endif %}'
+            '{% endfor %}')
+        with QueryRecorder() as recorder:
+            template.render(Context({'creators': Creator.objects.all()}))
+
+        self.assertEqual(recorder.queries[1].stack,
+                         ['<unknown template>',
+                          '{% for c in creators %}',
+                          '{% if c.event_roles.count %}'])
+
+    def test_code_stack(self):
+        "The last item is the innermost line of Spectator's code."
+        publication = PublicationFactory()
+        with QueryRecorder() as recorder:
+            publication.get_current_reading()
+        self.assertRegex(recorder.queries[0].stack[-1],
+                    r'^spectator/reading/models\.py:\d+ in get_current_reading$')
+
+
+class QueryReportTestCase(TestCase):
+
+    def test_within_budget(self):
+        with QueryRecorder() as recorder:
+            list(Creator.objects.all())
+        report = recorder.get_report('test', budget=1)
+        self.assertTrue(report.is_ok)
+        self.assertIsNone(report.violation)
+
+    def test_over_budget(self):
+        with QueryRecorder() as recorder:
+            list(Creator.objects.all())
+            list(Creator.objects.filter(name='Bob'))
+        report = recorder.get_report('test', budget=1)
+        self.assertFalse(report.is_ok)
+        self.assertIs(report.violation, recorder.queries[1])
+        self.assertIn('Over the budget of 1 queries', str(report))
+        self.assertIn('SQL: ' + recorder.queries[1].sql, str(report))
+
+    def test_repeated(self):
+        creators = [IndividualCreatorFactory() for n in range(3)]
+        with QueryRecorder() as recorder:
+            for creator in creators:
+                Creator.objects.get(pk=creator.pk)
+        report = recorder.get_report('test', repeat_limit=2)
+        self.assertFalse(report.is_ok)
+        self.assertIn('Same SQL run with 3 different parameters', str(report))
+
+
+class GetBudgetTestCase(TestCase):
+
+    @override_app_settings(QUERY_BUDGETS={'spectator:core:home': 3},
+                           QUERY_BUDGET_DEFAULT=10)
+    def test_budgets(self):
+        self.assertEqual(get_budget('spectator:core:home'), 3)
+        self.assertEqual(get_budget('spectator:events:home'), 10)
+
+    def test_default(self):
+        self.assertIsNone(get_budget('spectator:core:home'))
+
+
+@override_settings(MIDDLEWARE=[
+                    'spectator.core.querybudget.QueryBudgetMiddleware'])
+class QueryBudgetMiddlewareTestCase(TestCase):
+
+    def setUp(self):
+        reset_query_stats()
+        self.addCleanup(reset_query_stats)
+
+    def test_header(self):
+        response = self.client.get('/creators/')
+        self.assertRegex(response['X-Spectator-Queries'],
+                         r'^\d+; time=\d+\.\dms$')
+
+    def test_stats(self):
+        self.client.get('/creators/')
+        self.client.get('/creators/')
+        stats = get_query_stats()['spectator:creators:creator_list']
+        self.assertEqual(stats['requests'], 2)
+        self.assertEqual(stats['over_budget'], 0)
+        self.assertGreater(stats['queries'], 0)
+
+    @override_app_settings(QUERY_BUDGETS={'spectator:creators:creator_list': 1})
+    def test_over_budget(self):
+        with self.assertLogs('spectator.core.querybudget',
+                             logging.WARNING) as logs:
+            self.client.get('/creators/')
+        self.assertIn('spectator:creators:creator_list', logs.output[0])
+        self.assertIn('Over the budget of 1 queries', logs.output[0])
+        stats = get_query_stats()['spectator:creators:creator_list']
+        self.assertEqual(stats['over_budget'], 1)
+
+
+class QueryBudgetTestMixinTestCase(QueryBudgetTestMixin, TestCase):
+
+    def test_within_budget(self):
+        report = self.assertQueryBudget('/creators/', budget=10)
+        self.assertEqual(report.url_name, 'spectator:creators:creator_list')
+
+    def test_over_budget(self):
+        with self.assertRaisesRegex(AssertionError, 'Over the budget'):
+            self.assertQueryBudget('/creators/', budget=0)
+
+    @override_app_settings(QUERY_BUDGETS={'spectator:creators:creator_list': 0})
+    def test_budget_setting(self):
+        with self.assertRaises(AssertionError):
+            self.assertQueryBudget('/creators/')
@@ -0,0 +1,290 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.http.response import Http404
+from django.test import TestCase
+
+from .. import override_app_settings
+from ..core.test_views import ViewTestCase
+from spectator.core import views
+from spectator.core.factories import *
+from spectator.core.models import SearchDocument
+from spectator.core.search import (
+    BUILT_LABEL, get_backend, has_fts_table, index_is_built, rebuild_index,
+    search, search_post_migrate, tokenize
+)
+from spectator.events.factories import *
+from spectator.events.utils import dirty_events
+from spectator.reading.factories import *
+
+
+def num_documents():
+    "The number of objects in the index."
+    return SearchDocument.objects.exclude(model_label=BUILT_LABEL).count()
+
+
+class TokenizeTestCase(TestCase):
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize('The <b>Café</b> Royal, 2nd-floor'),
+                         ['the', 'cafe', 'royal', '2nd', 'floor'])
+
+
+class SearchTests(object):
+    "Run by a TestCase for each backend."
+
+    def search(self, query):
+        "Searches, first building the index, as migrating would."
+        if not index_is_built():
+            rebuild_index()
+        return search(query)
+
+    def names(self, query):
+        return [str(obj) for obj in self.search(query)]
+
+    def test_finds_each_model(self):
+        IndividualCreatorFactory(name='Bob Apple')
+        MovieFactory(title='Apple Movie')
+        GigEventFactory(title='Apple Fest')
+        VenueFactory(name='Apple Hall')
+        PublicationFactory(title='Apple Book')
+        PublicationSeriesFactory(title='Apple Series')
+
+        self.assertEqual(
+            sorted(obj._meta.model_name for obj in self.search('apple')),
+            ['creator', 'event', 'publication', 'publicationseries',
+             'venue', 'work'])
+
+    def test_all_words_must_match(self):
+        IndividualCreatorFactory(name='Bob Apple')
+        IndividualCreatorFactory(name='Bob Banana')
+
+        self.assertEqual(self.names('bob banana'), ['Bob Banana'])
+
+    def test_last_word_is_prefix(self):
+        IndividualCreatorFactory(name='Terry Pratchett')
+
+        self.assertEqual(self.names('terry prat'), ['Terry Pratchett'])
+        self.assertEqual(self.names('ter pratchett'), [])
+
+    def test_ignores_case_and_accents(self):
+        VenueFactory(name='Café Oto')
+
+        self.assertEqual(self.names('CAFE oto'), ['Café Oto'])
+
+    def test_ranks_titles_higher(self):
+        VenueFactory(name='Somewhere', address='1 Wigmore Street')
+        VenueFactory(name='Wigmore Hall', address='36 Somewhere Street')
+
+        self.assertEqual(self.names('wigmore'), ['Wigmore Hall', 'Somewhere'])
+
+    def test_body_text_without_html(self):
+        GigEventFactory(title='Gig', note='<p>A <b>memorable</b> night</p>')
+
+        self.assertEqual(self.names('memorable'), ['Gig'])
+        self.assertEqual(self.names('b'), [])
+
+    def test_empty_query(self):
+        IndividualCreatorFactory(name='Bob')
+
+        results = search('  !! ')
+
+        self.assertEqual(results.count(), 0)
+        self.assertEqual(list(results), [])
+        self.assertEqual(SearchDocument.objects.count(), 0)
+
+    @override_app_settings(SEARCH_INDEX=True)
+    def test_not_built_by_searching(self):
+        IndividualCreatorFactory(name='Bob')
+
+        self.assertEqual(list(search('bob')), [])
+        self.assertFalse(index_is_built())
+
+    @override_app_settings(SEARCH_INDEX=True)
+    def test_built_on_migrate(self):
+        IndividualCreatorFactory(name='Bob')
+        search_post_migrate(sender=None, using='default')
+
+        self.assertTrue(index_is_built())
+        self.assertEqual(self.names('bob'), ['Bob'])
+
+    def test_not_built_on_migrate_by_default(self):
+        IndividualCreatorFactory(name='Bob')
+        search_post_migrate(sender=None, using='default')
+
+        self.assertFalse(index_is_built())
+
+    @override_app_settings(SEARCH_INDEX=True)
+    def test_empty_index_is_built(self):
+        "Objects saved after building an index of nothing are added to it."
+        rebuild_index()
+        self.assertTrue(index_is_built())
+
+        IndividualCreatorFactory(name='Bob')
+
+        self.assertEqual(self.names('bob'), ['Bob'])
+
+    def test_count_and_slice(self):
+        for i in range(5):
+            IndividualCreatorFactory(name='Bob {}'.format(i))
+
+        results = self.search('bob')
+
+        self.assertEqual(results.count(), 5)
+        self.assertEqual(len(results[1:3]), 2)
+        self.assertEqual(results[4].name, list(results)[4].name)
+
+    @override_app_settings(SEARCH_INDEX=True)
+    def test_updated_on_save(self):
+        creator = IndividualCreatorFactory(name='Bob')
+        rebuild_index()
+
+        creator.name = 'Terry'
+        creator.save()
+        IndividualCreatorFactory(name='Bobby')
+
+        self.assertEqual(self.names('bob'), ['Bobby'])
+        self.assertEqual(self.names('terry'), ['Terry'])
+
+    @override_app_settings(SEARCH_INDEX=True)
+    def test_event_titles_from_creators(self):
+        "Events without titles are found by the titles made for them."
+        rebuild_index()
+
+        event = GigEventFactory(title='')
+        EventRoleFactory(event=event,
+                         creator=IndividualCreatorFactory(name='Nick Cave'))
+        # Its titles are recreated, with update(), when the transaction
+        # is committed:
+        dirty_events.flush()
+
+        self.assertEqual(
+            sorted(obj._meta.model_name for obj in self.search('nick cave')),
+            ['creator', 'event'])
+
+    @override_app_settings(SEARCH_INDEX=True)
+    def test_updated_on_delete(self):
+        creator = IndividualCreatorFactory(name='Bob')
+        rebuild_index()
+
+        creator.delete()
+
+        self.assertEqual(self.names('bob'), [])
+        self.assertEqual(num_documents(), 0)
+
+    @override_app_settings(SEARCH_INDEX=True)
+    def test_no_documents_before_built(self):
+        "Saving shouldn't create a partial index before it's built."
+        IndividualCreatorFactory(name='Bob')
+
+        self.assertEqual(SearchDocument.objects.count(), 0)
+
+    def test_not_updated_by_default(self):
+        creator = IndividualCreatorFactory(name='Bob')
+        rebuild_index()
+
+        creator.delete()
+
+        self.assertEqual(num_documents(), 1)
+        # But deleted objects aren't returned:
+        self.assertEqual(self.names('bob'), [])
+
+    def test_rebuild_index(self):
+        IndividualCreatorFactory.create_batch(3)
+        VenueFactory()
+
+        self.assertEqual(rebuild_index(), 4)
+        self.assertEqual(rebuild_index(), 4)
+        self.assertEqual(num_documents(), 4)
+
+
+class TokensSearchTestCase(SearchTests, TestCase):
+
+    def run(self, *args, **kwargs):
+        return override_app_settings(SEARCH_BACKEND='tokens')(
+                                            super().run)(*args, **kwargs)
+
+    def test_backend(self):
+        self.assertEqual(get_backend().name, 'tokens')
+
+
+class FTS5SearchTestCase(SearchTests, TestCase):
+
+    def run(self, *args, **kwargs):
+        return override_app_settings(SEARCH_BACKEND='fts5')(
+                                            super().run)(*args, **kwargs)
+
+    def setUp(self):
+        if not has_fts_table():
+            self.skipTest("SQLite doesn't have FTS5.")
+
+    def test_backend(self):
+        self.assertEqual(get_backend().name, 'fts5')
+
+
+class SearchViewTestCase(ViewTestCase):
+
+    def setUp(self):
+        super().setUp()
+        for i in range(25):
+            IndividualCreatorFactory(name='Bob {}'.format(i))
+        rebuild_index()
+
+    def get(self, view_class, **params):
+        request = self.factory.get('/fake-path/', params)
+        return view_class.as_view()(request)
+
+    def test_404_if_disabled(self):
+        with self.assertRaises(Http404):
+            self.get(views.SearchView, q='bob')
+
+    @override_app_settings(SEARCH_INDEX=True)
+    def test_context(self):
+        response = self.get(views.SearchView, q='bob')
+        context = response.context_data
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.template_name[0],
+                         'spectator_core/search.html')
+        self.assertEqual(context['query'], 'bob')
+        self.assertEqual(context['paginator'].count, 25)
+        self.assertEqual(len(context['object_list']), 20)
+
+    @override_app_settings(SEARCH_INDEX=True)
+    def test_page_2(self):
+        response = self.get(views.SearchView, q='bob', p='2')
+
+        self.assertEqual(len(response.context_data['object_list']), 5)
+
+    @override_app_settings(SEARCH_INDEX=True)
+    def test_renders(self):
+        response = self.get(views.SearchView, q='bob 3')
+        response.render()
+
+        self.assertIn('Bob 3', response.content.decode())
+
+    @override_app_settings(SEARCH_INDEX=True)
+    def test_json(self):
+        response = self.get(views.SearchJSONView, q='bob', p='2')
+        data = json.loads(response.content.decode())
+
+        self.assertEqual(data['query'], 'bob')
+        self.assertEqual(data['count'], 25)
+        self.assertEqual(data['page'], 2)
+        self.assertEqual(data['num_pages'], 2)
+        self.assertEqual(len(data['results']), 5)
+        self.assertEqual(data['results'][0]['type'], 'creator')
+        self.assertTrue(data['results'][0]['url'].startswith('/creators/'))
+
+
+class RebuildSearchIndexCommandTestCase(TestCase):
+
+    def test_rebuilds(self):
+        IndividualCreatorFactory.create_batch(2)
+
+        out = StringIO()
+        call_command('spectator_rebuild_search_index', stdout=out)
+
+        self.assertEqual(num_documents(), 2)
+        self.assertIn('Indexed 2 objects', out.getvalue())
@@ -0,0 +1,123 @@
+from django.contrib.sitemaps import views as sitemaps_views
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, PageNotAnInteger
+from django.http import Http404
+from django.test import RequestFactory, TestCase
+
+from spectator.core.factories import *
+from spectator.core.sitemaps import CreatorSitemap, get_sitemaps
+from spectator.events.factories import *
+from spectator.events.sitemaps import EventSitemap, WorkSitemap
+
+
+class FakeSite(object):
+    domain = 'example.com'
+
+
+class SmallCreatorSitemap(CreatorSitemap):
+    limit = 2
+
+
+class SectionedSitemapTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.creators = [IndividualCreatorFactory(pk=pk)
+                         for pk in [1, 2, 3, 5]]
+
+    def get_locations(self, sitemap, page=1):
+        return [u['location'] for u in
+                sitemap.get_urls(page=page, site=FakeSite(), protocol='https')]
+
+    def test_urls(self):
+        urls = CreatorSitemap().get_urls(site=FakeSite(), protocol='https')
+        self.assertEqual(
+            [u['location'] for u in urls],
+            ['https://example.com' + c.get_absolute_url()
+             for c in self.creators])
+        self.assertEqual(urls[0]['lastmod'], self.creators[0].time_modified)
+        self.assertEqual(urls[0]['changefreq'], 'yearly')
+        self.assertEqual(urls[0]['priority'], '0.5')
+
+    def test_sections(self):
+        "Each section contains a block of pks."
+        sitemap = SmallCreatorSitemap()
+        self.assertEqual(sitemap.paginator.num_pages, 3)
+        self.assertEqual(len(self.get_locations(sitemap, 1)), 2)
+        self.assertEqual(len(self.get_locations(sitemap, 2)), 1)
+        self.assertEqual(len(self.get_locations(sitemap, '3')), 1)
+
+    def test_invalid_pages(self):
+        with self.assertRaises(EmptyPage):
+            self.get_locations(SmallCreatorSitemap(), 4)
+        with self.assertRaises(PageNotAnInteger):
+            self.get_locations(SmallCreatorSitemap(), 'foo')
+
+    def test_latest_lastmod(self):
+        sitemap = SmallCreatorSitemap()
+        self.get_locations(sitemap, 1)
+        self.assertEqual(sitemap.latest_lastmod,
+                         self.creators[1].time_modified)
+
+    def test_only_fetches_fields(self):
+        GigEventFactory()
+        with self.assertNumQueries(3) as queries:
+            self.get_locations(EventSitemap())
+        self.assertNotIn('"note"', queries.captured_queries[-1]['sql'])
+
+    def test_cached(self):
+        "Unchanged sections are fetched from the cache."
+        sitemap = SmallCreatorSitemap()
+        locations = self.get_locations(sitemap, 1)
+
+        # Finding the number of pages, and the section's stamp:
+        with self.assertNumQueries(2):
+            self.assertEqual(self.get_locations(sitemap, 1), locations)
+
+    def test_regenerated_when_changed(self):
+        sitemap = SmallCreatorSitemap()
+        self.get_locations(sitemap, 1)
+        self.get_locations(sitemap, 2)
+
+        self.creators[0].name = 'New Name'
+        self.creators[0].save()
+
+        with self.assertNumQueries(3):
+            self.get_locations(sitemap, 1)
+        # The other section is still cached:
+        with self.assertNumQueries(2):
+            self.get_locations(sitemap, 2)
+
+    def test_regenerated_when_deleted(self):
+        sitemap = SmallCreatorSitemap()
+        self.get_locations(sitemap, 1)
+        self.creators[0].delete()
+        self.assertEqual(len(self.get_locations(sitemap, 1)), 1)
+
+    def test_work_locations(self):
+        work = MovieFactory()
+        self.assertEqual(self.get_locations(WorkSitemap()),
+                         ['https://example.com' + work.get_absolute_url()])
+
+    def test_sitemap_view(self):
+        request = RequestFactory().get('/sitemap-creators.xml', {'p': 2})
+        response = sitemaps_views.sitemap(
+                            request, {'creators': SmallCreatorSitemap},
+                            section='creators')
+        locations = [u['location'] for u in response.context_data['urlset']]
+        self.assertEqual(len(locations), 1)
+        self.assertTrue(
+                locations[0].endswith(self.creators[2].get_absolute_url()))
+        self.assertTrue(response.has_header('Last-Modified'))
+
+    def test_sitemap_view_404(self):
+        request = RequestFactory().get('/sitemap-creators.xml', {'p': 9})
+        with self.assertRaises(Http404):
+            sitemaps_views.sitemap(request, {'creators': SmallCreatorSitemap},
+                                   section='creators')
+
+    def test_get_sitemaps(self):
+        self.assertEqual(
+            sorted(get_sitemaps().keys()),
+            ['creators', 'events', 'publications', 'publicationseries',
+             'venues', 'works'])
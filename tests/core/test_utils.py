@@ -1,7 +1,15 @@
+from unittest.mock import patch
+
 from django.test import TestCase
 
-from spectator.core.utils import chartify
+from .. import override_app_settings
+from spectator.core.models import Creator
+from spectator.core.utils import (
+    chartify, chartify_queryset, decode_slug, generate_slug,
+    supports_window_functions
+)
 from spectator.core.factories import IndividualCreatorFactory
+from spectator.events.factories import EventRoleFactory
 
 
 class ChartifyTestCase(TestCase):
@@ -74,3 +82,73 @@ class ChartifyTestCase(TestCase):
         chart = chartify([creator], 'num_readings', cutoff=1)
 
         self.assertEqual(len(chart), 0)
+
+
+class ChartifyQuerySetTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Numbers of Events for each Creator:
+        for name, num in [('a', 3), ('b', 2), ('c', 2), ('d', 1), ('e', 0)]:
+            creator = IndividualCreatorFactory(name=name)
+            for i in range(num):
+                EventRoleFactory(creator=creator)
+
+    def get_chart(self, **kwargs):
+        chart = chartify_queryset(Creator.objects.by_events(), 'num_events',
+                                                                    **kwargs)
+        return [(c.name, c.num_events, c.chart_position) for c in chart]
+
+    def test_supports_window_functions(self):
+        # Our test database is SQLite 3.25+:
+        self.assertTrue(supports_window_functions('default'))
+
+    def test_chart(self):
+        self.assertEqual(self.get_chart(),
+                    [('a', 3, 1), ('b', 2, 2), ('c', 2, 2), ('d', 1, 4)])
+
+    def test_num(self):
+        self.assertEqual(self.get_chart(num=2), [('a', 3, 1), ('b', 2, 2)])
+
+    def test_cutoff(self):
+        self.assertEqual(self.get_chart(cutoff=1),
+                    [('a', 3, 1), ('b', 2, 2), ('c', 2, 2)])
+
+    def test_cutoff_none(self):
+        self.assertEqual(len(self.get_chart(cutoff=None)), 5)
+
+    def test_ensure_chartiness(self):
+        self.assertEqual(self.get_chart(cutoff=2), [])
+
+    def test_ensure_chartiness_false(self):
+        self.assertEqual(self.get_chart(cutoff=2, ensure_chartiness=False),
+                    [('a', 3, 1)])
+
+    def test_one_query(self):
+        with self.assertNumQueries(1):
+            self.get_chart(num=2)
+
+    @patch('spectator.core.utils.supports_window_functions')
+    def test_fallback(self, supports):
+        "It should get the same results without window functions."
+        supports.return_value = False
+        self.assertEqual(self.get_chart(num=3),
+                    [('a', 3, 1), ('b', 2, 2), ('c', 2, 2)])
+        self.assertEqual(self.get_chart(cutoff=2), [])
+
+
+class SlugTestCase(TestCase):
+
+    def test_generate_slug(self):
+        self.assertEqual(generate_slug(123), '9g5o8')
+
+    @override_app_settings(SLUG_SALT='My new salt')
+    def test_generate_slug_custom_salt(self):
+        self.assertEqual(generate_slug(123), 'y9xgy')
+
+    def test_decode_slug(self):
+        self.assertEqual(decode_slug('9g5o8'), 123)
+
+    def test_decode_slug_invalid(self):
+        self.assertIsNone(decode_slug('nope'))
+        self.assertIsNone(decode_slug(''))
@@ -1,12 +1,17 @@
+import time
+
+from django.db import connection
 from django.http.response import Http404
 from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import http_date
 
-from .. import make_date
+from .. import make_date, override_app_settings
 from spectator.core import views
 from spectator.core.factories import GroupCreatorFactory,\
         IndividualCreatorFactory
-from spectator.events.factories import GigEventFactory, CinemaEventFactory
-from spectator.reading.factories import ReadingFactory
+from spectator.events.factories import *
+from spectator.reading.factories import *
 
 
 class ViewTestCase(TestCase):
@@ -134,3 +139,187 @@ class CreatorDetailViewTestCase(ViewTestCase):
         self.assertEqual(response.template_name[0],
                 'spectator_core/creator_detail.html')
 
+    def test_context(self):
+        "It should have the Creator's things, with Works grouped by kind."
+        creator = IndividualCreatorFactory()
+        movie = MovieFactory()
+        WorkRoleFactory(work=movie, creator=creator)
+        # Two roles shouldn't make it appear twice:
+        WorkRoleFactory(work=movie, creator=creator)
+        play = PlayFactory()
+        WorkRoleFactory(work=play, creator=creator)
+        event = GigEventFactory()
+        EventRoleFactory(event=event, creator=creator)
+        publication = PublicationFactory()
+        PublicationRoleFactory(publication=publication, creator=creator)
+
+        response = views.CreatorDetailView.as_view()(self.request,
+                                                     slug=creator.slug)
+        context = response.context_data
+
+        self.assertEqual(context['works']['movie'], [movie])
+        self.assertEqual(context['works']['play'], [play])
+        self.assertEqual(context['works']['exhibition'], [])
+        self.assertEqual(context['event_list'], [event])
+        self.assertEqual(context['publication_list'], [publication])
+
+    def count_queries(self, creator):
+        "The number of queries it takes to render `creator`'s page."
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(creator.get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+        return len(captured.captured_queries)
+
+    def add_things(self, creator, num):
+        "Add `num` of every kind of thing to `creator`, with other Creators."
+        for i in range(num):
+            publication = PublicationFactory(series=PublicationSeriesFactory())
+            PublicationRoleFactory(publication=publication, creator=creator)
+            PublicationRoleFactory(publication=publication)
+
+            event = GigEventFactory(date=make_date('2017-02-15'),
+                                    venue=VenueFactory())
+            EventRoleFactory(event=event, creator=creator)
+
+            for work_factory in (MovieFactory, PlayFactory,
+                                 ClassicalWorkFactory, DancePieceFactory,
+                                 ExhibitionFactory):
+                work = work_factory()
+                WorkRoleFactory(work=work, creator=creator)
+                WorkRoleFactory(work=work)
+
+    def test_num_queries(self):
+        "The number of queries shouldn't depend on how much they've done."
+        creator = IndividualCreatorFactory()
+        self.add_things(creator, 1)
+        num_queries = self.count_queries(creator)
+
+        creator = IndividualCreatorFactory()
+        self.add_things(creator, 4)
+
+        self.assertEqual(self.count_queries(creator), num_queries)
+
+
+
+class DecodeSlugMixinTestCase(ViewTestCase):
+    "Using CreatorDetailView to test DecodeSlugMixin."
+
+    def get_object(self, slug):
+        view = views.CreatorDetailView()
+        view.kwargs = {'slug': slug}
+        return view.get_object()
+
+    def test_decodes_slug(self):
+        "It should get the object by pk, in one query."
+        creator = IndividualCreatorFactory(pk=123)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get_object('9g5o8'), creator)
+
+    def test_legacy_slug(self):
+        "It should fall back to the slug field if the slug can't be decoded."
+        creator = IndividualCreatorFactory(slug='legacy')
+        self.assertEqual(self.get_object('legacy'), creator)
+
+    def test_mismatched_slug(self):
+        "If the decoded pk's object has a different slug, use the slug field."
+        # '9g5o8' decodes to 123:
+        IndividualCreatorFactory(pk=123, slug='other')
+        creator = IndividualCreatorFactory(pk=124, slug='9g5o8')
+        self.assertEqual(self.get_object('9g5o8'), creator)
+
+    def test_404(self):
+        IndividualCreatorFactory(pk=123, slug='other')
+        with self.assertRaises(Http404):
+            self.get_object('9g5o8')
+
+
+class ConditionalGetMixinTestCase(ViewTestCase):
+    "Using CreatorDetailView and CreatorListView to test the mixins."
+
+    def setUp(self):
+        super().setUp()
+        self.creator = IndividualCreatorFactory(name='Bob Ferris')
+        self.role = EventRoleFactory(
+                creator=self.creator,
+                event=MiscEventFactory(date=make_date('2017-02-01')))
+
+    def get_detail(self, **headers):
+        request = self.factory.get('/fake-path/', **headers)
+        return views.CreatorDetailView.as_view()(request,
+                                                 slug=self.creator.slug)
+
+    def get_list(self, **headers):
+        request = self.factory.get('/fake-path/', **headers)
+        return views.CreatorListView.as_view()(request)
+
+    def test_not_enabled(self):
+        response = self.get_detail()
+        self.assertFalse(response.has_header('ETag'))
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    @override_app_settings(CONDITIONAL_GET=True)
+    def test_headers(self):
+        response = self.get_detail()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertFalse(response.has_header('Last-Modified'))
+        self.assertIn('Cookie', response['Vary'])
+
+    @override_app_settings(CONDITIONAL_GET=True)
+    def test_if_none_match(self):
+        "It should respond with a 304 without fetching the page's data."
+        etag = self.get_detail()['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_detail(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        with CaptureQueriesContext(connection) as all_queries:
+            self.get_detail().render()
+        self.assertLess(len(queries), len(all_queries))
+
+    @override_app_settings(CONDITIONAL_GET=True)
+    def test_if_modified_since_ignored(self):
+        "It can't tell if objects have been deleted since a time."
+        last_modified = http_date(time.time() + 60)
+        response = self.get_detail(HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+
+    @override_app_settings(CONDITIONAL_GET=True)
+    def test_etag_changes_with_object(self):
+        etag = self.get_detail()['ETag']
+        self.creator.name = 'Terry Collier'
+        self.creator.save()
+        response = self.get_detail(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    @override_app_settings(CONDITIONAL_GET=True)
+    def test_etag_changes_with_related_objects(self):
+        "Changing one of the Creator's Events changes the ETag."
+        etag = self.get_detail()['ETag']
+        self.role.event.note = 'Changed'
+        self.role.event.save()
+        response = self.get_detail(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    @override_app_settings(CONDITIONAL_GET=True)
+    def test_etag_changes_when_related_object_deleted(self):
+        etag = self.get_detail()['ETag']
+        self.role.delete()
+        response = self.get_detail(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    @override_app_settings(CONDITIONAL_GET=True)
+    def test_list(self):
+        etag = self.get_list()['ETag']
+        response = self.get_list(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    @override_app_settings(CONDITIONAL_GET=True)
+    def test_list_etag_changes_when_object_deleted(self):
+        other = IndividualCreatorFactory()
+        etag = self.get_list()['ETag']
+        other.delete()
+        response = self.get_list(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
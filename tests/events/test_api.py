@@ -0,0 +1,172 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import make_date, override_app_settings
+from ..core.test_api import APITestCase
+from spectator.events.factories import *
+
+
+class EventAPITestCase(APITestCase):
+
+    def setUp(self):
+        self.event = GigEventFactory(title='Big Gig',
+                                     date=make_date('2017-02-10'),
+                                     venue=VenueFactory(name='The Hall'))
+        EventRoleFactory(event=self.event, role_name='Headliner',
+                         creator__name='Bob Ferris')
+        self.work = MovieFactory(title='Alien')
+        WorkRoleFactory(work=self.work, role_name='Director',
+                        creator__name='Ridley Scott')
+        WorkSelectionFactory(event=self.event, work=self.work)
+
+        self.url = reverse('spectator:api:event_detail',
+                           kwargs={'slug': self.event.slug})
+
+    @override_app_settings(API=True)
+    def test_detail(self):
+        response, data = self.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['title'], 'Big Gig')
+        self.assertEqual(data['kind'], 'gig')
+        self.assertEqual(data['date'], '2017-02-10')
+        self.assertEqual(data['venue']['name'], 'The Hall')
+        self.assertEqual(data['roles'][0]['creator']['name'], 'Bob Ferris')
+        self.assertEqual(data['roles'][0]['role_name'], 'Headliner')
+        self.assertEqual(data['works'][0]['name'], 'Alien')
+        self.assertEqual(data['works'][0]['roles'][0]['creator']['name'],
+                         'Ridley Scott')
+
+    @override_app_settings(API=True)
+    def test_etag_changes_with_related_objects(self):
+        "Changing a Work's Creator changes the Event's ETag."
+        etag = self.client.get(self.url)['ETag']
+
+        creator = self.work.roles.get().creator
+        creator.name = 'Someone Else'
+        creator.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    @override_app_settings(API=True)
+    def test_etag_changes_when_role_deleted(self):
+        etag = self.client.get(self.url)['ETag']
+        self.event.roles.all().delete()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    @override_app_settings(API=True)
+    def test_list_queries(self):
+        "The number of queries doesn't depend on the number of Events."
+        url = reverse('spectator:api:event_list')
+
+        with CaptureQueriesContext(connection) as queries:
+            response, data = self.get(url)
+        num_queries = len(queries)
+
+        for n in range(3):
+            event = GigEventFactory()
+            EventRoleFactory(event=event)
+            WorkSelectionFactory(event=event, work=MovieFactory())
+
+        with CaptureQueriesContext(connection) as queries:
+            response, data = self.get(url)
+        self.assertEqual(len(data['results']), 4)
+        self.assertEqual(len(queries), num_queries)
+
+
+class WorkAPITestCase(APITestCase):
+
+    @override_app_settings(API=True)
+    def test_list(self):
+        work = MovieFactory(title='Alien', year=1979)
+        WorkRoleFactory(work=work, role_name='Director',
+                        creator__name='Ridley Scott')
+
+        response, data = self.get(reverse('spectator:api:work_list'))
+        self.assertEqual(data['results'][0]['title'], 'Alien')
+        self.assertEqual(data['results'][0]['year'], 1979)
+        self.assertEqual(data['results'][0]['roles'][0]['role_name'],
+                         'Director')
+
+    @override_app_settings(API=True)
+    def test_detail(self):
+        work = PlayFactory(title='Hamlet')
+        response, data = self.get(reverse('spectator:api:work_detail',
+                                          kwargs={'slug': work.slug}))
+        self.assertEqual(data['kind'], 'play')
+
+
+class VenueAPITestCase(APITestCase):
+
+    @override_app_settings(API=True)
+    def test_detail(self):
+        venue = VenueFactory(name='The Hall', latitude=51.5, longitude=-0.1,
+                             country='GB')
+        response, data = self.get(reverse('spectator:api:venue_detail',
+                                          kwargs={'slug': venue.slug}))
+        self.assertEqual(data['name'], 'The Hall')
+        self.assertEqual(data['latitude'], 51.5)
+        self.assertEqual(data['longitude'], -0.1)
+        self.assertEqual(data['country'], 'GB')
+
+    @override_app_settings(API=True)
+    def test_list(self):
+        VenueFactory(name='The Hall')
+        response, data = self.get(reverse('spectator:api:venue_list'))
+        self.assertEqual(data['results'][0]['name'], 'The Hall')
+        self.assertIsNone(data['results'][0]['latitude'])
+
+
+class VenueMapTileAPITestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.venue = VenueFactory(name='The Hall',
+                                  latitude=51.508, longitude=-0.128)
+        GigEventFactory(venue=self.venue)
+        self.url = reverse('spectator:api:venue_map_tile',
+                           kwargs={'zoom': 3, 'x': 3, 'y': 2})
+
+    def test_not_enabled(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+
+    @override_app_settings(API=True)
+    def test_tile(self):
+        response, data = self.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((data['zoom'], data['x'], data['y']), (3, 3, 2))
+        self.assertEqual(len(data['clusters']), 1)
+        self.assertEqual(data['clusters'][0]['visits'], 1)
+        self.assertEqual(data['clusters'][0]['venue']['name'], 'The Hall')
+
+    @override_app_settings(API=True)
+    def test_invalid_tile(self):
+        response = self.client.get(reverse('spectator:api:venue_map_tile',
+                                           kwargs={'zoom': 3, 'x': 8, 'y': 2}))
+        self.assertEqual(response.status_code, 404)
+
+    @override_app_settings(API=True)
+    def test_cached(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response, data = self.get(self.url)
+        self.assertEqual(len(data['clusters']), 1)
+
+    @override_app_settings(API=True)
+    def test_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    @override_app_settings(API=True)
+    def test_etag_changes_with_visits(self):
+        etag = self.client.get(self.url)['ETag']
+        GigEventFactory(venue=self.venue)
+        response, data = self.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['clusters'][0]['visits'], 2)
@@ -0,0 +1,94 @@
+from django.test import TestCase
+
+from spectator.events import geo
+
+
+class EncodeTestCase(TestCase):
+
+    def test_encode(self):
+        self.assertEqual(geo.encode(57.64911, 10.40744, 11), 'u4pruydqqvj')
+
+    def test_default_precision(self):
+        self.assertEqual(geo.encode(51.5034, -0.1276), 'gcpuvpgj4')
+
+    def test_extremes(self):
+        self.assertEqual(geo.encode(-90, -180, 3), '000')
+        self.assertEqual(geo.encode(90, 180, 3), 'zzz')
+
+
+class GetCellsTestCase(TestCase):
+
+    def test_cells(self):
+        self.assertEqual(geo.get_cells(51.4, -0.3, 51.6, 0.1),
+                         ['gcpu', 'gcpv', 'u10h', 'u10j'])
+
+    def test_cells_contain_points(self):
+        cells = geo.get_cells(51.4, -0.3, 51.6, 0.1)
+        self.assertTrue(any(geo.encode(51.5, -0.1).startswith(c)
+                            for c in cells))
+
+    def test_small_box(self):
+        "Small boxes are covered by small cells."
+        cells = geo.get_cells(51.5, -0.13, 51.5001, -0.1299)
+        self.assertTrue(all(len(c) >= 7 for c in cells))
+
+    def test_180th_meridian(self):
+        cells = geo.get_cells(-10, 170, 10, -170)
+        self.assertIn(geo.encode(0, 175)[:2], cells)
+        self.assertIn(geo.encode(0, -175)[:2], cells)
+
+    def test_max_cells(self):
+        self.assertLessEqual(len(geo.get_cells(0, 0, 30, 30, max_cells=4)), 4)
+
+    def test_too_big(self):
+        self.assertIsNone(geo.get_cells(-80, -180, 80, 180))
+
+
+class GetNextCellTestCase(TestCase):
+
+    def test_next(self):
+        self.assertEqual(geo.get_next_cell('gcpu'), 'gcpv')
+        self.assertEqual(geo.get_next_cell('gcp9'), 'gcpb')
+
+    def test_carry(self):
+        self.assertEqual(geo.get_next_cell('gcpz'), 'gcq0')
+        self.assertEqual(geo.get_next_cell('gczz'), 'gd00')
+
+    def test_last(self):
+        self.assertIsNone(geo.get_next_cell('zz'))
+
+    def test_contains_cell(self):
+        "Every geohash within a cell is between it and the next cell."
+        for geohash in ('gcpuvpgj4', 'gcpzzzzzz', 'gcp000000'):
+            cell = geohash[:4]
+            self.assertTrue(cell <= geohash < geo.get_next_cell(cell))
+
+
+class GetBoundingBoxTestCase(TestCase):
+
+    def test_box(self):
+        south, west, north, east = geo.get_bounding_box(51.5, -0.12, 10)
+        self.assertAlmostEqual(south, 51.41, places=2)
+        self.assertAlmostEqual(north, 51.59, places=2)
+        self.assertAlmostEqual(west, -0.265, places=3)
+        self.assertAlmostEqual(east, 0.025, places=3)
+
+    def test_180th_meridian(self):
+        south, west, north, east = geo.get_bounding_box(0, 179.99, 20)
+        self.assertGreater(west, east)
+
+    def test_pole(self):
+        self.assertEqual(geo.get_bounding_box(89.99, 0, 10)[1:4:2],
+                         (-180, 180))
+
+
+class HaversineTestCase(TestCase):
+
+    def test_distance(self):
+        # London to Paris:
+        self.assertAlmostEqual(
+                geo.haversine_km(51.5034, -0.1276, 48.8566, 2.3522),
+                343.2, places=1)
+
+    def test_same_point(self):
+        self.assertEqual(geo.haversine_km(10, 10, 10, 10), 0)
@@ -0,0 +1,136 @@
+from django.test import TestCase
+
+from .. import make_date
+from spectator.core.factories import *
+from spectator.core.models import Creator
+from spectator.events.factories import *
+from spectator.events.importers import EventImporter, WorkImporter
+from spectator.events.models import Event, Venue, Work
+
+
+class EventImporterTestCase(TestCase):
+
+    def test_event(self):
+        EventImporter().run([{
+            'kind': 'gig', 'date': '2018-03-31', 'title': 'Fest',
+            'venue': 'Cafe Oto', 'note': 'Good.',
+            'creators': 'Nick Cave|Vocals; The Bad Seeds||group',
+        }])
+
+        event = Event.objects.get()
+        self.assertEqual(event.date, make_date('2018-03-31'))
+        self.assertEqual(event.title_plain, 'Fest')
+        self.assertEqual(event.kind_slug, 'gigs')
+        self.assertEqual(event.venue.name, 'Cafe Oto')
+        self.assertEqual(event.venue_name, 'Cafe Oto')
+        self.assertEqual(event.note, 'Good.')
+        self.assertIsNotNone(event.slug)
+        self.assertEqual(
+            [(r.creator.name, r.creator.kind, r.role_name, r.role_order)
+             for r in event.roles.all()],
+            [('Nick Cave', 'individual', 'Vocals', 1),
+             ('The Bad Seeds', 'group', '', 2)])
+        self.assertEqual(Venue.objects.get().name_sort, 'cafe oto')
+        self.assertEqual(Creator.objects.get(name='Nick Cave').name_sort,
+                         'cave, nick')
+
+    def test_titles_from_creators(self):
+        EventImporter().run([{'kind': 'gig', 'creators': 'The Tuts'}])
+
+        event = Event.objects.get()
+        self.assertEqual(event.title_plain, 'The Tuts')
+        self.assertEqual(event.title_html, 'The Tuts')
+        self.assertEqual(event.title_sort, 'tuts, the')
+
+    def test_titles_from_works(self):
+        EventImporter().run([{'kind': 'cinema', 'works': 'Alien; Aliens'}])
+
+        event = Event.objects.get()
+        self.assertEqual(event.title_plain, 'Alien and Aliens')
+        self.assertEqual(event.title_html,
+                         '<cite>Alien</cite> and <cite>Aliens</cite>')
+        self.assertEqual([w.kind for w in Work.objects.all()],
+                         ['movie', 'movie'])
+
+    def test_title_without_roles(self):
+        EventImporter().run([{'kind': 'gig'}])
+
+        event = Event.objects.get()
+        self.assertEqual(event.title_plain, 'Event #{}'.format(event.pk))
+
+    def test_uses_existing_objects(self):
+        creator = GroupCreatorFactory(name='The Tuts')
+        venue = VenueFactory(name='Cafe Oto')
+        work = MovieFactory(title='Alien')
+
+        EventImporter().run([
+            {'kind': 'gig', 'venue': 'cafe oto', 'creators': 'the tuts'},
+            {'kind': 'cinema', 'venue': 'Cafe Oto', 'works': 'ALIEN|movie'},
+        ])
+
+        self.assertEqual(Creator.objects.count(), 1)
+        self.assertEqual(Venue.objects.count(), 1)
+        self.assertEqual(Work.objects.count(), 1)
+        gig, movie = Event.objects.order_by('pk')
+        self.assertEqual(gig.roles.get().creator, creator)
+        self.assertEqual(gig.title_plain, 'The Tuts')
+        self.assertEqual(gig.venue, venue)
+        self.assertEqual(movie.work_selections.get().work, work)
+
+    def test_creates_each_object_once(self):
+        EventImporter(batch_size=1).run([
+            {'kind': 'gig', 'venue': 'Cafe Oto', 'creators': 'The Tuts'},
+            {'kind': 'gig', 'venue': 'Cafe Oto', 'creators': 'The Tuts'},
+        ])
+
+        self.assertEqual(Event.objects.count(), 2)
+        self.assertEqual(Creator.objects.count(), 1)
+        self.assertEqual(Venue.objects.count(), 1)
+
+    def test_work_kind_required(self):
+        with self.assertRaises(ValueError):
+            EventImporter().run([{'kind': 'gig', 'works': 'Alien'}])
+
+    def test_json_lists(self):
+        EventImporter().run([{
+            'kind': 'misc',
+            'creators': [{'name': 'Bob', 'role': 'Host'}],
+            'works': [{'title': 'Hamlet', 'kind': 'play'}],
+        }])
+
+        event = Event.objects.get()
+        self.assertEqual(event.roles.get().role_name, 'Host')
+        self.assertEqual(event.works.get().kind, 'play')
+
+    def test_invalid_date(self):
+        with self.assertRaises(ValueError):
+            EventImporter().run([{'kind': 'gig', 'date': '31/03/2018'}])
+
+
+class WorkImporterTestCase(TestCase):
+
+    def test_work(self):
+        WorkImporter().run([{
+            'kind': 'movie', 'title': 'The Thing', 'year': '1982',
+            'imdb_id': 'tt0084787', 'creators': 'John Carpenter|Director',
+        }])
+
+        work = Work.objects.get()
+        self.assertEqual(work.title_sort, 'thing, the')
+        self.assertEqual(work.year, 1982)
+        self.assertEqual(work.imdb_id, 'tt0084787')
+        self.assertIsNotNone(work.slug)
+        role = work.roles.get()
+        self.assertEqual((role.creator.name, role.role_name),
+                         ('John Carpenter', 'Director'))
+
+    def test_skips_existing(self):
+        MovieFactory(title='Alien')
+
+        created = WorkImporter().run([
+            {'kind': 'movie', 'title': 'Alien', 'creators': 'Ridley Scott'},
+            {'kind': 'play', 'title': 'Alien'},
+        ])
+
+        self.assertEqual(Work.objects.count(), 2)
+        self.assertEqual(created, {'works': 1})
@@ -0,0 +1,55 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from spectator.core.factories import *
+from spectator.events.factories import *
+from spectator.events.maps import get_tile
+from spectator.events.models import Event
+
+
+class UpdateEventTitlesTestCase(TestCase):
+
+    def test_updates_titles(self):
+        event = GigEventFactory(title='')
+        EventRoleFactory(event=event,
+                        creator=GroupCreatorFactory(name='The Tuts'))
+        Event.objects.filter(pk=event.pk).update(
+                            title_plain='', title_html='', title_sort='')
+
+        out = StringIO()
+        call_command('spectator_update_event_titles', stdout=out)
+
+        event.refresh_from_db()
+        self.assertEqual(event.title_plain, 'The Tuts')
+        self.assertEqual(event.title_html, 'The Tuts')
+        self.assertEqual(event.title_sort, 'tuts, the')
+        self.assertIn('Updated the titles of 1 Event(s).', out.getvalue())
+
+    def test_leaves_correct_titles(self):
+        GigEventFactory(title='Indietracks')
+
+        out = StringIO()
+        call_command('spectator_update_event_titles', stdout=out)
+
+        self.assertIn('Updated the titles of 0 Event(s).', out.getvalue())
+
+
+class BuildVenueMapTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_builds_tiles(self):
+        VenueFactory(latitude=51.508, longitude=-0.128)
+
+        out = StringIO()
+        call_command('spectator_build_venue_map', '--max-zoom', '2',
+                     stdout=out)
+
+        self.assertIn('Cached 3 tile(s) for zoom levels 0 to 2.',
+                      out.getvalue())
+        with self.assertNumQueries(0):
+            self.assertEqual(len(get_tile(2, 1, 1)), 1)
@@ -5,6 +5,86 @@ from spectator.events.factories import *
 from spectator.events.models import Venue, Work
 
 
+class VenueManagerGeoTestCase(TestCase):
+    """
+    Testing the VenueManager.in_bounds() and near() methods.
+    """
+
+    def setUp(self):
+        self.trafalgar = VenueFactory(latitude=51.508, longitude=-0.128)
+        self.greenwich = VenueFactory(latitude=51.477, longitude=-0.001)
+        self.paris = VenueFactory(latitude=48.857, longitude=2.352)
+        self.suva = VenueFactory(latitude=-18.142, longitude=178.442)
+        self.apia = VenueFactory(latitude=-13.834, longitude=-171.769)
+        # Has no location:
+        VenueFactory()
+
+    def test_in_bounds(self):
+        venues = Venue.objects.in_bounds(51.4, -0.3, 51.6, 0.1)
+        self.assertEqual(set(venues), {self.trafalgar, self.greenwich})
+
+    def test_in_bounds_exact(self):
+        "Venues in the cells covering the box, but outside it, aren't found."
+        venues = Venue.objects.in_bounds(51.5, -0.2, 51.6, -0.1)
+        self.assertEqual(list(venues), [self.trafalgar])
+
+    def test_in_bounds_180th_meridian(self):
+        venues = Venue.objects.in_bounds(-20, 175, -10, -170)
+        self.assertEqual(set(venues), {self.suva, self.apia})
+
+    def test_in_bounds_world(self):
+        venues = Venue.objects.in_bounds(-90, -180, 90, 180)
+        self.assertEqual(len(venues), 5)
+
+    def test_in_bounds_geohash_ranges(self):
+        """
+        The geohash ranges' upper bounds are the next cells, which sort the
+        same way in any collation.
+        """
+        qs = Venue.objects.in_bounds(51.4, -0.3, 51.6, 0.1)
+        params = qs.query.sql_with_params()[1]
+        for cell in ('gcpu', 'gcpv', 'u10h', 'u10j'):
+            self.assertIn(cell, params)
+        for bound in ('gcpv', 'gcpw', 'u10j', 'u10k'):
+            self.assertIn(bound, params)
+        self.assertFalse(any('~' in str(p) for p in params))
+
+    def test_in_bounds_carry(self):
+        "A Venue in a cell whose next cell needs a carry is found."
+        venue = VenueFactory(latitude=51.5, longitude=-0.01)
+        self.assertEqual(venue.geohash, 'gcpuzz29n')
+        # Covered by cells including 'gcpuz', whose next cell is 'gcpv0':
+        qs = Venue.objects.in_bounds(51.45, -0.05, 51.55, 0.05)
+        self.assertIn('gcpv0', qs.query.sql_with_params()[1])
+        self.assertIn(venue, qs)
+
+    def test_in_bounds_after_by_visits(self):
+        GigEventFactory(venue=self.greenwich)
+        venues = Venue.objects.by_visits().in_bounds(51.4, -0.3, 51.6, 0.1)
+        self.assertEqual([(v, v.num_visits) for v in venues],
+                         [(self.greenwich, 1), (self.trafalgar, 0)])
+
+    def test_near(self):
+        venues = Venue.objects.near(51.507, -0.127, 20)
+        self.assertEqual(venues, [self.trafalgar, self.greenwich])
+        self.assertAlmostEqual(venues[0].distance_km, 0.13, places=2)
+        self.assertAlmostEqual(venues[1].distance_km, 9.34, places=2)
+
+    def test_near_radius(self):
+        "Venues in the bounding box but not the circle aren't included."
+        # Greenwich is about 9.3km away, but only 8.7km east:
+        venues = Venue.objects.near(51.507, -0.127, 9.2)
+        self.assertEqual(venues, [self.trafalgar])
+
+    def test_near_180th_meridian(self):
+        venues = Venue.objects.near(-16, 179.9, 1500)
+        self.assertEqual(venues, [self.suva, self.apia])
+
+    def test_near_queries(self):
+        with self.assertNumQueries(1):
+            Venue.objects.near(51.507, -0.127, 2000)
+
+
 class VenueManagerByVisitsTestCase(TestCase):
     """
     Testing the VenueManager.by_visits() method.
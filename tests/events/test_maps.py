@@ -0,0 +1,228 @@
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from spectator.events import maps
+from spectator.events.factories import *
+from spectator.events.importers import EventImporter
+from spectator.events.models import Event, Venue
+
+
+class TileMathTestCase(TestCase):
+
+    def test_world(self):
+        self.assertEqual(maps.get_tile_bounds(0, 0, 0), (-90, -180, 90, 180))
+
+    def test_bounds(self):
+        south, west, north, east = maps.get_tile_bounds(1, 1, 0)
+        self.assertAlmostEqual(south, 0)
+        self.assertEqual((west, north, east), (0, 90, 180))
+
+        south, west, north, east = maps.get_tile_bounds(2, 0, 1)
+        self.assertAlmostEqual(south, 0)
+        self.assertAlmostEqual(north, 66.51326, places=5)
+        self.assertEqual((west, east), (-180, -90))
+
+    def test_cell(self):
+        self.assertEqual(maps.get_tile_cell(51.508, -0.128, 3), (3, 2, 7, 5))
+        self.assertEqual(maps.get_tile_cell(-18.142, 178.442, 3), (7, 4, 7, 3))
+
+    def test_cell_within_bounds(self):
+        "Every point is within the bounds of the tile it's in."
+        for lat, lon in ((51.508, -0.128), (-18.142, 178.442), (89.9, 180),
+                         (-90, -180), (0, 0)):
+            for zoom in (0, 1, 5, 12):
+                x, y, column, row = maps.get_tile_cell(lat, lon, zoom)
+                south, west, north, east = maps.get_tile_bounds(zoom, x, y)
+                self.assertTrue(south <= lat <= north and west <= lon <= east,
+                                (lat, lon, zoom))
+
+    def test_is_valid_tile(self):
+        self.assertTrue(maps.is_valid_tile(0, 0, 0))
+        self.assertTrue(maps.is_valid_tile(2, 3, 3))
+        self.assertFalse(maps.is_valid_tile(2, 4, 0))
+        self.assertFalse(maps.is_valid_tile(maps.MAX_ZOOM + 1, 0, 0))
+
+
+class ClusterTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.trafalgar = VenueFactory(name='Trafalgar',
+                                      latitude=51.508, longitude=-0.128)
+        self.greenwich = VenueFactory(name='Greenwich',
+                                      latitude=51.477, longitude=-0.001)
+        self.paris = VenueFactory(latitude=48.857, longitude=2.352)
+        # Has no location:
+        VenueFactory()
+        GigEventFactory(venue=self.trafalgar)
+        GigEventFactory(venue=self.trafalgar)
+        GigEventFactory(venue=self.greenwich)
+
+    def test_world(self):
+        # The Prime Meridian is between two cells:
+        clusters = maps.make_tile(0, 0, 0)
+        self.assertEqual([(c['count'], c['visits']) for c in clusters],
+                         [(2, 3), (1, 0)])
+        self.assertEqual(clusters[0]['bounds'],
+                         [51.477, -0.128, 51.508, -0.001])
+        self.assertNotIn('venue', clusters[0])
+        self.assertEqual(clusters[1]['venue']['slug'], self.paris.slug)
+
+    def test_cluster(self):
+        clusters = maps.make_tile(3, 3, 2)
+        self.assertEqual(clusters, [{
+            'latitude': 51.4925,
+            'longitude': -0.0645,
+            'count': 2,
+            'visits': 3,
+            'bounds': [51.477, -0.128, 51.508, -0.001],
+        }])
+
+    def test_single_venues(self):
+        # Trafalgar and Greenwich are in different cells at this zoom:
+        clusters = maps.make_tile(10, 511, 340)
+        self.assertEqual([c['count'] for c in clusters], [1, 1])
+        self.assertEqual(clusters[0]['venue'], {
+            'slug': self.trafalgar.slug,
+            'name': 'Trafalgar',
+            'url': self.trafalgar.get_absolute_url(),
+        })
+        self.assertEqual(clusters[0]['visits'], 2)
+        self.assertEqual(clusters[1]['venue']['name'], 'Greenwich')
+
+    def test_empty(self):
+        self.assertEqual(maps.make_tile(3, 0, 0), [])
+
+    def test_build_tiles(self):
+        # 1 tile at zoom 0, and 2 at zooms 1, 2 and 3:
+        self.assertEqual(maps.build_tiles(3), 7)
+        with self.assertNumQueries(0):
+            clusters = maps.get_tile(3, 3, 2)
+        self.assertEqual(clusters, maps.make_tile(3, 3, 2))
+
+
+class TileCacheTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.venue = VenueFactory(latitude=51.508, longitude=-0.128)
+
+    @contextmanager
+    def assertBumps(self, bumped=True):
+        "Does the map's generation change within the block?"
+        old = maps.get_map_generation()
+        yield
+        if bumped:
+            self.assertNotEqual(maps.get_map_generation(), old)
+        else:
+            self.assertEqual(maps.get_map_generation(), old)
+
+    def test_cached(self):
+        clusters = maps.get_tile(0, 0, 0)
+        with self.assertNumQueries(0):
+            self.assertEqual(maps.get_tile(0, 0, 0), clusters)
+
+    def test_empty_tile_not_cached(self):
+        maps.get_tile(3, 0, 0)
+        with self.assertNumQueries(1):
+            self.assertEqual(maps.get_tile(3, 0, 0), [])
+
+    def test_zoomed_in_tile_not_cached(self):
+        zoom = maps.MAX_CACHED_ZOOM + 1
+        x, y, column, row = maps.get_tile_cell(51.508, -0.128, zoom)
+        self.assertEqual(len(maps.get_tile(zoom, x, y)), 1)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(maps.get_tile(zoom, x, y)), 1)
+
+    def test_build_tiles_max_cached_zoom(self):
+        self.assertEqual(maps.build_tiles(maps.MAX_ZOOM),
+                         maps.MAX_CACHED_ZOOM + 1)
+
+    def test_venue_moved(self):
+        maps.get_tile(0, 0, 0)
+        self.venue.latitude = 48.857
+        self.venue.save()
+        clusters = maps.get_tile(0, 0, 0)
+        self.assertEqual(clusters[0]['latitude'], 48.857)
+
+    def test_venue_renamed(self):
+        with self.assertBumps():
+            self.venue.name = 'New Name'
+            self.venue.save()
+
+    def test_venue_unchanged(self):
+        venue = Venue.objects.get(pk=self.venue.pk)
+        with self.assertBumps(False):
+            venue.latitude = 51.508
+            venue.note = 'Nice.'
+            venue.save()
+            # Saved again, compared with the values it was last saved with:
+            venue.save()
+
+    def test_venue_saved_without_fetching(self):
+        "Saving doesn't fetch the old values to compare with."
+        venue = Venue.objects.get(pk=self.venue.pk)
+        venue.name = 'New Name'
+        with CaptureQueriesContext(connection) as queries:
+            venue.save()
+        self.assertEqual([q['sql'] for q in queries
+                          if q['sql'].startswith('SELECT')], [])
+
+    def test_deferred_venue_fields(self):
+        "If the values weren't all loaded, it's assumed they've changed."
+        venue = Venue.objects.only('pk', 'note').get(pk=self.venue.pk)
+        with self.assertBumps():
+            venue.save()
+
+    def test_venue_added(self):
+        with self.assertBumps():
+            VenueFactory(latitude=48.857, longitude=2.352)
+
+    def test_venue_without_location_added(self):
+        with self.assertBumps(False):
+            VenueFactory()
+
+    def test_venue_deleted(self):
+        with self.assertBumps():
+            self.venue.delete()
+
+    def test_visit_added(self):
+        maps.get_tile(0, 0, 0)
+        GigEventFactory(venue=self.venue)
+        self.assertEqual(maps.get_tile(0, 0, 0)[0]['visits'], 1)
+
+    def test_event_without_venue_added(self):
+        with self.assertBumps(False):
+            GigEventFactory(venue=None)
+
+    def test_event_moved(self):
+        event = GigEventFactory()
+        with self.assertBumps():
+            event.venue = self.venue
+            event.save()
+
+    def test_event_unchanged(self):
+        event = GigEventFactory(venue=self.venue)
+        with self.assertBumps(False):
+            event.note = 'Good.'
+            event.save()
+            Event.objects.get(pk=event.pk).save()
+
+    def test_loaded_event_moved(self):
+        event = Event.objects.get(pk=GigEventFactory(venue=self.venue).pk)
+        with self.assertBumps():
+            event.venue = VenueFactory()
+            event.save()
+
+    def test_event_deleted(self):
+        event = GigEventFactory(venue=self.venue)
+        with self.assertBumps():
+            event.delete()
+
+    def test_events_imported(self):
+        with self.assertBumps():
+            EventImporter().run([{'kind': 'gig', 'venue': self.venue.name}])
@@ -1,5 +1,7 @@
 from django.core.exceptions import ValidationError
-from django.test import TestCase
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 
 from .. import make_date
 from spectator.core.factories import *
@@ -7,8 +9,13 @@ from spectator.events.factories import *
 from spectator.events.models import Event, Venue, Work
 
 
-class EventStrTestCase(TestCase):
-    "Only testing the Event.__str__() method."
+class EventStrTestCase(TransactionTestCase):
+    """
+    Only testing the Event.__str__() method.
+
+    A TransactionTestCase because titles are only updated after Works and
+    Creators are added once the transaction has been committed.
+    """
 
     def test_with_title(self):
         "If event has a title, that should be used."
@@ -78,7 +85,7 @@ class EventStrTestCase(TestCase):
         self.assertEqual(str(selection), 'Event #{}: My Work'.format(event.pk))
 
 
-class EventTitleHtmlTestCase(TestCase):
+class EventTitleHtmlTestCase(TransactionTestCase):
     "Only testing the Event.title_html property."
 
     def test_with_title(self):
@@ -144,8 +151,12 @@ class EventTitleHtmlTestCase(TestCase):
         self.assertEqual(event.title_html, 'Event #5')
 
 
-class EventTestCase(TestCase):
-    "Testing everything except the __str__() method."
+class EventStoredTitlesTestCase(TransactionTestCase):
+    """
+    Testing the stored title fields are kept up to date.
+    A TransactionTestCase because they're updated once the transaction
+    has been committed.
+    """
 
     def test_title_sort_with_no_title(self):
         "If there's no title, title_sort should be based on creators."
@@ -167,6 +178,97 @@ class EventTestCase(TestCase):
         event.refresh_from_db()
         self.assertEqual(event.title_sort, 'milky wimpshake')
 
+    def test_stored_titles_with_works(self):
+        "title_plain and title_html should be updated when Works change."
+        event = ConcertEventFactory(title='')
+        WorkSelectionFactory(event=event,
+                work=ClassicalWorkFactory(title='Work A'), order=1)
+        selection = WorkSelectionFactory(event=event,
+                work=ClassicalWorkFactory(title='Work B'), order=2)
+
+        event.refresh_from_db()
+        self.assertEqual(event.title_plain, 'Work A and Work B')
+        self.assertEqual(event.title_html,
+                                '<cite>Work A</cite> and <cite>Work B</cite>')
+
+        selection.delete()
+        event.refresh_from_db()
+        self.assertEqual(event.title_plain, 'Work A')
+        self.assertEqual(event.title_html, '<cite>Work A</cite>')
+
+    def test_stored_titles_when_work_title_changes(self):
+        event = ConcertEventFactory(title='')
+        work = ClassicalWorkFactory(title='Work A')
+        WorkSelectionFactory(event=event, work=work)
+
+        work.title = 'Work B'
+        work.save()
+
+        event.refresh_from_db()
+        self.assertEqual(event.title_plain, 'Work B')
+        self.assertEqual(event.title_sort, 'work b')
+
+    def test_stored_titles_when_creator_name_changes(self):
+        event = GigEventFactory(title='')
+        creator = GroupCreatorFactory(name='Martha')
+        EventRoleFactory(event=event, creator=creator)
+
+        creator.name = 'The Tuts'
+        creator.save()
+
+        event.refresh_from_db()
+        self.assertEqual(event.title_plain, 'The Tuts')
+        self.assertEqual(event.title_sort, 'tuts, the')
+
+    def test_stored_title_html_is_escaped(self):
+        event = GigEventFactory(title='Rock & Roll')
+        event.refresh_from_db()
+        self.assertEqual(event.title_plain, 'Rock & Roll')
+        self.assertEqual(event.title_html, 'Rock &amp; Roll')
+
+    def test_str_uses_stored_title(self):
+        "Shouldn't need any queries to get the title of a fetched Event."
+        event = GigEventFactory(title='')
+        EventRoleFactory(event=event,
+                        creator=GroupCreatorFactory(name='Martha'))
+        event = Event.objects.get(pk=event.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(str(event), 'Martha')
+            self.assertEqual(event.title_html, 'Martha')
+
+    def test_titles_updated_once_per_transaction(self):
+        "Several changes in one transaction should only update titles once."
+        event = GigEventFactory(title='')
+
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                EventRoleFactory(event=event,
+                        creator=GroupCreatorFactory(name='Milky Wimpshake'),
+                        role_order=1)
+                EventRoleFactory(event=event,
+                        creator=GroupCreatorFactory(name='Martha'),
+                        role_order=2)
+                # Not updated yet:
+                self.assertEqual(event.title_plain,
+                                            'Event #{}'.format(event.pk))
+
+        event_updates = [q for q in queries.captured_queries
+                    if q['sql'].startswith('UPDATE "spectator_events_event"')]
+        self.assertEqual(len(event_updates), 1)
+        self.assertEqual(event.title_plain, 'Milky Wimpshake and Martha')
+
+    def test_titles_updated_after_event_deleted(self):
+        "Deleting an Event with roles shouldn't cause errors or re-save it."
+        event = GigEventFactory(title='')
+        EventRoleFactory(event=event)
+        pk = event.pk
+        event.delete()
+        self.assertFalse(Event.objects.filter(pk=pk).exists())
+
+
+class EventTestCase(TestCase):
+    "Testing everything except the __str__() method."
+
     def test_slug(self):
         event = GigEventFactory(pk=123)
         self.assertEqual(event.slug, '9g5o8')
@@ -400,6 +502,22 @@ class EventTestCase(TestCase):
         self.assertEqual(len(works), 1)
         self.assertEqual(works[0].work, p)
 
+    def test_get_works_by_kind_prefetched(self):
+        "With Event.objects.with_details() it shouldn't need more queries."
+        event = CinemaEventFactory()
+        m = MovieFactory()
+        p = PlayFactory()
+        WorkSelectionFactory(work=m, event=event, order=2)
+        WorkSelectionFactory(work=p, event=event, order=1)
+
+        event = Event.objects.with_details().get(pk=event.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual([s.work for s in event.get_movies()], [m])
+            self.assertEqual([s.work for s in event.get_plays()], [p])
+            self.assertEqual([s.work for s in event.get_works()], [p, m])
+            self.assertEqual(event.get_exhibitions(), [])
+
 
 class WorkTestCase(TestCase):
 
@@ -487,6 +605,22 @@ class VenueTestCase(TestCase):
         venue = VenueFactory(name='My Venue')
         self.assertEqual(str(venue), 'My Venue')
 
+    def test_geohash(self):
+        venue = VenueFactory(latitude=51.5034, longitude=-0.1276)
+        self.assertEqual(venue.geohash, 'gcpuvpgj4')
+
+    def test_geohash_no_location(self):
+        venue = VenueFactory(latitude=None, longitude=None)
+        self.assertEqual(venue.geohash, '')
+
+    def test_geohash_updated(self):
+        venue = VenueFactory(latitude=51.5034, longitude=-0.1276)
+        venue.latitude = 48.8566
+        venue.longitude = 2.3522
+        venue.save(update_fields=['latitude', 'longitude'])
+        venue.refresh_from_db()
+        self.assertEqual(venue.geohash, 'u09tvw0f6')
+
     def test_ordering(self):
         "Should order by venue name."
         v3 = VenueFactory(name='Venue C')
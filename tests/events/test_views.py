@@ -1,5 +1,7 @@
 from django.conf import settings
+from django.db import connection
 from django.http.response import Http404
+from django.test.utils import CaptureQueriesContext
 
 from freezegun import freeze_time
 
@@ -94,13 +96,34 @@ class EventListViewTestCase(ViewTestCase):
         self.assertEqual(context['event_list'][4], misc)
         self.assertEqual(context['event_list'][5], dance)
 
+    def test_cursor(self):
+        "It should use the cursor to get the next page."
+        GigEventFactory.create_batch(3, date=make_date('2017-02-10'))
+        view = views.EventListView.as_view(paginate_by=2)
+
+        page = view(self.request).context_data['page_obj']
+        self.assertEqual(page.paginator.count, 3)
+        self.assertIsNotNone(page.next_cursor)
+        self.assertContains(view(self.request),
+                            'href="?cursor={}"'.format(page.next_cursor))
+
+        request = self.factory.get('/fake-path/', {'cursor': page.next_cursor})
+        response = view(request)
+        self.assertEqual(response.context_data['page_obj'].number, 2)
+        self.assertEqual(len(response.context_data['event_list']), 1)
+
+    def test_invalid_cursor(self):
+        request = self.factory.get('/fake-path/', {'cursor': 'nope'})
+        with self.assertRaises(Http404):
+            views.EventListView.as_view()(request)
+
 
 class EventDetailViewTestCase(ViewTestCase):
     "A basic EventDetail page e.g. for a gig or misc Event."
 
     def setUp(self):
         super().setUp()
-        self.event = GigEventFactory(pk=123)
+        self.event = GigEventFactory(pk=123, date=make_date('2017-02-15'))
 
     def test_response_200(self):
         "It should respond with 200."
@@ -128,6 +151,35 @@ class EventDetailViewTestCase(ViewTestCase):
         self.assertIn('event', context)
         self.assertEqual(context['event'], self.event)
 
+    def count_queries(self, event):
+        "The number of queries it takes to render `event`'s page."
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(event.get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+        return len(captured.captured_queries)
+
+    def add_work(self, event, work_factory):
+        work = work_factory()
+        WorkRoleFactory(work=work)
+        WorkRoleFactory(work=work)
+        WorkSelectionFactory(event=event, work=work)
+
+    def test_num_queries(self):
+        "The number of queries shouldn't depend on the number of Works."
+        EventRoleFactory(event=self.event)
+        self.add_work(self.event, MovieFactory)
+        num_queries = self.count_queries(self.event)
+
+        event = GigEventFactory(date=make_date('2017-02-16'))
+        for i in range(3):
+            EventRoleFactory(event=event)
+        for work_factory in (MovieFactory, PlayFactory, ClassicalWorkFactory,
+                             DancePieceFactory, ExhibitionFactory):
+            self.add_work(event, work_factory)
+            self.add_work(event, work_factory)
+
+        self.assertEqual(self.count_queries(event), num_queries)
+
 
 class EventYearArchiveViewTestCase(ViewTestCase):
 
@@ -362,3 +414,85 @@ class VenueDetailViewTestCase(ViewTestCase):
         venue = VenueFactory(pk=456, latitude=51, longitude=0)
         response = views.VenueDetailView.as_view()(self.request, slug='8wozp')
         self.assertNotIn('SPECTATOR_GOOGLE_MAPS_API_KEY', response.context_data)
+
+
+class ConditionalEventDetailViewTestCase(ViewTestCase):
+
+    @override_app_settings(CONDITIONAL_GET=True)
+    def test_etag_changes_with_work_creator(self):
+        "Renaming the Creator of one of the Event's Works changes the ETag."
+        event = MiscEventFactory(date=make_date('2017-02-01'))
+        role = WorkRoleFactory(work=MovieFactory())
+        WorkSelectionFactory(event=event, work=role.work)
+
+        def get(**headers):
+            request = self.factory.get('/fake-path/', **headers)
+            return views.EventDetailView.as_view()(request, slug=event.slug)
+
+        etag = get()['ETag']
+        self.assertEqual(get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        role.creator.name = 'Someone Else'
+        role.creator.save()
+        self.assertEqual(get(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    @override_app_settings(CONDITIONAL_GET=True)
+    def test_venue_detail(self):
+        venue = VenueFactory()
+        event = MiscEventFactory(venue=venue, date=make_date('2017-02-01'))
+
+        def get(**headers):
+            request = self.factory.get('/fake-path/', **headers)
+            return views.VenueDetailView.as_view()(request, slug=venue.slug)
+
+        etag = get()['ETag']
+        self.assertEqual(get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        event.delete()
+        self.assertEqual(get(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    @override_app_settings(CONDITIONAL_GET=True)
+    def test_etag_changes_with_sidebar_events(self):
+        "A new Event is shown in the recent events card on every page."
+        event = MiscEventFactory(date=make_date('2017-02-01'))
+
+        def get(**headers):
+            request = self.factory.get('/fake-path/', **headers)
+            return views.EventDetailView.as_view()(request, slug=event.slug)
+
+        etag = get()['ETag']
+        self.assertEqual(get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        MiscEventFactory(date=make_date('2018-03-01'))
+        self.assertEqual(get(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    @override_app_settings(CONDITIONAL_GET=True)
+    def test_event_list_etag_changes_with_creators(self):
+        "Creators are shown in the list's most seen creators card."
+        role = EventRoleFactory(event=GigEventFactory())
+
+        def get(**headers):
+            request = self.factory.get('/fake-path/', **headers)
+            return views.EventListView.as_view()(request)
+
+        etag = get()['ETag']
+        self.assertEqual(get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        role.creator.name = 'Someone Else'
+        role.creator.save()
+        self.assertEqual(get(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    @override_app_settings(CONDITIONAL_GET=True)
+    def test_work_list_with_selections(self):
+        "WorkSelections, without time_modified, are counted."
+        work = MovieFactory()
+
+        def get(**headers):
+            request = self.factory.get('/fake-path/', **headers)
+            return views.WorkListView.as_view()(request, kind_slug='movies')
+
+        etag = get()['ETag']
+        self.assertEqual(get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        WorkSelectionFactory(event=MiscEventFactory(), work=work)
+        self.assertEqual(get(HTTP_IF_NONE_MATCH=etag).status_code, 200)
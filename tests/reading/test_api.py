@@ -0,0 +1,64 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import make_date, override_app_settings
+from ..core.test_api import APITestCase
+from spectator.reading.factories import *
+
+
+class PublicationAPITestCase(APITestCase):
+
+    @override_app_settings(API=True)
+    def test_detail(self):
+        publication = PublicationFactory(
+                            title='Dune',
+                            series=PublicationSeriesFactory(title='Dune'))
+        PublicationRoleFactory(publication=publication,
+                               creator__name='Frank Herbert')
+
+        response, data = self.get(reverse('spectator:api:publication_detail',
+                                          kwargs={'slug': publication.slug}))
+        self.assertEqual(data['title'], 'Dune')
+        self.assertEqual(data['series']['name'], 'Dune')
+        self.assertEqual(data['roles'][0]['creator']['name'], 'Frank Herbert')
+
+    @override_app_settings(API=True)
+    def test_list_queries(self):
+        "The number of queries doesn't depend on the number of Publications."
+        for n in range(3):
+            PublicationRoleFactory(
+                    publication=PublicationFactory(
+                                    series=PublicationSeriesFactory()))
+
+        with CaptureQueriesContext(connection) as queries:
+            response, data = self.get(
+                                reverse('spectator:api:publication_list'))
+        self.assertEqual(len(data['results']), 3)
+        self.assertEqual(len(queries), 2)
+
+
+class ReadingAPITestCase(APITestCase):
+
+    @override_app_settings(API=True)
+    def test_detail(self):
+        reading = ReadingFactory(publication__title='Dune',
+                                 start_date=make_date('2017-02-10'),
+                                 end_date=make_date('2017-02-20'),
+                                 is_finished=True)
+
+        response, data = self.get(reverse('spectator:api:reading_detail',
+                                          kwargs={'pk': reading.pk}))
+        self.assertEqual(data['id'], reading.pk)
+        self.assertEqual(data['publication']['name'], 'Dune')
+        self.assertEqual(data['start_date'], '2017-02-10')
+        self.assertEqual(data['end_date'], '2017-02-20')
+        self.assertTrue(data['is_finished'])
+
+    @override_app_settings(API=True)
+    def test_list(self):
+        ReadingFactory.create_batch(3)
+        response, data = self.get(reverse('spectator:api:reading_list'),
+                                  data={'limit': 2})
+        self.assertEqual(len(data['results']), 2)
+        self.assertIsNotNone(data['next'])
@@ -0,0 +1,69 @@
+from django.test import TestCase
+
+from .. import make_date
+from spectator.reading.factories import *
+from spectator.reading.importers import ReadingImporter, parse_reading_date
+from spectator.reading.models import Publication, PublicationSeries, Reading
+
+
+class ParseReadingDateTestCase(TestCase):
+
+    def test_dates(self):
+        self.assertEqual(parse_reading_date('2018-03-31'),
+                         (make_date('2018-03-31'), 3))
+        self.assertEqual(parse_reading_date('2018-03'),
+                         (make_date('2018-03-01'), 4))
+        self.assertEqual(parse_reading_date('2018'),
+                         (make_date('2018-01-01'), 6))
+        self.assertEqual(parse_reading_date(''), (None, 3))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            parse_reading_date('2018-13')
+
+
+class ReadingImporterTestCase(TestCase):
+
+    def test_reading(self):
+        ReadingImporter().run([{
+            'title': 'Emma', 'series': 'Penguin Classics',
+            'isbn_uk': '0141439580',
+            'creators': 'Jane Austen; Fiona Stafford|Editor',
+            'start_date': '2018-03', 'end_date': '2018-04-02',
+            'is_finished': 'true',
+        }])
+
+        reading = Reading.objects.get()
+        self.assertEqual(reading.start_date, make_date('2018-03-01'))
+        self.assertEqual(reading.start_granularity, 4)
+        self.assertEqual(reading.end_date, make_date('2018-04-02'))
+        self.assertEqual(reading.end_granularity, 3)
+        self.assertTrue(reading.is_finished)
+
+        publication = reading.publication
+        self.assertEqual(publication.kind, 'book')
+        self.assertEqual(publication.isbn_uk, '0141439580')
+        self.assertEqual(publication.series.title, 'Penguin Classics')
+        self.assertIsNotNone(publication.slug)
+        self.assertEqual(
+            [(r.creator.name, r.role_name) for r in publication.roles.all()],
+            [('Jane Austen', ''), ('Fiona Stafford', 'Editor')])
+
+    def test_rereading(self):
+        PublicationFactory(title='Emma')
+
+        ReadingImporter().run([
+            {'title': 'Emma', 'end_date': '2001'},
+            {'title': 'emma', 'end_date': '2018'},
+            {'title': 'Persuasion'},
+        ])
+
+        self.assertEqual(Publication.objects.count(), 2)
+        self.assertEqual(Reading.objects.count(), 2)
+        self.assertEqual(
+            Publication.objects.get(title='Emma').reading_set.count(), 2)
+
+    def test_end_before_start(self):
+        with self.assertRaises(ValueError):
+            ReadingImporter().run([{'title': 'Emma', 'start_date': '2018',
+                                    'end_date': '2017'}])
@@ -1,6 +1,7 @@
 from django.test import TestCase
 
-from .. import make_date
+from .. import make_date, override_app_settings
+from spectator.core.models import AnnualCount
 from spectator.reading.factories import PublicationFactory, ReadingFactory
 
 from spectator.reading.utils import annual_reading_counts
@@ -86,3 +87,36 @@ class AnnualReadingCountsTestCase(TestCase):
         self.assertEqual(result[1],
                     {'year': make_date('2018-01-01'),
                     'periodical': 2})
+
+    def test_one_query(self):
+        with self.assertNumQueries(1):
+            annual_reading_counts()
+
+    def test_ignores_unfinished(self):
+        ReadingFactory(publication=PublicationFactory(kind='book'),
+                       end_date=None)
+
+        result = annual_reading_counts(kind='book')
+
+        self.assertEqual([r['book'] for r in result], [2, 3])
+
+    @override_app_settings(ANNUAL_COUNTS_TABLE=True)
+    def test_table(self):
+        "The same results when they come from the AnnualCount table"
+        self.assertEqual(annual_reading_counts(), [
+            {'year': make_date('2015-01-01'),
+             'book': 2, 'periodical': 0, 'total': 2},
+            {'year': make_date('2017-01-01'),
+             'book': 3, 'periodical': 2, 'total': 5},
+            {'year': make_date('2018-01-01'),
+             'book': 0, 'periodical': 2, 'total': 2},
+        ])
+        self.assertEqual(AnnualCount.objects.count(), 4)
+
+        with self.assertNumQueries(1):
+            result = annual_reading_counts(kind='periodical')
+
+        self.assertEqual(result, [
+            {'year': make_date('2017-01-01'), 'periodical': 2},
+            {'year': make_date('2018-01-01'), 'periodical': 2},
+        ])
@@ -2,7 +2,7 @@ from django.http.response import Http404
 
 from freezegun import freeze_time
 
-from .. import make_date
+from .. import make_date, override_app_settings
 from ..core.test_views import ViewTestCase
 from spectator.reading import views
 from spectator.reading.factories import PublicationFactory,\
@@ -339,3 +339,36 @@ class ReadingYearArchiveViewTestCase(ViewTestCase):
 
         self.assertIn('book_count', data)
         self.assertEqual(data['book_count'], 2)
+
+
+class ConditionalPublicationDetailViewTestCase(ViewTestCase):
+
+    @override_app_settings(CONDITIONAL_GET=True)
+    def test_etag_changes_with_reading(self):
+        publication = PublicationFactory()
+
+        def get(**headers):
+            request = self.factory.get('/fake-path/', **headers)
+            return views.PublicationDetailView.as_view()(
+                                            request, slug=publication.slug)
+
+        etag = get()['ETag']
+        self.assertEqual(get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        ReadingFactory(publication=publication)
+        self.assertEqual(get(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    @override_app_settings(CONDITIONAL_GET=True)
+    def test_etag_changes_with_sidebar_readings(self):
+        "Another Publication being read is shown in the sidebar."
+        publication = PublicationFactory()
+
+        def get(**headers):
+            request = self.factory.get('/fake-path/', **headers)
+            return views.PublicationDetailView.as_view()(
+                                            request, slug=publication.slug)
+
+        etag = get()['ETag']
+        ReadingFactory(publication=PublicationFactory(),
+                       start_date=make_date('2017-02-01'), end_date=None)
+        self.assertEqual(get(HTTP_IF_NONE_MATCH=etag).status_code, 200)